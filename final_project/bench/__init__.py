@@ -0,0 +1,82 @@
+"""
+Các tiện ích đo hiệu năng dùng chung cho các script phân tích trong final_project.
+
+Các script trong feature1/2/3 thêm thư mục final_project vào sys.path rồi
+import trực tiếp: `from bench import run_benchmark`.
+"""
+
+from .autotune import DEFAULT_TABLE_PATH, TuningTable, coordinate_search, host_id
+from .build import BuildError, build_targets
+from .cli import (
+    add_benchmark_arguments,
+    add_plot_arguments,
+    add_results_arguments,
+    add_thread_arguments,
+    benchmark_options,
+    describe_options,
+    plan_threads,
+    report_store,
+)
+from .engine import (
+    DEFAULT_CONFIDENCE,
+    DEFAULT_RUNS,
+    DEFAULT_WARMUP,
+    end_to_end_series,
+    format_stats,
+    run_benchmark,
+    run_once,
+    summarize,
+    summarize_threads,
+)
+from .export import read_results, results_meta, write_results
+from .native import NativeBlur, decode_image, load_library
+from .plotting import pyplot, render_charts
+from .pyblur import PYBLUR_SCRIPT, SharedBlur, pyblur_env
+from .reference import DEFAULT_TOLERANCE, check_dump, reference_output
+from .store import ResultStore
+from .topology import describe_topology, detect_topology, shade_topology, thread_ladder
+
+__all__ = [
+    'BuildError',
+    'DEFAULT_CONFIDENCE',
+    'DEFAULT_RUNS',
+    'DEFAULT_TABLE_PATH',
+    'DEFAULT_TOLERANCE',
+    'DEFAULT_WARMUP',
+    'PYBLUR_SCRIPT',
+    'add_benchmark_arguments',
+    'add_plot_arguments',
+    'add_results_arguments',
+    'add_thread_arguments',
+    'benchmark_options',
+    'build_targets',
+    'check_dump',
+    'coordinate_search',
+    'describe_options',
+    'decode_image',
+    'describe_topology',
+    'detect_topology',
+    'end_to_end_series',
+    'format_stats',
+    'host_id',
+    'load_library',
+    'plan_threads',
+    'pyblur_env',
+    'pyplot',
+    'read_results',
+    'reference_output',
+    'render_charts',
+    'report_store',
+    'results_meta',
+    'run_benchmark',
+    'run_once',
+    'shade_topology',
+    'summarize',
+    'summarize_threads',
+    'thread_ladder',
+    'write_results',
+    'NativeBlur',
+    'ResultStore',
+    'SharedBlur',
+    'TuningTable',
+]
@@ -0,0 +1,132 @@
+"""
+Tự động chọn tham số (autotuning) và bảng tra cứu kết quả theo máy.
+
+`coordinate_search` tìm cấu hình nhanh nhất trên lưới tham số (ví dụ kích thước
+tile) bằng tìm kiếm theo tọa độ: lần lượt quét từng trục khi giữ các trục còn
+lại ở giá trị tốt nhất hiện tại, lặp đến khi không còn cải thiện. Số phép đo
+tăng theo tổng số giá trị các trục thay vì theo tích của chúng.
+
+`TuningTable` lưu cấu hình thắng cuộc vào một file JSON, theo máy (CPU, kiến
+trúc, số CPU), kernel, kích thước ảnh và số luồng. Khi tra cứu một kích thước
+ảnh chưa được tune, bảng trả về mục của kích thước gần nhất (theo số pixel)
+trên cùng máy và số luồng.
+"""
+
+import json
+import math
+import os
+import time
+
+from .store import environment_fingerprint
+
+DEFAULT_TABLE_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'autotune_table.json')
+)
+DEFAULT_MAX_ROUNDS = 3  # Số vòng quét tối đa của tìm kiếm theo tọa độ
+
+
+def host_id(env=None):
+    """Định danh máy cho bảng tra cứu, ví dụ 'Apple M2 Pro (arm64, 12 CPUs)'."""
+    fingerprint = environment_fingerprint(env)
+    return f"{fingerprint['cpu'] or 'unknown CPU'} ({fingerprint['machine']}, {fingerprint['cpu_count']} CPUs)"
+
+
+def coordinate_search(measure, axes, start=None, max_rounds=DEFAULT_MAX_ROUNDS):
+    """
+    Tìm cấu hình có thời gian nhỏ nhất bằng tìm kiếm theo tọa độ.
+
+    Args:
+        measure (callable): measure(config) -> thời gian (giây) hoặc None nếu lỗi;
+            config là dict {tên trục: giá trị}
+        axes (dict): {tên trục: danh sách giá trị}
+        start (dict | None): Cấu hình xuất phát (mặc định: giá trị giữa của mỗi trục)
+        max_rounds (int): Số vòng quét tối đa qua tất cả các trục
+
+    Returns:
+        dict | None: 'best' (cấu hình), 'time', 'measured' (danh sách
+        {'config', 'time'} theo thứ tự đo, mỗi cấu hình đo một lần) và 'rounds';
+        None nếu không đo được cấu hình nào
+    """
+    names = list(axes)
+    current = dict(start) if start else {name: axes[name][len(axes[name]) // 2] for name in names}
+    times = {}
+    measured = []
+
+    def evaluate(config):
+        key = tuple(config[name] for name in names)
+        if key not in times:
+            times[key] = measure(dict(config))
+            if times[key] is not None:
+                measured.append({'config': dict(config), 'time': times[key]})
+        return times[key]
+
+    best_time = evaluate(current)
+    rounds = 0
+    for rounds in range(1, max_rounds + 1):
+        improved = False
+        for name in names:
+            for value in axes[name]:
+                candidate = dict(current, **{name: value})
+                elapsed = evaluate(candidate)
+                if elapsed is not None and (best_time is None or elapsed < best_time):
+                    current, best_time, improved = candidate, elapsed, True
+        if not improved:
+            break
+    if best_time is None:
+        return None
+    return {'best': current, 'time': best_time, 'measured': measured, 'rounds': rounds}
+
+
+class TuningTable:
+    """Bảng tra cứu cấu hình tốt nhất đã tune, lưu trong file JSON."""
+
+    def __init__(self, path=DEFAULT_TABLE_PATH):
+        """
+        Args:
+            path (str): Đường dẫn file JSON (được tạo khi `save` lần đầu)
+        """
+        self.path = path
+        self.entries = []
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f).get('entries', [])
+
+    def _matches(self, entry, kernel, threads, host):
+        return entry['host'] == host and entry['kernel'] == kernel and entry['threads'] == threads
+
+    def lookup(self, kernel, width, height, threads, host=None):
+        """
+        Tra cứu cấu hình cho kernel, kích thước ảnh và số luồng trên máy hiện tại.
+
+        Returns:
+            dict | None: Mục của bảng (có 'params', 'time', 'exact' cho biết kích thước
+            ảnh có trùng khớp không), hoặc None nếu máy/kernel/số luồng chưa được tune.
+            Tham số None trong 'params' (ví dụ tile_w) nghĩa là phiên bản không tune
+            (kernel không chia tile) nhanh hơn mọi cấu hình đã đo
+        """
+        host = host or host_id()
+        candidates = [e for e in self.entries if self._matches(e, kernel, threads, host)]
+        if not candidates:
+            return None
+        pixels = width * height
+        entry = min(candidates, key=lambda e: abs(math.log(e['width'] * e['height'] / pixels)))
+        return dict(entry, exact=(entry['width'], entry['height']) == (width, height))
+
+    def record(self, kernel, width, height, threads, params, elapsed, host=None, **extra):
+        """Ghi (hoặc thay thế) cấu hình thắng cuộc cho một kernel/kích thước ảnh/số luồng."""
+        host = host or host_id()
+        self.entries = [
+            e for e in self.entries
+            if not (self._matches(e, kernel, threads, host) and (e['width'], e['height']) == (width, height))
+        ]
+        self.entries.append(dict(
+            host=host, kernel=kernel, width=width, height=height, threads=threads,
+            params=params, time=elapsed, updated=time.strftime('%Y-%m-%dT%H:%M:%S'), **extra,
+        ))
+
+    def save(self):
+        """Ghi bảng ra file JSON (sắp xếp theo máy, kernel, kích thước ảnh, số luồng)."""
+        self.entries.sort(key=lambda e: (e['host'], e['kernel'], e['width'] * e['height'], e['threads']))
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'entries': self.entries}, f, indent=2)
+            f.write('\n')
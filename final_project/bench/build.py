@@ -0,0 +1,173 @@
+"""
+Lớp build tăng dần dựa trên hash nội dung, thay cho `make clean && make`.
+
+Makefile vẫn là nơi định nghĩa lệnh biên dịch: lệnh của từng target được lấy
+bằng `make -n -B`. Mỗi target được băm theo lệnh biên dịch, phiên bản trình
+biên dịch, nội dung source và các header cục bộ (`#include "..."`). Binary đã
+build được lưu trong `final_project/.build_cache/<hash>/`, nên target không đổi
+chỉ cần chép lại từ cache; các target cần build được biên dịch song song.
+"""
+
+import hashlib
+import os
+import re
+import shlex
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_CACHE_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.build_cache')
+)
+
+SOURCE_EXTENSIONS = ('.c', '.cc', '.cpp', '.cxx')
+_INCLUDE_RE = re.compile(r'^\s*#\s*include\s*"([^"]+)"', re.MULTILINE)
+
+_compiler_versions = {}
+
+
+class BuildError(Exception):
+    """Lỗi khi đọc Makefile hoặc biên dịch một target."""
+
+
+def make_variables():
+    """Biến make được ghi đè từ môi trường (ví dụ CXX=g++ trên Linux)."""
+    return [f"{name}={os.environ[name]}" for name in ('CXX', 'CXXFLAGS', 'OMPFLAGS') if name in os.environ]
+
+
+def compile_commands(targets=(), directory='.'):
+    """
+    Lấy lệnh biên dịch của các target từ Makefile bằng `make -n -B`.
+
+    Returns:
+        dict: {tên file đầu ra: danh sách tham số của lệnh biên dịch}
+    """
+    result = subprocess.run(
+        ['make', '-n', '-B'] + make_variables() + list(targets),
+        cwd=directory, check=True, capture_output=True, text=True,
+    )
+    commands = {}
+    for line in result.stdout.splitlines():
+        argv = shlex.split(line)
+        if '-o' in argv[:-1]:
+            commands[argv[argv.index('-o') + 1]] = argv
+    return commands
+
+
+def _compiler_version(compiler):
+    if compiler not in _compiler_versions:
+        try:
+            result = subprocess.run([compiler, '--version'], capture_output=True, text=True)
+            _compiler_versions[compiler] = result.stdout
+        except FileNotFoundError:
+            raise BuildError(f"Compiler not found: {compiler}")
+    return _compiler_versions[compiler]
+
+
+def _local_includes(path, seen):
+    """Tìm đệ quy các header cục bộ (`#include "..."`) mà file sử dụng."""
+    with open(path, encoding='utf-8', errors='replace') as f:
+        text = f.read()
+    for name in _INCLUDE_RE.findall(text):
+        header = os.path.normpath(os.path.join(os.path.dirname(path), name))
+        if os.path.isfile(header) and header not in seen:
+            seen.add(header)
+            _local_includes(header, seen)
+    return seen
+
+
+def target_hash(argv, directory='.'):
+    """Hash của một target: lệnh biên dịch + trình biên dịch + source + header."""
+    digest = hashlib.sha256()
+    digest.update('\0'.join(argv).encode('utf-8'))
+    digest.update(_compiler_version(argv[0]).encode('utf-8'))
+    sources = [os.path.join(directory, a) for a in argv if a.endswith(SOURCE_EXTENSIONS)]
+    inputs = set(sources)
+    for source in sources:
+        _local_includes(source, inputs)
+    for path in sorted(inputs):
+        digest.update(os.path.basename(path).encode('utf-8'))
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _build_one(output, argv, directory, cache_path):
+    """
+    Biên dịch một target vào thư mục cache; trả về (output, lỗi hoặc None).
+
+    Trình biên dịch ghi vào một file tạm cùng thư mục, chỉ được đổi tên thành
+    cache_path khi biên dịch thành công: một lần build bị ngắt (Ctrl-C, job bị
+    kill) không để lại binary dở dang mà các lần chạy sau coi là đã cache.
+    """
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    temp_path = f"{cache_path}.tmp{os.getpid()}"
+    cache_argv = list(argv)
+    cache_argv[cache_argv.index('-o') + 1] = temp_path
+    try:
+        result = subprocess.run(cache_argv, cwd=directory, capture_output=True, text=True)
+        if result.returncode != 0:
+            return output, result.stderr
+        os.replace(temp_path, cache_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return output, None
+
+
+def _install(cache_path, output_path):
+    """Chép binary từ cache ra thư mục làm việc nếu nội dung khác."""
+    if os.path.isfile(output_path):
+        with open(cache_path, 'rb') as a, open(output_path, 'rb') as b:
+            if a.read() == b.read():
+                return
+        os.remove(output_path)
+    shutil.copy2(cache_path, output_path)
+
+
+def build_targets(targets=(), directory='.', cache_dir=DEFAULT_CACHE_DIR, jobs=None):
+    """
+    Đảm bảo các target trong Makefile đã được build, chỉ biên dịch lại khi cần.
+
+    Args:
+        targets (list): Tên target make (rỗng = target mặc định)
+        directory (str): Thư mục chứa Makefile
+        cache_dir (str): Thư mục cache binary theo hash
+        jobs (int | None): Số lệnh biên dịch chạy song song (mặc định: số CPU)
+
+    Returns:
+        dict: {'built': [...], 'cached': [...]} theo tên file đầu ra
+
+    Raises:
+        BuildError: Khi không đọc được Makefile hoặc biên dịch thất bại
+    """
+    try:
+        commands = compile_commands(targets, directory)
+    except FileNotFoundError:
+        raise BuildError("'make' command not found. Please ensure make is installed.")
+    except subprocess.CalledProcessError as e:
+        raise BuildError(f"Cannot read build commands from Makefile:\n{e.stderr}")
+
+    cache_paths = {}
+    to_build = []
+    for output, argv in commands.items():
+        digest = target_hash(argv, directory)
+        cache_paths[output] = os.path.join(cache_dir, digest, os.path.basename(output))
+        if not os.path.isfile(cache_paths[output]):
+            to_build.append(output)
+
+    if to_build:
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+            futures = [
+                pool.submit(_build_one, output, commands[output], directory, cache_paths[output])
+                for output in to_build
+            ]
+            errors = [f.result() for f in futures]
+        failed = [(output, err) for output, err in errors if err is not None]
+        if failed:
+            raise BuildError('\n'.join(f"{output}:\n{err}" for output, err in failed))
+
+    for output, cache_path in cache_paths.items():
+        _install(cache_path, os.path.join(directory, output))
+
+    return {'built': to_build, 'cached': [o for o in commands if o not in to_build]}
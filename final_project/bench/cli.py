@@ -0,0 +1,125 @@
+"""Các tham số dòng lệnh dùng chung cho bộ máy đo hiệu năng."""
+
+from .engine import (
+    DEFAULT_MAX_RUNS,
+    DEFAULT_RUNS,
+    DEFAULT_TARGET_CI,
+    DEFAULT_TIME_BUDGET,
+    DEFAULT_WARMUP,
+)
+from .plotting import DEFAULT_DPI
+from .reference import DEFAULT_TOLERANCE
+from .store import DEFAULT_DB_PATH, ResultStore
+from .topology import DEFAULT_OVERSUBSCRIBE, detect_topology, thread_ladder
+
+
+def add_benchmark_arguments(parser, runs=DEFAULT_RUNS, warmup=DEFAULT_WARMUP):
+    """Thêm các tham số điều khiển việc lấy mẫu vào argparse parser."""
+    group = parser.add_argument_group('benchmark')
+    group.add_argument('--runs', '-r', type=int, default=runs,
+                       help=f'Số mẫu được tính vào thống kê, là số mẫu tối thiểu khi dùng --adaptive (mặc định: {runs})')
+    group.add_argument('--warmup', '-w', type=int, default=warmup,
+                       help=f'Số lần chạy khởi động bị loại bỏ (mặc định: {warmup})')
+    group.add_argument('--repeat', type=int, default=None,
+                       help='Chạy kernel N lần trong cùng một process (đọc ảnh một lần) thay vì mỗi mẫu một process')
+    group.add_argument('--adaptive', action='store_true',
+                       help='Lấy mẫu đến khi khoảng tin cậy đủ hẹp thay vì chạy số lần cố định')
+    group.add_argument('--target-ci', type=float, default=DEFAULT_TARGET_CI,
+                       help=f'Nửa độ rộng CI 95%% tương đối cần đạt khi dùng --adaptive (mặc định: {DEFAULT_TARGET_CI})')
+    group.add_argument('--time-budget', type=float, default=DEFAULT_TIME_BUDGET,
+                       help=f'Ngân sách thời gian (giây) cho mỗi cấu hình khi dùng --adaptive (mặc định: {DEFAULT_TIME_BUDGET})')
+    group.add_argument('--max-runs', type=int, default=DEFAULT_MAX_RUNS,
+                       help=f'Số mẫu tối đa cho mỗi cấu hình khi dùng --adaptive (mặc định: {DEFAULT_MAX_RUNS})')
+    group.add_argument('--db', default=DEFAULT_DB_PATH,
+                       help='File SQLite lưu kết quả đo để dùng lại giữa các lần chạy (mặc định: final_project/bench_results.sqlite)')
+    group.add_argument('--no-cache', action='store_true',
+                       help='Đo lại mọi cấu hình, không đọc/ghi kết quả đã lưu')
+    group.add_argument('--max-age', type=float, default=None,
+                       help='Chỉ dùng lại kết quả đo trong vòng số giờ này (mặc định: không giới hạn)')
+    group.add_argument('--verify', action='store_true',
+                       help='Kiểm tra ảnh kết quả của mỗi cấu hình với bản tham chiếu NumPy; cấu hình sai bị loại')
+    group.add_argument('--tolerance', type=int, default=DEFAULT_TOLERANCE,
+                       help=f'Sai khác tối đa (mức xám) cho phép khi dùng --verify (mặc định: {DEFAULT_TOLERANCE})')
+    return group
+
+
+def add_results_arguments(parser, results_file):
+    """Thêm các tham số lưu kết quả và vẽ lại từ kết quả đã lưu."""
+    group = parser.add_argument_group('results')
+    group.add_argument('--results', default=results_file,
+                       help=f'File JSON-lines lưu mẫu thô và kết quả dẫn xuất, kèm file .csv tóm tắt (mặc định: {results_file})')
+    mode = group.add_mutually_exclusive_group()
+    mode.add_argument('--replot', action='store_true',
+                      help='Vẽ lại biểu đồ và REPORT.md từ file --results, không chạy benchmark')
+    mode.add_argument('--report-only', action='store_true',
+                      help='Chỉ tạo lại REPORT.md từ file --results, không chạy benchmark')
+    return group
+
+
+def add_plot_arguments(parser, dpi=DEFAULT_DPI):
+    """Thêm các tham số điều khiển việc vẽ biểu đồ."""
+    group = parser.add_argument_group('plots')
+    group.add_argument('--no-plots', action='store_true',
+                       help='Không vẽ biểu đồ (không import matplotlib), chỉ đo và tạo báo cáo')
+    group.add_argument('--dpi', type=int, default=dpi,
+                       help=f'Độ phân giải của file biểu đồ (mặc định: {dpi})')
+    group.add_argument('--plot-jobs', type=int, default=None,
+                       help='Số process vẽ biểu đồ song song (mặc định: số CPU, 1 = tuần tự)')
+    return group
+
+
+def add_thread_arguments(parser):
+    """Thêm các tham số chọn số luồng cần đo."""
+    group = parser.add_argument_group('threads')
+    group.add_argument('--threads', '-t', nargs='+', type=int, default=None,
+                       help='Danh sách số thread để test (mặc định: lập theo topology CPU của máy)')
+    group.add_argument('--oversubscribe', type=float, default=DEFAULT_OVERSUBSCRIBE,
+                       help=f'Điểm oversubscription = hệ số này x số CPU logic, <= 1 để bỏ qua (mặc định: {DEFAULT_OVERSUBSCRIBE})')
+    return group
+
+
+def plan_threads(args):
+    """Topology của máy và danh sách số luồng: --threads nếu có, nếu không thì lập theo topology."""
+    topology = detect_topology()
+    return topology, args.threads or thread_ladder(topology, args.oversubscribe)
+
+
+def benchmark_options(args):
+    """Chuyển kết quả argparse thành keyword arguments cho `run_benchmark`."""
+    store = None
+    if not args.no_cache:
+        max_age = args.max_age * 3600 if args.max_age is not None else None
+        store = ResultStore(args.db, max_age=max_age)
+    return {
+        'runs': args.runs,
+        'warmup': args.warmup,
+        'target_ci': args.target_ci if args.adaptive else None,
+        'time_budget': args.time_budget,
+        'max_runs': args.max_runs,
+        'repeat': args.repeat,
+        'store': store,
+        'verify': args.verify,
+        'tolerance': args.tolerance,
+    }
+
+
+def report_store(options):
+    """In thống kê dùng lại kết quả của results store (nếu có)."""
+    if options.get('store') is not None:
+        print(options['store'].summary())
+
+
+def describe_options(options):
+    """Mô tả ngắn cấu hình lấy mẫu để in ra màn hình hoặc báo cáo."""
+    if options.get('target_ci') is None:
+        text = f"{options['runs']} runs, {options['warmup']} warmup"
+    else:
+        text = (
+            f"adaptive: ±{options['target_ci']:.1%} CI, {options['runs']}-{options['max_runs']} runs, "
+            f"{options['time_budget']:.0f}s budget, {options['warmup']} warmup"
+        )
+    if options.get('repeat'):
+        text += f", {options['repeat']} in-process repeats"
+    if options.get('verify'):
+        text += f", output verified (±{options['tolerance']})"
+    return text
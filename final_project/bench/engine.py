@@ -0,0 +1,397 @@
+"""
+Bộ máy đo hiệu năng dùng chung cho các script phân tích.
+
+Mỗi mẫu là một lần chạy file thực thi; chương trình in thời gian tính toán
+ở dòng cuối cùng của stdout. Các lần chạy khởi động (warmup) được chạy
+trước và loại khỏi thống kê, nhưng vẫn được giữ lại trong kết quả.
+
+Nếu dòng cuối là JSON (xem phase_timing.h), chương trình báo thời gian từng
+giai đoạn: decode, alloc, compute (danh sách, mỗi lần lặp một giá trị), encode
+và total. Thời gian compute là mẫu của thống kê; các giai đoạn còn lại được
+tổng hợp thành thời gian đầu-cuối (end-to-end) và throughput (megapixel/giây).
+
+Ở chế độ lặp trong process (repeat=N), số lần lặp được thêm vào cuối tham số
+dòng lệnh: chương trình đọc ảnh một lần, chạy kernel N lần trên cùng team
+OpenMP và in thời gian từng lần trên N dòng cuối. Khi đó warmup là số lần lặp
+đầu tiên bị loại trong mỗi process.
+
+Khi chương trình được chạy với BLUR_THREAD_STATS=1, dòng JSON có thêm trường
+"threads" (số liệu từng luồng của từng lần lặp: start, busy, wait, iterations);
+`summarize_threads` tổng hợp chúng thành thời gian theo luồng và tỷ lệ mất cân
+bằng tải (max/mean thời gian busy).
+
+Tham số env cho phép chạy chương trình với môi trường được kiểm soát (ví dụ
+OMP_PROC_BIND/OMP_PLACES): các biến được ghi đè lên môi trường hiện tại, giá trị
+None nghĩa là xóa biến đó.
+
+Ở chế độ thích ứng (target_ci khác None), số mẫu không cố định: việc lấy
+mẫu dừng khi khoảng tin cậy đủ hẹp hoặc khi hết ngân sách thời gian.
+
+Khi verify=True và có mô tả kiểm tra (check, xem reference.py), sau khi lấy mẫu
+chương trình được chạy thêm một lần với BLUR_DUMP/BLUR_DUMP_INPUT và kết quả
+được so sánh với bản tham chiếu NumPy. Cấu hình cho kết quả sai (vượt dung sai)
+bị coi là lỗi: run_benchmark trả về None, nên một biến thể nhanh nhưng sai không
+thể thắng trong phép quét.
+"""
+
+import json
+import math
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+
+from .reference import DEFAULT_TOLERANCE, check_dump
+
+DEFAULT_RUNS = 5
+DEFAULT_WARMUP = 1
+DEFAULT_CONFIDENCE = 0.95
+
+# Cấu hình mặc định cho chế độ lấy mẫu thích ứng (adaptive)
+DEFAULT_TARGET_CI = 0.02  # Nửa độ rộng CI / trung bình
+DEFAULT_TIME_BUDGET = 10.0  # Giây cho mỗi cấu hình
+DEFAULT_MAX_RUNS = 30
+
+# Các giai đoạn (ngoài compute) trong dòng JSON của chương trình
+PHASES = ('decode', 'alloc', 'encode', 'total')
+
+# Giá trị tới hạn hai phía của phân phối Student-t (df = 1..30)
+_T_TABLE = {
+    0.90: [6.314, 2.920, 2.353, 2.132, 2.015, 1.943, 1.895, 1.860, 1.833, 1.812,
+           1.796, 1.782, 1.771, 1.761, 1.753, 1.746, 1.740, 1.734, 1.729, 1.725,
+           1.721, 1.717, 1.714, 1.711, 1.708, 1.706, 1.703, 1.701, 1.699, 1.697],
+    0.95: [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+           2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+           2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042],
+    0.99: [63.657, 9.925, 5.841, 4.604, 4.032, 3.707, 3.499, 3.355, 3.250, 3.169,
+           3.106, 3.055, 3.012, 2.977, 2.947, 2.921, 2.898, 2.878, 2.861, 2.845,
+           2.831, 2.819, 2.807, 2.797, 2.787, 2.779, 2.771, 2.763, 2.756, 2.750],
+}
+_Z_VALUES = {0.90: 1.645, 0.95: 1.960, 0.99: 2.576}
+
+
+def t_critical(df, confidence=DEFAULT_CONFIDENCE):
+    """Trả về giá trị tới hạn t cho số bậc tự do df."""
+    if confidence not in _T_TABLE:
+        raise ValueError(f"Unsupported confidence level: {confidence}")
+    if df < 1:
+        return math.inf
+    table = _T_TABLE[confidence]
+    return table[df - 1] if df <= len(table) else _Z_VALUES[confidence]
+
+
+def summarize(samples, confidence=DEFAULT_CONFIDENCE):
+    """Tính median, min, mean, độ lệch chuẩn và khoảng tin cậy của trung bình."""
+    n = len(samples)
+    mean = statistics.fmean(samples)
+    stddev = statistics.stdev(samples) if n > 1 else 0.0
+    half_width = t_critical(n - 1, confidence) * stddev / math.sqrt(n) if n > 1 else math.inf
+    return {
+        'n': n,
+        'median': statistics.median(samples),
+        'min': min(samples),
+        'mean': mean,
+        'stddev': stddev,
+        'confidence': confidence,
+        'ci_low': mean - half_width,
+        'ci_high': mean + half_width,
+        'ci_rel': half_width / mean if mean > 0 else math.inf,
+    }
+
+
+def parse_timings(stdout, count=1):
+    """Lấy `count` thời gian tính toán (giây) từ các dòng output cuối cùng."""
+    lines = stdout.strip().split('\n')
+    if len(lines) < count:
+        raise ValueError(f"expected {count} timing lines, got {len(lines)}")
+    return [float(line) for line in lines[-count:]]
+
+
+def parse_output(stdout, count=1):
+    """
+    Phân tích output của chương trình.
+
+    Returns:
+        tuple: (danh sách `count` thời gian compute, dict các giai đoạn hoặc None
+        nếu chương trình chỉ in thời gian dạng số)
+    """
+    last_line = stdout.strip().split('\n')[-1].strip()
+    if not last_line.startswith('{'):
+        return parse_timings(stdout, count), None
+    phases = json.loads(last_line)
+    timings = phases.pop('compute')
+    if len(timings) < count:
+        raise ValueError(f"expected {count} compute timings, got {len(timings)}")
+    return timings[-count:], phases
+
+
+def child_environment(env=None):
+    """Môi trường của process con: os.environ ghi đè bởi env (giá trị None = xóa biến)."""
+    merged = dict(os.environ)
+    for name, value in (env or {}).items():
+        if value is None:
+            merged.pop(name, None)
+        else:
+            merged[name] = str(value)
+    return merged
+
+
+def run_once(executable, args=(), repeat=None, env=None):
+    """Chạy file thực thi một lần; trả về (danh sách thời gian compute, giai đoạn)."""
+    command = [executable] + list(args) + ([str(repeat)] if repeat else [])
+    result = subprocess.run(command, check=True, capture_output=True, text=True,
+                            env=child_environment(env) if env else None)
+    return parse_output(result.stdout, repeat or 1)
+
+
+def verify_output(executable, args=(), check=None, tolerance=DEFAULT_TOLERANCE, env=None):
+    """
+    Chạy file thực thi một lần với BLUR_DUMP/BLUR_DUMP_INPUT và so sánh ảnh kết
+    quả với bản tham chiếu NumPy.
+
+    Returns:
+        dict: Kết quả của `check_dump` (ok, max_abs, mismatched, fraction, tolerance)
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'input.raw')
+        output_path = os.path.join(tmp, 'output.raw')
+        dump_env = dict(env or {}, BLUR_DUMP=output_path, BLUR_DUMP_INPUT=input_path)
+        _, phases = run_once(executable, args, env=dump_env)
+        if phases is None:
+            raise ValueError("program does not report image dimensions")
+        return check_dump(check, input_path, output_path, phases['width'], phases['height'],
+                          phases['channels'], tolerance)
+
+
+def summarize_phases(phase_samples, compute_time):
+    """
+    Tổng hợp thời gian các giai đoạn của những lần chạy được tính vào thống kê.
+
+    Args:
+        phase_samples (list): Dict giai đoạn của từng process (từ `parse_output`)
+        compute_time (float): Thời gian compute đại diện (median)
+
+    Returns:
+        dict: 'phases' (median từng giai đoạn, gồm cả các giai đoạn riêng trong
+        "extra_phases"), 'end_to_end' (decode + alloc + compute + encode + các giai
+        đoạn riêng cho một ảnh), 'megapixels', 'throughput' (MP/s đầu-cuối) và
+        'kernel_throughput' (MP/s chỉ tính compute)
+    """
+    phases = {name: statistics.median(p[name] for p in phase_samples) for name in PHASES}
+    extra = {name: statistics.median(p.get('extra_phases', {}).get(name, 0.0) for p in phase_samples)
+             for name in phase_samples[-1].get('extra_phases', {})}
+    phases.update(extra)
+    end_to_end = phases['decode'] + phases['alloc'] + compute_time + phases['encode'] + sum(extra.values())
+    last = phase_samples[-1]
+    megapixels = last['width'] * last['height'] / 1e6
+    return {
+        'phases': phases,
+        'end_to_end': end_to_end,
+        'megapixels': megapixels,
+        'throughput': megapixels / end_to_end if end_to_end > 0 else math.inf,
+        'kernel_throughput': megapixels / compute_time if compute_time > 0 else math.inf,
+    }
+
+
+def summarize_threads(phase_samples):
+    """
+    Tổng hợp số liệu theo luồng (trường "threads") của những lần chạy được tính vào thống kê.
+
+    Chỉ dùng các lần lặp có team đầy đủ (kích thước team lớn nhất); mỗi lần lặp
+    cho một tỷ lệ mất cân bằng max(busy) / mean(busy) (1.0 = cân bằng hoàn hảo).
+
+    Returns:
+        dict | None: 'team_size', 'start', 'busy', 'wait', 'iterations' (median
+        theo từng luồng), 'imbalance' (median các lần lặp), 'imbalance_max',
+        'wait_fraction' (tổng thời gian chờ / tổng thời gian của team, median),
+        'n' (số lần lặp); None nếu không có số liệu theo luồng
+    """
+    teams = [team for p in phase_samples for team in p.get('threads', []) if team]
+    if not teams:
+        return None
+    team_size = max(len(team) for team in teams)
+    teams = [team for team in teams if len(team) == team_size]
+    imbalances, wait_fractions = [], []
+    for team in teams:
+        busy = [t['busy'] for t in team]
+        wait = sum(t['wait'] for t in team)
+        mean_busy = statistics.fmean(busy)
+        imbalances.append(max(busy) / mean_busy if mean_busy > 0 else math.nan)
+        wait_fractions.append(wait / (sum(busy) + wait) if sum(busy) + wait > 0 else 0.0)
+    summary = {'team_size': team_size, 'n': len(teams)}
+    for name in ('start', 'busy', 'wait', 'iterations'):
+        summary[name] = [statistics.median(team[i][name] for team in teams) for i in range(team_size)]
+    summary.update(
+        imbalance=statistics.median(imbalances),
+        imbalance_max=max(imbalances),
+        wait_fraction=statistics.median(wait_fractions),
+    )
+    return summary
+
+
+def end_to_end_series(baseline_stats, stats_list):
+    """
+    Thời gian đầu-cuối, speedup đầu-cuối và throughput của một dãy phép đo.
+
+    Args:
+        baseline_stats (dict): Thống kê của bản tuần tự
+        stats_list (list): Thống kê của các cấu hình song song
+
+    Returns:
+        dict | None: {'times', 'speedups', 'throughputs'} (danh sách theo thứ tự
+        `stats_list`), hoặc None nếu có phép đo không báo thời gian giai đoạn
+    """
+    if any('end_to_end' not in s for s in [baseline_stats] + list(stats_list)):
+        return None
+    return {
+        'times': [s['end_to_end'] for s in stats_list],
+        'speedups': [baseline_stats['end_to_end'] / s['end_to_end'] for s in stats_list],
+        'throughputs': [s['throughput'] for s in stats_list],
+    }
+
+
+def run_benchmark(executable, args=(), runs=DEFAULT_RUNS, warmup=DEFAULT_WARMUP,
+                  confidence=DEFAULT_CONFIDENCE, target_ci=None,
+                  time_budget=DEFAULT_TIME_BUDGET, max_runs=DEFAULT_MAX_RUNS, repeat=None,
+                  store=None, env=None, check=None, verify=False, tolerance=DEFAULT_TOLERANCE):
+    """
+    Chạy một file thực thi nhiều lần và trả về thống kê thời gian.
+
+    Args:
+        executable (str): Đường dẫn file thực thi
+        args (list): Tham số dòng lệnh
+        runs (int): Số mẫu được tính vào thống kê (số mẫu tối thiểu ở chế độ thích ứng)
+        warmup (int): Số lần chạy khởi động bị loại bỏ (mẫu "lạnh" đầu tiên)
+        confidence (float): Mức tin cậy của khoảng tin cậy (0.90, 0.95, 0.99)
+        target_ci (float | None): Nếu khác None, lấy mẫu đến khi nửa độ rộng
+            CI tương đối (ci_rel) không vượt quá giá trị này
+        time_budget (float | None): Ngân sách thời gian (giây) cho chế độ thích ứng
+        max_runs (int): Số mẫu tối đa ở chế độ thích ứng
+        repeat (int | None): Nếu khác None, mỗi process chạy kernel `warmup + repeat`
+            lần và trả về `repeat` mẫu (bỏ `warmup` lần đầu)
+        env (dict | None): Biến môi trường ghi đè cho mọi lần chạy (None = xóa biến)
+        store (ResultStore | None): Nếu có, dùng lại phép đo đã lưu với cùng
+            binary, đầu vào, tham số, môi trường và cấu hình lấy mẫu
+        check (dict | None): Mô tả kiểm tra kết quả (xem reference.py)
+        verify (bool): Nếu True và có check, kiểm tra ảnh kết quả với bản tham chiếu
+        tolerance (int): Sai khác tối đa cho phép so với bản tham chiếu
+
+    Returns:
+        dict | None: Thống kê (xem `summarize`) cùng 'samples',
+        'warmup_samples' và 'stop_reason', hoặc None nếu có lần chạy bị lỗi
+        hoặc kết quả không qua kiểm tra. Khi kiểm tra, có thêm 'check'.
+        Nếu chương trình in dòng JSON, có thêm các trường của `summarize_phases`
+        và 'phase_samples'; nếu có số liệu theo luồng, thêm 'thread_stats'
+        (xem `summarize_threads`).
+    """
+    args = list(args)
+    verify = verify and check is not None
+    if store is not None:
+        options = {'runs': runs, 'warmup': warmup, 'confidence': confidence, 'target_ci': target_ci}
+        if target_ci is not None:
+            options.update(time_budget=time_budget, max_runs=max_runs)
+        if repeat:
+            options['repeat'] = repeat
+        if verify:
+            options.update(check=check, tolerance=tolerance)
+        try:
+            key, fields = store.key_for(executable, args, options,
+                                        child_environment(env) if env else None)
+        except OSError as e:
+            print(f"Error running {executable} with args {args}: {e}")
+            return None
+        cached = store.lookup(key)
+        if cached is not None:
+            cached['cached'] = True
+            return cached
+        stats = run_benchmark(executable, args, runs, warmup, confidence, target_ci,
+                              time_budget, max_runs, repeat, env=env,
+                              check=check, verify=verify, tolerance=tolerance)
+        if stats is not None:
+            store.save(key, fields, executable, stats)
+        return stats
+
+    warmup_samples = []
+    samples = []
+    phase_samples = []
+    min_runs = max(2, runs) if target_ci is not None else max(1, runs)
+    start_time = time.perf_counter()
+    try:
+        if not repeat:
+            for _ in range(warmup):
+                warmup_samples.extend(run_once(executable, args, env=env)[0])
+        while True:
+            if repeat:
+                timings, phases = run_once(executable, args, warmup + repeat, env)
+                warmup_samples.extend(timings[:warmup])
+                samples.extend(timings[warmup:])
+                if phases is not None and 'threads' in phases:
+                    phases['threads'] = phases['threads'][warmup:]
+            else:
+                timings, phases = run_once(executable, args, env=env)
+                samples.extend(timings)
+            if phases is not None:
+                phase_samples.append(phases)
+            stop_reason = _stop_reason(samples, min_runs, confidence, target_ci,
+                                       time_budget, max_runs, time.perf_counter() - start_time)
+            if stop_reason:
+                break
+        result = verify_output(executable, args, check, tolerance, env) if verify else None
+    except (subprocess.CalledProcessError, FileNotFoundError, ValueError, IndexError, KeyError) as e:
+        print(f"Error running {executable} with args {args}: {e}")
+        if getattr(e, 'stderr', None): print(e.stderr)
+        return None
+    if result is not None and not result['ok']:
+        print(f"Output check failed for {executable} {' '.join(args)}: max abs diff "
+              f"{result['max_abs']} > {tolerance} ({result['mismatched']} values)")
+        return None
+
+    stats = summarize(samples, confidence)
+    stats['samples'] = samples
+    stats['warmup_samples'] = warmup_samples
+    stats['stop_reason'] = stop_reason
+    if result is not None:
+        stats['check'] = result
+    if phase_samples:
+        stats.update(summarize_phases(phase_samples, stats['median']))
+        stats['phase_samples'] = phase_samples
+        thread_stats = summarize_threads(phase_samples)
+        if thread_stats is not None:
+            stats['thread_stats'] = thread_stats
+    return stats
+
+
+def _stop_reason(samples, min_runs, confidence, target_ci, time_budget, max_runs, elapsed):
+    """Quyết định có dừng lấy mẫu hay không; trả về lý do dừng hoặc None."""
+    n = len(samples)
+    if target_ci is None:
+        return 'fixed' if n >= min_runs else None
+    if n >= min_runs and summarize(samples, confidence)['ci_rel'] <= target_ci:
+        return 'converged'
+    if n >= max_runs:
+        return 'max_runs'
+    if time_budget is not None and elapsed >= time_budget and n >= 2:
+        return 'time_budget'
+    return None
+
+
+def format_stats(stats):
+    """Định dạng thống kê thành một dòng ngắn để in ra màn hình."""
+    half_width = (stats['ci_high'] - stats['ci_low']) / 2
+    sample_info = f"n={stats['n']}"
+    if stats.get('stop_reason', 'fixed') != 'fixed':
+        sample_info += f", {stats['stop_reason']}"
+    if stats.get('cached'):
+        sample_info += ", cached"
+    text = (
+        f"median {stats['median']:.6f}s, min {stats['min']:.6f}s, "
+        f"stddev {stats['stddev']:.6f}s, "
+        f"{stats['confidence']:.0%} CI ±{half_width:.6f}s ({sample_info})"
+    )
+    if 'end_to_end' in stats:
+        text += f"; end-to-end {stats['end_to_end']:.6f}s ({stats['throughput']:.1f} MP/s)"
+    if 'thread_stats' in stats:
+        text += (f"; imbalance {stats['thread_stats']['imbalance']:.2f} "
+                 f"(wait {stats['thread_stats']['wait_fraction']:.1%})")
+    return text
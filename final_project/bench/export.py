@@ -0,0 +1,88 @@
+"""
+Lưu và đọc lại kết quả đo để vẽ lại biểu đồ và REPORT.md mà không cần chạy lại.
+
+File JSON-lines: dòng đầu là metadata (`{"type": "meta", ...}`: cấu hình lấy mẫu,
+số luồng...), mỗi dòng sau là một bản ghi (`{"type": "record", ...}`) gồm thống kê
+với các mẫu thô và các giá trị dẫn xuất (speedup, efficiency...). Một file CSV đi
+kèm chứa các cột tóm tắt để mở bằng bảng tính.
+"""
+
+import csv
+import json
+import time
+
+# Các trường thống kê được đưa vào file CSV
+CSV_STATS_COLUMNS = ('n', 'median', 'min', 'mean', 'stddev', 'ci_low', 'ci_high',
+                     'end_to_end', 'throughput')
+
+
+def _to_json(obj):
+    """Chuyển kiểu numpy (mảng, số) sang kiểu JSON."""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def results_meta(options, **extra):
+    """Metadata của một lần chạy: cấu hình lấy mẫu (trừ store) và các trường thêm."""
+    meta = {'created': time.time(), 'options': {k: v for k, v in options.items() if k != 'store'}}
+    meta.update(extra)
+    return meta
+
+
+def write_results(path, records, meta=None, csv_path=None):
+    """
+    Ghi kết quả ra file JSON-lines (và CSV tóm tắt nếu có csv_path).
+
+    Args:
+        path (str): File JSON-lines
+        records (list): Các bản ghi (dict), mỗi bản ghi có thể chứa 'stats'
+        meta (dict | None): Metadata (xem `results_meta`)
+        csv_path (str | None): File CSV tóm tắt
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(dict(meta or {}, type='meta'), default=_to_json) + '\n')
+        for record in records:
+            f.write(json.dumps(dict(record, type='record'), default=_to_json) + '\n')
+    if csv_path is not None:
+        write_csv(csv_path, records)
+
+
+def read_results(path):
+    """
+    Đọc file JSON-lines do `write_results` ghi.
+
+    Returns:
+        tuple: (metadata, danh sách bản ghi)
+    """
+    meta = {}
+    records = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            kind = entry.pop('type', 'record')
+            if kind == 'meta':
+                meta = entry
+            else:
+                records.append(entry)
+    return meta, records
+
+
+def write_csv(path, records):
+    """Ghi các trường vô hướng của bản ghi và thống kê chính ra file CSV."""
+    columns = []
+    rows = []
+    for record in records:
+        row = {k: v for k, v in record.items() if not isinstance(v, (dict, list))}
+        stats = record.get('stats') or {}
+        row.update({k: stats[k] for k in CSV_STATS_COLUMNS if k in stats})
+        for k in row:
+            if k not in columns:
+                columns.append(k)
+        rows.append(row)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,190 @@
+"""
+Gọi các kernel làm mờ trong process qua thư viện dùng chung libblur.so (ctypes).
+
+Mỗi mẫu của `run_benchmark` là một process: khởi động chương trình, giải mã ảnh,
+chạy kernel, mã hóa JPEG. Với các vòng lặp đo dày (autotune, quét số luồng hay
+chunk size mịn), chi phí đó lớn hơn nhiều so với kernel. Ở đây ảnh được giải mã
+một lần vào mảng NumPy; mỗi mẫu chỉ là một lần gọi `blur_run` trên bộ đệm của
+Python (không sao chép), nên có thể đo hàng nghìn lần gọi trong một process.
+
+Thư viện được build từ final_project/Makefile (target libblur.so) qua lớp build
+tăng dần; xem libblur.cpp cho danh sách kernel và C ABI.
+"""
+
+import ctypes
+import os
+import time
+
+import numpy as np
+
+from .build import build_targets
+from .engine import (
+    DEFAULT_CONFIDENCE,
+    DEFAULT_MAX_RUNS,
+    DEFAULT_RUNS,
+    DEFAULT_TIME_BUDGET,
+    DEFAULT_WARMUP,
+    _stop_reason,
+    summarize,
+)
+from .reference import DEFAULT_TOLERANCE, compare_output, reference_output
+
+LIBRARY_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+LIBRARY_NAME = 'libblur.so'
+LIBRARY_PATH = os.path.join(LIBRARY_DIR, LIBRARY_NAME)
+
+NATIVE_KERNELS = ('3x3', '5x5', '7x7', '5x5-sep', '7x7-sep')
+NATIVE_SCHEDULES = ('static', 'dynamic', 'guided', 'auto')
+
+_ERRORS = {
+    -1: 'unknown kernel',
+    -2: 'unknown schedule',
+    -3: 'separable kernel needs a workspace',
+    -4: 'invalid image size or thread count',
+}
+
+
+def decode_image(path, library=None):
+    """
+    Giải mã ảnh thành mảng uint8 liên tục (height, width, channels) bằng stb_image
+    của libblur.so, cùng bộ giải mã với các chương trình C++ (PIL cho ra pixel khác
+    stb_image với JPEG, nên kết quả sẽ không so sánh được với chương trình).
+
+    Raises:
+        ValueError: Khi không giải mã được ảnh
+    """
+    library = library or load_library()
+    width, height, channels = ctypes.c_int(), ctypes.c_int(), ctypes.c_int()
+    data = library.blur_load_image(os.fsencode(path), ctypes.byref(width), ctypes.byref(height),
+                                   ctypes.byref(channels))
+    if not data:
+        raise ValueError(f"cannot decode image: {path}")
+    try:
+        size = height.value * width.value * channels.value
+        image = np.ctypeslib.as_array(data, shape=(size,)).copy()
+    finally:
+        library.blur_free_image(data)
+    return image.reshape(height.value, width.value, channels.value)
+
+
+def build_library():
+    """Build (hoặc lấy từ cache) libblur.so; trả về đường dẫn thư viện."""
+    build_targets([LIBRARY_NAME], directory=LIBRARY_DIR)
+    return LIBRARY_PATH
+
+
+def load_library(path=None, build=True):
+    """
+    Nạp libblur.so và khai báo kiểu tham số của C ABI.
+
+    Args:
+        path (str | None): Đường dẫn thư viện (mặc định: final_project/libblur.so)
+        build (bool | None): Build (hoặc lấy từ cache) target libblur.so trước khi nạp;
+            None = chỉ build khi chưa có file thư viện
+
+    Raises:
+        BuildError: Khi biên dịch thư viện thất bại
+        OSError: Khi không nạp được thư viện
+    """
+    if path is None:
+        path = LIBRARY_PATH
+        if build or (build is None and not os.path.isfile(path)):
+            build_library()
+    library = ctypes.CDLL(path)
+    library.blur_load_image.restype = ctypes.POINTER(ctypes.c_ubyte)
+    library.blur_load_image.argtypes = [ctypes.c_char_p] + [ctypes.POINTER(ctypes.c_int)] * 3
+    library.blur_free_image.restype = None
+    library.blur_free_image.argtypes = [ctypes.POINTER(ctypes.c_ubyte)]
+    library.blur_workspace_size.restype = ctypes.c_long
+    library.blur_workspace_size.argtypes = [ctypes.c_char_p, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+    library.blur_run.restype = ctypes.c_int
+    library.blur_run.argtypes = [
+        ctypes.c_char_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p,
+        ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_char_p, ctypes.c_int,
+    ]
+    return library
+
+
+class NativeBlur:
+    """
+    Kernel của libblur.so trên một ảnh cố định.
+
+    Giữ ảnh đầu vào, ảnh kết quả và bộ đệm trung gian (nếu cần) của từng kernel
+    để các lần gọi liên tiếp không cấp phát lại.
+    """
+
+    def __init__(self, image, library=None):
+        if image.dtype != np.uint8 or image.ndim != 3:
+            raise ValueError("image must be a uint8 array (height, width, channels)")
+        self.library = library or load_library()
+        self.image = np.ascontiguousarray(image)
+        self.output = np.zeros_like(self.image)
+        self._workspaces = {}
+
+    def _workspace(self, kernel):
+        if kernel not in self._workspaces:
+            height, width, channels = self.image.shape
+            size = self.library.blur_workspace_size(kernel.encode(), width, height, channels)
+            if size < 0:
+                raise ValueError(f"unknown kernel: {kernel}")
+            self._workspaces[kernel] = np.empty(size // 4, dtype=np.float32) if size else None
+        return self._workspaces[kernel]
+
+    def run(self, kernel, threads, schedule='static', chunk=0):
+        """Chạy kernel một lần; kết quả nằm trong `output`. chunk 0 = mặc định của OpenMP."""
+        height, width, channels = self.image.shape
+        workspace = self._workspace(kernel)
+        status = self.library.blur_run(
+            kernel.encode(), self.image.ctypes.data, self.output.ctypes.data,
+            workspace.ctypes.data if workspace is not None else None,
+            width, height, channels, threads, schedule.encode(), chunk,
+        )
+        if status != 0:
+            raise ValueError(f"blur_run({kernel}, {schedule}): {_ERRORS.get(status, status)}")
+        return self.output
+
+    def check(self, kernel, tolerance=DEFAULT_TOLERANCE):
+        """So sánh `output` của lần gọi gần nhất với bản tham chiếu NumPy (xem `compare_output`)."""
+        reference, border = reference_output({'kernel': kernel}, self.image)
+        return compare_output(self.output, reference, border, tolerance)
+
+    def measure(self, kernel, threads, schedule='static', chunk=0, runs=DEFAULT_RUNS, warmup=DEFAULT_WARMUP,
+                confidence=DEFAULT_CONFIDENCE, target_ci=None, time_budget=DEFAULT_TIME_BUDGET,
+                max_runs=DEFAULT_MAX_RUNS, verify=False, tolerance=DEFAULT_TOLERANCE):
+        """
+        Đo kernel bằng các lần gọi liên tiếp trong process, cùng cách lấy mẫu với
+        `run_benchmark` (warmup, số mẫu cố định hoặc thích ứng theo target_ci).
+
+        Returns:
+            dict | None: Thống kê (xem `summarize`) cùng 'samples', 'warmup_samples',
+            'stop_reason' và 'check' khi verify; None nếu kết quả không qua kiểm tra.
+        """
+        warmup_samples = []
+        samples = []
+        for _ in range(warmup):
+            start = time.perf_counter()
+            self.run(kernel, threads, schedule, chunk)
+            warmup_samples.append(time.perf_counter() - start)
+        min_runs = max(2, runs) if target_ci is not None else max(1, runs)
+        start_time = time.perf_counter()
+        while True:
+            start = time.perf_counter()
+            self.run(kernel, threads, schedule, chunk)
+            samples.append(time.perf_counter() - start)
+            stop_reason = _stop_reason(samples, min_runs, confidence, target_ci,
+                                       time_budget, max_runs, time.perf_counter() - start_time)
+            if stop_reason:
+                break
+
+        result = self.check(kernel, tolerance) if verify else None
+        if result is not None and not result['ok']:
+            print(f"Output check failed for {LIBRARY_NAME} {kernel} {schedule},{chunk} x{threads}: "
+                  f"max abs diff {result['max_abs']} > {tolerance} ({result['mismatched']} values)")
+            return None
+        stats = summarize(samples, confidence)
+        stats['samples'] = samples
+        stats['warmup_samples'] = warmup_samples
+        stats['stop_reason'] = stop_reason
+        if result is not None:
+            stats['check'] = result
+        return stats
@@ -0,0 +1,56 @@
+"""
+Vẽ biểu đồ không cần màn hình (backend Agg) và song song.
+
+matplotlib chỉ được import khi thực sự vẽ (`pyplot()`), nên các lần chạy đo với
+`--no-plots` không tốn thời gian import. Mỗi biểu đồ là một hàm cấp module
+`chart(*args, dpi=...)` tự vẽ và lưu file; `render_charts` chạy các hàm độc lập
+này trên nhiều process.
+"""
+
+import importlib.util
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_DPI = 100  # DPI mặc định của matplotlib
+
+
+def pyplot():
+    """Import matplotlib.pyplot với backend không tương tác (Agg)."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _render(job):
+    chart, args, dpi = job
+    chart(*args, dpi=dpi)
+
+
+def render_charts(charts, dpi=DEFAULT_DPI, workers=None):
+    """
+    Vẽ các biểu đồ độc lập, song song trên nhiều process.
+
+    Args:
+        charts (list): Các tuple (hàm vẽ, tham số...); hàm vẽ phải ở cấp module
+            để truyền được sang process con
+        dpi (int): Độ phân giải của file ảnh
+        workers (int | None): Số process (mặc định: min(số biểu đồ, số CPU));
+            1 nghĩa là vẽ tuần tự trong process hiện tại
+
+    Nếu không có matplotlib, in lỗi và bỏ qua biểu đồ để kết quả đo và báo cáo
+    vẫn được giữ.
+    """
+    if importlib.util.find_spec('matplotlib') is None:
+        print("Error: 'matplotlib' is required to draw charts (pip install matplotlib); "
+              "skipping charts. Use --no-plots to measure without charts.")
+        return
+    jobs = [(chart[0], chart[1:], dpi) for chart in charts]
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            _render(job)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for future in [pool.submit(_render, job) for job in jobs]:
+            future.result()
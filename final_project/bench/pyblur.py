@@ -0,0 +1,199 @@
+"""
+Backend làm mờ thuần Python: NumPy + process pool trên bộ nhớ chia sẻ.
+
+Ảnh được giải mã bằng stb_image của libblur.so (cùng bộ giải mã với các chương
+trình C++, xem native.decode_image) một lần vào một mảng NumPy nằm trong shared
+memory; ảnh kết quả cũng là một mảng shared memory. Các worker của pool gắn vào
+hai vùng nhớ này một lần khi khởi động (initializer), nên mỗi lần lặp chỉ gửi cho
+worker chỉ số hàng của dải (band) cần tính: không có dữ liệu ảnh nào được pickle
+hay sao chép giữa các process (zero-copy). Các hàng phần trong của ảnh được chia
+thành các dải liên tục, mỗi worker một dải (như schedule(static)); worker đọc thêm
+r hàng halo ở trên và dưới dải rồi tính tích chập vector hóa của reference.py.
+Cùng ảnh đầu vào và cùng thứ tự cộng nên kết quả trùng khớp từng byte với
+blur_parallel; chỉ ảnh JPEG ghi ra (bằng PIL) có thể khác output_parallel.jpg.
+
+Chạy như một chương trình với cùng giao diện như các binary C++ để bộ máy đo
+dùng lại nguyên vẹn (run_benchmark, results store, --verify):
+
+    python3 bench/pyblur.py [--kernel 3x3|5x5|7x7] <image_file> <num_processes> [repeats]
+
+In thời gian mỗi lần lặp rồi dòng JSON của phase_timing.h; thời gian khởi động
+pool được báo trong "extra_phases" (pool_start). BLUR_DUMP/BLUR_DUMP_INPUT được
+hỗ trợ như raw_dump.h.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+if not __package__:
+    # Chạy trực tiếp (python3 bench/pyblur.py): thêm final_project vào sys.path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench import reference
+from bench.native import build_library, decode_image, load_library
+from bench.reference import KERNELS_2D, convolve_2d
+from bench.store import file_hash
+
+PYBLUR_SCRIPT = os.path.abspath(__file__)
+
+# Mảng shared memory của worker, gắn một lần trong `_attach`
+_WORKER = {}
+
+
+def pyblur_env():
+    """
+    Biến môi trường cho run_benchmark khi đo pyblur.py: hash của reference.py (tích
+    chập mà worker thực sự chạy) và của libblur.so (bộ giải mã ảnh, được build nếu
+    cần). Khóa của results store chỉ hash chương trình (sys.executable) và các tham
+    số là file (pyblur.py); biến BLUR_ được đưa vào dấu vân tay môi trường, nên sửa
+    hai file này cũng làm các phép đo cũ hết hiệu lực.
+
+    Raises:
+        BuildError: Khi biên dịch libblur.so thất bại
+    """
+    return {'BLUR_PYBLUR_REFERENCE': file_hash(reference.__file__),
+            'BLUR_PYBLUR_LIBRARY': file_hash(build_library())}
+
+
+def band_rows(height, radius, bands):
+    """Chia các hàng phần trong [radius, height - radius) thành `bands` dải liên tục (y0, y1)."""
+    edges = np.linspace(radius, height - radius, bands + 1).round().astype(int)
+    return [(int(y0), int(y1)) for y0, y1 in zip(edges[:-1], edges[1:]) if y1 > y0]
+
+
+def _attach(input_name, output_name, shape, kernel_name):
+    """Initializer của worker: gắn vào hai vùng shared memory (không sao chép ảnh)."""
+    input_shm = shared_memory.SharedMemory(name=input_name)
+    output_shm = shared_memory.SharedMemory(name=output_name)
+    _WORKER.update(
+        shm=(input_shm, output_shm),
+        image=np.ndarray(shape, dtype=np.uint8, buffer=input_shm.buf),
+        output=np.ndarray(shape, dtype=np.uint8, buffer=output_shm.buf),
+        kernel=KERNELS_2D[kernel_name],
+    )
+
+
+def _blur_band(band):
+    """Tính các hàng y0..y1 của ảnh kết quả, đọc thêm r hàng halo mỗi phía."""
+    y0, y1 = band
+    image, output, kernel = _WORKER['image'], _WORKER['output'], _WORKER['kernel']
+    radius = kernel.shape[0] // 2
+    output[y0:y1, radius:image.shape[1] - radius] = convolve_2d(image[y0 - radius:y1 + radius], kernel)
+
+
+class SharedBlur:
+    """
+    Pool `processes` worker làm mờ ảnh kích thước `shape` (height, width, channels).
+
+    Ghi ảnh vào `input` (mảng shared memory) rồi gọi `run()`; kết quả nằm trong
+    `output`. Dùng như context manager để giải phóng pool và shared memory.
+    """
+
+    def __init__(self, shape, processes, kernel='3x3'):
+        self.shape = tuple(shape)
+        self.processes = processes
+        size = int(np.prod(self.shape))
+        self._shm = []
+        try:
+            for _ in range(2):
+                self._shm.append(shared_memory.SharedMemory(create=True, size=size))
+            self.input = np.ndarray(self.shape, dtype=np.uint8, buffer=self._shm[0].buf)
+            self.output = np.ndarray(self.shape, dtype=np.uint8, buffer=self._shm[1].buf)
+            self.output[:] = 0
+            self.bands = band_rows(self.shape[0], KERNELS_2D[kernel].shape[0] // 2, processes)
+            self._pool = Pool(processes, initializer=_attach,
+                              initargs=(self._shm[0].name, self._shm[1].name, self.shape, kernel))
+        except BaseException:
+            # Không có pool thì close() không bao giờ được gọi: trả lại shared memory ngay
+            self._release()
+            raise
+
+    def _release(self):
+        self.input = self.output = None
+        for shm in self._shm:
+            shm.close()
+            shm.unlink()
+        self._shm = []
+
+    def run(self):
+        """Một lần làm mờ: mỗi worker một dải, chờ mọi dải xong (như barrier cuối vùng song song)."""
+        self._pool.map(_blur_band, self.bands, chunksize=1)
+        return self.output
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+        self._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _dump(env_name, array):
+    """Ghi mảng dạng byte thô vào file trong biến môi trường env_name (nếu có), như raw_dump.h."""
+    path = os.environ.get(env_name)
+    if path:
+        array.tofile(path)
+
+
+def main(argv=None):
+    """Chương trình đo: cùng tham số và output với blur_parallel (xem docstring của module)."""
+    from PIL import Image
+
+    program_start = time.perf_counter()
+    parser = argparse.ArgumentParser(description='Làm mờ ảnh bằng process pool trên shared memory')
+    parser.add_argument('--kernel', choices=sorted(KERNELS_2D), default='3x3')
+    parser.add_argument('image')
+    parser.add_argument('processes', type=int)
+    parser.add_argument('repeats', type=int, nargs='?', default=1)
+    args = parser.parse_args(argv)
+
+    # Nạp thư viện trước khi đo (chỉ build khi chưa có libblur.so)
+    library = load_library(build=None)
+    start = time.perf_counter()
+    decoded = decode_image(args.image, library)
+    decode = time.perf_counter() - start
+
+    start = time.perf_counter()
+    blur = SharedBlur(decoded.shape, args.processes, args.kernel)
+    pool_start = time.perf_counter() - start
+    with blur:
+        # Chép ảnh đã giải mã vào shared memory (lần sao chép duy nhất), tính vào alloc
+        start = time.perf_counter()
+        blur.input[:] = decoded
+        alloc = time.perf_counter() - start
+
+        compute = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            blur.run()
+            compute.append(time.perf_counter() - start)
+            print(f"{compute[-1]:f}")
+
+        _dump('BLUR_DUMP_INPUT', blur.input)
+        _dump('BLUR_DUMP', blur.output)
+
+        start = time.perf_counter()
+        Image.fromarray(blur.output.squeeze(axis=2) if blur.shape[2] == 1 else blur.output).save(
+            'output_pyblur.jpg', quality=100)
+        encode = time.perf_counter() - start
+
+    height, width, channels = decoded.shape
+    print(json.dumps({
+        'width': width, 'height': height, 'channels': channels,
+        'decode': decode, 'alloc': alloc, 'compute': compute, 'encode': encode,
+        'total': time.perf_counter() - program_start, 'extra_phases': {'pool_start': pool_start},
+    }))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+Bản tham chiếu NumPy (oracle) của các kernel làm mờ, dùng để kiểm tra kết quả của
+các chương trình C++.
+
+Chương trình ghi ảnh đầu vào (đã giải mã bởi stb_image) và ảnh kết quả dạng byte
+thô khi có BLUR_DUMP_INPUT/BLUR_DUMP (xem raw_dump.h). Oracle tính lại kết quả từ
+chính ảnh đầu vào đó, với cùng trọng số, cùng thứ tự cộng trong double và cùng phép
+cắt về unsigned char, rồi so sánh từng byte với dung sai. Các chương trình bỏ viền r
+pixel (không ghi vào đó), nên chỉ phần trong của ảnh được so sánh.
+
+Một kiểm tra được mô tả bằng dict có thể lưu dạng JSON (`spec`):
+    {'kernel': '3x3' | '5x5' | '7x7'}            tích chập 2D của feature1/2/3
+    {'kernel': '5x5-sep' | '7x7-sep'}            hai lượt 1D qua bộ đệm float
+    {'kernel': 'gaussian', 'method': 'direct' | 'separable', 'radius': r, 'sigma': s}
+    {'kernel': 'boxsum', 'radius': r, 'sigma': s}  3 box blur (blur_engine)
+"""
+
+import math
+
+import numpy as np
+
+DEFAULT_TOLERANCE = 1  # Sai khác tối đa (mức xám) cho phép so với oracle
+
+# Trọng số giống hệt các mảng trong source C++
+KERNELS_2D = {
+    '3x3': np.array([[1, 2, 1], [2, 4, 2], [1, 2, 1]]) / 16.0,
+    '5x5': np.array([
+        [1, 4, 7, 4, 1],
+        [4, 16, 26, 16, 4],
+        [7, 26, 41, 26, 7],
+        [4, 16, 26, 16, 4],
+        [1, 4, 7, 4, 1],
+    ]) / 273.0,
+    '7x7': np.array([
+        [0.00000067, 0.00002292, 0.00019117, 0.00038771, 0.00019117, 0.00002292, 0.00000067],
+        [0.00002292, 0.00078633, 0.00655965, 0.01330373, 0.00655965, 0.00078633, 0.00002292],
+        [0.00019117, 0.00655965, 0.05472157, 0.11098164, 0.05472157, 0.00655965, 0.00019117],
+        [0.00038771, 0.01330373, 0.11098164, 0.22508352, 0.11098164, 0.01330373, 0.00038771],
+        [0.00019117, 0.00655965, 0.05472157, 0.11098164, 0.05472157, 0.00655965, 0.00019117],
+        [0.00002292, 0.00078633, 0.00655965, 0.01330373, 0.00655965, 0.00078633, 0.00002292],
+        [0.00000067, 0.00002292, 0.00019117, 0.00038771, 0.00019117, 0.00002292, 0.00000067],
+    ]),
+}
+SEPARABLE_1D = {
+    '5x5-sep': np.array([17, 66, 107, 66, 17]) / 273.0,
+    '7x7-sep': np.array([0.00081722, 0.02804152, 0.23392642, 0.47442968, 0.23392642, 0.02804152, 0.00081722]),
+}
+
+
+def gaussian_1d(radius, sigma):
+    """Kernel Gaussian 1D 2r+1 phần tử, chuẩn hóa tổng bằng 1 (như blur_engine)."""
+    k = np.arange(-radius, radius + 1)
+    kernel = np.exp(-(k * k) / (2.0 * sigma * sigma))
+    return kernel / kernel.sum()
+
+
+def boxes_for_gauss(sigma, n=3):
+    """Bán kính của n box blur xấp xỉ Gaussian sigma (Wells, 1986), như blur_engine."""
+    w_ideal = math.sqrt(12.0 * sigma * sigma / n + 1.0)
+    w_l = int(math.floor(w_ideal))
+    if w_l % 2 == 0:
+        w_l -= 1
+    w_u = w_l + 2
+    m_ideal = (12.0 * sigma * sigma - n * w_l * w_l - 4.0 * n * w_l - 3.0 * n) / (-4.0 * w_l - 4.0)
+    m = round(m_ideal)
+    return [((w_l if i < m else w_u) - 1) // 2 for i in range(n)]
+
+
+def convolve_2d(image, kernel):
+    """
+    Tích chập 2D trên phần trong của ảnh (bỏ viền r pixel).
+
+    Các số hạng được cộng theo thứ tự (ky, kx) như vòng lặp C++, nên tổng double
+    trùng khớp với chương trình (trừ khi trình biên dịch gộp nhân-cộng thành FMA).
+
+    Args:
+        image (numpy.ndarray): Ảnh uint8 (height, width, channels)
+        kernel (numpy.ndarray): Trọng số (k, k), k lẻ
+
+    Returns:
+        numpy.ndarray: Kết quả uint8 (height - 2r, width - 2r, channels)
+    """
+    size = kernel.shape[0]
+    height, width = image.shape[0] - size + 1, image.shape[1] - size + 1
+    pixels = image.astype(np.float64)
+    total = np.zeros((height, width, image.shape[2]))
+    for ky in range(size):
+        for kx in range(size):
+            total += pixels[ky:ky + height, kx:kx + width] * kernel[ky, kx]
+    return total.astype(np.uint8)
+
+
+def convolve_separable(image, vector, intermediate=np.float32):
+    """
+    Lượt ngang (mọi hàng, bỏ viền r cột) vào bộ đệm trung gian rồi lượt dọc, như
+    blur_5x5_sep/blur_7x7_sep và phương pháp separable của blur_engine (bộ đệm float).
+
+    Args:
+        image (numpy.ndarray): Ảnh uint8 (height, width, channels)
+        vector (numpy.ndarray): Kernel 1D 2r+1 phần tử
+        intermediate (numpy.dtype | None): Kiểu của bộ đệm trung gian (None = giữ double)
+
+    Returns:
+        numpy.ndarray: Kết quả uint8 (height - 2r, width - 2r, channels)
+    """
+    size = len(vector)
+    width = image.shape[1] - size + 1
+    pixels = image.astype(np.float64)
+    temp = np.zeros((image.shape[0], width, image.shape[2]))
+    for k in range(size):
+        temp += pixels[:, k:k + width] * vector[k]
+    if intermediate is not None:
+        temp = temp.astype(intermediate).astype(np.float64)
+    height = image.shape[0] - size + 1
+    total = np.zeros((height, width, image.shape[2]))
+    for k in range(size):
+        total += temp[k:k + height] * vector[k]
+    return total.astype(np.uint8)
+
+
+def box_blur(values, radius, axis):
+    """Box blur bán kính radius theo một trục, kẹp chỉ số ở biên (như tổng chạy của blur_engine)."""
+    n = values.shape[axis]
+    total = np.zeros_like(values)
+    for k in range(-radius, radius + 1):
+        total += np.take(values, np.clip(np.arange(n) + k, 0, n - 1), axis=axis)
+    return total / (2 * radius + 1)
+
+
+def box_gaussian(image, sigma):
+    """
+    Xấp xỉ Gaussian bằng 3 box blur (ngang rồi dọc mỗi lần) trên toàn ảnh, như boxsum
+    của blur_engine. Chương trình cộng dồn tổng chạy bằng float32 nên chỉ khớp trong
+    phạm vi dung sai, không trùng khớp từng byte.
+    """
+    values = image.astype(np.float64)
+    for radius in boxes_for_gauss(sigma, 3):
+        values = box_blur(box_blur(values, radius, axis=1), radius, axis=0)
+    return values.astype(np.uint8)
+
+
+def reference_output(spec, image):
+    """
+    Kết quả của oracle cho một kiểm tra.
+
+    Returns:
+        tuple: (ảnh uint8 tham chiếu, số pixel viền bị bỏ ở mỗi cạnh)
+    """
+    kernel = spec['kernel']
+    if kernel in KERNELS_2D:
+        return convolve_2d(image, KERNELS_2D[kernel]), KERNELS_2D[kernel].shape[0] // 2
+    if kernel in SEPARABLE_1D:
+        return convolve_separable(image, SEPARABLE_1D[kernel]), len(SEPARABLE_1D[kernel]) // 2
+    radius = spec['radius']
+    sigma = spec.get('sigma') or radius / 3.0
+    if kernel == 'gaussian':
+        # Kernel 2D của phương pháp direct là tích ngoài của kernel 1D: tính theo hai lượt
+        # double (khác direct chỉ ở sai số làm tròn) để oracle không tốn (2r+1)^2 lượt
+        vector = gaussian_1d(radius, sigma)
+        separable = spec.get('method', 'direct') == 'separable'
+        return convolve_separable(image, vector, np.float32 if separable else None), radius
+    if kernel == 'boxsum':
+        return box_gaussian(image, sigma), 0
+    raise ValueError(f"unknown reference kernel: {kernel}")
+
+
+def compare_output(output, reference, border, tolerance=DEFAULT_TOLERANCE):
+    """
+    So sánh kết quả của chương trình với oracle trên phần trong của ảnh.
+
+    Args:
+        output (numpy.ndarray): Ảnh uint8 đầy đủ (height, width, channels) của chương trình
+        reference (numpy.ndarray): Ảnh của oracle (đã bỏ viền)
+        border (int): Số pixel viền bị bỏ ở mỗi cạnh
+        tolerance (int): Sai khác tối đa cho phép
+
+    Returns:
+        dict: ok, max_abs, mismatched (số giá trị vượt dung sai), fraction (tỷ lệ
+        giá trị khác oracle) và tolerance
+    """
+    inner = output[border:output.shape[0] - border, border:output.shape[1] - border]
+    diff = np.abs(inner.astype(np.int16) - reference.astype(np.int16))
+    max_abs = int(diff.max()) if diff.size else 0
+    return {
+        'ok': max_abs <= tolerance,
+        'max_abs': max_abs,
+        'mismatched': int(np.count_nonzero(diff > tolerance)),
+        'fraction': float(np.mean(diff != 0)) if diff.size else 0.0,
+        'tolerance': tolerance,
+    }
+
+
+def check_dump(spec, input_path, output_path, width, height, channels, tolerance=DEFAULT_TOLERANCE):
+    """Đọc hai file byte thô (BLUR_DUMP_INPUT, BLUR_DUMP) và so sánh kết quả với oracle."""
+    shape = (height, width, channels)
+    image = np.fromfile(input_path, dtype=np.uint8).reshape(shape)
+    output = np.fromfile(output_path, dtype=np.uint8).reshape(shape)
+    reference, border = reference_output(spec, image)
+    return compare_output(output, reference, border, tolerance)
@@ -0,0 +1,132 @@
+"""
+Khớp mô hình mở rộng (scaling model) với thời gian đo ở mọi số luồng.
+
+Mô hình: Amdahl cộng chi phí tăng theo số luồng
+
+    T(p) = T_s + T_p / p + k * (p - 1)
+
+với T_s là phần tuần tự, T_p là phần song song được và k là overhead cho mỗi
+luồng thêm vào (tạo team, đồng bộ, tranh chấp bộ nhớ). Ba hệ số được khớp bằng
+bình phương tối thiểu không âm, có trọng số 1/T để mọi điểm đo đóng góp theo sai
+số tương đối. Phần tuần tự theo Amdahl là s = T_s / (T_s + T_p).
+
+Ngoài ra tính phần tuần tự thực nghiệm Karp–Flatt cho từng số luồng:
+
+    e(p) = (1/S(p) - 1/p) / (1 - 1/p)
+
+e(p) gần như không đổi nghĩa là giới hạn do phần tuần tự; e(p) tăng theo p
+nghĩa là overhead song song tăng theo số luồng.
+"""
+
+import itertools
+import math
+
+import numpy as np
+
+
+def _design(threads):
+    """Ma trận thiết kế với các cột [1, 1/p, p - 1]."""
+    threads = np.asarray(threads, dtype=float)
+    return np.column_stack([np.ones_like(threads), 1.0 / threads, threads - 1.0])
+
+
+def _nnls(A, y):
+    """
+    Bình phương tối thiểu với hệ số không âm.
+
+    Chỉ có 3 hệ số nên thử mọi tập cột con và giữ nghiệm không âm có phần dư nhỏ nhất.
+    """
+    best, best_residual = np.zeros(A.shape[1]), float(np.sum(y ** 2))
+    for size in range(1, A.shape[1] + 1):
+        for cols in itertools.combinations(range(A.shape[1]), size):
+            coef, *_ = np.linalg.lstsq(A[:, cols], y, rcond=None)
+            if np.any(coef < 0):
+                continue
+            residual = float(np.sum((A[:, cols] @ coef - y) ** 2))
+            if residual < best_residual:
+                best = np.zeros(A.shape[1])
+                best[list(cols)] = coef
+                best_residual = residual
+    return best
+
+
+def karp_flatt(speedups, threads):
+    """Phần tuần tự thực nghiệm Karp–Flatt; NaN tại p = 1 (không xác định)."""
+    speedups = np.asarray(speedups, dtype=float)
+    threads = np.asarray(threads, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        e = (1.0 / speedups - 1.0 / threads) / (1.0 - 1.0 / threads)
+    return np.where(threads > 1, e, np.nan)
+
+
+def fit_scaling(threads, times, baseline_time=None):
+    """
+    Khớp mô hình T(p) = T_s + T_p/p + k(p-1) với thời gian đo được.
+
+    Args:
+        threads (list): Số luồng của từng điểm đo
+        times (list): Thời gian (median) tương ứng
+        baseline_time (float | None): Thời gian bản tuần tự để tính speedup
+            (mặc định: T(1) của mô hình)
+
+    Mô hình có 3 tham số nên cần ít nhất 4 số luồng khác nhau để R² có ý nghĩa.
+
+    Returns:
+        dict: serial, parallel, overhead (hệ số T_s, T_p, k), serial_fraction,
+        r_squared (trên thời gian), rmse_rel (sai số tương đối), baseline_time,
+        karp_flatt (mảng theo threads), optimal_threads (p làm T(p) nhỏ nhất)
+    """
+    threads = np.asarray(threads, dtype=float)
+    times = np.asarray(times, dtype=float)
+    weights = 1.0 / times
+    A = _design(threads)
+    serial, parallel, overhead = _nnls(A * weights[:, None], times * weights)
+
+    predicted = A @ np.array([serial, parallel, overhead])
+    ss_res = float(np.sum((times - predicted) ** 2))
+    ss_tot = float(np.sum((times - times.mean()) ** 2))
+    if baseline_time is None:
+        baseline_time = serial + parallel
+
+    model = {
+        'serial': serial,
+        'parallel': parallel,
+        'overhead': overhead,
+        'serial_fraction': serial / (serial + parallel) if serial + parallel > 0 else math.nan,
+        'r_squared': 1.0 - ss_res / ss_tot if ss_tot > 0 else math.nan,
+        'rmse_rel': float(np.sqrt(np.mean(((times - predicted) / times) ** 2))),
+        'baseline_time': baseline_time,
+        'threads': threads,
+        'karp_flatt': karp_flatt(baseline_time / times, threads),
+    }
+    # dT/dp = -T_p/p^2 + k = 0 -> p* = sqrt(T_p / k), tối thiểu 1 luồng
+    model['optimal_threads'] = max(1.0, math.sqrt(parallel / overhead)) if overhead > 0 else math.inf
+    return model
+
+
+def predict_time(model, threads):
+    """Thời gian dự đoán của mô hình tại các số luồng cho trước."""
+    coef = np.array([model['serial'], model['parallel'], model['overhead']])
+    return _design(np.atleast_1d(threads)) @ coef
+
+
+def predict_speedup(model, threads):
+    """Speedup dự đoán (so với baseline_time của mô hình) tại các số luồng cho trước."""
+    return model['baseline_time'] / predict_time(model, threads)
+
+
+def gustafson_speedup(serial_fraction, threads):
+    """Scaled speedup theo Gustafson: S(p) = p - s(p - 1)."""
+    threads = np.asarray(threads, dtype=float)
+    return threads - serial_fraction * (threads - 1.0)
+
+
+def format_model(model):
+    """Mô tả ngắn gọn mô hình đã khớp."""
+    optimal = model['optimal_threads']
+    optimal = f"{optimal:.1f}" if math.isfinite(optimal) else "unbounded"
+    return (
+        f"T(p) = {model['serial']:.4f} + {model['parallel']:.4f}/p + {model['overhead']:.2e}(p-1); "
+        f"serial fraction {model['serial_fraction']:.1%}, R² {model['r_squared']:.3f}, "
+        f"optimal p ≈ {optimal}"
+    )
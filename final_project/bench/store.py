@@ -0,0 +1,141 @@
+"""
+Lưu trữ kết quả đo bền vững (SQLite) để các lần chạy sau bỏ qua cấu hình đã đo.
+
+Khóa của một phép đo gồm: hash nội dung file thực thi, hash nội dung các file
+đầu vào xuất hiện trong tham số (ví dụ ảnh), các tham số còn lại (số luồng...),
+dấu vân tay môi trường (máy, CPU, biến môi trường OpenMP) và cấu hình lấy mẫu.
+Khi binary hoặc ảnh thay đổi, khóa thay đổi nên kết quả cũ tự động không còn
+được dùng.
+"""
+
+import hashlib
+import json
+import os
+import platform
+import socket
+import sqlite3
+import time
+
+DEFAULT_DB_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bench_results.sqlite')
+)
+
+# Các biến môi trường ảnh hưởng đến kết quả đo của chương trình OpenMP
+# (BLUR_: tùy chọn của chính các chương trình blur, ví dụ BLUR_THREAD_STATS)
+ENV_PREFIXES = ('OMP_', 'GOMP_', 'KMP_', 'BLUR_')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS measurements (
+    key TEXT PRIMARY KEY,
+    executable TEXT NOT NULL,
+    binary_hash TEXT NOT NULL,
+    args TEXT NOT NULL,
+    env_hash TEXT NOT NULL,
+    options TEXT NOT NULL,
+    created REAL NOT NULL,
+    result TEXT NOT NULL
+)
+"""
+
+_hash_cache = {}
+
+
+def file_hash(path):
+    """Tính SHA-256 nội dung file, có cache theo (path, mtime, size)."""
+    st = os.stat(path)
+    cache_key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    if cache_key not in _hash_cache:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        _hash_cache[cache_key] = digest.hexdigest()
+    return _hash_cache[cache_key]
+
+
+def _cpu_model():
+    """Đọc tên CPU (Linux: /proc/cpuinfo, các hệ khác: platform.processor())."""
+    try:
+        with open('/proc/cpuinfo', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def environment_fingerprint(env=None):
+    """Mô tả môi trường chạy ảnh hưởng đến thời gian đo."""
+    env = os.environ if env is None else env
+    return {
+        'host': socket.gethostname(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'cpu': _cpu_model(),
+        'cpu_count': os.cpu_count(),
+        'omp_env': {k: v for k, v in sorted(env.items()) if k.startswith(ENV_PREFIXES)},
+    }
+
+
+def _digest(obj):
+    return hashlib.sha256(json.dumps(obj, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class ResultStore:
+    """Cơ sở dữ liệu SQLite chứa các phép đo trước đó."""
+
+    def __init__(self, path=DEFAULT_DB_PATH, max_age=None):
+        """
+        Args:
+            path (str): Đường dẫn file SQLite
+            max_age (float | None): Tuổi tối đa (giây) của một phép đo còn dùng được
+        """
+        self.path = path
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def key_for(self, executable, args, options, env=None):
+        """Tạo khóa của phép đo; tham số là file tồn tại được thay bằng hash nội dung."""
+        normalized_args = [
+            f"sha256:{file_hash(a)}" if os.path.isfile(a) else a for a in map(str, args)
+        ]
+        fields = {
+            'binary_hash': file_hash(executable),
+            'args': normalized_args,
+            'env_hash': _digest(environment_fingerprint(env)),
+            'options': {k: v for k, v in sorted(options.items())},
+        }
+        return _digest(fields), fields
+
+    def lookup(self, key):
+        """Trả về kết quả đã lưu cho khóa, hoặc None nếu không có/đã cũ."""
+        row = self._conn.execute(
+            "SELECT created, result FROM measurements WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (self.max_age is not None and time.time() - row[0] > self.max_age):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[1])
+
+    def save(self, key, fields, executable, stats):
+        """Lưu (hoặc ghi đè) kết quả đo cho khóa."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO measurements VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, executable, fields['binary_hash'], json.dumps(fields['args']),
+             fields['env_hash'], json.dumps(fields['options'], sort_keys=True),
+             time.time(), json.dumps(stats)),
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def summary(self):
+        """Một dòng tóm tắt số lần dùng lại / đo mới."""
+        return f"results store {self.path}: {self.hits} reused, {self.misses} measured"
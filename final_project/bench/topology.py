@@ -0,0 +1,119 @@
+"""
+Đọc topology CPU của máy và lập danh sách số luồng cần đo.
+
+Số CPU dùng được lấy từ affinity của process (`os.sched_getaffinity`, tôn trọng
+taskset/cgroup cpuset), số lõi vật lý từ /sys/devices/system/cpu trên Linux hoặc
+`sysctl hw.physicalcpu` trên macOS. Danh sách số luồng (ladder) bao gồm các lũy
+thừa của 2 dưới số lõi vật lý, đúng số lõi vật lý, ranh giới SMT (số CPU logic)
+và một điểm oversubscription có chủ đích.
+"""
+
+import math
+import os
+import subprocess
+
+DEFAULT_OVERSUBSCRIBE = 2.0  # Điểm oversubscription = hệ số này x số CPU logic
+
+
+def usable_cpus():
+    """Danh sách id các CPU logic mà process được phép chạy."""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _sysfs_cores(cpus):
+    """Số lõi vật lý (cặp package, core) chứa các CPU cho trước, đọc từ sysfs."""
+    cores = set()
+    for cpu in cpus:
+        base = f"/sys/devices/system/cpu/cpu{cpu}/topology"
+        with open(f"{base}/physical_package_id") as f:
+            package = f.read().strip()
+        with open(f"{base}/core_id") as f:
+            core = f.read().strip()
+        cores.add((package, core))
+    return len(cores)
+
+
+def _sysctl(name):
+    """Đọc một giá trị số nguyên bằng `sysctl -n` (macOS)."""
+    result = subprocess.run(['sysctl', '-n', name], capture_output=True, text=True, check=True)
+    return int(result.stdout.strip())
+
+
+def detect_topology():
+    """
+    Xác định số CPU logic dùng được và số lõi vật lý tương ứng.
+
+    Returns:
+        dict: logical (số CPU logic dùng được), physical (số lõi vật lý),
+        smt (số luồng phần cứng mỗi lõi), source (nguồn thông tin)
+    """
+    cpus = usable_cpus()
+    logical = len(cpus)
+    physical, source = logical, 'cpu_count'
+    try:
+        physical, source = _sysfs_cores(cpus), 'sysfs'
+    except (OSError, ValueError):
+        try:
+            # macOS không có affinity: tỷ lệ lõi vật lý/logic của cả máy
+            physical = max(1, logical * _sysctl('hw.physicalcpu') // _sysctl('hw.logicalcpu'))
+            source = 'sysctl'
+        except (OSError, ValueError, subprocess.CalledProcessError):
+            pass
+    physical = max(1, min(physical, logical))
+    return {
+        'logical': logical,
+        'physical': physical,
+        'smt': logical // physical,
+        'source': source,
+    }
+
+
+def thread_ladder(topology, oversubscribe=DEFAULT_OVERSUBSCRIBE):
+    """
+    Danh sách số luồng cần đo cho topology cho trước.
+
+    Gồm 1, các lũy thừa của 2 nhỏ hơn số lõi vật lý, số lõi vật lý, số CPU logic
+    (ranh giới SMT) và một điểm oversubscription (ceil(oversubscribe * logic);
+    bỏ qua nếu oversubscribe <= 1).
+    """
+    physical, logical = topology['physical'], topology['logical']
+    ladder = {1, physical, logical}
+    p = 2
+    while p < physical:
+        ladder.add(p)
+        p *= 2
+    if oversubscribe > 1:
+        ladder.add(max(logical + 1, math.ceil(logical * oversubscribe)))
+    return sorted(ladder)
+
+
+def describe_topology(topology):
+    """Mô tả ngắn gọn topology, ví dụ '16 usable CPUs (8 physical cores, SMT x2, sysfs)'."""
+    return (
+        f"{topology['logical']} usable CPUs ({topology['physical']} physical cores, "
+        f"SMT x{topology['smt']}, {topology['source']})"
+    )
+
+
+def shade_topology(ax, topology):
+    """
+    Đánh dấu các vùng topology trên trục số luồng của một biểu đồ matplotlib.
+
+    Vùng SMT (lõi vật lý < p <= CPU logic) và vùng oversubscription (p > CPU logic)
+    được tô nền; gọi sau khi đã vẽ dữ liệu để giới hạn trục x đã được xác định.
+    """
+    if topology is None:
+        return
+    physical, logical = topology['physical'], topology['logical']
+    x_min, x_max = ax.get_xlim()
+    ax.axvline(x=physical, color='grey', linestyle=':', linewidth=1.5,
+               label=f'Physical cores ({physical})')
+    if logical > physical:
+        ax.axvspan(physical, min(logical, x_max), color='orange', alpha=0.08,
+                   label=f'SMT ({physical}-{logical} threads)')
+    if x_max > logical:
+        ax.axvspan(logical, x_max, color='red', alpha=0.06,
+                   label=f'Oversubscribed (> {logical} CPUs)')
+    ax.set_xlim(x_min, x_max)
@@ -0,0 +1,171 @@
+// Trọng số và vòng lặp tích chập dùng chung cho các chương trình làm mờ song song
+// (image_parallel.cpp, feature1, feature2, feature3) và thư viện libblur.so, để
+// chương trình và lời gọi trong process (bench/native.py) biên dịch cùng một kernel.
+//
+// Mỗi hàm xử lý một lần làm mờ trên bộ đệm xen kẽ (height x width x channels byte),
+// bỏ viền r pixel (không ghi vào đó). Kiểu schedule nằm trong tên hàm vì mệnh đề
+// schedule của OpenMP phải cố định lúc biên dịch; số luồng lấy từ omp_set_num_threads.
+// Không có -fopenmp (các bản *_seq), các pragma bị bỏ qua và vòng lặp chạy tuần tự.
+#pragma once
+
+#include <omp.h>
+
+// Kernel 3x3 - Cường độ tính toán thấp (9 phép tính/pixel)
+const double blur_kernel_3x3[3][3] = {
+    {1.0 / 16, 2.0 / 16, 1.0 / 16},
+    {2.0 / 16, 4.0 / 16, 2.0 / 16},
+    {1.0 / 16, 2.0 / 16, 1.0 / 16}};
+
+// Kernel 5x5 - Cường độ tính toán trung bình (25 phép tính/pixel)
+const double blur_kernel_5x5[5][5] = {
+    {1.0/273, 4.0/273,  7.0/273,  4.0/273, 1.0/273},
+    {4.0/273, 16.0/273, 26.0/273, 16.0/273, 4.0/273},
+    {7.0/273, 26.0/273, 41.0/273, 26.0/273, 7.0/273},
+    {4.0/273, 16.0/273, 26.0/273, 16.0/273, 4.0/273},
+    {1.0/273, 4.0/273,  7.0/273,  4.0/273, 1.0/273}};
+
+// Kernel 7x7 - Cường độ tính toán cao (49 phép tính/pixel)
+const double blur_kernel_7x7[7][7] = {
+    {0.00000067, 0.00002292, 0.00019117, 0.00038771, 0.00019117, 0.00002292, 0.00000067},
+    {0.00002292, 0.00078633, 0.00655965, 0.01330373, 0.00655965, 0.00078633, 0.00002292},
+    {0.00019117, 0.00655965, 0.05472157, 0.11098164, 0.05472157, 0.00655965, 0.00019117},
+    {0.00038771, 0.01330373, 0.11098164, 0.22508352, 0.11098164, 0.01330373, 0.00038771},
+    {0.00019117, 0.00655965, 0.05472157, 0.11098164, 0.05472157, 0.00655965, 0.00019117},
+    {0.00002292, 0.00078633, 0.00655965, 0.01330373, 0.00655965, 0.00078633, 0.00002292},
+    {0.00000067, 0.00002292, 0.00019117, 0.00038771, 0.00019117, 0.00002292, 0.00000067}};
+
+// Kernel 1D cho bộ lọc 5x5 tách được (separable). Ma trận 5x5 (1/273) không tách
+// được chính xác; đây là xấp xỉ hạng 1 (vector suy biến chính, làm tròn về mẫu số
+// 273). Tổng hệ số vẫn bằng 1 nên vùng đồng màu giữ nguyên; mỗi hệ số của tích ngoài
+// lệch khỏi ma trận 2D không quá 0.0035.
+const double blur_kernel_1d_5[5] = {17.0 / 273, 66.0 / 273, 107.0 / 273, 66.0 / 273, 17.0 / 273};
+
+// Kernel 1D cho bộ lọc 7x7 tách được: blur_kernel_7x7 là Gaussian (sigma = 1) nên
+// bằng tích ngoài của vector này với chính nó (sai lệch < 1e-6).
+const double blur_kernel_1d_7[7] = {0.00081722, 0.02804152, 0.23392642, 0.47442968, 0.23392642, 0.02804152, 0.00081722};
+
+// --- Tích chập 2D trực tiếp ---
+
+// Một pixel (mọi kênh) của tích chập 2D bán kính radius
+template <int radius>
+static inline void blur_pixel(const unsigned char *img, unsigned char *output_img, int x, int y,
+                              int width, int channels, const double kernel[][2 * radius + 1]) {
+    for (int c = 0; c < channels; ++c) {
+        double sum = 0.0;
+        for (int ky = -radius; ky <= radius; ++ky) {
+            for (int kx = -radius; kx <= radius; ++kx) {
+                unsigned char pixel_val = img[((y + ky) * width + (x + kx)) * channels + c];
+                sum += pixel_val * kernel[ky + radius][kx + radius];
+            }
+        }
+        output_img[(y * width + x) * channels + c] = (unsigned char)sum;
+    }
+}
+
+// Chia đều công việc cho các luồng ngay từ đầu
+template <int radius>
+static void blur_direct_static(const unsigned char *img, unsigned char *output_img, int width, int height,
+                               int channels, const double kernel[][2 * radius + 1]) {
+    #pragma omp parallel for schedule(static) collapse(2)
+    for (int y = radius; y < height - radius; ++y) {
+        for (int x = radius; x < width - radius; ++x) {
+            blur_pixel<radius>(img, output_img, x, y, width, channels, kernel);
+        }
+    }
+}
+
+// Luồng nhận công việc mới khi hoàn thành công việc hiện tại
+template <int radius>
+static void blur_direct_dynamic(const unsigned char *img, unsigned char *output_img, int width, int height,
+                                int channels, const double kernel[][2 * radius + 1]) {
+    #pragma omp parallel for schedule(dynamic) collapse(2)
+    for (int y = radius; y < height - radius; ++y) {
+        for (int x = radius; x < width - radius; ++x) {
+            blur_pixel<radius>(img, output_img, x, y, width, channels, kernel);
+        }
+    }
+}
+
+// Kiểu schedule và chunk size lấy từ OMP_SCHEDULE hoặc omp_set_schedule
+template <int radius>
+static void blur_direct_runtime(const unsigned char *img, unsigned char *output_img, int width, int height,
+                                int channels, const double kernel[][2 * radius + 1]) {
+    #pragma omp parallel for schedule(runtime) collapse(2)
+    for (int y = radius; y < height - radius; ++y) {
+        for (int x = radius; x < width - radius; ++x) {
+            blur_pixel<radius>(img, output_img, x, y, width, channels, kernel);
+        }
+    }
+}
+
+// --- Tích chập tách được: lượt ngang rồi lượt dọc qua bộ đệm trung gian float ---
+
+// Lượt ngang của một pixel (mọi kênh)
+template <int radius>
+static inline void blur_row_pixel(const unsigned char *img, float *temp_img, int x, int y,
+                                  int width, int channels, const double *kernel_1d) {
+    for (int c = 0; c < channels; ++c) {
+        double sum = 0.0;
+        for (int k = -radius; k <= radius; ++k) {
+            sum += img[(y * width + (x + k)) * channels + c] * kernel_1d[k + radius];
+        }
+        temp_img[(y * width + x) * channels + c] = (float)sum;
+    }
+}
+
+// Lượt dọc của một pixel (mọi kênh) trên bộ đệm trung gian
+template <int radius>
+static inline void blur_column_pixel(const float *temp_img, unsigned char *output_img, int x, int y,
+                                     int width, int channels, const double *kernel_1d) {
+    for (int c = 0; c < channels; ++c) {
+        double sum = 0.0;
+        for (int k = -radius; k <= radius; ++k) {
+            sum += temp_img[((y + k) * width + x) * channels + c] * kernel_1d[k + radius];
+        }
+        output_img[(y * width + x) * channels + c] = (unsigned char)sum;
+    }
+}
+
+template <int radius>
+static void blur_separable_static(const unsigned char *img, unsigned char *output_img, float *temp_img,
+                                  int width, int height, int channels, const double *kernel_1d) {
+    #pragma omp parallel
+    {
+        // Lượt ngang: mọi hàng (lượt dọc cần cả các hàng viền), bỏ viền radius cột
+        #pragma omp for schedule(static) collapse(2)
+        for (int y = 0; y < height; ++y) {
+            for (int x = radius; x < width - radius; ++x) {
+                blur_row_pixel<radius>(img, temp_img, x, y, width, channels, kernel_1d);
+            }
+        }
+        // (barrier ngầm định: lượt dọc đọc kết quả lượt ngang của các luồng khác)
+
+        // Lượt dọc trên bộ đệm trung gian (bỏ viền radius pixel)
+        #pragma omp for schedule(static) collapse(2)
+        for (int y = radius; y < height - radius; ++y) {
+            for (int x = radius; x < width - radius; ++x) {
+                blur_column_pixel<radius>(temp_img, output_img, x, y, width, channels, kernel_1d);
+            }
+        }
+    }
+}
+
+template <int radius>
+static void blur_separable_runtime(const unsigned char *img, unsigned char *output_img, float *temp_img,
+                                   int width, int height, int channels, const double *kernel_1d) {
+    #pragma omp parallel
+    {
+        #pragma omp for schedule(runtime) collapse(2)
+        for (int y = 0; y < height; ++y) {
+            for (int x = radius; x < width - radius; ++x) {
+                blur_row_pixel<radius>(img, temp_img, x, y, width, channels, kernel_1d);
+            }
+        }
+        #pragma omp for schedule(runtime) collapse(2)
+        for (int y = radius; y < height - radius; ++y) {
+            for (int x = radius; x < width - radius; ++x) {
+                blur_column_pixel<radius>(temp_img, output_img, x, y, width, channels, kernel_1d);
+            }
+        }
+    }
+}
@@ -11,6 +11,8 @@ rm -f *.jpg 2>/dev/null || true
 # Xóa các kết quả cũ
 echo "Removing old result files..."
 rm -f *.png REPORT.md output_*.jpg
+rm -f weak_*.ppm WEAK_SCALING.md weak_results.jsonl weak_results.csv
+rm -f AFFINITY.md affinity_results.jsonl affinity_results.csv
 
 echo "✅ Cleanup completed!"
 echo ""
@@ -8,54 +8,96 @@ import numpy as np
 from PIL import Image
 import os
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 
-def create_test_image(width, height, filename, pattern='gradient'):
+# Số dòng ảnh được sinh trong mỗi lần (band) ở chế độ streaming
+BAND_ROWS = 256
+
+
+def _noise_band(width, height, y0, y1, seed):
     """
-    Tạo một ảnh test với kích thước và pattern chỉ định.
+    Sinh noise cho các dòng [y0, y1) từ seed cố định.
+    
+    Mỗi khối BAND_ROWS dòng có bộ sinh số ngẫu nhiên riêng (seed, chỉ số khối),
+    nên kết quả giống nhau dù ảnh được sinh một lần hay theo từng band, và giống
+    nhau giữa các máy.
+    """
+    blocks = []
+    for b0 in range(y0 - y0 % BAND_ROWS, y1, BAND_ROWS):
+        rng = np.random.default_rng([seed, b0 // BAND_ROWS])
+        block = rng.integers(0, 256, (min(b0 + BAND_ROWS, height) - b0, width, 3), dtype=np.uint8)
+        blocks.append(block[max(y0 - b0, 0):y1 - b0])
+    return np.concatenate(blocks, axis=0)
+
+
+def generate_band(width, height, y0, y1, pattern='gradient', seed=None):
+    """
+    Sinh các dòng [y0, y1) của ảnh test bằng phép toán NumPy trên toàn mảng.
     
     Args:
         width (int): Chiều rộng ảnh
-        height (int): Chiều cao ảnh  
-        filename (str): Tên file đầu ra
-        pattern (str): Loại pattern ('gradient', 'noise', 'checkerboard')
+        height (int): Chiều cao của toàn bộ ảnh (dùng cho công thức pattern)
+        y0 (int): Dòng bắt đầu
+        y1 (int): Dòng kết thúc (không bao gồm)
+        pattern (str): Loại pattern ('gradient', 'noise', 'checkerboard', 'colorful')
+        seed (int | None): Seed cho pattern 'noise' (None = ngẫu nhiên mỗi lần chạy)
+    
+    Returns:
+        np.ndarray: Mảng uint8 kích thước (y1 - y0, width, 3)
     """
-    print(f"Creating {width}x{height} image: {filename}")
+    i = np.arange(y0, y1, dtype=np.int64)[:, None]  # Chỉ số dòng
+    j = np.arange(width, dtype=np.int64)[None, :]   # Chỉ số cột
     
     if pattern == 'gradient':
-        # Tạo gradient từ đen đến trắng
-        img_array = np.zeros((height, width, 3), dtype=np.uint8)
-        for i in range(height):
-            for j in range(width):
-                # Gradient theo đường chéo
-                value = int(255 * ((i + j) / (height + width - 2)))
-                img_array[i, j] = [value, value, value]
-                
+        # Gradient theo đường chéo từ đen đến trắng
+        value = (255 * ((i + j) / (height + width - 2))).astype(np.uint8)
+        return np.repeat(value[:, :, None], 3, axis=2)
+    
     elif pattern == 'noise':
-        # Tạo noise ngẫu nhiên
-        img_array = np.random.randint(0, 256, (height, width, 3), dtype=np.uint8)
-        
+        # Noise ngẫu nhiên (tái lập được nếu có seed)
+        if seed is not None:
+            return _noise_band(width, height, y0, y1, seed)
+        return np.random.randint(0, 256, (y1 - y0, width, 3), dtype=np.uint8)
+    
     elif pattern == 'checkerboard':
-        # Tạo bàn cờ
-        img_array = np.zeros((height, width, 3), dtype=np.uint8)
-        block_size = min(32, width//8, height//8)  # Kích thước ô vuông
-        for i in range(height):
-            for j in range(width):
-                if ((i // block_size) + (j // block_size)) % 2 == 0:
-                    img_array[i, j] = [255, 255, 255]  # Trắng
-                else:
-                    img_array[i, j] = [0, 0, 0]        # Đen
-                    
+        # Bàn cờ trắng/đen
+        block_size = max(1, min(32, width // 8, height // 8))  # Kích thước ô vuông
+        white = ((i // block_size) + (j // block_size)) % 2 == 0
+        value = np.where(white, 255, 0).astype(np.uint8)
+        return np.repeat(value[:, :, None], 3, axis=2)
+    
     elif pattern == 'colorful':
-        # Tạo ảnh màu sắc phong phú
-        img_array = np.zeros((height, width, 3), dtype=np.uint8)
-        for i in range(height):
-            for j in range(width):
-                r = int(255 * (i / height))
-                g = int(255 * (j / width))
-                b = int(255 * ((i + j) / (height + width)))
-                img_array[i, j] = [r, g, b]
-    else:
-        raise ValueError(f"Unknown pattern: {pattern}")
+        # Ảnh màu sắc phong phú
+        band = np.empty((y1 - y0, width, 3), dtype=np.uint8)
+        band[:, :, 0] = (255 * (i / height)).astype(np.uint8)
+        band[:, :, 1] = (255 * (j / width)).astype(np.uint8)
+        band[:, :, 2] = (255 * ((i + j) / (height + width))).astype(np.uint8)
+        return band
+    
+    raise ValueError(f"Unknown pattern: {pattern}")
+
+
+def create_test_image(width, height, filename, pattern='gradient', seed=None):
+    """
+    Tạo một ảnh test với kích thước và pattern chỉ định.
+    
+    File có đuôi .ppm được ghi không nén theo từng band (xem
+    `create_test_image_streaming`); các đuôi khác được ghi JPEG quality 95.
+    
+    Args:
+        width (int): Chiều rộng ảnh
+        height (int): Chiều cao ảnh  
+        filename (str): Tên file đầu ra
+        pattern (str): Loại pattern ('gradient', 'noise', 'checkerboard', 'colorful')
+        seed (int | None): Seed cho pattern 'noise'
+    """
+    if filename.endswith('.ppm'):
+        create_test_image_streaming(width, height, filename, pattern, seed=seed)
+        return
+    
+    print(f"Creating {width}x{height} image: {filename}")
+    
+    img_array = generate_band(width, height, 0, height, pattern, seed)
     
     # Chuyển đổi thành ảnh PIL và lưu
     image = Image.fromarray(img_array, 'RGB')
@@ -66,40 +108,89 @@ def create_test_image(width, height, filename, pattern='gradient'):
     print(f"  Saved: {filename} ({file_size:.1f} MB)")
 
 
+def create_test_image_streaming(width, height, filename, pattern='gradient', band_rows=BAND_ROWS, seed=None):
+    """
+    Tạo ảnh test dạng PPM nhị phân (P6), sinh và ghi từng band để giới hạn bộ nhớ.
+    
+    Bộ nhớ sử dụng tỷ lệ với band_rows * width thay vì width * height, nên có thể
+    tạo các ảnh rất lớn (ví dụ 16384x12288). stb_image đọc trực tiếp được file PPM.
+    
+    Args:
+        width (int): Chiều rộng ảnh
+        height (int): Chiều cao ảnh
+        filename (str): Tên file đầu ra (.ppm)
+        pattern (str): Loại pattern ('gradient', 'noise', 'checkerboard', 'colorful')
+        band_rows (int): Số dòng được sinh trong mỗi band
+        seed (int | None): Seed cho pattern 'noise'
+    """
+    print(f"Creating {width}x{height} image (streaming): {filename}")
+    
+    with open(filename, 'wb') as f:
+        f.write(f"P6\n{width} {height}\n255\n".encode('ascii'))
+        for y0 in range(0, height, band_rows):
+            y1 = min(y0 + band_rows, height)
+            f.write(generate_band(width, height, y0, y1, pattern, seed).tobytes())
+    
+    file_size = os.path.getsize(filename) / (1024 * 1024)  # MB
+    print(f"  Saved: {filename} ({file_size:.1f} MB)")
+
+
+def _create_test_image_job(job):
+    """Hàm chạy trong process con của ProcessPoolExecutor."""
+    create_test_image(*job)
+    return job[2]
+
+
 def main():
     parser = argparse.ArgumentParser(description='Tạo các file ảnh test với kích thước khác nhau')
     parser.add_argument('--pattern', choices=['gradient', 'noise', 'checkerboard', 'colorful'], 
                        default='gradient', help='Pattern cho ảnh test')
     parser.add_argument('--custom', nargs='+', help='Kích thước custom theo format WIDTHxHEIGHT (vd: 1920x1080)')
+    parser.add_argument('--format', choices=['jpg', 'ppm'], default='jpg',
+                       help='Định dạng đầu ra: jpg (quality 95) hoặc ppm (P6 không nén, ghi theo band, đọc rất nhanh)')
+    parser.add_argument('--stream', action='store_true',
+                       help='Tương đương --format ppm (bộ nhớ giới hạn, dùng cho ảnh rất lớn như 16384x12288)')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='Seed cho pattern noise để các máy khác nhau tạo ra ảnh giống hệt nhau')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count(),
+                       help='Số process tạo ảnh song song (mặc định: số CPU)')
+    parser.add_argument('--skip-standard', action='store_true', help='Không tạo 4 ảnh kích thước chuẩn')
     
     args = parser.parse_args()
+    ext = 'ppm' if args.stream else args.format
     
     # Các kích thước ảnh chuẩn để test
     standard_sizes = [
-        (640, 480, "input_640x480.jpg"),     # VGA - ảnh rất nhỏ
-        (1024, 768, "input_1024x768.jpg"),  # XGA - ảnh nhỏ
-        (2560, 1560, "input_2560x1560.jpg"), # 2.5K - ảnh lớn
-        (4096, 3072, "input_4096x3072.jpg") # 4K+ - ảnh rất lớn
+        (640, 480),    # VGA - ảnh rất nhỏ
+        (1024, 768),   # XGA - ảnh nhỏ
+        (2560, 1560),  # 2.5K - ảnh lớn
+        (4096, 3072)   # 4K+ - ảnh rất lớn
     ]
     
     print(f"Creating test images with pattern: {args.pattern}")
     print("=" * 50)
     
-    # Tạo ảnh chuẩn
-    for width, height, filename in standard_sizes:
-        create_test_image(width, height, filename, args.pattern)
-    
-    # Tạo ảnh custom nếu có
-    if args.custom:
-        print("\nCreating custom size images:")
-        for size_str in args.custom:
-            try:
-                width_str, height_str = size_str.split('x')
-                width, height = int(width_str), int(height_str)
-                filename = f"input_{width}x{height}.jpg"
-                create_test_image(width, height, filename, args.pattern)
-            except ValueError:
-                print(f"Error: Invalid size format '{size_str}'. Use WIDTHxHEIGHT format.")
+    # Danh sách ảnh cần tạo: ảnh chuẩn + ảnh custom
+    sizes = [] if args.skip_standard else list(standard_sizes)
+    for size_str in args.custom or []:
+        try:
+            width_str, height_str = size_str.split('x')
+            sizes.append((int(width_str), int(height_str)))
+        except ValueError:
+            print(f"Error: Invalid size format '{size_str}'. Use WIDTHxHEIGHT format.")
+    
+    jobs = [
+        (width, height, f"input_{width}x{height}.{ext}", args.pattern, args.seed)
+        for width, height in dict.fromkeys(sizes)
+    ]
+    
+    # Tạo các ảnh song song trên nhiều process
+    if args.jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(jobs))) as pool:
+            list(pool.map(_create_test_image_job, jobs))
+    else:
+        for job in jobs:
+            _create_test_image_job(job)
     
     print("\n" + "=" * 50)
     print("All test images created successfully!")
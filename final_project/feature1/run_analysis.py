@@ -1,51 +1,147 @@
-import subprocess
 import numpy as np
-import matplotlib.pyplot as plt
 import os
 import glob
 import re
 import argparse
 import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from bench import (
+    PYBLUR_SCRIPT, BuildError, add_benchmark_arguments, benchmark_options, build_targets,
+    add_plot_arguments, add_results_arguments, add_thread_arguments, describe_options,
+    describe_topology, detect_topology, end_to_end_series, format_stats, plan_threads, pyblur_env, pyplot,
+    read_results, render_charts, report_store, results_meta, run_benchmark, shade_topology,
+    thread_ladder, write_results,
+)
+from bench.scaling import fit_scaling, format_model, gustafson_speedup, predict_speedup
+
 # --- Cấu hình thực nghiệm ---
 NUM_RUNS = 3  # Giảm số lần chạy để nhanh hơn, có thể tăng lại sau
-THREAD_COUNTS = [1, 2, 4, 8, 10, 12]
+WARMUP_RUNS = 1  # Số lần chạy khởi động bị loại bỏ trước khi lấy mẫu
+BENCH_OPTIONS = {'runs': NUM_RUNS, 'warmup': WARMUP_RUNS}  # Tham số cho run_benchmark, ghi đè từ dòng lệnh
+TOPOLOGY = detect_topology()  # CPU dùng được và số lõi vật lý của máy
+THREAD_COUNTS = thread_ladder(TOPOLOGY)  # Lõi vật lý, ranh giới SMT và một điểm oversubscription; ghi đè bằng --threads
+PREDICT_THREADS = [16, 32, 64]  # Số luồng chưa đo, dự đoán speedup từ mô hình khớp được
 BASELINE_EXE = "./blur_baseline"
 PARALLEL_EXE = "./blur_parallel"
+OUTPUT_CHECK = {'kernel': '3x3'}  # Kiểm tra ảnh kết quả với bản tham chiếu NumPy (--verify)
+PYTHON_BACKEND = False  # Đo thêm backend Python (bench/pyblur.py) như một series, bật bằng --python-backend
+RESULTS_FILE = "results.jsonl"  # Mẫu thô và kết quả dẫn xuất, dùng cho --replot/--report-only
+CHART_DPI = 300  # Độ phân giải biểu đồ, ghi đè bằng --dpi
+PLOT_JOBS = None  # Số process vẽ biểu đồ (None = số CPU), ghi đè bằng --plot-jobs
+
+# --- Cấu hình weak scaling (Gustafson) ---
+WEAK_BASE_SIZE = (1024, 768)  # Kích thước ảnh cho 1 thread; ảnh cho p threads có p lần số pixel
+WEAK_PATTERN = 'noise'  # Pattern của ảnh weak scaling (xem create_test_images.py)
+WEAK_RESULTS_FILE = "weak_results.jsonl"
+
+# --- Cấu hình affinity sweep (OMP_PROC_BIND / OMP_PLACES) ---
+AFFINITY_BINDS = ['close', 'spread', 'master', 'false']  # 'false' = không gắn luồng (unbound)
+AFFINITY_PLACES = ['cores', 'threads', 'sockets']
+AFFINITY_RESULTS_FILE = "affinity_results.jsonl"
 
 def compile_code():
-    """Biên dịch code C++ bằng Makefile."""
+    """Biên dịch code C++ từ Makefile, chỉ build lại các target đã thay đổi."""
     print("--- Compiling C++ code ---")
     try:
-        subprocess.run(["make", "clean"], check=True, capture_output=True, text=True)
-        subprocess.run(["make"], check=True, capture_output=True, text=True)
-        print("Compilation successful.")
-        return True
-    except (FileNotFoundError, subprocess.CalledProcessError) as e:
+        result = build_targets()
+    except BuildError as e:
         print(f"Error during compilation: {e}")
-        if hasattr(e, 'stderr'): print(e.stderr)
         return False
-
-def run_benchmark(executable, args=[]):
-    """Chạy một file thực thi nhiều lần và trả về thời gian trung bình."""
-    timings = []
-    for _ in range(NUM_RUNS):
-        try:
-            result = subprocess.run(
-                [executable] + args, check=True, capture_output=True, text=True
-            )
-            timings.append(float(result.stdout.strip().split('\n')[-1]))
-        except (subprocess.CalledProcessError, ValueError, IndexError) as e:
-            print(f"Error running {executable} with args {args}: {e}")
-            if hasattr(e, 'stderr'): print(e.stderr)
-            return None
-    return np.mean(timings) if timings else None
+    print(f"Compilation successful ({len(result['built'])} built, {len(result['cached'])} up to date).")
+    return True
 
 def get_image_resolution(image_path):
     """Trích xuất độ phân giải từ tên file (ví dụ: input_1920x1080.jpg -> 1920x1080)."""
     match = re.search(r'_(\d+x\d+)', image_path)
     return match.group(1) if match else "unknown"
 
+def image_pixels(image_path):
+    """Số pixel suy ra từ tên file (0 nếu không trích xuất được độ phân giải)."""
+    resolution = get_image_resolution(image_path)
+    if resolution == "unknown":
+        return 0
+    width, height = resolution.split('x')
+    return int(width) * int(height)
+
+def format_phases(stats):
+    """Mô tả thời gian từng giai đoạn của một phép đo (median)."""
+    phases = stats['phases']
+    return (
+        f"decode {phases['decode']:.4f}s, alloc {phases['alloc']:.4f}s, "
+        f"compute {stats['median']:.4f}s, encode {phases['encode']:.4f}s"
+    )
+
+def analyze_python(baseline_time, python_stats, threads):
+    """Speedup/efficiency của backend Python so với cùng baseline C++ (None nếu không đo)."""
+    if not python_stats:
+        return None
+    threads_np = np.array(threads)
+    times_np = np.array([stats['median'] for stats in python_stats])
+    speedups = baseline_time / times_np
+    return {
+        'stats': python_stats,
+        'threads': threads_np,
+        'times': times_np,
+        'speedups': speedups,
+        'efficiencies': speedups / threads_np,
+        'pool_start': np.array([stats.get('phases', {}).get('pool_start', np.nan) for stats in python_stats]),
+    }
+
+def analyze_image(baseline_stats, parallel_stats, threads, python_stats=None, python_threads=None):
+    """Tính speedup, efficiency và số liệu đầu-cuối cho một ảnh từ thống kê đo được."""
+    baseline_time = baseline_stats['median']
+    threads_np = np.array(threads)
+    times_np = np.array([stats['median'] for stats in parallel_stats])
+    speedups = baseline_time / times_np
+    return {
+        'baseline_time': baseline_time,
+        'baseline_stats': baseline_stats,
+        'stats': parallel_stats,
+        'threads': threads_np,
+        'times': times_np,
+        'speedups': speedups,
+        'efficiencies': speedups / threads_np,
+        'e2e': end_to_end_series(baseline_stats, parallel_stats),
+        'model': fit_scaling(threads_np, times_np, baseline_time),
+        'python': analyze_python(baseline_time, python_stats, python_threads),
+    }
+
+def results_to_records(all_results):
+    """Chuyển kết quả thành các bản ghi (baseline + từng số luồng) để lưu ra file."""
+    records = []
+    for image_path, data in all_results.items():
+        records.append({'image': image_path, 'series': 'baseline', 'threads': None,
+                        'stats': data['baseline_stats']})
+        for j, p in enumerate(data['threads']):
+            records.append({
+                'image': image_path, 'series': 'parallel', 'threads': int(p),
+                'speedup': data['speedups'][j], 'efficiency': data['efficiencies'][j],
+                'stats': data['stats'][j],
+            })
+        python = data['python']
+        for j, p in enumerate(python['threads'] if python else []):
+            records.append({
+                'image': image_path, 'series': 'python', 'threads': int(p),
+                'speedup': python['speedups'][j], 'efficiency': python['efficiencies'][j],
+                'stats': python['stats'][j],
+            })
+    return records
+
+def records_to_results(records):
+    """Dựng lại kết quả từ các bản ghi đã lưu (ngược với `results_to_records`)."""
+    all_results = {}
+    for image_path in dict.fromkeys(r['image'] for r in records):
+        image_records = [r for r in records if r['image'] == image_path]
+        baseline = next(r['stats'] for r in image_records if r['series'] == 'baseline')
+        parallel = [r for r in image_records if r['series'] == 'parallel']
+        python = [r for r in image_records if r['series'] == 'python']
+        all_results[image_path] = analyze_image(
+            baseline, [r['stats'] for r in parallel], [r['threads'] for r in parallel],
+            [r['stats'] for r in python], [r['threads'] for r in python]
+        )
+    return all_results
+
 def generate_report(all_results):
     """Tạo file báo cáo Markdown từ kết quả thu thập được."""
     print("\n--- Generating REPORT.md ---")
@@ -53,14 +149,16 @@ def generate_report(all_results):
     report_content = "# Báo cáo Phân tích Ảnh hưởng của Kích thước Bài toán\n\n"
     report_content += "Phân tích hiệu năng của thuật toán làm mờ ảnh song song với các kích thước ảnh đầu vào khác nhau.\n\n"
     report_content += f"**Cấu hình thực nghiệm:**\n"
-    report_content += f"- Số lần chạy mỗi test: {NUM_RUNS}\n"
+    report_content += f"- Cách lấy mẫu: {describe_options(BENCH_OPTIONS)} (các lần chạy khởi động bị loại bỏ)\n"
+    report_content += "- Thời gian được báo cáo: median của các mẫu; CI là khoảng tin cậy 95% của trung bình\n"
     report_content += f"- Số thread được test: {THREAD_COUNTS}\n"
+    report_content += f"- Topology CPU: {describe_topology(TOPOLOGY)}\n"
     report_content += f"- Tổng số file ảnh được phân tích: {len(all_results)}\n\n"
 
     # Tạo bảng tóm tắt so sánh
     report_content += "## Tóm tắt so sánh\n\n"
-    report_content += "| Tên file | Độ phân giải | Baseline (s) | Max Speedup | Max Efficiency | Threads tối ưu |\n"
-    report_content += "|----------|--------------|--------------|-------------|----------------|----------------|\n"
+    report_content += "| Tên file | Độ phân giải | Baseline (s) | Max Speedup | Max Efficiency | Threads tối ưu | Max E2E Speedup |\n"
+    report_content += "|----------|--------------|--------------|-------------|----------------|----------------|-----------------|\n"
     
     for image_path, data in all_results.items():
         resolution = get_image_resolution(image_path)
@@ -72,10 +170,11 @@ def generate_report(all_results):
         max_speedup = data['speedups'][max_speedup_idx]
         max_efficiency = data['efficiencies'][max_speedup_idx]
         optimal_threads = data['threads'][max_speedup_idx]
+        max_e2e_speedup = f"{max(data['e2e']['speedups']):.2f}x" if data['e2e'] else "n/a"
         
         report_content += (
             f"| `{os.path.basename(image_path)}` | {resolution} | {baseline_time:.4f} | "
-            f"{max_speedup:.2f}x | {max_efficiency:.1%} | {optimal_threads} |\n"
+            f"{max_speedup:.2f}x | {max_efficiency:.1%} | {optimal_threads} | {max_e2e_speedup} |\n"
         )
     
     report_content += "\n"
@@ -91,14 +190,16 @@ def generate_report(all_results):
         report_content += f"## {i}. Kết quả cho ảnh: `{os.path.basename(image_path)}` ({resolution})\n\n"
         report_content += f"**Thời gian chạy tuần tự (baseline): {baseline_time:.4f} giây**\n\n"
         
-        report_content += "| Threads | Time (s) | Speedup | Efficiency | So với lý tưởng |\n"
-        report_content += "|---------|----------|---------|------------|-----------------|\n"
+        report_content += "| Threads | Time (s) | Min (s) | ±CI (s) | Speedup | Efficiency | So với lý tưởng |\n"
+        report_content += "|---------|----------|---------|---------|---------|------------|-----------------|\n"
         
         for j, p in enumerate(data['threads']):
             ideal_speedup = p
             speedup_ratio = data['speedups'][j] / ideal_speedup
+            stats = data['stats'][j]
+            ci_half = (stats['ci_high'] - stats['ci_low']) / 2
             report_content += (
-                f"| {p:<7} | {data['times'][j]:<8.4f} | "
+                f"| {p:<7} | {data['times'][j]:<8.4f} | {stats['min']:<7.4f} | {ci_half:<7.4f} | "
                 f"{data['speedups'][j]:<7.2f}x | {data['efficiencies'][j]:<10.1%} | "
                 f"{speedup_ratio:<15.1%} |\n"
             )
@@ -122,6 +223,63 @@ def generate_report(all_results):
         
         report_content += "\n"
 
+        # Thời gian đầu-cuối: đọc ảnh + cấp phát + tính toán + ghi ảnh
+        if data['e2e'] is not None:
+            baseline_stats = data['baseline_stats']
+            report_content += "**Đầu-cuối (decode + alloc + compute + encode):**\n\n"
+            report_content += f"- Baseline: {format_phases(baseline_stats)} → **{baseline_stats['end_to_end']:.4f}s** ({baseline_stats['throughput']:.1f} MP/s)\n\n"
+            report_content += "| Threads | Kernel Speedup | E2E Time (s) | E2E Speedup | Throughput (MP/s) | Compute / E2E |\n"
+            report_content += "|---------|----------------|--------------|-------------|-------------------|---------------|\n"
+            for j, p in enumerate(data['threads']):
+                stats = data['stats'][j]
+                report_content += (
+                    f"| {p:<7} | {data['speedups'][j]:<14.2f}x | {data['e2e']['times'][j]:<12.4f} | "
+                    f"{data['e2e']['speedups'][j]:<11.2f}x | {data['e2e']['throughputs'][j]:<17.1f} | "
+                    f"{stats['median'] / stats['end_to_end']:<13.1%} |\n"
+                )
+            report_content += "\n"
+
+    # Backend Python: process pool trên shared memory, cùng baseline C++
+    python_results = {k: v for k, v in all_results.items() if v['python'] is not None}
+    if python_results:
+        report_content += "## Backend Python (process pool + shared memory)\n\n"
+        report_content += (
+            "`bench/pyblur.py` giải mã ảnh bằng stb_image của libblur.so (cùng bộ giải mã với blur_parallel, "
+            "nên ảnh kết quả trùng khớp từng byte) một lần vào mảng NumPy trong shared memory, chia các hàng thành "
+            "mỗi process một dải (kèm hàng halo) và tính tích chập vector hóa trong từng worker; "
+            "worker chỉ nhận chỉ số hàng, không sao chép ảnh. Speedup tính so với cùng baseline C++; "
+            "thời gian khởi động pool không nằm trong thời gian kernel mà được tính vào đầu-cuối.\n\n"
+        )
+        report_content += "| Độ phân giải | Processes | Python (s) | OpenMP (s) | Python / OpenMP | Speedup | Efficiency | Khởi động pool (s) |\n"
+        report_content += "|--------------|-----------|------------|------------|-----------------|---------|------------|--------------------|\n"
+        for image_path, data in python_results.items():
+            resolution = get_image_resolution(image_path)
+            if resolution == "unknown":
+                resolution = os.path.basename(image_path).split('.')[0]
+            python = data['python']
+            omp_times = dict(zip(data['threads'].tolist(), data['times']))
+            for j, p in enumerate(python['threads'].tolist()):
+                omp_time = omp_times.get(p)
+                ratio = f"{python['times'][j] / omp_time:.2f}x" if omp_time else "n/a"
+                omp_cell = f"{omp_time:.4f}" if omp_time else "n/a"
+                report_content += (
+                    f"| {resolution} | {p} | {python['times'][j]:.4f} | {omp_cell} | {ratio} | "
+                    f"{python['speedups'][j]:.2f}x | {python['efficiencies'][j]:.1%} | {python['pool_start'][j]:.4f} |\n"
+                )
+        report_content += "\n"
+        for image_path, data in python_results.items():
+            resolution = get_image_resolution(image_path)
+            if resolution == "unknown":
+                resolution = os.path.basename(image_path).split('.')[0]
+            python = data['python']
+            best = np.argmax(python['speedups'])
+            report_content += (
+                f"- {resolution}: Python tốt nhất **{python['speedups'][best]:.2f}x** với {python['threads'][best]} processes, "
+                f"OpenMP tốt nhất **{max(data['speedups']):.2f}x** "
+                f"(Python đạt {python['speedups'][best] / max(data['speedups']):.0%} speedup của OpenMP)\n"
+            )
+        report_content += "\n*Đường đứt nét trên biểu đồ speedup và efficiency là backend Python*\n\n"
+
     # So sánh tổng hợp và phân tích Amdahl
     report_content += "## So sánh tổng hợp và Phân tích Định luật Amdahl\n\n"
     report_content += "### Biểu đồ so sánh Baseline vs Parallel:\n\n"
@@ -133,6 +291,9 @@ def generate_report(all_results):
     report_content += "*Biểu đồ cột cho thấy mức cải thiện hiệu năng với từng kích thước ảnh*\n\n"
     report_content += "![Efficiency Comparison](efficiency_comparison.png)\n"
     report_content += "*Hiệu suất sử dụng tài nguyên với các số threads khác nhau*\n\n"
+    if any(data['e2e'] is not None for data in all_results.values()):
+        report_content += "![End-to-End Comparison](end_to_end_comparison.png)\n"
+        report_content += "*Speedup chỉ tính kernel (đường liền) so với speedup đầu-cuối gồm đọc/ghi ảnh (đường đứt nét), và throughput đầu-cuối*\n\n"
     
     report_content += "### Quan sát và Phân tích:\n\n"
     report_content += "#### 1. Ảnh hưởng của kích thước bài toán:\n"
@@ -151,20 +312,50 @@ def generate_report(all_results):
     
     report_content += "#### 2. Minh chứng Định luật Amdahl:\n"
     report_content += "Định luật Amdahl: `Speedup_max = 1 / (s + (1-s)/p)` với `s` là phần không song song được.\n\n"
-    
+    report_content += (
+        "Mô hình `T(p) = T_s + T_p/p + k(p-1)` được khớp với thời gian đo ở mọi số thread "
+        "(bình phương tối thiểu không âm, sai số tương đối): `s = T_s / (T_s + T_p)` là phần tuần tự, "
+        "`k` là overhead cho mỗi thread thêm vào. Threads tối ưu theo mô hình là `sqrt(T_p / k)`.\n\n"
+    )
+    if len(THREAD_COUNTS) < 4:
+        report_content += "> ⚠️ Mô hình có 3 tham số: với ít hơn 4 số thread, R² luôn xấp xỉ 1 và dự đoán không đáng tin cậy.\n\n"
+    report_content += "| Độ phân giải | T_s (s) | T_p (s) | k (s/thread) | Phần tuần tự s | R² | Sai số TB | Threads tối ưu |\n"
+    report_content += "|--------------|---------|---------|--------------|----------------|----|-----------|----------------|\n"
     for image_path, data in all_results.items():
         resolution = get_image_resolution(image_path)
         if resolution == "unknown":
             resolution = os.path.basename(image_path).split('.')[0]
-        
-        # Ước tính phần tuần tự từ speedup với số thread cao nhất
-        max_threads = max(data['threads'])
-        speedup_max_threads = data['speedups'][np.where(data['threads'] == max_threads)[0][0]]
-        estimated_s = (max_threads - speedup_max_threads) / (max_threads * speedup_max_threads - speedup_max_threads)
-        estimated_s = max(0, min(1, estimated_s))  # Giới hạn trong [0,1]
-        
-        report_content += f"- **{resolution}**: Phần tuần tự ước tính ≈ {estimated_s:.1%}\n"
-    
+        model = data['model']
+        optimal = f"{model['optimal_threads']:.1f}" if np.isfinite(model['optimal_threads']) else "∞"
+        report_content += (
+            f"| {resolution} | {model['serial']:.4f} | {model['parallel']:.4f} | {model['overhead']:.2e} | "
+            f"{model['serial_fraction']:.1%} | {model['r_squared']:.3f} | {model['rmse_rel']:.1%} | {optimal} |\n"
+        )
+
+    report_content += "\n**Phần tuần tự thực nghiệm Karp–Flatt** `e(p) = (1/S - 1/p) / (1 - 1/p)`: "
+    report_content += "e(p) gần như không đổi → giới hạn do phần tuần tự; e(p) tăng theo p → overhead song song tăng theo số thread.\n\n"
+    report_content += "| Độ phân giải | " + " | ".join(f"p={p}" for p in THREAD_COUNTS if p > 1) + " |\n"
+    report_content += "|--------------|" + "|".join("------" for p in THREAD_COUNTS if p > 1) + "|\n"
+    for image_path, data in all_results.items():
+        resolution = get_image_resolution(image_path)
+        if resolution == "unknown":
+            resolution = os.path.basename(image_path).split('.')[0]
+        karp_flatt = dict(zip(data['threads'].tolist(), data['model']['karp_flatt']))
+        cells = [f"{karp_flatt[p]:.1%}" if p in karp_flatt else "n/a" for p in THREAD_COUNTS if p > 1]
+        report_content += f"| {resolution} | " + " | ".join(cells) + " |\n"
+
+    if PREDICT_THREADS:
+        report_content += "\n**Speedup dự đoán** tại số thread chưa đo (từ mô hình khớp được):\n\n"
+        report_content += "| Độ phân giải | " + " | ".join(f"p={p}" for p in PREDICT_THREADS) + " |\n"
+        report_content += "|--------------|" + "|".join("------" for p in PREDICT_THREADS) + "|\n"
+        for image_path, data in all_results.items():
+            resolution = get_image_resolution(image_path)
+            if resolution == "unknown":
+                resolution = os.path.basename(image_path).split('.')[0]
+            predicted = predict_speedup(data['model'], PREDICT_THREADS)
+            report_content += f"| {resolution} | " + " | ".join(f"{v:.2f}x" for v in predicted) + " |\n"
+        report_content += "\n![Scaling Model](scaling_model.png)\n"
+        report_content += "*Speedup đo được (điểm) và mô hình khớp được (đường), kéo dài đến số thread dự đoán; bên phải là Karp–Flatt e(p)*\n"
     report_content += "\n#### 3. Nguyên nhân overhead thấp hơn với ảnh lớn:\n"
     report_content += "- **Overhead cố định**: Thời gian tạo/hủy thread, đồng bộ hóa không thay đổi theo kích thước ảnh\n"
     report_content += "- **Khối lượng tính toán tỷ lệ**: Với ảnh lớn hơn, thời gian xử lý pixel tăng tuyến tính\n"
@@ -184,10 +375,289 @@ def generate_report(all_results):
     print("Generated detailed REPORT.md successfully.")
 
 
-def main(image_files=None):
+def chart_speedup_comparison(all_results, thread_counts, topology=None, dpi=CHART_DPI):
+    """Biểu đồ speedup của tất cả các ảnh so với baseline và lý tưởng."""
+    plt = pyplot()
+    plt.figure(figsize=(12, 8))
+    
+    for image_path, data in all_results.items():
+        resolution = get_image_resolution(image_path)
+        if resolution == "unknown":
+            resolution = os.path.basename(image_path).split('.')[0]
+        threads = data['threads']
+        speedups = data['speedups']
+        line, = plt.plot(threads, speedups, 'o-', label=f'{resolution}', linewidth=2, markersize=6)
+        if data['python'] is not None:
+            plt.plot(data['python']['threads'], data['python']['speedups'], 's--', color=line.get_color(),
+                     label=f'{resolution} Python (processes)', linewidth=2, markersize=6)
+    
+    # Vẽ đường baseline (speedup = 1 cho tất cả threads) và đường lý tưởng
+    max_threads = max(len(data['threads']) for data in all_results.values())
+    ideal_line_threads = thread_counts[:max_threads]
+    plt.axhline(y=1.0, color='black', linestyle='-', linewidth=3, label='Baseline (Sequential)', alpha=0.8)
+    plt.plot(ideal_line_threads, ideal_line_threads, 'r--', label='Ideal Speedup', linewidth=2)
+    
+    plt.title('Speedup Comparison: Baseline vs Parallel vs Ideal', fontsize=14)
+    plt.xlabel('Number of Threads (p)', fontsize=12)
+    plt.ylabel('Speedup', fontsize=12)
+    shade_topology(plt.gca(), topology)
+    plt.grid(True, alpha=0.3); plt.legend(fontsize=11); plt.xticks(thread_counts)
+    plt.ylim(0, max(ideal_line_threads) * 1.1)
+    plt.tight_layout()
+    plt.savefig("speedup_comparison.png", dpi=dpi, bbox_inches='tight')
+    print("\nSaved speedup comparison chart to speedup_comparison.png")
+    plt.close()
+
+
+def chart_baseline_vs_parallel_time(all_results, thread_counts, dpi=CHART_DPI):
+    """Biểu đồ thời gian thực thi baseline và parallel."""
+    plt = pyplot()
+    plt.figure(figsize=(12, 8))
+    
+    for image_path, data in all_results.items():
+        resolution = get_image_resolution(image_path)
+        if resolution == "unknown":
+            resolution = os.path.basename(image_path).split('.')[0]
+        
+        threads = data['threads']
+        parallel_times = data['times']
+        baseline_time = data['baseline_time']
+        
+        # Vẽ đường baseline (thời gian tuần tự không đổi)
+        plt.axhline(y=baseline_time, linestyle='--', linewidth=2, 
+                   label=f'Baseline {resolution}', alpha=0.7)
+        
+        # Vẽ đường parallel
+        plt.plot(threads, parallel_times, 'o-', label=f'Parallel {resolution}', 
+                linewidth=2, markersize=6)
+    
+    plt.title('Execution Time: Baseline vs Parallel', fontsize=14)
+    plt.xlabel('Number of Threads (p)', fontsize=12)
+    plt.ylabel('Execution Time (seconds)', fontsize=12)
+    plt.grid(True, alpha=0.3)
+    plt.legend(fontsize=10)
+    plt.yscale('log')  # Dùng log scale vì chênh lệch lớn
+    plt.xticks(thread_counts)
+    plt.tight_layout()
+    plt.savefig("baseline_vs_parallel_time.png", dpi=dpi, bbox_inches='tight')
+    print("Saved baseline vs parallel time chart to baseline_vs_parallel_time.png")
+    plt.close()
+
+
+def chart_efficiency_comparison(all_results, thread_counts, dpi=CHART_DPI):
+    """Biểu đồ efficiency của tất cả các ảnh."""
+    plt = pyplot()
+    plt.figure(figsize=(12, 8))
+    
+    for image_path, data in all_results.items():
+        resolution = get_image_resolution(image_path)
+        if resolution == "unknown":
+            resolution = os.path.basename(image_path).split('.')[0]
+        threads = data['threads']
+        efficiencies = data['efficiencies']
+        line, = plt.plot(threads, efficiencies, 'o-', label=f'{resolution}', linewidth=2, markersize=6)
+        if data['python'] is not None:
+            plt.plot(data['python']['threads'], data['python']['efficiencies'], 's--', color=line.get_color(),
+                     label=f'{resolution} Python (processes)', linewidth=2, markersize=6)
+    
+    plt.axhline(y=1.0, color='r', linestyle='--', label='Ideal Efficiency (100%)', linewidth=2)
+    plt.title('Efficiency Comparison Across Different Image Sizes', fontsize=14)
+    plt.xlabel('Number of Threads (p)', fontsize=12)
+    plt.ylabel('Efficiency', fontsize=12)
+    plt.grid(True, alpha=0.3)
+    plt.legend(fontsize=11)
+    plt.ylim(0, 1.1)
+    plt.xticks(thread_counts)
+    plt.gca().yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x:.0%}'))
+    plt.tight_layout()
+    plt.savefig("efficiency_comparison.png", dpi=dpi, bbox_inches='tight')
+    print("Saved efficiency comparison chart to efficiency_comparison.png")
+    plt.close()
+
+
+def chart_performance_gain(all_results, thread_counts, dpi=CHART_DPI):
+    """Biểu đồ cột baseline so với parallel tốt nhất của từng ảnh."""
+    plt = pyplot()
+    plt.figure(figsize=(10, 6))
+    
+    resolutions = []
+    baseline_times = []
+    best_parallel_times = []
+    speedups = []
+    
+    for image_path, data in all_results.items():
+        resolution = get_image_resolution(image_path)
+        if resolution == "unknown":
+            resolution = os.path.basename(image_path).split('.')[0]
+        
+        resolutions.append(resolution)
+        baseline_times.append(data['baseline_time'])
+        
+        # Tìm thời gian parallel tốt nhất
+        best_idx = np.argmax(data['speedups'])
+        best_parallel_times.append(data['times'][best_idx])
+        speedups.append(data['speedups'][best_idx])
+    
+    x = np.arange(len(resolutions))
+    width = 0.35
+    
+    bars1 = plt.bar(x - width/2, baseline_times, width, label='Baseline (Sequential)', 
+                   color='lightcoral', alpha=0.8)
+    bars2 = plt.bar(x + width/2, best_parallel_times, width, label='Best Parallel', 
+                   color='lightblue', alpha=0.8)
+    
+    # Thêm text hiển thị speedup trên mỗi cặp bar
+    for i, (baseline, parallel, speedup) in enumerate(zip(baseline_times, best_parallel_times, speedups)):
+        plt.text(i, max(baseline, parallel) * 1.1, f'{speedup:.1f}x faster', 
+                ha='center', va='bottom', fontweight='bold', fontsize=10)
+    
+    plt.xlabel('Image Resolution')
+    plt.ylabel('Execution Time (seconds)')
+    plt.title('Performance Gain: Baseline vs Best Parallel')
+    plt.xticks(x, resolutions, rotation=45)
+    plt.legend()
+    plt.grid(True, alpha=0.3, axis='y')
+    plt.tight_layout()
+    plt.savefig("performance_gain.png", dpi=dpi, bbox_inches='tight')
+    print("Saved performance gain chart to performance_gain.png")
+    plt.close()
+
+
+def chart_end_to_end(all_results, thread_counts, dpi=CHART_DPI):
+    """Biểu đồ speedup kernel so với speedup đầu-cuối, và throughput đầu-cuối."""
+    plt = pyplot()
+    e2e_results = {k: v for k, v in all_results.items() if v['e2e'] is not None}
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 7))
+    for image_path, data in e2e_results.items():
+        resolution = get_image_resolution(image_path)
+        if resolution == "unknown":
+            resolution = os.path.basename(image_path).split('.')[0]
+        line, = ax1.plot(data['threads'], data['speedups'], 'o-', label=f'{resolution} kernel',
+                         linewidth=2, markersize=6)
+        ax1.plot(data['threads'], data['e2e']['speedups'], 's--', color=line.get_color(),
+                 label=f'{resolution} end-to-end', linewidth=2, markersize=6)
+        ax2.plot(data['threads'], data['e2e']['throughputs'], 'o-', color=line.get_color(),
+                 label=f'{resolution}', linewidth=2, markersize=6)
+
+    ax1.axhline(y=1.0, color='black', linestyle='-', linewidth=2, alpha=0.8)
+    ax1.set_title('Kernel-only vs End-to-End Speedup', fontsize=14)
+    ax1.set_xlabel('Number of Threads (p)', fontsize=12)
+    ax1.set_ylabel('Speedup', fontsize=12)
+    ax1.set_xticks(thread_counts)
+    ax1.grid(True, alpha=0.3)
+    ax1.legend(fontsize=9)
+
+    ax2.set_title('End-to-End Throughput (decode + compute + encode)', fontsize=14)
+    ax2.set_xlabel('Number of Threads (p)', fontsize=12)
+    ax2.set_ylabel('Throughput (megapixels/s)', fontsize=12)
+    ax2.set_xticks(thread_counts)
+    ax2.grid(True, alpha=0.3)
+    ax2.legend(fontsize=10)
+
+    plt.tight_layout()
+    plt.savefig("end_to_end_comparison.png", dpi=dpi, bbox_inches='tight')
+    print("Saved end-to-end comparison chart to end_to_end_comparison.png")
+    plt.close()
+
+
+def chart_scaling_model(all_results, thread_counts, predict_threads, topology=None, dpi=CHART_DPI):
+    """Biểu đồ speedup đo được so với mô hình khớp được, và Karp–Flatt e(p)."""
+    plt = pyplot()
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 7))
+    p_max = max(list(thread_counts) + list(predict_threads))
+    p_curve = np.linspace(1, p_max, 200)
+    y_max = max(thread_counts)
+    for image_path, data in all_results.items():
+        resolution = get_image_resolution(image_path)
+        if resolution == "unknown":
+            resolution = os.path.basename(image_path).split('.')[0]
+        line, = ax1.plot(data['threads'], data['speedups'], 'o', label=f'{resolution} measured', markersize=7)
+        fitted = predict_speedup(data['model'], p_curve)
+        y_max = max(y_max, fitted.max())
+        ax1.plot(p_curve, fitted, '-', color=line.get_color(),
+                 label=f"{resolution} fit (s={data['model']['serial_fraction']:.1%})", linewidth=2)
+        mask = data['threads'] > 1
+        ax2.plot(data['threads'][mask], data['model']['karp_flatt'][mask], 'o-', color=line.get_color(),
+                 label=f'{resolution}', linewidth=2, markersize=6)
+
+    ax1.plot([1, p_max], [1, p_max], 'r--', label='Ideal Speedup', linewidth=1.5)
+    if predict_threads:
+        ax1.axvspan(max(thread_counts), p_max, color='grey', alpha=0.1, label='Predicted')
+    ax1.set_title('Measured Speedup vs Fitted Scaling Model', fontsize=14)
+    ax1.set_xlabel('Number of Threads (p)', fontsize=12)
+    ax1.set_ylabel('Speedup', fontsize=12)
+    ax1.set_ylim(0, y_max * 1.1)
+    shade_topology(ax1, topology)
+    ax1.grid(True, alpha=0.3)
+    ax1.legend(fontsize=9)
+
+    ax2.set_title('Karp–Flatt Experimentally Determined Serial Fraction', fontsize=14)
+    ax2.set_xlabel('Number of Threads (p)', fontsize=12)
+    ax2.set_ylabel('e(p)', fontsize=12)
+    ax2.set_xticks([p for p in thread_counts if p > 1])
+    ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x:.0%}'))
+    ax2.grid(True, alpha=0.3)
+    ax2.legend(fontsize=10)
+
+    plt.tight_layout()
+    plt.savefig("scaling_model.png", dpi=dpi, bbox_inches='tight')
+    print("Saved scaling model chart to scaling_model.png")
+    plt.close()
+
+
+def plot_charts(all_results):
+    """Vẽ các biểu đồ tổng hợp (song song, mỗi biểu đồ một process)."""
+    charts = [chart_baseline_vs_parallel_time, chart_efficiency_comparison, chart_performance_gain]
+    if any(data['e2e'] is not None for data in all_results.values()):
+        charts.append(chart_end_to_end)
+    jobs = [(chart_speedup_comparison, all_results, THREAD_COUNTS, TOPOLOGY)]
+    jobs += [(chart, all_results, THREAD_COUNTS) for chart in charts]
+    jobs.append((chart_scaling_model, all_results, THREAD_COUNTS, PREDICT_THREADS, TOPOLOGY))
+    render_charts(jobs, dpi=CHART_DPI, workers=PLOT_JOBS)
+
+
+def print_summary(all_results):
+    """In tóm tắt kết quả ra màn hình."""
+    print("\n=== TÓM TẮT KẾT QUẢ ===")
+    for image_path in sorted(all_results.keys()):
+        resolution = get_image_resolution(image_path)
+        if resolution == "unknown":
+            resolution = os.path.basename(image_path).split('.')[0]
+        data = all_results[image_path]
+        max_speedup = max(data['speedups'])
+        max_efficiency = max(data['efficiencies'])
+        summary = f"{image_path} ({resolution}): Max Speedup = {max_speedup:.2f}x, Max Efficiency = {max_efficiency:.1%}"
+        if data['e2e'] is not None:
+            summary += f", Max E2E Speedup = {max(data['e2e']['speedups']):.2f}x"
+        print(summary)
+        print(f"  Scaling model: {format_model(data['model'])}")
+        if data['python'] is not None:
+            python = data['python']
+            print(f"  Python backend: Max Speedup = {max(python['speedups']):.2f}x, "
+                  f"Max Efficiency = {max(python['efficiencies']):.1%}")
+
+
+def render_results(all_results, charts=True):
+    """Tạo biểu đồ (nếu charts=True), REPORT.md và tóm tắt từ kết quả."""
+    if charts:
+        plot_charts(all_results)
+    generate_report(all_results)
+    print_summary(all_results)
+
+
+def main(image_files=None, charts=True):
     """Hàm chính điều phối toàn bộ quá trình."""
     if not compile_code():
         return
+    python_env = None
+    if PYTHON_BACKEND:
+        # Backend Python giải mã ảnh bằng stb_image của libblur.so như các chương trình
+        try:
+            python_env = pyblur_env()
+        except BuildError as e:
+            print(f"Error building libblur.so for the Python backend: {e}")
+            return
+    print(f"CPU topology: {describe_topology(TOPOLOGY)}; thread counts: {THREAD_COUNTS}")
 
     # Xác định danh sách file ảnh để xử lý
     if image_files:
@@ -200,7 +670,7 @@ def main(image_files=None):
                 print(f"Warning: File {img_file} không tồn tại. Bỏ qua.")
     else:
         # Tự động tìm tất cả file ảnh
-        input_images = glob.glob("input_*.jpg") + glob.glob("*.jpg") + glob.glob("*.png")
+        input_images = glob.glob("input_*.jpg") + glob.glob("input_*.ppm") + glob.glob("*.jpg") + glob.glob("*.png")
     
     if not input_images:
         print("Error: Không tìm thấy file ảnh nào.")
@@ -208,9 +678,8 @@ def main(image_files=None):
         return
 
     all_results = {}
-    plt.figure(figsize=(12, 8)) # Tạo figure cho biểu đồ tổng hợp
 
-    for image_path in sorted(input_images):
+    for image_path in sorted(set(input_images)):
         resolution = get_image_resolution(image_path)
         if resolution == "unknown":
             # Nếu không trích xuất được từ tên file, thử lấy kích thước thực tế
@@ -219,221 +688,569 @@ def main(image_files=None):
         print(f"\n--- Analyzing image: {image_path} ({resolution}) ---")
 
         # --- Chạy bản tuần tự (baseline) ---
-        print(f"  Running Baseline ({NUM_RUNS} runs)...")
-        baseline_time = run_benchmark(BASELINE_EXE, [image_path])
-        if baseline_time is None:
+        print(f"  Running Baseline ({describe_options(BENCH_OPTIONS)})...")
+        baseline_stats = run_benchmark(BASELINE_EXE, [image_path], check=OUTPUT_CHECK, **BENCH_OPTIONS)
+        if baseline_stats is None:
             print(f"  Failed to get baseline time for {image_path}. Skipping.")
             continue
-        print(f"  Average sequential time: {baseline_time:.6f}s")
+        print(f"  Sequential time: {format_stats(baseline_stats)}")
 
         # --- Chạy bản song song ---
-        parallel_times = []
+        parallel_stats = []
         valid_threads = []
-        print(f"  Running Parallel ({NUM_RUNS} runs each)...")
+        print(f"  Running Parallel ({describe_options(BENCH_OPTIONS)} each)...")
         for p in THREAD_COUNTS:
             print(f"    Testing with {p} threads...")
-            avg_time = run_benchmark(PARALLEL_EXE, [image_path, str(p)])
-            if avg_time is not None:
-                parallel_times.append(avg_time)
+            stats = run_benchmark(PARALLEL_EXE, [image_path, str(p)], check=OUTPUT_CHECK, **BENCH_OPTIONS)
+            if stats is not None:
+                print(f"      {format_stats(stats)}")
+                parallel_stats.append(stats)
                 valid_threads.append(p)
         
-        if not parallel_times:
+        if not parallel_stats:
             print(f"  No successful parallel runs for {image_path}. Skipping.")
             continue
 
+        # --- Chạy backend Python (process pool + shared memory) ---
+        python_stats = []
+        python_threads = []
+        if python_env is not None:
+            print(f"  Running Python backend ({describe_options(BENCH_OPTIONS)} each)...")
+            for p in THREAD_COUNTS:
+                print(f"    Testing with {p} processes...")
+                stats = run_benchmark(sys.executable, [PYBLUR_SCRIPT, image_path, str(p)], env=python_env,
+                                      check=OUTPUT_CHECK, **BENCH_OPTIONS)
+                if stats is not None:
+                    print(f"      {format_stats(stats)}")
+                    python_stats.append(stats)
+                    python_threads.append(p)
+
         # --- Tính toán và lưu kết quả ---
-        threads_np = np.array(valid_threads)
-        times_np = np.array(parallel_times)
-        speedups = baseline_time / times_np
-        efficiencies = speedups / threads_np
-        
-        all_results[image_path] = {
-            'baseline_time': baseline_time,
+        all_results[image_path] = analyze_image(baseline_stats, parallel_stats, valid_threads,
+                                                python_stats, python_threads)
+
+    if all_results:
+        write_results(RESULTS_FILE, results_to_records(all_results),
+                      results_meta(BENCH_OPTIONS, thread_counts=THREAD_COUNTS, topology=TOPOLOGY),
+                      csv_path=os.path.splitext(RESULTS_FILE)[0] + '.csv')
+        print(f"\nSaved raw samples and derived results to {RESULTS_FILE}")
+        render_results(all_results, charts=charts)
+
+
+# --- Weak scaling (Gustafson) ---
+
+def weak_scaling_size(base_size, threads):
+    """Kích thước ảnh có xấp xỉ threads lần số pixel của base_size, giữ nguyên tỷ lệ khung hình."""
+    width, height = base_size
+    scale = np.sqrt(threads)
+    return int(round(width * scale)), int(round(height * scale))
+
+def prepare_weak_images(base_size, thread_counts):
+    """Tạo (nếu chưa có) ảnh PPM cho từng số thread; trả về {threads: đường dẫn ảnh}."""
+    from create_test_images import create_test_image
+
+    images = {}
+    for p in thread_counts:
+        width, height = weak_scaling_size(base_size, p)
+        filename = f"weak_{width}x{height}.ppm"
+        if not os.path.exists(filename):
+            create_test_image(width, height, filename, WEAK_PATTERN, seed=0)
+        images[p] = filename
+    return images
+
+def analyze_weak(images, baseline_stats, parallel_stats, threads):
+    """
+    Tính các chỉ số weak scaling từ thống kê đo được.
+
+    - Scaled speedup (Gustafson): T_tuần tự(ảnh_p) / T_song_song(p, ảnh_p)
+    - Phần tuần tự theo Gustafson: s = (p - S) / (p - 1), với p > 1
+    - Weak efficiency: throughput(p) / (p * throughput_tuần_tự), chuẩn hóa theo số
+      pixel vì kích thước ảnh chỉ xấp xỉ p lần ảnh gốc; throughput tuần tự lấy từ
+      baseline của điểm đầu tiên nên không cần threads[0] == 1
+    """
+    threads_np = np.array(threads)
+    pixels = np.array([image_pixels(images[p]) for p in threads], dtype=float)
+    times_np = np.array([stats['median'] for stats in parallel_stats])
+    baseline_times = np.array([stats['median'] for stats in baseline_stats])
+    scaled_speedups = baseline_times / times_np
+    throughputs = pixels / times_np
+    serial_throughput = pixels[0] / baseline_times[0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        serial_fractions = np.where(threads_np > 1, (threads_np - scaled_speedups) / (threads_np - 1), np.nan)
+    serial_fraction = float(np.nanmedian(serial_fractions)) if np.any(threads_np > 1) else 0.0
+    return {
+        'images': [images[p] for p in threads],
+        'baseline_stats': baseline_stats,
+        'stats': parallel_stats,
+        'threads': threads_np,
+        'pixels': pixels,
+        'times': times_np,
+        'baseline_times': baseline_times,
+        'scaled_speedups': scaled_speedups,
+        'scaled_efficiencies': scaled_speedups / threads_np,
+        'weak_efficiencies': throughputs / (threads_np * serial_throughput),
+        'serial_fractions': serial_fractions,
+        'serial_fraction': serial_fraction,
+        'gustafson': gustafson_speedup(serial_fraction, threads_np),
+    }
+
+def weak_to_records(weak):
+    """Chuyển kết quả weak scaling thành các bản ghi (mỗi số thread một baseline + một parallel)."""
+    records = []
+    for j, p in enumerate(weak['threads']):
+        records.append({'image': weak['images'][j], 'series': 'baseline', 'threads': int(p),
+                        'stats': weak['baseline_stats'][j]})
+        records.append({
+            'image': weak['images'][j], 'series': 'parallel', 'threads': int(p),
+            'scaled_speedup': weak['scaled_speedups'][j], 'weak_efficiency': weak['weak_efficiencies'][j],
+            'stats': weak['stats'][j],
+        })
+    return records
+
+def records_to_weak(records):
+    """Dựng lại kết quả weak scaling từ các bản ghi đã lưu (ngược với `weak_to_records`)."""
+    baseline = {r['threads']: r for r in records if r['series'] == 'baseline'}
+    parallel = [r for r in records if r['series'] == 'parallel']
+    return analyze_weak(
+        {r['threads']: r['image'] for r in parallel},
+        [baseline[r['threads']]['stats'] for r in parallel],
+        [r['stats'] for r in parallel],
+        [r['threads'] for r in parallel],
+    )
+
+def chart_weak_scaling(weak, topology=None, dpi=CHART_DPI):
+    """Biểu đồ weak scaling: thời gian theo p (lý tưởng: không đổi) và scaled speedup so với Gustafson."""
+    plt = pyplot()
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 7))
+    threads = weak['threads']
+
+    ax1.plot(threads, weak['times'], 'o-', label='Parallel time (image grows with p)', linewidth=2, markersize=6)
+    ax1.axhline(y=weak['times'][0], color='r', linestyle='--', label='Ideal (constant time)', linewidth=2)
+    ax1.set_title('Weak Scaling: Execution Time', fontsize=14)
+    ax1.set_xlabel('Number of Threads (p)', fontsize=12)
+    ax1.set_ylabel('Execution Time (seconds)', fontsize=12)
+    ax1.set_xticks(threads)
+    ax1.set_ylim(0, max(weak['times']) * 1.2)
+    ax1.grid(True, alpha=0.3)
+    ax1.legend(fontsize=10)
+    ax1b = ax1.twinx()
+    ax1b.plot(threads, weak['weak_efficiencies'], 's:', color='green', label='Weak efficiency', linewidth=2)
+    ax1b.set_ylabel('Weak Efficiency', fontsize=12)
+    ax1b.set_ylim(0, 1.1)
+    ax1b.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x:.0%}'))
+    ax1b.legend(loc='lower right', fontsize=10)
+
+    ax2.plot(threads, weak['scaled_speedups'], 'o-', label='Measured scaled speedup', linewidth=2, markersize=6)
+    ax2.plot(threads, weak['gustafson'], 's--',
+             label=f"Gustafson (s={weak['serial_fraction']:.1%})", linewidth=2, markersize=6)
+    ax2.plot(threads, threads, 'r--', label='Ideal Speedup', linewidth=1.5)
+    ax2.set_title('Weak Scaling: Scaled Speedup (Gustafson)', fontsize=14)
+    ax2.set_xlabel('Number of Threads (p)', fontsize=12)
+    ax2.set_ylabel('Scaled Speedup', fontsize=12)
+    ax2.set_xticks(threads)
+    shade_topology(ax2, topology)
+    ax2.grid(True, alpha=0.3)
+    ax2.legend(fontsize=10)
+
+    plt.tight_layout()
+    plt.savefig("weak_scaling.png", dpi=dpi, bbox_inches='tight')
+    print("Saved weak scaling chart to weak_scaling.png")
+    plt.close()
+
+def generate_weak_report(weak):
+    """Tạo file báo cáo WEAK_SCALING.md."""
+    print("\n--- Generating WEAK_SCALING.md ---")
+    report_content = "# Báo cáo Weak Scaling (Định luật Gustafson)\n\n"
+    report_content += (
+        "Kích thước ảnh tăng tỷ lệ với số thread (mỗi thread xử lý xấp xỉ cùng số pixel). "
+        "Nếu song song hóa tốt, thời gian chạy gần như không đổi khi p tăng.\n\n"
+    )
+    report_content += f"**Cấu hình thực nghiệm:**\n"
+    report_content += f"- Cách lấy mẫu: {describe_options(BENCH_OPTIONS)} (các lần chạy khởi động bị loại bỏ)\n"
+    report_content += f"- Ảnh cho 1 thread: {WEAK_BASE_SIZE[0]}x{WEAK_BASE_SIZE[1]}, pattern `{WEAK_PATTERN}` (PPM)\n"
+    report_content += f"- Số thread được test: {THREAD_COUNTS}\n"
+    report_content += f"- Topology CPU: {describe_topology(TOPOLOGY)}\n\n"
+    report_content += "- **Scaled speedup** = T_tuần tự(ảnh_p) / T_song_song(p, ảnh_p)\n"
+    report_content += "- **Weak efficiency** = throughput(p) / (p × throughput tuần tự của ảnh gốc) (chuẩn hóa theo số pixel)\n"
+    report_content += "- **Phần tuần tự (Gustafson)** s = (p - S) / (p - 1); Gustafson dự đoán `S(p) = p - s(p - 1)`\n\n"
+
+    report_content += "| Threads | Ảnh | Megapixels | Baseline (s) | Parallel (s) | Scaled Speedup | Gustafson | Scaled Efficiency | Weak Efficiency | s |\n"
+    report_content += "|---------|-----|------------|--------------|--------------|----------------|-----------|-------------------|-----------------|---|\n"
+    for j, p in enumerate(weak['threads']):
+        serial = weak['serial_fractions'][j]
+        report_content += (
+            f"| {p} | `{weak['images'][j]}` | {weak['pixels'][j] / 1e6:.2f} | {weak['baseline_times'][j]:.4f} | "
+            f"{weak['times'][j]:.4f} | {weak['scaled_speedups'][j]:.2f}x | {weak['gustafson'][j]:.2f}x | "
+            f"{weak['scaled_efficiencies'][j]:.1%} | {weak['weak_efficiencies'][j]:.1%} | "
+            f"{'n/a' if np.isnan(serial) else f'{serial:.1%}'} |\n"
+        )
+    report_content += f"\nPhần tuần tự (median theo p): **{weak['serial_fraction']:.1%}**\n\n"
+    report_content += "![Weak Scaling](weak_scaling.png)\n"
+    report_content += "*Trái: thời gian khi ảnh tăng theo p (lý tưởng là đường ngang) và weak efficiency; phải: scaled speedup so với Gustafson*\n"
+
+    with open("WEAK_SCALING.md", "w", encoding="utf-8") as f:
+        f.write(report_content)
+    print("Generated WEAK_SCALING.md successfully.")
+
+def render_weak_results(weak, charts=True):
+    """Tạo biểu đồ (nếu charts=True), WEAK_SCALING.md và tóm tắt weak scaling."""
+    if charts:
+        render_charts([(chart_weak_scaling, weak, TOPOLOGY)], dpi=CHART_DPI, workers=PLOT_JOBS)
+    generate_weak_report(weak)
+    print("\n=== TÓM TẮT WEAK SCALING ===")
+    for j, p in enumerate(weak['threads']):
+        print(f"{p:>3} threads, {weak['images'][j]}: {weak['times'][j]:.4f}s, "
+              f"scaled speedup {weak['scaled_speedups'][j]:.2f}x, weak efficiency {weak['weak_efficiencies'][j]:.1%}")
+    print(f"Gustafson serial fraction ≈ {weak['serial_fraction']:.1%}")
+
+def run_weak_scaling(charts=True):
+    """Chạy thực nghiệm weak scaling: ảnh cho p threads có p lần số pixel của ảnh gốc."""
+    if not compile_code():
+        return
+    print(f"CPU topology: {describe_topology(TOPOLOGY)}; thread counts: {THREAD_COUNTS}")
+
+    print(f"\n--- Preparing weak-scaling images (base {WEAK_BASE_SIZE[0]}x{WEAK_BASE_SIZE[1]}) ---")
+    images = prepare_weak_images(WEAK_BASE_SIZE, THREAD_COUNTS)
+
+    baseline_stats = []
+    parallel_stats = []
+    valid_threads = []
+    for p in THREAD_COUNTS:
+        image_path = images[p]
+        print(f"\n--- {p} threads, image {image_path} ---")
+        print(f"  Running Baseline ({describe_options(BENCH_OPTIONS)})...")
+        b_stats = run_benchmark(BASELINE_EXE, [image_path], check=OUTPUT_CHECK, **BENCH_OPTIONS)
+        print(f"  Running Parallel ({describe_options(BENCH_OPTIONS)})...")
+        p_stats = run_benchmark(PARALLEL_EXE, [image_path, str(p)], check=OUTPUT_CHECK, **BENCH_OPTIONS)
+        if b_stats is None or p_stats is None:
+            print(f"  Failed to measure {image_path}. Skipping.")
+            continue
+        print(f"    Sequential: {format_stats(b_stats)}")
+        print(f"    Parallel:   {format_stats(p_stats)}")
+        baseline_stats.append(b_stats)
+        parallel_stats.append(p_stats)
+        valid_threads.append(p)
+
+    if not parallel_stats:
+        print("Error: No successful weak-scaling runs.")
+        return
+
+    weak = analyze_weak(images, baseline_stats, parallel_stats, valid_threads)
+    write_results(WEAK_RESULTS_FILE, weak_to_records(weak),
+                  results_meta(BENCH_OPTIONS, thread_counts=THREAD_COUNTS, topology=TOPOLOGY,
+                               base_size=list(WEAK_BASE_SIZE),
+                               pattern=WEAK_PATTERN),
+                  csv_path=os.path.splitext(WEAK_RESULTS_FILE)[0] + '.csv')
+    print(f"\nSaved raw samples and derived results to {WEAK_RESULTS_FILE}")
+    render_weak_results(weak, charts=charts)
+
+
+# --- Affinity sweep (OMP_PROC_BIND / OMP_PLACES) ---
+
+def affinity_configs(binds, places):
+    """
+    Các cấu hình affinity cần đo: {nhãn: biến môi trường}.
+
+    Với OMP_PROC_BIND=false (unbound) các luồng không bị gắn nên OMP_PLACES
+    không có tác dụng và bị xóa khỏi môi trường.
+    """
+    configs = {}
+    for bind in binds:
+        if bind == 'false':
+            configs['unbound'] = {'OMP_PROC_BIND': 'false', 'OMP_PLACES': None}
+        else:
+            for place in places:
+                configs[f'{bind}/{place}'] = {'OMP_PROC_BIND': bind, 'OMP_PLACES': place}
+    return configs
+
+def analyze_affinity(baseline_stats, config_results):
+    """
+    Tính speedup và độ biến thiên (CV = stddev / mean) cho từng cấu hình affinity.
+
+    Args:
+        baseline_stats (dict): Thống kê của bản tuần tự
+        config_results (dict): {nhãn: {'env', 'threads', 'stats'}}
+    """
+    baseline_time = baseline_stats['median']
+    affinity = {}
+    for label, config in config_results.items():
+        threads_np = np.array(config['threads'])
+        times_np = np.array([stats['median'] for stats in config['stats']])
+        affinity[label] = {
+            'env': config['env'],
             'threads': threads_np,
+            'stats': config['stats'],
             'times': times_np,
-            'speedups': speedups,
-            'efficiencies': efficiencies
+            'speedups': baseline_time / times_np,
+            'cv': np.array([stats['stddev'] / stats['mean'] for stats in config['stats']]),
         }
+    return affinity
 
-        # Thêm đường speedup vào biểu đồ tổng hợp
-        plt.figure(1) # Quay lại figure đã tạo lúc đầu
-        plt.plot(threads_np, speedups, 'o-', label=f'Speedup ({resolution})', linewidth=2, markersize=6)
+def affinity_to_records(baseline_stats, affinity):
+    """Chuyển kết quả affinity sweep thành các bản ghi (baseline + cấu hình x số thread)."""
+    records = [{'config': 'baseline', 'threads': None, 'stats': baseline_stats}]
+    for label, data in affinity.items():
+        for j, p in enumerate(data['threads']):
+            records.append({
+                'config': label, 'env': data['env'], 'threads': int(p),
+                'speedup': data['speedups'][j], 'cv': data['cv'][j], 'stats': data['stats'][j],
+            })
+    return records
 
-    # --- Hoàn thiện các biểu đồ tổng hợp ---
-    if all_results:
-        # 1. Biểu đồ so sánh Speedup với đường baseline
-        plt.figure(figsize=(12, 8))
-        
-        for image_path, data in all_results.items():
-            resolution = get_image_resolution(image_path)
-            if resolution == "unknown":
-                resolution = os.path.basename(image_path).split('.')[0]
-            threads = data['threads']
-            speedups = data['speedups']
-            plt.plot(threads, speedups, 'o-', label=f'{resolution}', linewidth=2, markersize=6)
-        
-        # Vẽ đường baseline (speedup = 1 cho tất cả threads) và đường lý tưởng
-        max_threads = max(len(data['threads']) for data in all_results.values())
-        ideal_line_threads = THREAD_COUNTS[:max_threads]
-        plt.axhline(y=1.0, color='black', linestyle='-', linewidth=3, label='Baseline (Sequential)', alpha=0.8)
-        plt.plot(ideal_line_threads, ideal_line_threads, 'r--', label='Ideal Speedup', linewidth=2)
-        
-        plt.title('Speedup Comparison: Baseline vs Parallel vs Ideal', fontsize=14)
-        plt.xlabel('Number of Threads (p)', fontsize=12)
-        plt.ylabel('Speedup', fontsize=12)
-        plt.grid(True, alpha=0.3); plt.legend(fontsize=11); plt.xticks(THREAD_COUNTS)
-        plt.ylim(0, max(ideal_line_threads) * 1.1)
-        plt.tight_layout()
-        plt.savefig("speedup_comparison.png", dpi=300, bbox_inches='tight')
-        print("\nSaved speedup comparison chart to speedup_comparison.png")
-        plt.close()
-
-        # 2. Biểu đồ so sánh thời gian thực thi (Baseline vs Parallel)
-        plt.figure(figsize=(12, 8))
-        
-        for image_path, data in all_results.items():
-            resolution = get_image_resolution(image_path)
-            if resolution == "unknown":
-                resolution = os.path.basename(image_path).split('.')[0]
-            
-            threads = data['threads']
-            parallel_times = data['times']
-            baseline_time = data['baseline_time']
-            
-            # Vẽ đường baseline (thời gian tuần tự không đổi)
-            plt.axhline(y=baseline_time, linestyle='--', linewidth=2, 
-                       label=f'Baseline {resolution}', alpha=0.7)
-            
-            # Vẽ đường parallel
-            plt.plot(threads, parallel_times, 'o-', label=f'Parallel {resolution}', 
-                    linewidth=2, markersize=6)
-        
-        plt.title('Execution Time: Baseline vs Parallel', fontsize=14)
-        plt.xlabel('Number of Threads (p)', fontsize=12)
-        plt.ylabel('Execution Time (seconds)', fontsize=12)
-        plt.grid(True, alpha=0.3)
-        plt.legend(fontsize=10)
-        plt.yscale('log')  # Dùng log scale vì chênh lệch lớn
-        plt.xticks(THREAD_COUNTS)
-        plt.tight_layout()
-        plt.savefig("baseline_vs_parallel_time.png", dpi=300, bbox_inches='tight')
-        print("Saved baseline vs parallel time chart to baseline_vs_parallel_time.png")
-        plt.close()
-
-        # 3. Biểu đồ so sánh Efficiency
-        plt.figure(figsize=(12, 8))
-        
-        for image_path, data in all_results.items():
-            resolution = get_image_resolution(image_path)
-            if resolution == "unknown":
-                resolution = os.path.basename(image_path).split('.')[0]
-            threads = data['threads']
-            efficiencies = data['efficiencies']
-            plt.plot(threads, efficiencies, 'o-', label=f'{resolution}', linewidth=2, markersize=6)
-        
-        plt.axhline(y=1.0, color='r', linestyle='--', label='Ideal Efficiency (100%)', linewidth=2)
-        plt.title('Efficiency Comparison Across Different Image Sizes', fontsize=14)
-        plt.xlabel('Number of Threads (p)', fontsize=12)
-        plt.ylabel('Efficiency', fontsize=12)
-        plt.grid(True, alpha=0.3)
-        plt.legend(fontsize=11)
-        plt.ylim(0, 1.1)
-        plt.xticks(THREAD_COUNTS)
-        plt.gca().yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x:.0%}'))
-        plt.tight_layout()
-        plt.savefig("efficiency_comparison.png", dpi=300, bbox_inches='tight')
-        print("Saved efficiency comparison chart to efficiency_comparison.png")
-        plt.close()
-
-        # 4. Biểu đồ Performance Gain (so sánh trực tiếp baseline vs best parallel)
-        plt.figure(figsize=(10, 6))
-        
-        resolutions = []
-        baseline_times = []
-        best_parallel_times = []
-        speedups = []
-        
-        for image_path, data in all_results.items():
-            resolution = get_image_resolution(image_path)
-            if resolution == "unknown":
-                resolution = os.path.basename(image_path).split('.')[0]
-            
-            resolutions.append(resolution)
-            baseline_times.append(data['baseline_time'])
-            
-            # Tìm thời gian parallel tốt nhất
-            best_idx = np.argmax(data['speedups'])
-            best_parallel_times.append(data['times'][best_idx])
-            speedups.append(data['speedups'][best_idx])
-        
-        x = np.arange(len(resolutions))
-        width = 0.35
-        
-        bars1 = plt.bar(x - width/2, baseline_times, width, label='Baseline (Sequential)', 
-                       color='lightcoral', alpha=0.8)
-        bars2 = plt.bar(x + width/2, best_parallel_times, width, label='Best Parallel', 
-                       color='lightblue', alpha=0.8)
-        
-        # Thêm text hiển thị speedup trên mỗi cặp bar
-        for i, (baseline, parallel, speedup) in enumerate(zip(baseline_times, best_parallel_times, speedups)):
-            plt.text(i, max(baseline, parallel) * 1.1, f'{speedup:.1f}x faster', 
-                    ha='center', va='bottom', fontweight='bold', fontsize=10)
-        
-        plt.xlabel('Image Resolution')
-        plt.ylabel('Execution Time (seconds)')
-        plt.title('Performance Gain: Baseline vs Best Parallel')
-        plt.xticks(x, resolutions, rotation=45)
-        plt.legend()
-        plt.grid(True, alpha=0.3, axis='y')
-        plt.tight_layout()
-        plt.savefig("performance_gain.png", dpi=300, bbox_inches='tight')
-        print("Saved performance gain chart to performance_gain.png")
-        plt.close()
-
-        # Tạo báo cáo
-        generate_report(all_results)
-
-        # In tóm tắt kết quả
-        print("\n=== TÓM TẮT KẾT QUẢ ===")
-        for image_path in sorted(all_results.keys()):
-            resolution = get_image_resolution(image_path)
-            if resolution == "unknown":
-                resolution = os.path.basename(image_path).split('.')[0]
-            data = all_results[image_path]
-            max_speedup = max(data['speedups'])
-            max_efficiency = max(data['efficiencies'])
-            print(f"{image_path} ({resolution}): Max Speedup = {max_speedup:.2f}x, Max Efficiency = {max_efficiency:.1%}")
+def records_to_affinity(records):
+    """Dựng lại kết quả affinity sweep từ các bản ghi đã lưu (ngược với `affinity_to_records`)."""
+    baseline_stats = next(r['stats'] for r in records if r['config'] == 'baseline')
+    config_results = {}
+    for r in records:
+        if r['config'] == 'baseline':
+            continue
+        config = config_results.setdefault(r['config'], {'env': r['env'], 'threads': [], 'stats': []})
+        config['threads'].append(r['threads'])
+        config['stats'].append(r['stats'])
+    return baseline_stats, analyze_affinity(baseline_stats, config_results)
+
+def chart_affinity(affinity, thread_counts, topology=None, dpi=CHART_DPI):
+    """Biểu đồ speedup và độ biến thiên giữa các lần chạy theo cấu hình affinity."""
+    plt = pyplot()
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 7))
+    for label, data in affinity.items():
+        # Không gắn luồng (unbound) là mốc so sánh: đường đứt nét màu đen
+        style = {'color': 'black', 'linestyle': '--'} if label == 'unbound' else {'linestyle': '-'}
+        line, = ax1.plot(data['threads'], data['speedups'], marker='o', label=label, linewidth=2, markersize=5, **style)
+        style['color'] = line.get_color()
+        ax2.plot(data['threads'], data['cv'], marker='o', label=label, linewidth=2, markersize=5, **style)
+
+    ax1.plot(thread_counts, thread_counts, 'r:', label='Ideal Speedup', linewidth=1.5)
+    ax1.set_title('Speedup by Thread Binding Policy (OMP_PROC_BIND / OMP_PLACES)', fontsize=13)
+    ax1.set_xlabel('Number of Threads (p)', fontsize=12)
+    ax1.set_ylabel('Speedup', fontsize=12)
+    ax1.set_xticks(thread_counts)
+    shade_topology(ax1, topology)
+    ax1.grid(True, alpha=0.3)
+    ax1.legend(fontsize=9, ncol=2)
+
+    ax2.set_title('Run-to-Run Variability (CV = stddev / mean)', fontsize=13)
+    ax2.set_xlabel('Number of Threads (p)', fontsize=12)
+    ax2.set_ylabel('Coefficient of Variation', fontsize=12)
+    ax2.set_xticks(thread_counts)
+    ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x:.0%}'))
+    ax2.grid(True, alpha=0.3)
+    ax2.legend(fontsize=9, ncol=2)
+
+    plt.tight_layout()
+    plt.savefig("affinity_comparison.png", dpi=dpi, bbox_inches='tight')
+    print("Saved affinity comparison chart to affinity_comparison.png")
+    plt.close()
+
+def generate_affinity_report(baseline_stats, affinity, image_path):
+    """Tạo file báo cáo AFFINITY.md."""
+    print("\n--- Generating AFFINITY.md ---")
+    report_content = "# Báo cáo Thread Affinity (OMP_PROC_BIND / OMP_PLACES)\n\n"
+    report_content += (
+        "So sánh các chính sách gắn luồng vào CPU. `OMP_PROC_BIND` chọn cách phân bố luồng "
+        "(`close`: gần luồng chính, `spread`: trải đều, `master`: cùng place với luồng chính, "
+        "`false`: không gắn, hệ điều hành tự di chuyển luồng); `OMP_PLACES` chọn đơn vị place "
+        "(`cores`, `threads` - luồng phần cứng, `sockets`).\n\n"
+    )
+    report_content += f"**Cấu hình thực nghiệm:**\n"
+    report_content += f"- Ảnh: `{image_path}`\n"
+    report_content += f"- Cách lấy mẫu: {describe_options(BENCH_OPTIONS)} (các lần chạy khởi động bị loại bỏ)\n"
+    report_content += f"- Số thread được test: {THREAD_COUNTS}\n"
+    report_content += f"- Topology CPU: {describe_topology(TOPOLOGY)}\n"
+    report_content += f"- Thời gian tuần tự (baseline): {baseline_stats['median']:.4f} giây\n\n"
+
+    header = "| Cấu hình | " + " | ".join(f"p={p}" for p in THREAD_COUNTS) + " |\n"
+    separator = "|----------|" + "|".join("------" for p in THREAD_COUNTS) + "|\n"
+    report_content += "## Speedup\n\n" + header + separator
+    for label, data in affinity.items():
+        speedups = dict(zip(data['threads'].tolist(), data['speedups']))
+        report_content += f"| `{label}` | " + " | ".join(
+            f"{speedups[p]:.2f}x" if p in speedups else "n/a" for p in THREAD_COUNTS) + " |\n"
+
+    report_content += "\n## Độ biến thiên giữa các lần chạy (CV = stddev / mean)\n\n" + header + separator
+    for label, data in affinity.items():
+        cv = dict(zip(data['threads'].tolist(), data['cv']))
+        report_content += f"| `{label}` | " + " | ".join(
+            f"{cv[p]:.1%}" if p in cv else "n/a" for p in THREAD_COUNTS) + " |\n"
+
+    # Cấu hình nhanh nhất ở số thread lớn nhất đo được và cấu hình ổn định nhất
+    p_max = max(max(data['threads']) for data in affinity.values())
+    at_p_max = {label: data['speedups'][list(data['threads']).index(p_max)]
+                for label, data in affinity.items() if p_max in data['threads']}
+    fastest = max(at_p_max, key=at_p_max.get)
+    stability = {label: float(np.median(data['cv'])) for label, data in affinity.items()}
+    most_stable = min(stability, key=stability.get)
+    report_content += "\n## Khuyến nghị\n\n"
+    report_content += f"- **Nhanh nhất với {p_max} threads**: `{fastest}` ({at_p_max[fastest]:.2f}x"
+    if 'unbound' in at_p_max and fastest != 'unbound':
+        report_content += f", so với {at_p_max['unbound']:.2f}x khi không gắn luồng"
+    report_content += ")\n"
+    report_content += f"- **Ổn định nhất** (CV median thấp nhất): `{most_stable}` ({stability[most_stable]:.1%}"
+    if 'unbound' in stability and most_stable != 'unbound':
+        report_content += f", so với {stability['unbound']:.1%} khi không gắn luồng"
+    report_content += ")\n\n"
+    report_content += "![Affinity Comparison](affinity_comparison.png)\n"
+    report_content += "*Trái: speedup theo cấu hình affinity (đường đứt nét: không gắn luồng); phải: độ biến thiên giữa các lần chạy*\n"
+
+    with open("AFFINITY.md", "w", encoding="utf-8") as f:
+        f.write(report_content)
+    print("Generated AFFINITY.md successfully.")
+
+def render_affinity_results(baseline_stats, affinity, image_path, charts=True):
+    """Tạo biểu đồ (nếu charts=True), AFFINITY.md và tóm tắt affinity sweep."""
+    if charts:
+        render_charts([(chart_affinity, affinity, THREAD_COUNTS, TOPOLOGY)], dpi=CHART_DPI, workers=PLOT_JOBS)
+    generate_affinity_report(baseline_stats, affinity, image_path)
+    print("\n=== TÓM TẮT AFFINITY ===")
+    for label, data in affinity.items():
+        best = np.argmax(data['speedups'])
+        print(f"{label:<16} max speedup {data['speedups'][best]:.2f}x at {data['threads'][best]} threads, "
+              f"median CV {np.median(data['cv']):.1%}")
+
+def run_affinity_sweep(image_path, charts=True):
+    """Đo blur_parallel với từng cấu hình OMP_PROC_BIND/OMP_PLACES và từng số thread."""
+    if not compile_code():
+        return
+    print(f"CPU topology: {describe_topology(TOPOLOGY)}; thread counts: {THREAD_COUNTS}")
+    print(f"\n--- Affinity sweep on {image_path} ---")
+
+    print(f"  Running Baseline ({describe_options(BENCH_OPTIONS)})...")
+    baseline_stats = run_benchmark(BASELINE_EXE, [image_path], check=OUTPUT_CHECK, **BENCH_OPTIONS)
+    if baseline_stats is None:
+        print(f"  Failed to get baseline time for {image_path}.")
+        return
+    print(f"  Sequential time: {format_stats(baseline_stats)}")
+
+    config_results = {}
+    for label, env in affinity_configs(AFFINITY_BINDS, AFFINITY_PLACES).items():
+        print(f"\n  Policy {label} ({describe_options(BENCH_OPTIONS)} each)...")
+        config = {'env': env, 'threads': [], 'stats': []}
+        for p in THREAD_COUNTS:
+            stats = run_benchmark(PARALLEL_EXE, [image_path, str(p)], env=env, check=OUTPUT_CHECK, **BENCH_OPTIONS)
+            if stats is not None:
+                print(f"    {p} threads: {format_stats(stats)}")
+                config['threads'].append(p)
+                config['stats'].append(stats)
+        if config['stats']:
+            config_results[label] = config
+
+    if not config_results:
+        print("Error: No successful affinity runs.")
+        return
+
+    affinity = analyze_affinity(baseline_stats, config_results)
+    write_results(AFFINITY_RESULTS_FILE, affinity_to_records(baseline_stats, affinity),
+                  results_meta(BENCH_OPTIONS, thread_counts=THREAD_COUNTS, topology=TOPOLOGY, image=image_path),
+                  csv_path=os.path.splitext(AFFINITY_RESULTS_FILE)[0] + '.csv')
+    print(f"\nSaved raw samples and derived results to {AFFINITY_RESULTS_FILE}")
+    render_affinity_results(baseline_stats, affinity, image_path, charts=charts)
 
 
 def parse_arguments():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description='Phân tích hiệu năng của thuật toán làm mờ ảnh song song')
     parser.add_argument('images', nargs='*', help='Các file ảnh đầu vào để phân tích')
-    parser.add_argument('--runs', '-r', type=int, default=NUM_RUNS, help=f'Số lần chạy để lấy trung bình (mặc định: {NUM_RUNS})')
-    parser.add_argument('--threads', '-t', nargs='+', type=int, default=THREAD_COUNTS, help=f'Danh sách số thread để test (mặc định: {THREAD_COUNTS})')
+    parser.add_argument('--python-backend', action='store_true', help='Đo thêm backend Python (bench/pyblur.py: process pool trên shared memory) như một series trên biểu đồ speedup và efficiency')
+    parser.add_argument('--predict', nargs='*', type=int, default=PREDICT_THREADS, help=f'Số thread chưa đo để dự đoán speedup từ mô hình (mặc định: {PREDICT_THREADS})')
+    parser.add_argument('--weak-scaling', action='store_true', help='Chạy thực nghiệm weak scaling (Gustafson): kích thước ảnh tăng tỷ lệ với số thread')
+    parser.add_argument('--weak-base', default=f'{WEAK_BASE_SIZE[0]}x{WEAK_BASE_SIZE[1]}', help=f'Kích thước ảnh cho 1 thread ở chế độ weak scaling, dạng WIDTHxHEIGHT (mặc định: {WEAK_BASE_SIZE[0]}x{WEAK_BASE_SIZE[1]})')
+    parser.add_argument('--affinity-sweep', action='store_true', help='So sánh các chính sách gắn luồng OMP_PROC_BIND/OMP_PLACES trên ảnh đầu tiên (hoặc ảnh lớn nhất)')
+    parser.add_argument('--bind', nargs='+', choices=['close', 'spread', 'master', 'false'], default=AFFINITY_BINDS, help=f'Các giá trị OMP_PROC_BIND cho --affinity-sweep (mặc định: {AFFINITY_BINDS})')
+    parser.add_argument('--places', nargs='+', choices=['cores', 'threads', 'sockets'], default=AFFINITY_PLACES, help=f'Các giá trị OMP_PLACES cho --affinity-sweep (mặc định: {AFFINITY_PLACES})')
+    add_thread_arguments(parser)
+    add_benchmark_arguments(parser, runs=NUM_RUNS, warmup=WARMUP_RUNS)
+    add_results_arguments(parser, RESULTS_FILE)
+    add_plot_arguments(parser, dpi=CHART_DPI)
     return parser.parse_args()
 
 
 if __name__ == "__main__":
     try:
-        import matplotlib
+        # matplotlib chỉ được import khi vẽ biểu đồ (bench.plotting.pyplot)
         import numpy
     except ImportError:
-        print("Error: 'matplotlib' and 'numpy' are required.")
-        print("Please install them using: pip install matplotlib numpy")
+        print("Error: 'numpy' is required.")
+        print("Please install it using: pip install numpy")
         sys.exit(1)
     else:
         # Parse arguments
         args = parse_arguments()
         
         # Update global variables if provided
-        if args.runs:
-            NUM_RUNS = args.runs
-        if args.threads:
-            THREAD_COUNTS = args.threads
+        custom_results = args.results != RESULTS_FILE
+        RESULTS_FILE = os.path.abspath(args.results)
+        CHART_DPI = args.dpi
+        PLOT_JOBS = args.plot_jobs
+        TOPOLOGY, THREAD_COUNTS = plan_threads(args)
+        PREDICT_THREADS = args.predict
+        PYTHON_BACKEND = args.python_backend
+        if args.weak_scaling:
+            try:
+                WEAK_BASE_SIZE = tuple(int(v) for v in args.weak_base.split('x'))
+            except ValueError:
+                print(f"Error: Invalid size format '{args.weak_base}'. Use WIDTHxHEIGHT format.")
+                sys.exit(1)
+            # Kết quả weak scaling được lưu riêng (trừ khi chỉ định --results),
+            # không ghi đè kết quả strong scaling
+            WEAK_RESULTS_FILE = RESULTS_FILE if custom_results else os.path.abspath(WEAK_RESULTS_FILE)
+        if args.affinity_sweep:
+            AFFINITY_BINDS = args.bind
+            AFFINITY_PLACES = args.places
+            AFFINITY_RESULTS_FILE = RESULTS_FILE if custom_results else os.path.abspath(AFFINITY_RESULTS_FILE)
 
         # Chuyển vào thư mục của script để các đường dẫn tương đối hoạt động đúng
         os.chdir(os.path.dirname(os.path.abspath(__file__)))
-        
-        # Run main function with specified images
-        main(args.images if args.images else None)
+
+        if args.affinity_sweep and (args.replot or args.report_only):
+            try:
+                meta, records = read_results(AFFINITY_RESULTS_FILE)
+            except FileNotFoundError:
+                print(f"Error: {AFFINITY_RESULTS_FILE} not found. Run the affinity sweep first.")
+                sys.exit(1)
+            BENCH_OPTIONS = meta.get('options', BENCH_OPTIONS)
+            THREAD_COUNTS = meta.get('thread_counts', THREAD_COUNTS)
+            TOPOLOGY = meta.get('topology', TOPOLOGY)
+            render_affinity_results(*records_to_affinity(records), meta.get('image', 'unknown'),
+                                    charts=args.replot and not args.no_plots)
+        elif args.affinity_sweep:
+            # Ảnh được chỉ định đầu tiên, nếu không thì ảnh input_* lớn nhất
+            candidates = args.images or glob.glob("input_*.jpg") + glob.glob("input_*.ppm")
+            if not candidates:
+                print("Error: Không tìm thấy file ảnh nào.")
+                sys.exit(1)
+            image_path = args.images[0] if args.images else max(candidates, key=image_pixels)
+            BENCH_OPTIONS = benchmark_options(args)
+            run_affinity_sweep(image_path, charts=not args.no_plots)
+            report_store(BENCH_OPTIONS)
+        elif args.weak_scaling and (args.replot or args.report_only):
+            try:
+                meta, records = read_results(WEAK_RESULTS_FILE)
+            except FileNotFoundError:
+                print(f"Error: {WEAK_RESULTS_FILE} not found. Run the weak-scaling analysis first.")
+                sys.exit(1)
+            BENCH_OPTIONS = meta.get('options', BENCH_OPTIONS)
+            THREAD_COUNTS = meta.get('thread_counts', THREAD_COUNTS)
+            TOPOLOGY = meta.get('topology', TOPOLOGY)
+            WEAK_BASE_SIZE = tuple(meta.get('base_size', WEAK_BASE_SIZE))
+            WEAK_PATTERN = meta.get('pattern', WEAK_PATTERN)
+            render_weak_results(records_to_weak(records), charts=args.replot and not args.no_plots)
+        elif args.weak_scaling:
+            BENCH_OPTIONS = benchmark_options(args)
+            run_weak_scaling(charts=not args.no_plots)
+            report_store(BENCH_OPTIONS)
+        elif args.replot or args.report_only:
+            # Dựng lại biểu đồ/báo cáo từ kết quả đã lưu, không chạy benchmark
+            try:
+                meta, records = read_results(RESULTS_FILE)
+            except FileNotFoundError:
+                print(f"Error: {RESULTS_FILE} not found. Run the analysis first.")
+                sys.exit(1)
+            BENCH_OPTIONS = meta.get('options', BENCH_OPTIONS)
+            THREAD_COUNTS = meta.get('thread_counts', THREAD_COUNTS)
+            TOPOLOGY = meta.get('topology', TOPOLOGY)
+            render_results(records_to_results(records), charts=args.replot and not args.no_plots)
+        else:
+            BENCH_OPTIONS = benchmark_options(args)
+            # Run main function with specified images
+            main(args.images if args.images else None, charts=not args.no_plots)
+            report_store(BENCH_OPTIONS)
@@ -8,20 +8,42 @@
 #define STB_IMAGE_WRITE_IMPLEMENTATION
 #include "stb_image_write.h"
 
+// Đo thời gian từng giai đoạn, in dòng JSON ở cuối stdout
+#include "../phase_timing.h"
+
+// Ghi bộ đệm ảnh dạng byte thô khi có BLUR_DUMP/BLUR_DUMP_INPUT
+#include "../raw_dump.h"
+
 // Bộ lọc Gaussian 3x3 để làm mờ ảnh
 const double kernel[3][3] = {
     {1.0 / 16, 2.0 / 16, 1.0 / 16},
     {2.0 / 16, 4.0 / 16, 2.0 / 16},
     {1.0 / 16, 2.0 / 16, 1.0 / 16}};
 
-int main() {
+int main(int argc, char *argv[]) {
+    PhaseTimer timer;
+
+    if (argc < 2) {
+        printf("Cách dùng: %s <tên_file_ảnh> [số_lần_lặp]\n", argv[0]);
+        return 1;
+    }
+    
+    char* input_filename = argv[1];
+    // Số lần lặp kernel trong cùng một process (mặc định 1)
+    int repeats = 1;
+    if (argc > 2) {
+        repeats = atoi(argv[2]);
+    }
+
     int width, height, channels;
 
     // 1. Đọc ảnh đầu vào
     // stbi_load trả về con trỏ unsigned char* đến dữ liệu pixel
-    unsigned char *img = stbi_load("input.jpg", &width, &height, &channels, 0);
+    timer.start();
+    unsigned char *img = stbi_load(input_filename, &width, &height, &channels, 0);
+    timer.decode = timer.stop();
     if (img == NULL) {
-        printf("Lỗi: Không thể đọc file ảnh.\n");
+        printf("Lỗi: Không thể đọc file ảnh %s.\n", input_filename);
         return 1;
     }
     printf("Đã đọc ảnh: %d x %d, %d channels\n", width, height, channels);
@@ -30,41 +52,53 @@ int main() {
     size_t img_size = width * height * channels;
     
     // 2. Tạo bộ đệm (buffer) cho ảnh đầu ra
+    timer.start();
     unsigned char *output_img = (unsigned char *)malloc(img_size);
+    timer.alloc = timer.stop();
     if (output_img == NULL) {
         printf("Lỗi: Không thể cấp phát bộ nhớ cho ảnh đầu ra.\n");
         stbi_image_free(img);
         return 1;
     }
     
-    // Bắt đầu đo thời gian
-    auto start_time = std::chrono::high_resolution_clock::now();
+    // Lặp kernel `repeats` lần trên dữ liệu đã đọc, in thời gian của từng lần
+    for (int r = 0; r < repeats; ++r) {
+        // Bắt đầu đo thời gian
+        auto start_time = std::chrono::high_resolution_clock::now();
 
-    // Áp dụng bộ lọc tuần tự (bỏ viền 1 pixel)
-    for (int y = 1; y < height - 1; ++y) {
-        for (int x = 1; x < width - 1; ++x) {
-            // Xử lý từng kênh màu (R, G, B)
-            for (int c = 0; c < channels; ++c) {
-                double sum = 0.0;
-                // Tính convolution với 9 pixel lân cận
-                for (int ky = -1; ky <= 1; ++ky) {
-                    for (int kx = -1; kx <= 1; ++kx) {
-                        unsigned char pixel_val = img[((y + ky) * width + (x + kx)) * channels + c];
-                        sum += pixel_val * kernel[ky + 1][kx + 1];
+        // Áp dụng bộ lọc tuần tự (bỏ viền 1 pixel)
+        for (int y = 1; y < height - 1; ++y) {
+            for (int x = 1; x < width - 1; ++x) {
+                // Xử lý từng kênh màu (R, G, B)
+                for (int c = 0; c < channels; ++c) {
+                    double sum = 0.0;
+                    // Tính convolution với 9 pixel lân cận
+                    for (int ky = -1; ky <= 1; ++ky) {
+                        for (int kx = -1; kx <= 1; ++kx) {
+                            unsigned char pixel_val = img[((y + ky) * width + (x + kx)) * channels + c];
+                            sum += pixel_val * kernel[ky + 1][kx + 1];
+                        }
                     }
+                    output_img[(y * width + x) * channels + c] = (unsigned char)sum;
                 }
-                output_img[(y * width + x) * channels + c] = (unsigned char)sum;
             }
         }
+
+        // Kết thúc đo thời gian và in ra
+        auto end_time = std::chrono::high_resolution_clock::now();
+        std::chrono::duration<double> diff = end_time - start_time;
+        printf("%f\n", diff.count());
+        timer.compute.push_back(diff.count());
     }
 
-    // Kết thúc đo thời gian và in ra
-    auto end_time = std::chrono::high_resolution_clock::now();
-    std::chrono::duration<double> diff = end_time - start_time;
-    printf("%f\n", diff.count());
+    // Ghi bộ đệm thô (nếu có BLUR_DUMP) để kiểm tra với bản tham chiếu
+    dump_buffers(img, output_img, img_size);
 
     // Ghi ảnh kết quả
+    timer.start();
     stbi_write_jpg("output_sequential.jpg", width, height, channels, output_img, 100);
+    timer.encode = timer.stop();
+    timer.report(width, height, channels);
 
     // Giải phóng bộ nhớ
     stbi_image_free(img);
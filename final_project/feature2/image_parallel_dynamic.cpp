@@ -8,26 +8,41 @@
 #define STB_IMAGE_WRITE_IMPLEMENTATION
 #include "stb_image_write.h"
 
-const double kernel[3][3] = {
-    {1.0 / 16, 2.0 / 16, 1.0 / 16},
-    {2.0 / 16, 4.0 / 16, 2.0 / 16},
-    {1.0 / 16, 2.0 / 16, 1.0 / 16}};
+// Đo thời gian từng giai đoạn, in dòng JSON ở cuối stdout
+#include "../phase_timing.h"
+
+// Ghi bộ đệm ảnh dạng byte thô khi có BLUR_DUMP/BLUR_DUMP_INPUT
+#include "../raw_dump.h"
+
+// Trọng số và vòng lặp tích chập dùng chung với libblur.so
+#include "../blur_kernels.h"
 
 int main(int argc, char *argv[]) {
+    PhaseTimer timer;
+
     if (argc < 3) {
-        printf("Usage: %s <image_file> <num_threads>\n", argv[0]);
+        printf("Usage: %s <image_file> <num_threads> [repeats]\n", argv[0]);
         return 1;
     }
     char* input_filename = argv[1];
     int num_threads = atoi(argv[2]);
+    // Số lần lặp kernel trong cùng một process (mặc định 1)
+    int repeats = 1;
+    if (argc > 3) {
+        repeats = atoi(argv[3]);
+    }
 
     int width, height, channels;
+    timer.start();
     unsigned char *img = stbi_load(input_filename, &width, &height, &channels, 0);
+    timer.decode = timer.stop();
     if (img == NULL) {
         return 1;
     }
     size_t img_size = width * height * channels;
+    timer.start();
     unsigned char *output_img = (unsigned char *)malloc(img_size);
+    timer.alloc = timer.stop();
     if (output_img == NULL) {
         stbi_image_free(img);
         return 1;
@@ -35,34 +50,59 @@ int main(int argc, char *argv[]) {
 
     omp_set_num_threads(num_threads);
 
-    // Bắt đầu đo thời gian
-    double start_time = omp_get_wtime();
+    // Lặp kernel `repeats` lần trên dữ liệu đã đọc, in thời gian của từng lần
+    for (int r = 0; r < repeats; ++r) {
+        // Bắt đầu đo thời gian
+        double start_time = omp_get_wtime();
 
-    // Dynamic scheduling: luồng nhận công việc mới khi hoàn thành công việc hiện tại
-    #pragma omp parallel for schedule(dynamic) collapse(2)
-    for (int y = 1; y < height - 1; ++y) {
-        for (int x = 1; x < width - 1; ++x) {
-            // Xử lý từng kênh màu
-            for (int c = 0; c < channels; ++c) {
-                double sum = 0.0;
-                // Tính convolution với 9 pixel lân cận
-                for (int ky = -1; ky <= 1; ++ky) {
-                    for (int kx = -1; kx <= 1; ++kx) {
-                        unsigned char pixel_val = img[((y + ky) * width + (x + kx)) * channels + c];
-                        sum += pixel_val * kernel[ky + 1][kx + 1];
+        // Dynamic scheduling: luồng nhận công việc mới khi hoàn thành công việc hiện tại
+        timer.begin_iteration(num_threads);
+        int team_size = num_threads;
+        if (!timer.thread_stats) {
+            // Không ghi số liệu theo luồng: vòng lặp song song gốc, không có chi phí đo
+            blur_direct_dynamic<1>(img, output_img, width, height, channels, blur_kernel_3x3);
+        } else {
+            #pragma omp parallel
+            {
+                // Số liệu theo luồng: thời điểm bắt đầu, thời gian xử lý, số iteration
+                // và thời gian chờ ở barrier (nowait + barrier tường minh để tách riêng)
+                double thread_start = omp_get_wtime();
+                long iterations = 0;
+                #pragma omp for schedule(dynamic) collapse(2) nowait
+                for (int y = 1; y < height - 1; ++y) {
+                    for (int x = 1; x < width - 1; ++x) {
+                        ++iterations;
+                        blur_pixel<1>(img, output_img, x, y, width, channels, blur_kernel_3x3);
                     }
                 }
-                output_img[(y * width + x) * channels + c] = (unsigned char)sum;
+                double busy_end = omp_get_wtime();
+                #pragma omp barrier
+                ThreadSample sample;
+                sample.start = thread_start - start_time;
+                sample.busy = busy_end - thread_start;
+                sample.wait = omp_get_wtime() - busy_end;
+                sample.iterations = iterations;
+                timer.record_thread(omp_get_thread_num(), sample);
+                #pragma omp master
+                team_size = omp_get_num_threads();
             }
         }
+        timer.end_iteration(team_size);
+
+        // Kết thúc đo thời gian và in ra
+        double end_time = omp_get_wtime();
+        printf("%f\n", (end_time - start_time));
+        timer.compute.push_back(end_time - start_time);
     }
 
-    // Kết thúc đo thời gian và in ra
-    double end_time = omp_get_wtime();
-    printf("%f\n", (end_time - start_time));
+    // Ghi bộ đệm thô (nếu có BLUR_DUMP) để kiểm tra với bản tham chiếu
+    dump_buffers(img, output_img, img_size);
 
     // Ghi ảnh kết quả
+    timer.start();
     stbi_write_jpg("output_dynamic.jpg", width, height, channels, output_img, 100);
+    timer.encode = timer.stop();
+    timer.report(width, height, channels);
 
     // Giải phóng bộ nhớ
     stbi_image_free(img);
@@ -1,47 +1,55 @@
 import subprocess
 import numpy as np
-import matplotlib.pyplot as plt
 import os
+import argparse
 import glob
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from bench import (
+    BuildError, NativeBlur, add_benchmark_arguments, benchmark_options, build_targets, decode_image,
+    add_plot_arguments, add_results_arguments, add_thread_arguments, describe_options,
+    describe_topology, detect_topology, end_to_end_series, format_stats, load_library, plan_threads, pyplot,
+    read_results, render_charts, report_store, results_meta, run_benchmark, shade_topology,
+    thread_ladder, write_results,
+)
 
 # --- Cấu hình thực nghiệm ---
-NUM_RUNS = 5  # Số lần chạy mỗi cấu hình để lấy trung bình
-THREAD_COUNTS = [1, 2, 4, 8, 12, 16]  # Các số luồng cần kiểm tra
+NUM_RUNS = 5  # Số mẫu được tính vào thống kê cho mỗi cấu hình
+WARMUP_RUNS = 1  # Số lần chạy khởi động bị loại bỏ
+BENCH_OPTIONS = {'runs': NUM_RUNS, 'warmup': WARMUP_RUNS}  # Tham số cho run_benchmark, ghi đè từ dòng lệnh
+TOPOLOGY = detect_topology()  # CPU dùng được và số lõi vật lý của máy
+THREAD_COUNTS = thread_ladder(TOPOLOGY)  # Các số luồng cần kiểm tra (theo topology), ghi đè bằng --threads
 BASELINE_EXE = "./blur_baseline"
 STATIC_EXE = "./blur_static"
 DYNAMIC_EXE = "./blur_dynamic"
+RUNTIME_EXE = "./blur_runtime"  # schedule(runtime): kiểu schedule và chunk lấy từ OMP_SCHEDULE
+OUTPUT_CHECK = {'kernel': '3x3'}  # Kiểm tra ảnh kết quả với bản tham chiếu NumPy (--verify)
+RESULTS_FILE = "results.jsonl"  # Mẫu thô và kết quả dẫn xuất, dùng cho --replot/--report-only
+CHART_DPI = 100  # Độ phân giải biểu đồ, ghi đè bằng --dpi
+PLOT_JOBS = None  # Số process vẽ biểu đồ (None = số CPU), ghi đè bằng --plot-jobs
+
+# --- Cấu hình schedule explorer (--explore) ---
+EXPLORE_KINDS = ['static', 'dynamic', 'guided']
+EXPLORE_CHUNKS = [0, 1, 16, 256, 4096, 65536]  # 0 = chunk mặc định của OpenMP
+EXPLORER_RESULTS_FILE = "explorer_results.jsonl"
+NATIVE = False  # Đo kernel trong process qua libblur.so (ctypes) thay vì chạy blur_runtime, bật bằng --native
 
 def compile_code():
-    """Biên dịch code C++ bằng Makefile."""
+    """Biên dịch code C++ từ Makefile, chỉ build lại các target đã thay đổi."""
     print("--- Compiling C++ code ---")
     try:
-        subprocess.run(["make", "clean"], check=True, capture_output=True, text=True)
-        subprocess.run(["make"], check=True, capture_output=True, text=True)
-        print("Compilation successful.")
-        return True
-    except (FileNotFoundError, subprocess.CalledProcessError) as e:
+        result = build_targets()
+    except BuildError as e:
         print(f"Error during compilation: {e}")
-        if hasattr(e, 'stderr'): print(e.stderr)
         return False
+    print(f"Compilation successful ({len(result['built'])} built, {len(result['cached'])} up to date).")
+    return True
 
-def run_benchmark(executable, args=[]):
-    """Chạy một file thực thi nhiều lần và trả về thời gian trung bình."""
-    timings = []
-    for _ in range(NUM_RUNS):
-        try:
-            result = subprocess.run(
-                [executable] + args, check=True, capture_output=True, text=True
-            )
-            timings.append(float(result.stdout.strip().split('\n')[-1]))
-        except (subprocess.CalledProcessError, ValueError, IndexError) as e:
-            print(f"Error running {executable} with args {args}: {e}")
-            if hasattr(e, 'stderr'): print(e.stderr)
-            return None
-    return np.mean(timings) if timings else None
-
-def generate_report(baseline_time, static_results, dynamic_results):
+def generate_report(baseline_stats, static_results, dynamic_results):
     """Tạo file báo cáo Markdown từ kết quả thu thập được."""
     print("\n--- Generating REPORT.md ---")
+    baseline_time = baseline_stats['median']
     
     report_content = "# Báo cáo So sánh Schedule Policy trong OpenMP\n\n"
     report_content += "Phân tích hiệu năng giữa `schedule(static)` và `schedule(dynamic)` trong OpenMP.\n\n"
@@ -54,6 +62,7 @@ def generate_report(baseline_time, static_results, dynamic_results):
     # Thông tin baseline
     report_content += f"## 2. Kết quả Thực nghiệm\n\n"
     report_content += f"**Thời gian chạy tuần tự (baseline):** {baseline_time:.4f} giây\n\n"
+    report_content += f"**Số luồng được test:** {THREAD_COUNTS} (topology CPU: {describe_topology(TOPOLOGY)})\n\n"
     
     # Bảng so sánh
     report_content += "### So sánh chi tiết\n\n"
@@ -74,10 +83,66 @@ def generate_report(baseline_time, static_results, dynamic_results):
     report_content += "\n![Schedule Comparison - Execution Time](schedule_time_comparison.png)\n"
     report_content += "![Schedule Comparison - Speedup](schedule_speedup_comparison.png)\n\n"
 
+    # Thời gian đầu-cuối: đọc ảnh + cấp phát + tính toán + ghi ảnh
+    if static_results['e2e'] is not None and dynamic_results['e2e'] is not None:
+        phases = baseline_stats['phases']
+        report_content += "### Đầu-cuối (decode + alloc + compute + encode)\n\n"
+        report_content += (
+            f"Baseline: decode {phases['decode']:.4f}s, alloc {phases['alloc']:.4f}s, "
+            f"compute {baseline_time:.4f}s, encode {phases['encode']:.4f}s → "
+            f"**{baseline_stats['end_to_end']:.4f}s** ({baseline_stats['throughput']:.1f} MP/s)\n\n"
+        )
+        report_content += "| Threads | Static E2E (s) | Dynamic E2E (s) | Static E2E Speedup | Dynamic E2E Speedup | Static MP/s | Dynamic MP/s |\n"
+        report_content += "|---------|----------------|-----------------|--------------------|---------------------|-------------|--------------|\n"
+        static_e2e, dynamic_e2e = static_results['e2e'], dynamic_results['e2e']
+        for i, p in enumerate(static_results['threads']):
+            if i >= len(dynamic_results['threads']):
+                break
+            report_content += (
+                f"| {p:<7} | {static_e2e['times'][i]:<14.4f} | {dynamic_e2e['times'][i]:<15.4f} | "
+                f"{static_e2e['speedups'][i]:<18.2f}x | {dynamic_e2e['speedups'][i]:<19.2f}x | "
+                f"{static_e2e['throughputs'][i]:<11.1f} | {dynamic_e2e['throughputs'][i]:<12.1f} |\n"
+            )
+        report_content += "\n![Schedule Comparison - End-to-End](schedule_end_to_end.png)\n\n"
+
+    # Cân bằng tải đo theo luồng (chỉ khi chạy với --thread-stats)
+    static_balance, dynamic_balance = imbalance_series(static_results), imbalance_series(dynamic_results)
+    if static_balance is not None and dynamic_balance is not None:
+        report_content += "### Cân bằng tải theo luồng\n\n"
+        report_content += (
+            "Mỗi luồng ghi thời gian xử lý phần việc được chia (busy) và thời gian chờ ở barrier cuối "
+            "vùng song song (wait). **Imbalance** = max(busy) / mean(busy) của team (1.00 = cân bằng "
+            "hoàn hảo); **Wait** = tổng thời gian chờ / tổng thời gian của team. Giá trị là median qua "
+            "các lần lặp được đo.\n\n"
+        )
+        report_content += "| Threads | Static Imbalance | Static Wait | Dynamic Imbalance | Dynamic Wait |\n"
+        report_content += "|---------|------------------|-------------|-------------------|--------------|\n"
+        for i, p in enumerate(static_results['threads']):
+            if i >= len(dynamic_results['threads']):
+                break
+            s, d = static_balance[i], dynamic_balance[i]
+            report_content += (
+                f"| {p:<7} | {s['imbalance']:<16.2f} | {s['wait_fraction']:<11.1%} | "
+                f"{d['imbalance']:<17.2f} | {d['wait_fraction']:<12.1%} |\n"
+            )
+        report_content += "\n![Per-thread Load Balance](schedule_thread_balance.png)\n\n"
+
     # Phân tích
     report_content += "## 3. Phân tích Kết quả\n\n"
     report_content += "### 3.1. Tại sao `static` thường nhanh hơn trong bài toán này?\n\n"
-    report_content += "1. **Tính chất bài toán đồng đều**: Xử lý ảnh blur có đặc điểm là mỗi pixel đòi hỏi lượng tính toán gần như nhau (9 phép nhân + 9 phép cộng). Do đó không có vấn đề \"load imbalance\" (mất cân bằng tải).\n\n"
+    report_content += "1. **Tính chất bài toán đồng đều**: Xử lý ảnh blur có đặc điểm là mỗi pixel đòi hỏi lượng tính toán gần như nhau (9 phép nhân + 9 phép cộng). "
+    if static_balance is not None:
+        worst = max(static_balance, key=lambda b: b['imbalance'])
+        report_content += (
+            f"Số liệu đo cho `static`: imbalance lớn nhất {worst['imbalance']:.2f} "
+            f"(ở {worst['team_size']} luồng, thời gian chờ {worst['wait_fraction']:.1%}). "
+        )
+        if worst['imbalance'] < 1.1:
+            report_content += "Do đó mất cân bằng tải (load imbalance) không đáng kể.\n\n"
+        else:
+            report_content += "Mất cân bằng tải vẫn xuất hiện (nhiễu hệ điều hành, tranh chấp bộ nhớ hoặc SMT), đây là chỗ `dynamic` có thể bù lại.\n\n"
+    else:
+        report_content += "Do đó dự kiến không có vấn đề \"load imbalance\" (mất cân bằng tải); chạy với `--thread-stats` để đo trực tiếp.\n\n"
     report_content += "2. **Overhead thấp nhất**: `static` chia sẵn công việc từ đầu, các luồng không cần phải \"communication\" với scheduler trong quá trình thực thi.\n\n"
     report_content += "3. **Cache locality tốt hơn**: Mỗi luồng xử lý một vùng pixel liên tiếp, giúp tận dụng cache hiệu quả.\n\n"
     
@@ -96,11 +161,185 @@ def generate_report(baseline_time, static_results, dynamic_results):
         f.write(report_content)
     print("Generated REPORT.md successfully.")
 
-def main():
-    """Hàm chính điều phối toàn bộ quá trình."""
-    if not compile_code():
-        return
+def build_results(baseline_stats, static_stats, static_threads, dynamic_stats, dynamic_threads):
+    """Tính thời gian, speedup và số liệu đầu-cuối của hai schedule từ thống kê đo được."""
+    results = []
+    for stats_list, threads in ((static_stats, static_threads), (dynamic_stats, dynamic_threads)):
+        times = np.array([stats['median'] for stats in stats_list])
+        results.append({
+            'threads': np.array(threads),
+            'times': times,
+            'speedups': baseline_stats['median'] / times,
+            'stats': stats_list,
+            'e2e': end_to_end_series(baseline_stats, stats_list),
+        })
+    return tuple(results)
 
+def imbalance_series(results):
+    """Số liệu cân bằng tải (xem `summarize_threads`) theo từng số luồng, hoặc None nếu không được đo."""
+    if any('thread_stats' not in stats for stats in results['stats']):
+        return None
+    return [stats['thread_stats'] for stats in results['stats']]
+
+def results_to_records(baseline_stats, static_results, dynamic_results):
+    """Chuyển kết quả thành các bản ghi (baseline + từng schedule/số luồng) để lưu ra file."""
+    records = [{'series': 'baseline', 'threads': None, 'stats': baseline_stats}]
+    for series, data in (('static', static_results), ('dynamic', dynamic_results)):
+        for i, p in enumerate(data['threads']):
+            record = {'series': series, 'threads': int(p), 'speedup': data['speedups'][i],
+                      'stats': data['stats'][i]}
+            if 'thread_stats' in data['stats'][i]:
+                record['imbalance'] = data['stats'][i]['thread_stats']['imbalance']
+            records.append(record)
+    return records
+
+def records_to_results(records):
+    """Dựng lại (baseline_stats, static_results, dynamic_results) từ các bản ghi đã lưu."""
+    baseline_stats = next(r['stats'] for r in records if r['series'] == 'baseline')
+    static = [r for r in records if r['series'] == 'static']
+    dynamic = [r for r in records if r['series'] == 'dynamic']
+    static_results, dynamic_results = build_results(
+        baseline_stats, [r['stats'] for r in static], [r['threads'] for r in static],
+        [r['stats'] for r in dynamic], [r['threads'] for r in dynamic],
+    )
+    return baseline_stats, static_results, dynamic_results
+
+def print_comparison(static_results, dynamic_results):
+    """In bảng so sánh static và dynamic ra màn hình."""
+    print(f"\n--- Schedule Comparison Results ---")
+    print(f"{'Threads':<8} {'Static (s)':<12} {'Dynamic (s)':<13} {'Ratio (D/S)':<12} {'Winner':<10}")
+    print("-" * 60)
+    
+    for i, p in enumerate(static_results['threads']):
+        if i < len(dynamic_results['threads']):
+            ratio = dynamic_results['times'][i] / static_results['times'][i]
+            winner = "Static" if ratio > 1.0 else "Dynamic"
+            print(f"{p:<8} {static_results['times'][i]:<12.6f} {dynamic_results['times'][i]:<13.6f} {ratio:<12.3f} {winner:<10}")
+
+    static_balance, dynamic_balance = imbalance_series(static_results), imbalance_series(dynamic_results)
+    if static_balance is not None and dynamic_balance is not None:
+        print(f"\n{'Threads':<8} {'Static imbalance':<18} {'Dynamic imbalance':<18}")
+        for i, p in enumerate(static_results['threads']):
+            if i < len(dynamic_results['threads']):
+                print(f"{p:<8} {static_balance[i]['imbalance']:<18.3f} {dynamic_balance[i]['imbalance']:<18.3f}")
+
+def chart_time_comparison(static_results, dynamic_results, thread_counts, dpi=CHART_DPI):
+    """Biểu đồ thời gian chạy của static và dynamic."""
+    plt = pyplot()
+    plt.figure(figsize=(12, 6))
+    plt.plot(static_results['threads'], static_results['times'], 'o-', label='Static Schedule', color='blue')
+    plt.plot(dynamic_results['threads'], dynamic_results['times'], 's-', label='Dynamic Schedule', color='red')
+    plt.title('Execution Time Comparison: Static vs Dynamic Schedule')
+    plt.xlabel('Number of Threads')
+    plt.ylabel('Execution Time (seconds)')
+    plt.grid(True)
+    plt.legend()
+    plt.xticks(thread_counts)
+    plt.savefig("schedule_time_comparison.png", dpi=dpi)
+    print("Saved time comparison chart to schedule_time_comparison.png")
+    plt.close()
+
+def chart_speedup_comparison(static_results, dynamic_results, thread_counts, topology=None, dpi=CHART_DPI):
+    """Biểu đồ speedup của static và dynamic."""
+    plt = pyplot()
+    plt.figure(figsize=(12, 6))
+    plt.plot(static_results['threads'], static_results['speedups'], 'o-', label='Static Schedule', color='blue')
+    plt.plot(dynamic_results['threads'], dynamic_results['speedups'], 's-', label='Dynamic Schedule', color='red')
+    plt.plot(thread_counts, thread_counts, 'k--', alpha=0.5, label='Ideal Speedup')
+    plt.title('Speedup Comparison: Static vs Dynamic Schedule')
+    plt.xlabel('Number of Threads')
+    plt.ylabel('Speedup')
+    shade_topology(plt.gca(), topology)
+    plt.grid(True)
+    plt.legend()
+    plt.xticks(thread_counts)
+    plt.savefig("schedule_speedup_comparison.png", dpi=dpi)
+    print("Saved speedup comparison chart to schedule_speedup_comparison.png")
+    plt.close()
+
+def chart_end_to_end(static_results, dynamic_results, thread_counts, dpi=CHART_DPI):
+    """Biểu đồ speedup chỉ tính kernel so với speedup đầu-cuối."""
+    plt = pyplot()
+    plt.figure(figsize=(12, 6))
+    plt.plot(static_results['threads'], static_results['speedups'], 'o-', label='Static (kernel)', color='blue')
+    plt.plot(static_results['threads'], static_results['e2e']['speedups'], 'o--',
+             label='Static (end-to-end)', color='blue', alpha=0.6)
+    plt.plot(dynamic_results['threads'], dynamic_results['speedups'], 's-', label='Dynamic (kernel)', color='red')
+    plt.plot(dynamic_results['threads'], dynamic_results['e2e']['speedups'], 's--',
+             label='Dynamic (end-to-end)', color='red', alpha=0.6)
+    plt.axhline(y=1.0, color='black', linestyle='-', alpha=0.5)
+    plt.title('Kernel-only vs End-to-End Speedup (decode + compute + encode)')
+    plt.xlabel('Number of Threads')
+    plt.ylabel('Speedup')
+    plt.grid(True)
+    plt.legend()
+    plt.xticks(thread_counts)
+    plt.savefig("schedule_end_to_end.png", dpi=dpi)
+    print("Saved end-to-end chart to schedule_end_to_end.png")
+    plt.close()
+
+def draw_thread_timeline(ax, thread_stats, title):
+    """Vẽ timeline của một team: chờ fork (xám), xử lý (busy) và chờ ở barrier (đỏ) cho từng luồng."""
+    threads = np.arange(thread_stats['team_size'])
+    start, busy = np.array(thread_stats['start']), np.array(thread_stats['busy'])
+    wait = np.array(thread_stats['wait'])
+    ax.barh(threads, start * 1e3, color='lightgrey', label='Fork delay')
+    ax.barh(threads, busy * 1e3, left=start * 1e3, color='steelblue', label='Busy')
+    ax.barh(threads, wait * 1e3, left=(start + busy) * 1e3, color='indianred', label='Barrier wait')
+    ax.set_title(f"{title}: imbalance {thread_stats['imbalance']:.2f}, wait {thread_stats['wait_fraction']:.1%}")
+    ax.set_xlabel('Time since region start (ms, median over iterations)')
+    ax.set_ylabel('Thread')
+    ax.set_yticks(threads)
+    ax.invert_yaxis()
+    ax.legend(loc='lower right', fontsize=8)
+
+def chart_thread_balance(static_results, dynamic_results, thread_counts, topology=None, dpi=CHART_DPI):
+    """Timeline theo luồng ở số luồng lớn nhất của static/dynamic và tỷ lệ imbalance theo số luồng."""
+    plt = pyplot()
+    static_balance, dynamic_balance = imbalance_series(static_results), imbalance_series(dynamic_results)
+    fig, axes = plt.subplots(1, 3, figsize=(20, 6))
+    draw_thread_timeline(axes[0], static_balance[-1], f"Static, {static_results['threads'][-1]} threads")
+    draw_thread_timeline(axes[1], dynamic_balance[-1], f"Dynamic, {dynamic_results['threads'][-1]} threads")
+    axes[1].set_xlim(right=max(axes[0].get_xlim()[1], axes[1].get_xlim()[1]))
+    axes[0].set_xlim(axes[1].get_xlim())
+
+    ax = axes[2]
+    ax.plot(static_results['threads'], [b['imbalance'] for b in static_balance], 'o-', label='Static Schedule', color='blue')
+    ax.plot(dynamic_results['threads'], [b['imbalance'] for b in dynamic_balance], 's-', label='Dynamic Schedule', color='red')
+    ax.axhline(y=1.0, color='black', linestyle='--', alpha=0.5, label='Perfect balance')
+    ax.set_title('Load Imbalance (max / mean busy time)')
+    ax.set_xlabel('Number of Threads')
+    ax.set_ylabel('Imbalance Ratio')
+    shade_topology(ax, topology)
+    ax.grid(True)
+    ax.legend()
+    ax.set_xticks(thread_counts)
+    plt.tight_layout()
+    plt.savefig("schedule_thread_balance.png", dpi=dpi)
+    print("Saved per-thread load balance chart to schedule_thread_balance.png")
+    plt.close()
+
+def plot_charts(static_results, dynamic_results):
+    """Vẽ các biểu đồ so sánh static và dynamic (song song, mỗi biểu đồ một process)."""
+    charts = [chart_time_comparison]
+    if static_results['e2e'] is not None and dynamic_results['e2e'] is not None:
+        charts.append(chart_end_to_end)
+    jobs = [(chart_speedup_comparison, static_results, dynamic_results, THREAD_COUNTS, TOPOLOGY)]
+    if imbalance_series(static_results) is not None and imbalance_series(dynamic_results) is not None:
+        jobs.append((chart_thread_balance, static_results, dynamic_results, THREAD_COUNTS, TOPOLOGY))
+    jobs += [(chart, static_results, dynamic_results, THREAD_COUNTS) for chart in charts]
+    render_charts(jobs, dpi=CHART_DPI, workers=PLOT_JOBS)
+
+def render_results(baseline_stats, static_results, dynamic_results, charts=True):
+    """In bảng so sánh, vẽ biểu đồ (nếu charts=True) và tạo REPORT.md từ kết quả."""
+    print_comparison(static_results, dynamic_results)
+    if charts:
+        print(f"\n--- Generating charts ---")
+        plot_charts(static_results, dynamic_results)
+    generate_report(baseline_stats, static_results, dynamic_results)
+
+def find_test_image():
+    """Tìm (hoặc tạo) ảnh dùng cho thực nghiệm; trả về đường dẫn hoặc None."""
     # Kiểm tra file ảnh đầu vào
     input_images = glob.glob("../input*.jpg")  # Tìm ảnh trong thư mục cha
     if not input_images:
@@ -117,7 +356,7 @@ def main():
                 print("Đã tạo ảnh mẫu input_test.jpg")
             except:
                 print("Không thể tạo ảnh mẫu. Vui lòng cung cấp file ảnh input.")
-                return
+                return None
 
     # Sử dụng ảnh đầu tiên cho thực nghiệm
     test_image = input_images[0]
@@ -128,111 +367,387 @@ def main():
         shutil.copy(test_image, new_name)
         test_image = new_name
     
+    return test_image
+
+def main(charts=True):
+    """Hàm chính điều phối toàn bộ quá trình."""
+    if not compile_code():
+        return
+    print(f"CPU topology: {describe_topology(TOPOLOGY)}; thread counts: {THREAD_COUNTS}")
+
+    test_image = find_test_image()
+    if test_image is None:
+        return
     print(f"Using test image: {test_image}")
 
     # --- Chạy baseline (tuần tự) ---
-    print(f"\n--- Running Baseline (Sequential) - {NUM_RUNS} runs ---")
-    baseline_time = run_benchmark(BASELINE_EXE, [test_image])
-    if baseline_time is None:
+    print(f"\n--- Running Baseline (Sequential) - {describe_options(BENCH_OPTIONS)} ---")
+    baseline_stats = run_benchmark(BASELINE_EXE, [test_image], check=OUTPUT_CHECK, **BENCH_OPTIONS)
+    if baseline_stats is None:
         print("Failed to get baseline time. Exiting.")
         return
-    print(f"Average sequential time: {baseline_time:.6f}s")
+    print(f"Sequential time: {format_stats(baseline_stats)}")
 
     # --- Chạy static scheduling ---
-    static_times = []
+    static_stats = []
     valid_threads_static = []
-    print(f"\n--- Running Static Schedule ({NUM_RUNS} runs each) ---")
+    print(f"\n--- Running Static Schedule ({describe_options(BENCH_OPTIONS)} each) ---")
     for p in THREAD_COUNTS:
         print(f"  Testing with {p} threads...")
-        avg_time = run_benchmark(STATIC_EXE, [test_image, str(p)])
-        if avg_time is not None:
-            static_times.append(avg_time)
+        stats = run_benchmark(STATIC_EXE, [test_image, str(p)], check=OUTPUT_CHECK, **BENCH_OPTIONS)
+        if stats is not None:
+            static_stats.append(stats)
             valid_threads_static.append(p)
-            print(f"    Average time: {avg_time:.6f}s")
+            print(f"    {format_stats(stats)}")
 
     # --- Chạy dynamic scheduling ---
-    dynamic_times = []
+    dynamic_stats = []
     valid_threads_dynamic = []
-    print(f"\n--- Running Dynamic Schedule ({NUM_RUNS} runs each) ---")
+    print(f"\n--- Running Dynamic Schedule ({describe_options(BENCH_OPTIONS)} each) ---")
     for p in THREAD_COUNTS:
         print(f"  Testing with {p} threads...")
-        avg_time = run_benchmark(DYNAMIC_EXE, [test_image, str(p)])
-        if avg_time is not None:
-            dynamic_times.append(avg_time)
+        stats = run_benchmark(DYNAMIC_EXE, [test_image, str(p)], check=OUTPUT_CHECK, **BENCH_OPTIONS)
+        if stats is not None:
+            dynamic_stats.append(stats)
             valid_threads_dynamic.append(p)
-            print(f"    Average time: {avg_time:.6f}s")
+            print(f"    {format_stats(stats)}")
 
-    if not static_times or not dynamic_times:
+    if not static_stats or not dynamic_stats:
         print("No successful runs for comparison. Exiting.")
         return
 
     # --- Chuẩn bị dữ liệu cho phân tích ---
-    static_results = {
-        'threads': np.array(valid_threads_static),
-        'times': np.array(static_times)
-    }
-    dynamic_results = {
-        'threads': np.array(valid_threads_dynamic),
-        'times': np.array(dynamic_times)
-    }
-
-    # --- In kết quả so sánh ---
-    print(f"\n--- Schedule Comparison Results ---")
-    print(f"{'Threads':<8} {'Static (s)':<12} {'Dynamic (s)':<13} {'Ratio (D/S)':<12} {'Winner':<10}")
-    print("-" * 60)
-    
-    for i, p in enumerate(static_results['threads']):
-        if i < len(dynamic_results['threads']):
-            ratio = dynamic_results['times'][i] / static_results['times'][i]
-            winner = "Static" if ratio > 1.0 else "Dynamic"
-            print(f"{p:<8} {static_results['times'][i]:<12.6f} {dynamic_results['times'][i]:<13.6f} {ratio:<12.3f} {winner:<10}")
+    static_results, dynamic_results = build_results(
+        baseline_stats, static_stats, valid_threads_static, dynamic_stats, valid_threads_dynamic
+    )
+    write_results(RESULTS_FILE, results_to_records(baseline_stats, static_results, dynamic_results),
+                  results_meta(BENCH_OPTIONS, thread_counts=THREAD_COUNTS, topology=TOPOLOGY,
+                               test_image=test_image),
+                  csv_path=os.path.splitext(RESULTS_FILE)[0] + '.csv')
+    print(f"\nSaved raw samples and derived results to {RESULTS_FILE}")
+    render_results(baseline_stats, static_results, dynamic_results, charts=charts)
 
-    # --- Vẽ biểu đồ ---
-    print(f"\n--- Generating charts ---")
 
-    # 1. So sánh thời gian chạy
-    plt.figure(figsize=(12, 6))
-    plt.plot(static_results['threads'], static_results['times'], 'o-', label='Static Schedule', color='blue')
-    plt.plot(dynamic_results['threads'], dynamic_results['times'], 's-', label='Dynamic Schedule', color='red')
-    plt.title('Execution Time Comparison: Static vs Dynamic Schedule')
-    plt.xlabel('Number of Threads')
-    plt.ylabel('Execution Time (seconds)')
-    plt.grid(True)
-    plt.legend()
-    plt.xticks(THREAD_COUNTS)
-    plt.savefig("schedule_time_comparison.png")
-    print("Saved time comparison chart to schedule_time_comparison.png")
-    plt.close()
+# --- Schedule explorer: schedule(runtime) x chunk size x số luồng ---
 
-    # 2. So sánh Speedup
-    static_speedups = baseline_time / static_results['times']
-    dynamic_speedups = baseline_time / dynamic_results['times']
-    
-    plt.figure(figsize=(12, 6))
-    plt.plot(static_results['threads'], static_speedups, 'o-', label='Static Schedule', color='blue')
-    plt.plot(dynamic_results['threads'], dynamic_speedups, 's-', label='Dynamic Schedule', color='red')
-    plt.plot(THREAD_COUNTS, THREAD_COUNTS, 'k--', alpha=0.5, label='Ideal Speedup')
-    plt.title('Speedup Comparison: Static vs Dynamic Schedule')
-    plt.xlabel('Number of Threads')
-    plt.ylabel('Speedup')
-    plt.grid(True)
-    plt.legend()
-    plt.xticks(THREAD_COUNTS)
-    plt.savefig("schedule_speedup_comparison.png")
-    print("Saved speedup comparison chart to schedule_speedup_comparison.png")
+def schedule_label(kind, chunk):
+    """Giá trị OMP_SCHEDULE của một cấu hình, ví dụ 'guided,64' (chunk 0 = mặc định)."""
+    return kind if chunk == 0 else f"{kind},{chunk}"
+
+def explorer_configs(kinds, chunks):
+    """
+    Các cấu hình (kind, chunk) cần đo. Với dynamic và guided, chunk mặc định của
+    OpenMP là 1, nên chunk 0 bị bỏ qua khi 1 đã có trong danh sách (tránh đo hai lần
+    cùng một cấu hình; ô tương ứng trên lưới là n/a).
+    """
+    return [(kind, chunk) for kind in kinds for chunk in chunks
+            if not (chunk == 0 and kind != 'static' and 1 in chunks)]
+
+def analyze_explorer(baseline_stats, runs, kinds, chunks, threads):
+    """
+    Sắp xếp các phép đo thành lưới (kind, chunk, threads) và tìm cấu hình tốt nhất.
+
+    Args:
+        baseline_stats (dict): Thống kê của bản tuần tự
+        runs (list): Các phép đo {'kind', 'chunk', 'threads', 'stats'}
+        kinds, chunks, threads (list): Các giá trị của từng chiều
+
+    Returns:
+        dict: 'times', 'speedups' và 'imbalance' (mảng [kind][chunk][threads], NaN
+        nếu thiếu hoặc không đo theo luồng), 'best' (mỗi số luồng: kind, chunk, time, speedup) và các chiều của lưới
+    """
+    times = np.full((len(kinds), len(chunks), len(threads)), np.nan)
+    for run in runs:
+        times[kinds.index(run['kind']), chunks.index(run['chunk']), threads.index(run['threads'])] = run['stats']['median']
+    speedups = baseline_stats['median'] / times
+    imbalance = np.full_like(times, np.nan)
+    for run in runs:
+        if 'thread_stats' in run['stats']:
+            imbalance[kinds.index(run['kind']), chunks.index(run['chunk']), threads.index(run['threads'])] = \
+                run['stats']['thread_stats']['imbalance']
+    best = []
+    for t, p in enumerate(threads):
+        if np.all(np.isnan(times[:, :, t])):
+            continue
+        k, c = np.unravel_index(np.nanargmin(times[:, :, t]), times[:, :, t].shape)
+        best.append({'threads': p, 'kind': kinds[k], 'chunk': chunks[c],
+                     'time': times[k, c, t], 'speedup': speedups[k, c, t]})
+    return {'kinds': kinds, 'chunks': chunks, 'threads': threads, 'runs': runs,
+            'times': times, 'speedups': speedups, 'imbalance': imbalance, 'best': best}
+
+def explorer_to_records(baseline_stats, explorer):
+    """Chuyển kết quả explorer thành các bản ghi (baseline + mỗi cấu hình/số luồng)."""
+    records = [{'kind': 'baseline', 'chunk': None, 'threads': None, 'stats': baseline_stats}]
+    for run in explorer['runs']:
+        record = {
+            'kind': run['kind'], 'chunk': run['chunk'], 'threads': run['threads'],
+            'omp_schedule': schedule_label(run['kind'], run['chunk']),
+            'speedup': baseline_stats['median'] / run['stats']['median'], 'stats': run['stats'],
+        }
+        if 'thread_stats' in run['stats']:
+            record['imbalance'] = run['stats']['thread_stats']['imbalance']
+        records.append(record)
+    return records
+
+def records_to_explorer(records, kinds, chunks, threads):
+    """Dựng lại (baseline_stats, explorer) từ các bản ghi đã lưu."""
+    baseline_stats = next(r['stats'] for r in records if r['kind'] == 'baseline')
+    runs = [{k: r[k] for k in ('kind', 'chunk', 'threads', 'stats')} for r in records if r['kind'] != 'baseline']
+    return baseline_stats, analyze_explorer(baseline_stats, runs, kinds, chunks, threads)
+
+def plot_schedule_grid(explorer, values, cmap, colorbar_label, title, path, dpi):
+    """Vẽ một lưới giá trị [kind][chunk][threads]: chunk size (hàng) x số luồng (cột), mỗi kiểu schedule một ô."""
+    plt = pyplot()
+    kinds, chunks, threads = explorer['kinds'], explorer['chunks'], explorer['threads']
+    vmin, vmax = np.nanmin(values), np.nanmax(values)
+    fig, axes = plt.subplots(1, len(kinds), figsize=(5 * len(kinds) + 2, 0.6 * len(chunks) + 3), squeeze=False)
+    best = {(b['kind'], b['chunk'], b['threads']) for b in explorer['best']}
+    for k, (ax, kind) in enumerate(zip(axes[0], kinds)):
+        image = ax.imshow(values[k], cmap=cmap, vmin=vmin, vmax=vmax, aspect='auto')
+        for c, chunk in enumerate(chunks):
+            for t, p in enumerate(threads):
+                if np.isnan(values[k, c, t]):
+                    continue
+                is_best = (kind, chunk, p) in best
+                ax.text(t, c, f"{values[k, c, t]:.2f}", ha='center', va='center', fontsize=8,
+                        color='white' if values[k, c, t] < (vmin + vmax) / 2 else 'black',
+                        fontweight='bold' if is_best else 'normal')
+                if is_best:
+                    ax.add_patch(plt.Rectangle((t - 0.5, c - 0.5), 1, 1, fill=False, edgecolor='red', linewidth=2))
+        ax.set_title(f'schedule({kind}, chunk)')
+        ax.set_xticks(range(len(threads)))
+        ax.set_xticklabels(threads)
+        ax.set_yticks(range(len(chunks)))
+        ax.set_yticklabels(['default' if chunk == 0 else chunk for chunk in chunks])
+        ax.set_xlabel('Number of Threads')
+        if k == 0:
+            ax.set_ylabel('Chunk Size')
+    fig.colorbar(image, ax=axes[0].tolist(), label=colorbar_label)
+    fig.suptitle(title)
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
     plt.close()
 
-    # --- Tạo báo cáo ---
-    generate_report(baseline_time, static_results, dynamic_results)
+def chart_schedule_heatmap(explorer, dpi=CHART_DPI):
+    """Heatmap speedup theo chunk size và số luồng cho từng kiểu schedule."""
+    plot_schedule_grid(explorer, explorer['speedups'], 'viridis', 'Speedup vs Sequential',
+                       'OpenMP Schedule Explorer (red box: best configuration per thread count)',
+                       "schedule_heatmap.png", dpi)
+    print("Saved schedule heatmap to schedule_heatmap.png")
+
+def chart_imbalance_heatmap(explorer, dpi=CHART_DPI):
+    """Heatmap tỷ lệ mất cân bằng tải (max/mean busy) theo chunk size và số luồng."""
+    plot_schedule_grid(explorer, explorer['imbalance'], 'magma', 'Load Imbalance (max / mean busy time)',
+                       'Per-thread Load Imbalance (1.00 = perfect balance; red box: fastest configuration)',
+                       "schedule_imbalance_heatmap.png", dpi)
+    print("Saved load imbalance heatmap to schedule_imbalance_heatmap.png")
+
+def generate_explorer_report(baseline_stats, explorer, test_image):
+    """Tạo file báo cáo SCHEDULE_EXPLORER.md."""
+    print("\n--- Generating SCHEDULE_EXPLORER.md ---")
+    kinds, chunks, threads = explorer['kinds'], explorer['chunks'], explorer['threads']
+    report_content = "# Schedule Explorer: kiểu schedule × chunk size × số luồng\n\n"
+    report_content += (
+        "`blur_runtime` dùng `schedule(runtime)`: kiểu schedule và chunk size được đọc từ biến môi "
+        "trường `OMP_SCHEDULE` (ví dụ `OMP_SCHEDULE=\"guided,64\"`). Không gian lặp `collapse(2)` có "
+        "khoảng (width-2)×(height-2) iteration, nên chunk nhỏ làm overhead của scheduler chiếm ưu thế.\n\n"
+    )
+    report_content += f"**Cấu hình thực nghiệm:**\n"
+    report_content += f"- Ảnh: `{test_image}`\n"
+    if NATIVE:
+        report_content += (
+            "- Backend: `libblur.so` gọi trong process (ctypes), cùng vòng lặp `blur_kernels.h` với các "
+            "chương trình; schedule và chunk được đặt bằng `omp_set_schedule` cho mỗi lần gọi, mỗi mẫu là một lần gọi kernel (không khởi động process, "
+            "không giải mã/mã hóa ảnh). Bộ đệm kết quả được dùng lại giữa các lần gọi nên không có page "
+            "fault lần đầu như trong chương trình: speedup so với baseline (chương trình) hơi lạc quan\n"
+        )
+    report_content += f"- Cách lấy mẫu: {describe_options(BENCH_OPTIONS)} (các lần chạy khởi động bị loại bỏ)\n"
+    report_content += f"- Số luồng được test: {threads} (topology CPU: {describe_topology(TOPOLOGY)})\n"
+    report_content += f"- Chunk size: {', '.join('mặc định' if c == 0 else str(c) for c in chunks)}"
+    if 0 in chunks and 1 in chunks:
+        report_content += " (chunk mặc định của `dynamic`/`guided` là 1 nên không đo lại: ô n/a)"
+    report_content += "\n"
+    report_content += f"- Thời gian tuần tự (baseline): {baseline_stats['median']:.4f} giây\n\n"
+
+    report_content += "## Cấu hình tốt nhất theo số luồng\n\n"
+    report_content += "| Threads | OMP_SCHEDULE tốt nhất | Time (s) | Speedup | `static` (s) | `dynamic,1` (s) | Nhanh hơn `dynamic,1` |\n"
+    report_content += "|---------|-----------------------|----------|---------|--------------|-----------------|-----------------------|\n"
+    for best in explorer['best']:
+        t = threads.index(best['threads'])
+        reference = {}
+        for kind, chunk in (('static', 0), ('dynamic', 1)):
+            if kind in kinds and chunk in chunks:
+                reference[kind] = explorer['times'][kinds.index(kind), chunks.index(chunk), t]
+        static_time = f"{reference['static']:.4f}" if not np.isnan(reference.get('static', np.nan)) else "n/a"
+        dynamic_time = reference.get('dynamic', np.nan)
+        gain = f"{dynamic_time / best['time']:.2f}x" if not np.isnan(dynamic_time) else "n/a"
+        report_content += (
+            f"| {best['threads']} | `{schedule_label(best['kind'], best['chunk'])}` | {best['time']:.4f} | "
+            f"{best['speedup']:.2f}x | {static_time} | "
+            f"{'n/a' if np.isnan(dynamic_time) else f'{dynamic_time:.4f}'} | {gain} |\n"
+        )
+
+    report_content += "\n![Schedule Heatmap](schedule_heatmap.png)\n\n"
+    sections = [("Thời gian chi tiết (giây)", explorer['times'], "{:.4f}")]
+    if not np.all(np.isnan(explorer['imbalance'])):
+        sections.append(("Mất cân bằng tải (max / mean thời gian busy của các luồng)", explorer['imbalance'], "{:.2f}"))
+    for title, values, fmt in sections:
+        report_content += f"## {title}\n\n"
+        for k, kind in enumerate(kinds):
+            report_content += f"### `schedule({kind})`\n\n"
+            report_content += "| Chunk | " + " | ".join(f"p={p}" for p in threads) + " |\n"
+            report_content += "|-------|" + "|".join("------" for p in threads) + "|\n"
+            for c, chunk in enumerate(chunks):
+                cells = ["n/a" if np.isnan(v) else fmt.format(v) for v in values[k, c]]
+                report_content += f"| {'mặc định' if chunk == 0 else chunk} | " + " | ".join(cells) + " |\n"
+            report_content += "\n"
+    if len(sections) > 1:
+        report_content += "![Load Imbalance Heatmap](schedule_imbalance_heatmap.png)\n\n"
+
+    with open("SCHEDULE_EXPLORER.md", "w", encoding="utf-8") as f:
+        f.write(report_content)
+    print("Generated SCHEDULE_EXPLORER.md successfully.")
+
+def render_explorer_results(baseline_stats, explorer, test_image, charts=True):
+    """Tạo heatmap (nếu charts=True), SCHEDULE_EXPLORER.md và in cấu hình tốt nhất."""
+    if charts:
+        jobs = [(chart_schedule_heatmap, explorer)]
+        if not np.all(np.isnan(explorer['imbalance'])):
+            jobs.append((chart_imbalance_heatmap, explorer))
+        render_charts(jobs, dpi=CHART_DPI, workers=PLOT_JOBS)
+    generate_explorer_report(baseline_stats, explorer, test_image)
+    print("\n--- Best schedule per thread count ---")
+    for best in explorer['best']:
+        print(f"{best['threads']:>4} threads: OMP_SCHEDULE={schedule_label(best['kind'], best['chunk']):<16} "
+              f"{best['time']:.6f}s ({best['speedup']:.2f}x)")
+
+def run_explorer(charts=True):
+    """Đo blur_runtime (hoặc libblur.so trong process nếu NATIVE) với mọi tổ hợp kiểu schedule x chunk size x số luồng."""
+    if not compile_code():
+        return
+    print(f"CPU topology: {describe_topology(TOPOLOGY)}; thread counts: {THREAD_COUNTS}")
+    test_image = find_test_image()
+    if test_image is None:
+        return
+    print(f"Using test image: {test_image}")
+
+    print(f"\n--- Running Baseline (Sequential) - {describe_options(BENCH_OPTIONS)} ---")
+    baseline_stats = run_benchmark(BASELINE_EXE, [test_image], check=OUTPUT_CHECK, **BENCH_OPTIONS)
+    if baseline_stats is None:
+        print("Failed to get baseline time. Exiting.")
+        return
+    print(f"Sequential time: {format_stats(baseline_stats)}")
+
+    native = None
+    if NATIVE:
+        # Ảnh được giải mã một lần; mỗi mẫu là một lần gọi kernel trong process
+        try:
+            library = load_library()
+            native = NativeBlur(decode_image(test_image, library), library)
+        except (BuildError, OSError, ValueError) as e:
+            print(f"Failed to load the native kernel library: {e}")
+            return
+        native_options = {k: v for k, v in BENCH_OPTIONS.items() if k not in ('store', 'repeat')}
+
+    runs = []
+    for kind, chunk in explorer_configs(EXPLORE_KINDS, EXPLORE_CHUNKS):
+        label = schedule_label(kind, chunk)
+        print(f"\n--- OMP_SCHEDULE={label} ({describe_options(BENCH_OPTIONS)} each) ---")
+        for p in THREAD_COUNTS:
+            if native is not None:
+                stats = native.measure(OUTPUT_CHECK['kernel'], p, kind, chunk, **native_options)
+            else:
+                stats = run_benchmark(RUNTIME_EXE, [test_image, str(p)], env={'OMP_SCHEDULE': label},
+                                      check=OUTPUT_CHECK, **BENCH_OPTIONS)
+            if stats is not None:
+                print(f"  {p} threads: {format_stats(stats)}")
+                runs.append({'kind': kind, 'chunk': chunk, 'threads': p, 'stats': stats})
+
+    if not runs:
+        print("No successful runs. Exiting.")
+        return
+
+    explorer = analyze_explorer(baseline_stats, runs, EXPLORE_KINDS, EXPLORE_CHUNKS, THREAD_COUNTS)
+    write_results(EXPLORER_RESULTS_FILE, explorer_to_records(baseline_stats, explorer),
+                  results_meta(BENCH_OPTIONS, thread_counts=THREAD_COUNTS, topology=TOPOLOGY,
+                               kinds=EXPLORE_KINDS, chunks=EXPLORE_CHUNKS, test_image=test_image,
+                               native=NATIVE),
+                  csv_path=os.path.splitext(EXPLORER_RESULTS_FILE)[0] + '.csv')
+    print(f"\nSaved raw samples and derived results to {EXPLORER_RESULTS_FILE}")
+    render_explorer_results(baseline_stats, explorer, test_image, charts=charts)
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='So sánh schedule(static) và schedule(dynamic) trong OpenMP')
+    parser.add_argument('--explore', action='store_true', help='Quét schedule(runtime) qua OMP_SCHEDULE: kiểu schedule x chunk size x số luồng, vẽ heatmap')
+    parser.add_argument('--kinds', nargs='+', choices=['static', 'dynamic', 'guided'], default=EXPLORE_KINDS, help=f'Các kiểu schedule cho --explore (mặc định: {EXPLORE_KINDS})')
+    parser.add_argument('--thread-stats', action='store_true', help='Ghi thời gian busy/wait và số iteration của từng luồng (BLUR_THREAD_STATS=1), báo cáo mất cân bằng tải; chỉ khi bật, chương trình mới chạy vùng song song có đo đạc thay cho vòng lặp gốc')
+    parser.add_argument('--native', action='store_true', help='Với --explore: gọi kernel trong process qua libblur.so (ctypes) thay vì chạy blur_runtime cho mỗi mẫu')
+    parser.add_argument('--chunks', nargs='+', type=int, default=EXPLORE_CHUNKS, help=f'Các chunk size cho --explore, 0 = mặc định của OpenMP (mặc định: {EXPLORE_CHUNKS})')
+    add_thread_arguments(parser)
+    add_benchmark_arguments(parser, runs=NUM_RUNS, warmup=WARMUP_RUNS)
+    add_results_arguments(parser, RESULTS_FILE)
+    add_plot_arguments(parser, dpi=CHART_DPI)
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
     try:
-        import matplotlib
+        # matplotlib chỉ được import khi vẽ biểu đồ (bench.plotting.pyplot)
         import numpy
     except ImportError:
-        print("Error: 'matplotlib' and 'numpy' are required.")
-        print("Please install them using: pip install matplotlib numpy")
+        print("Error: 'numpy' is required.")
+        print("Please install it using: pip install numpy")
     else:
+        args = parse_arguments()
+        custom_results = args.results != RESULTS_FILE
+        RESULTS_FILE = os.path.abspath(args.results)
+        CHART_DPI = args.dpi
+        PLOT_JOBS = args.plot_jobs
+        TOPOLOGY, THREAD_COUNTS = plan_threads(args)
+        if args.thread_stats:
+            # Các chương trình đọc biến này (phase_timing.h); nó cũng là một phần khóa của kết quả đã lưu
+            os.environ['BLUR_THREAD_STATS'] = '1'
+        if args.explore:
+            EXPLORE_KINDS = args.kinds
+            EXPLORE_CHUNKS = args.chunks
+            NATIVE = args.native
+            # Kết quả explorer được lưu riêng (trừ khi chỉ định --results)
+            EXPLORER_RESULTS_FILE = RESULTS_FILE if custom_results else os.path.abspath(EXPLORER_RESULTS_FILE)
+
         # Chuyển vào thư mục của script để các đường dẫn tương đối hoạt động đúng
         os.chdir(os.path.dirname(os.path.abspath(__file__)))
-        main()
\ No newline at end of file
+
+        if args.explore and (args.replot or args.report_only):
+            try:
+                meta, records = read_results(EXPLORER_RESULTS_FILE)
+            except FileNotFoundError:
+                print(f"Error: {EXPLORER_RESULTS_FILE} not found. Run the explorer first.")
+                sys.exit(1)
+            BENCH_OPTIONS = meta.get('options', BENCH_OPTIONS)
+            THREAD_COUNTS = meta.get('thread_counts', THREAD_COUNTS)
+            TOPOLOGY = meta.get('topology', TOPOLOGY)
+            NATIVE = meta.get('native', False)
+            baseline_stats, explorer = records_to_explorer(
+                records, meta.get('kinds', EXPLORE_KINDS), meta.get('chunks', EXPLORE_CHUNKS), THREAD_COUNTS)
+            render_explorer_results(baseline_stats, explorer, meta.get('test_image', 'unknown'),
+                                    charts=args.replot and not args.no_plots)
+        elif args.explore:
+            BENCH_OPTIONS = benchmark_options(args)
+            run_explorer(charts=not args.no_plots)
+            report_store(BENCH_OPTIONS)
+        elif args.replot or args.report_only:
+            # Dựng lại biểu đồ/báo cáo từ kết quả đã lưu, không chạy benchmark
+            try:
+                meta, records = read_results(RESULTS_FILE)
+            except FileNotFoundError:
+                print(f"Error: {RESULTS_FILE} not found. Run the analysis first.")
+                sys.exit(1)
+            BENCH_OPTIONS = meta.get('options', BENCH_OPTIONS)
+            THREAD_COUNTS = meta.get('thread_counts', THREAD_COUNTS)
+            TOPOLOGY = meta.get('topology', TOPOLOGY)
+            render_results(*records_to_results(records), charts=args.replot and not args.no_plots)
+        else:
+            BENCH_OPTIONS = benchmark_options(args)
+            main(charts=not args.no_plots)
+            report_store(BENCH_OPTIONS)
@@ -0,0 +1,266 @@
+#include <iostream>
+#include <vector>
+#include <cmath>
+#include <cstring>
+#include <omp.h> // OpenMP cho xử lý song song
+
+// Thư viện xử lý ảnh
+#define STB_IMAGE_IMPLEMENTATION
+#include "stb_image.h"
+#define STB_IMAGE_WRITE_IMPLEMENTATION
+#include "stb_image_write.h"
+
+// Đo thời gian từng giai đoạn, in dòng JSON ở cuối stdout
+#include "../phase_timing.h"
+
+// Ghi bộ đệm ảnh dạng byte thô khi có BLUR_DUMP/BLUR_DUMP_INPUT
+#include "../raw_dump.h"
+
+// Bộ máy làm mờ Gaussian với bán kính và sigma chọn lúc chạy, ba thuật toán:
+//   direct    - tích chập 2D trực tiếp, (2r+1)^2 phép nhân-cộng mỗi pixel
+//   separable - lượt ngang rồi lượt dọc với kernel 1D, 2(2r+1) phép nhân-cộng
+//   boxsum    - xấp xỉ Gaussian bằng 3 lần box blur liên tiếp, mỗi lần dùng tổng
+//               chạy (running sum) nên chi phí mỗi pixel không phụ thuộc bán kính
+// direct/separable bỏ viền r pixel như các chương trình khác; boxsum xử lý cả
+// ảnh (kẹp chỉ số ở biên).
+
+// Kernel Gaussian 1D 2r+1 phần tử, chuẩn hóa tổng bằng 1
+static std::vector<double> gaussian_1d(int radius, double sigma) {
+    std::vector<double> kernel(2 * radius + 1);
+    double total = 0.0;
+    for (int k = -radius; k <= radius; ++k) {
+        kernel[k + radius] = exp(-(k * k) / (2.0 * sigma * sigma));
+        total += kernel[k + radius];
+    }
+    for (size_t i = 0; i < kernel.size(); ++i) kernel[i] /= total;
+    return kernel;
+}
+
+// Bán kính của 3 box blur có phương sai tổng gần với sigma^2 (Wells, 1986):
+// n box có độ rộng w_l hoặc w_l + 2 với số box rộng w_l chọn theo sigma
+static std::vector<int> boxes_for_gauss(double sigma, int n) {
+    double w_ideal = sqrt(12.0 * sigma * sigma / n + 1.0);
+    int w_l = (int)floor(w_ideal);
+    if (w_l % 2 == 0) --w_l;
+    int w_u = w_l + 2;
+    double m_ideal = (12.0 * sigma * sigma - n * w_l * w_l - 4.0 * n * w_l - 3.0 * n) / (-4.0 * w_l - 4.0);
+    int m = (int)round(m_ideal);
+    std::vector<int> radii(n);
+    for (int i = 0; i < n; ++i) radii[i] = ((i < m ? w_l : w_u) - 1) / 2;
+    return radii;
+}
+
+static inline int clamp_index(int i, int n) {
+    return i < 0 ? 0 : (i >= n ? n - 1 : i);
+}
+
+// Box blur ngang bán kính b bằng tổng chạy: src -> dst, mỗi hàng một luồng
+static void box_horizontal(const float *src, float *dst, int width, int height, int channels, int b) {
+    float scale = 1.0f / (2 * b + 1);
+    #pragma omp for schedule(static)
+    for (int y = 0; y < height; ++y) {
+        const float *row = src + (size_t)y * width * channels;
+        float *out = dst + (size_t)y * width * channels;
+        for (int c = 0; c < channels; ++c) {
+            float sum = 0.0f;
+            for (int k = -b; k <= b; ++k) sum += row[clamp_index(k, width) * channels + c];
+            for (int x = 0; x < width; ++x) {
+                out[x * channels + c] = sum * scale;
+                sum += row[clamp_index(x + b + 1, width) * channels + c] - row[clamp_index(x - b, width) * channels + c];
+            }
+        }
+    }
+}
+
+// Box blur dọc bán kính b bằng tổng chạy theo hàng: mỗi luồng giữ tổng của một
+// dải cột liên tiếp và đi từ trên xuống, nên mọi truy cập bộ nhớ đều theo hàng
+static void box_vertical(const float *src, float *dst, int width, int height, int channels, int b,
+                         std::vector<float> &sums) {
+    float scale = 1.0f / (2 * b + 1);
+    int row_size = width * channels;
+    int nthreads = omp_get_num_threads();
+    int tid = omp_get_thread_num();
+    int begin = (int)((long)row_size * tid / nthreads);
+    int end = (int)((long)row_size * (tid + 1) / nthreads);
+    float *sum = sums.data();
+    for (int i = begin; i < end; ++i) sum[i] = 0.0f;
+    for (int k = -b; k <= b; ++k) {
+        const float *row = src + (size_t)clamp_index(k, height) * row_size;
+        for (int i = begin; i < end; ++i) sum[i] += row[i];
+    }
+    for (int y = 0; y < height; ++y) {
+        float *out = dst + (size_t)y * row_size;
+        const float *add = src + (size_t)clamp_index(y + b + 1, height) * row_size;
+        const float *sub = src + (size_t)clamp_index(y - b, height) * row_size;
+        for (int i = begin; i < end; ++i) {
+            out[i] = sum[i] * scale;
+            sum[i] += add[i] - sub[i];
+        }
+    }
+    #pragma omp barrier
+}
+
+int main(int argc, char *argv[]) {
+    PhaseTimer timer;
+
+    if (argc < 5) {
+        printf("Usage: %s <image_file> <num_threads> <direct|separable|boxsum> <radius> [sigma] [repeats]\n", argv[0]);
+        printf("  sigma <= 0 means radius / 3 (kernel covers +-3 sigma)\n");
+        return 1;
+    }
+    char* input_filename = argv[1];
+    int num_threads = atoi(argv[2]);
+    std::string method = argv[3];
+    int radius = atoi(argv[4]);
+    double sigma = argc > 5 ? atof(argv[5]) : 0.0;
+    // Số lần lặp kernel trong cùng một process (mặc định 1)
+    int repeats = 1;
+    if (argc > 6) {
+        repeats = atoi(argv[6]);
+    }
+    if (method != "direct" && method != "separable" && method != "boxsum") {
+        fprintf(stderr, "Unknown method: %s\n", method.c_str());
+        return 1;
+    }
+    if (radius < 1) {
+        fprintf(stderr, "Radius must be >= 1\n");
+        return 1;
+    }
+    if (sigma <= 0.0) sigma = radius / 3.0;
+
+    int width, height, channels;
+    timer.start();
+    unsigned char *img = stbi_load(input_filename, &width, &height, &channels, 0);
+    timer.decode = timer.stop();
+    if (img == NULL) {
+        return 1;
+    }
+    if (2 * radius >= width || 2 * radius >= height) {
+        fprintf(stderr, "Radius %d too large for %dx%d image\n", radius, width, height);
+        stbi_image_free(img);
+        return 1;
+    }
+    size_t img_size = width * height * channels;
+    timer.start();
+    unsigned char *output_img = (unsigned char *)malloc(img_size);
+    // Bộ đệm trung gian (float): separable dùng 1, boxsum dùng 2 và một hàng tổng chạy
+    float *buffer_a = method == "direct" ? NULL : (float *)malloc(img_size * sizeof(float));
+    float *buffer_b = method == "boxsum" ? (float *)malloc(img_size * sizeof(float)) : NULL;
+    std::vector<float> sums(method == "boxsum" ? width * channels : 0);
+    timer.alloc = timer.stop();
+    if (output_img == NULL || (method != "direct" && buffer_a == NULL) || (method == "boxsum" && buffer_b == NULL)) {
+        stbi_image_free(img);
+        free(output_img);
+        free(buffer_a);
+        free(buffer_b);
+        return 1;
+    }
+
+    std::vector<double> kernel_1d = gaussian_1d(radius, sigma);
+    std::vector<double> kernel_2d((2 * radius + 1) * (2 * radius + 1));
+    for (int ky = 0; ky <= 2 * radius; ++ky) {
+        for (int kx = 0; kx <= 2 * radius; ++kx) {
+            kernel_2d[ky * (2 * radius + 1) + kx] = kernel_1d[ky] * kernel_1d[kx];
+        }
+    }
+    std::vector<int> boxes = boxes_for_gauss(sigma, 3);
+    fprintf(stderr, "engine: %s, radius %d, sigma %.3f", method.c_str(), radius, sigma);
+    if (method == "boxsum") fprintf(stderr, ", box radii %d %d %d", boxes[0], boxes[1], boxes[2]);
+    fprintf(stderr, "\n");
+
+    omp_set_num_threads(num_threads);
+    const double *k1 = kernel_1d.data();
+    const double *k2 = kernel_2d.data();
+    int size = 2 * radius + 1;
+
+    // Lặp kernel `repeats` lần trên dữ liệu đã đọc, in thời gian của từng lần
+    for (int r = 0; r < repeats; ++r) {
+        // Bắt đầu đo thời gian
+        double start_time = omp_get_wtime();
+
+        if (method == "direct") {
+            // Tích chập 2D trực tiếp (bỏ viền r pixel)
+            #pragma omp parallel for schedule(static) collapse(2)
+            for (int y = radius; y < height - radius; ++y) {
+                for (int x = radius; x < width - radius; ++x) {
+                    for (int c = 0; c < channels; ++c) {
+                        double sum = 0.0;
+                        for (int ky = -radius; ky <= radius; ++ky) {
+                            for (int kx = -radius; kx <= radius; ++kx) {
+                                unsigned char pixel_val = img[((y + ky) * width + (x + kx)) * channels + c];
+                                sum += pixel_val * k2[(ky + radius) * size + kx + radius];
+                            }
+                        }
+                        output_img[(y * width + x) * channels + c] = (unsigned char)sum;
+                    }
+                }
+            }
+        } else if (method == "separable") {
+            #pragma omp parallel
+            {
+                // Lượt ngang: mọi hàng (lượt dọc cần cả các hàng viền), bỏ viền r cột
+                #pragma omp for schedule(static) collapse(2)
+                for (int y = 0; y < height; ++y) {
+                    for (int x = radius; x < width - radius; ++x) {
+                        for (int c = 0; c < channels; ++c) {
+                            double sum = 0.0;
+                            for (int k = -radius; k <= radius; ++k) {
+                                sum += img[(y * width + (x + k)) * channels + c] * k1[k + radius];
+                            }
+                            buffer_a[(y * width + x) * channels + c] = (float)sum;
+                        }
+                    }
+                }
+                // Lượt dọc trên bộ đệm trung gian (bỏ viền r pixel)
+                #pragma omp for schedule(static) collapse(2)
+                for (int y = radius; y < height - radius; ++y) {
+                    for (int x = radius; x < width - radius; ++x) {
+                        for (int c = 0; c < channels; ++c) {
+                            double sum = 0.0;
+                            for (int k = -radius; k <= radius; ++k) {
+                                sum += buffer_a[((y + k) * width + x) * channels + c] * k1[k + radius];
+                            }
+                            output_img[(y * width + x) * channels + c] = (unsigned char)sum;
+                        }
+                    }
+                }
+            }
+        } else {
+            #pragma omp parallel
+            {
+                #pragma omp for schedule(static)
+                for (long i = 0; i < (long)img_size; ++i) buffer_a[i] = img[i];
+                // 3 box blur liên tiếp, mỗi lần ngang (a -> b) rồi dọc (b -> a)
+                for (int pass = 0; pass < 3; ++pass) {
+                    box_horizontal(buffer_a, buffer_b, width, height, channels, boxes[pass]);
+                    box_vertical(buffer_b, buffer_a, width, height, channels, boxes[pass], sums);
+                }
+                #pragma omp for schedule(static)
+                for (long i = 0; i < (long)img_size; ++i) output_img[i] = (unsigned char)buffer_a[i];
+            }
+        }
+
+        // Kết thúc đo thời gian và in ra
+        double end_time = omp_get_wtime();
+        printf("%f\n", (end_time - start_time));
+        timer.compute.push_back(end_time - start_time);
+    }
+
+    // Ghi bộ đệm thô (nếu có BLUR_DUMP) để kiểm tra với bản tham chiếu
+    dump_buffers(img, output_img, img_size);
+
+    // Ghi ảnh kết quả
+    timer.start();
+    std::string output_name = "output_engine_" + method + ".jpg";
+    stbi_write_jpg(output_name.c_str(), width, height, channels, output_img, 100);
+    timer.encode = timer.stop();
+    timer.report(width, height, channels);
+
+    // Giải phóng bộ nhớ
+    stbi_image_free(img);
+    free(output_img);
+    free(buffer_a);
+    free(buffer_b);
+
+    return 0;
+}
@@ -0,0 +1,127 @@
+#include <iostream>
+#include <vector>
+#include <omp.h> // OpenMP cho xử lý song song
+
+// Thư viện xử lý ảnh
+#define STB_IMAGE_IMPLEMENTATION
+#include "stb_image.h"
+#define STB_IMAGE_WRITE_IMPLEMENTATION
+#include "stb_image_write.h"
+
+// Đo thời gian từng giai đoạn, in dòng JSON ở cuối stdout
+#include "../phase_timing.h"
+
+// Ghi bộ đệm ảnh dạng byte thô khi có BLUR_DUMP/BLUR_DUMP_INPUT
+#include "../raw_dump.h"
+
+// Trọng số dùng chung với blur_7x7 và libblur.so
+#include "../blur_kernels.h"
+
+// Biến thể chia khối (tiled) của kernel 7x7: ảnh được chia thành các tile
+// BLUR_TILE_W x BLUR_TILE_H pixel (đọc từ biến môi trường, <= 0 = cả chiều đó),
+// mỗi luồng xử lý trọn các tile để vùng dữ liệu đầu vào của một tile
+// ((tile_h + 6) hàng x (tile_w + 6) cột) nằm gọn trong cache.
+// Thứ tự cộng giống hệt blur_7x7 nên ảnh kết quả trùng khớp từng byte.
+
+// Đọc một số nguyên từ biến môi trường, trả về giá trị mặc định nếu không có
+static int env_int(const char *name, int fallback) {
+    const char *value = getenv(name);
+    return value != NULL ? atoi(value) : fallback;
+}
+
+int main(int argc, char *argv[]) {
+    PhaseTimer timer;
+
+    if (argc < 3) {
+        printf("Usage: %s <image_file> <num_threads> [repeats]\n", argv[0]);
+        return 1;
+    }
+    char* input_filename = argv[1];
+    int num_threads = atoi(argv[2]);
+    // Số lần lặp kernel trong cùng một process (mặc định 1)
+    int repeats = 1;
+    if (argc > 3) {
+        repeats = atoi(argv[3]);
+    }
+
+    int width, height, channels;
+    timer.start();
+    unsigned char *img = stbi_load(input_filename, &width, &height, &channels, 0);
+    timer.decode = timer.stop();
+    if (img == NULL) {
+        return 1;
+    }
+    size_t img_size = width * height * channels;
+    timer.start();
+    unsigned char *output_img = (unsigned char *)malloc(img_size);
+    timer.alloc = timer.stop();
+    if (output_img == NULL) {
+        stbi_image_free(img);
+        return 1;
+    }
+
+    omp_set_num_threads(num_threads);
+
+    // Kích thước tile (mặc định 64 x 16), tile <= 0 nghĩa là cả chiều rộng/chiều cao
+    int x_begin = 3, x_end = width - 3, y_begin = 3, y_end = height - 3;
+    int tile_w = env_int("BLUR_TILE_W", 64);
+    int tile_h = env_int("BLUR_TILE_H", 16);
+    if (tile_w <= 0 || tile_w > x_end - x_begin) tile_w = x_end - x_begin;
+    if (tile_h <= 0 || tile_h > y_end - y_begin) tile_h = y_end - y_begin;
+    int tiles_x = (x_end - x_begin + tile_w - 1) / tile_w;
+    int tiles_y = (y_end - y_begin + tile_h - 1) / tile_h;
+    fprintf(stderr, "tile: %dx%d (%d x %d tiles)\n", tile_w, tile_h, tiles_x, tiles_y);
+
+    // Lặp kernel `repeats` lần trên dữ liệu đã đọc, in thời gian của từng lần
+    for (int r = 0; r < repeats; ++r) {
+        // Bắt đầu đo thời gian
+        double start_time = omp_get_wtime();
+
+        // Áp dụng kernel 7x7 song song theo tile (bỏ viền 3 pixel)
+        #pragma omp parallel for schedule(static) collapse(2)
+        for (int ty = 0; ty < tiles_y; ++ty) {
+            for (int tx = 0; tx < tiles_x; ++tx) {
+                int y0 = y_begin + ty * tile_h;
+                int y1 = y0 + tile_h < y_end ? y0 + tile_h : y_end;
+                int x0 = x_begin + tx * tile_w;
+                int x1 = x0 + tile_w < x_end ? x0 + tile_w : x_end;
+                for (int y = y0; y < y1; ++y) {
+                    for (int x = x0; x < x1; ++x) {
+                        // Xử lý từng kênh màu
+                        for (int c = 0; c < channels; ++c) {
+                            double sum = 0.0;
+                            // Tính convolution với 49 pixel lân cận
+                            for (int ky = -3; ky <= 3; ++ky) {
+                                for (int kx = -3; kx <= 3; ++kx) {
+                                    unsigned char pixel_val = img[((y + ky) * width + (x + kx)) * channels + c];
+                                    sum += pixel_val * blur_kernel_7x7[ky + 3][kx + 3];
+                                }
+                            }
+                            output_img[(y * width + x) * channels + c] = (unsigned char)sum;
+                        }
+                    }
+                }
+            }
+        }
+
+        // Kết thúc đo thời gian và in ra
+        double end_time = omp_get_wtime();
+        printf("%f\n", (end_time - start_time));
+        timer.compute.push_back(end_time - start_time);
+    }
+
+    // Ghi bộ đệm thô (nếu có BLUR_DUMP) để kiểm tra với bản tham chiếu
+    dump_buffers(img, output_img, img_size);
+
+    // Ghi ảnh kết quả
+    timer.start();
+    stbi_write_jpg("output_tiled.jpg", width, height, channels, output_img, 100);
+    timer.encode = timer.stop();
+    timer.report(width, height, channels);
+
+    // Giải phóng bộ nhớ
+    stbi_image_free(img);
+    free(output_img);
+
+    return 0;
+}
\ No newline at end of file
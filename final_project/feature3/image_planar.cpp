@@ -0,0 +1,182 @@
+#include <iostream>
+#include <vector>
+#include <omp.h> // OpenMP cho xử lý song song
+
+// Thư viện xử lý ảnh
+#define STB_IMAGE_IMPLEMENTATION
+#include "stb_image.h"
+#define STB_IMAGE_WRITE_IMPLEMENTATION
+#include "stb_image_write.h"
+
+// Đo thời gian từng giai đoạn, in dòng JSON ở cuối stdout
+#include "../phase_timing.h"
+
+// Ghi bộ đệm ảnh dạng byte thô khi có BLUR_DUMP/BLUR_DUMP_INPUT
+#include "../raw_dump.h"
+
+// Kernel 3x3/5x5/7x7 (cùng trọng số với blur_3x3/5x5/7x7) trên bố cục planar
+// (structure-of-arrays): ngay sau stbi_load, ảnh xen kẽ RGBRGB... được tách thành
+// mỗi kênh một mặt phẳng liên tục; kernel chạy trên từng mặt phẳng với vòng lặp
+// trong cùng đi theo x (bước 1) nên trình biên dịch vector hóa được; trước khi ghi
+// ảnh các mặt phẳng được ghép lại. Thời gian tách/ghép được in trong "extra_phases"
+// (deinterleave, interleave), compute chỉ tính kernel.
+//
+// Mỗi hàng kết quả được cộng dồn trong một hàng double: với mỗi trọng số (ky, kx),
+// cả hàng cộng thêm pixel * trọng số. Mỗi pixel vẫn cộng các số hạng theo đúng thứ
+// tự (ky, kx) như blur_3x3/5x5/7x7 nên kết quả trùng khớp từng byte.
+
+const double kernel_3x3[3 * 3] = {
+    1.0 / 16, 2.0 / 16, 1.0 / 16,
+    2.0 / 16, 4.0 / 16, 2.0 / 16,
+    1.0 / 16, 2.0 / 16, 1.0 / 16};
+
+const double kernel_5x5[5 * 5] = {
+    1.0/273, 4.0/273,  7.0/273,  4.0/273, 1.0/273,
+    4.0/273, 16.0/273, 26.0/273, 16.0/273, 4.0/273,
+    7.0/273, 26.0/273, 41.0/273, 26.0/273, 7.0/273,
+    4.0/273, 16.0/273, 26.0/273, 16.0/273, 4.0/273,
+    1.0/273, 4.0/273,  7.0/273,  4.0/273, 1.0/273};
+
+const double kernel_7x7[7 * 7] = {
+    0.00000067, 0.00002292, 0.00019117, 0.00038771, 0.00019117, 0.00002292, 0.00000067,
+    0.00002292, 0.00078633, 0.00655965, 0.01330373, 0.00655965, 0.00078633, 0.00002292,
+    0.00019117, 0.00655965, 0.05472157, 0.11098164, 0.05472157, 0.00655965, 0.00019117,
+    0.00038771, 0.01330373, 0.11098164, 0.22508352, 0.11098164, 0.01330373, 0.00038771,
+    0.00019117, 0.00655965, 0.05472157, 0.11098164, 0.05472157, 0.00655965, 0.00019117,
+    0.00002292, 0.00078633, 0.00655965, 0.01330373, 0.00655965, 0.00078633, 0.00002292,
+    0.00000067, 0.00002292, 0.00019117, 0.00038771, 0.00019117, 0.00002292, 0.00000067};
+
+// Tích chập các mặt phẳng (bỏ viền r pixel); bán kính là tham số template để các
+// vòng lặp kernel có cận hằng. Mỗi luồng có một hàng cộng dồn riêng
+template <int radius>
+static void convolve_planes(const unsigned char *planes, unsigned char *output_planes, int width, int height,
+                            int channels, const double *kernel) {
+    const int size = 2 * radius + 1;
+    size_t plane_size = (size_t)width * height;
+    #pragma omp parallel
+    {
+        std::vector<double> acc(width);
+        #pragma omp for schedule(static) collapse(2)
+        for (int c = 0; c < channels; ++c) {
+            for (int y = radius; y < height - radius; ++y) {
+                const unsigned char *plane = planes + c * plane_size;
+                for (int x = radius; x < width - radius; ++x) acc[x] = 0.0;
+                for (int ky = -radius; ky <= radius; ++ky) {
+                    for (int kx = -radius; kx <= radius; ++kx) {
+                        const unsigned char *row = plane + (size_t)(y + ky) * width + kx;
+                        double weight = kernel[(ky + radius) * size + kx + radius];
+                        for (int x = radius; x < width - radius; ++x) {
+                            acc[x] += row[x] * weight;
+                        }
+                    }
+                }
+                unsigned char *out = output_planes + c * plane_size + (size_t)y * width;
+                for (int x = radius; x < width - radius; ++x) out[x] = (unsigned char)acc[x];
+            }
+        }
+    }
+}
+
+int main(int argc, char *argv[]) {
+    PhaseTimer timer;
+
+    if (argc < 4) {
+        printf("Usage: %s <image_file> <num_threads> <3|5|7> [repeats]\n", argv[0]);
+        return 1;
+    }
+    char* input_filename = argv[1];
+    int num_threads = atoi(argv[2]);
+    int kernel_size = atoi(argv[3]);
+    // Số lần lặp kernel trong cùng một process (mặc định 1)
+    int repeats = 1;
+    if (argc > 4) {
+        repeats = atoi(argv[4]);
+    }
+    const double *kernel = kernel_size == 3 ? kernel_3x3 : kernel_size == 5 ? kernel_5x5
+                         : kernel_size == 7 ? kernel_7x7 : NULL;
+    if (kernel == NULL) {
+        fprintf(stderr, "Unknown kernel size: %d\n", kernel_size);
+        return 1;
+    }
+
+    int width, height, channels;
+    timer.start();
+    unsigned char *img = stbi_load(input_filename, &width, &height, &channels, 0);
+    timer.decode = timer.stop();
+    if (img == NULL) {
+        return 1;
+    }
+    size_t img_size = width * height * channels;
+    size_t plane_size = (size_t)width * height;
+    timer.start();
+    unsigned char *output_img = (unsigned char *)malloc(img_size);
+    unsigned char *planes = (unsigned char *)malloc(img_size);
+    unsigned char *output_planes = (unsigned char *)malloc(img_size);
+    timer.alloc = timer.stop();
+    if (output_img == NULL || planes == NULL || output_planes == NULL) {
+        stbi_image_free(img);
+        free(output_img);
+        free(planes);
+        free(output_planes);
+        return 1;
+    }
+
+    omp_set_num_threads(num_threads);
+
+    // Tách kênh: RGBRGB... -> RRR... GGG... BBB...
+    timer.start();
+    #pragma omp parallel for schedule(static)
+    for (long i = 0; i < (long)plane_size; ++i) {
+        for (int c = 0; c < channels; ++c) {
+            planes[c * plane_size + i] = img[i * channels + c];
+        }
+    }
+    timer.record_phase("deinterleave", timer.stop());
+
+    // Lặp kernel `repeats` lần trên dữ liệu đã đọc, in thời gian của từng lần
+    for (int r = 0; r < repeats; ++r) {
+        // Bắt đầu đo thời gian
+        double start_time = omp_get_wtime();
+
+        if (kernel_size == 3) {
+            convolve_planes<1>(planes, output_planes, width, height, channels, kernel);
+        } else if (kernel_size == 5) {
+            convolve_planes<2>(planes, output_planes, width, height, channels, kernel);
+        } else {
+            convolve_planes<3>(planes, output_planes, width, height, channels, kernel);
+        }
+
+        // Kết thúc đo thời gian và in ra
+        double end_time = omp_get_wtime();
+        printf("%f\n", (end_time - start_time));
+        timer.compute.push_back(end_time - start_time);
+    }
+
+    // Ghép kênh: RRR... GGG... BBB... -> RGBRGB...
+    timer.start();
+    #pragma omp parallel for schedule(static)
+    for (long i = 0; i < (long)plane_size; ++i) {
+        for (int c = 0; c < channels; ++c) {
+            output_img[i * channels + c] = output_planes[c * plane_size + i];
+        }
+    }
+    timer.record_phase("interleave", timer.stop());
+
+    // Ghi bộ đệm thô (nếu có BLUR_DUMP) để kiểm tra với bản tham chiếu
+    dump_buffers(img, output_img, img_size);
+
+    // Ghi ảnh kết quả
+    timer.start();
+    std::string output_name = "output_planar_" + std::to_string(kernel_size) + "x" + std::to_string(kernel_size) + ".jpg";
+    stbi_write_jpg(output_name.c_str(), width, height, channels, output_img, 100);
+    timer.encode = timer.stop();
+    timer.report(width, height, channels);
+
+    // Giải phóng bộ nhớ
+    stbi_image_free(img);
+    free(output_img);
+    free(planes);
+    free(output_planes);
+
+    return 0;
+}
@@ -0,0 +1,204 @@
+#include <iostream>
+#include <vector>
+#include <cmath>
+#include <cstring>
+#include <omp.h> // OpenMP cho xử lý song song
+
+// Thư viện xử lý ảnh
+#define STB_IMAGE_IMPLEMENTATION
+#include "stb_image.h"
+#define STB_IMAGE_WRITE_IMPLEMENTATION
+#include "stb_image_write.h"
+
+// Đo thời gian từng giai đoạn, in dòng JSON ở cuối stdout
+#include "../phase_timing.h"
+
+// Ghi bộ đệm ảnh dạng byte thô khi có BLUR_DUMP/BLUR_DUMP_INPUT
+#include "../raw_dump.h"
+
+// Kernel 3x3/5x5/7x7 (cùng trọng số với blur_3x3/5x5/7x7) với ba kiểu số học:
+//   double - như các chương trình khác: pixel * trọng số double, cộng dồn double
+//   float  - trọng số và tổng float (32 bit)
+//   fixed  - số nguyên fixed-point Q16: trọng số round(w * 2^16) (int32), tổng
+//            nguyên, kết quả = tổng >> 16; với 3x3 {1,2,1}/16 đây là phép tính chính xác
+// Đặt BLUR_DUMP=<file> để ghi ảnh kết quả dạng byte thô (không nén) ra file, dùng
+// để so sánh sai số với bản double (JPEG làm sai lệch giá trị pixel), xem raw_dump.h.
+
+static const int FIXED_SHIFT = 16;  // Số bit phần thập phân của trọng số fixed-point
+
+const double kernel_3x3[3 * 3] = {
+    1.0 / 16, 2.0 / 16, 1.0 / 16,
+    2.0 / 16, 4.0 / 16, 2.0 / 16,
+    1.0 / 16, 2.0 / 16, 1.0 / 16};
+
+const double kernel_5x5[5 * 5] = {
+    1.0/273, 4.0/273,  7.0/273,  4.0/273, 1.0/273,
+    4.0/273, 16.0/273, 26.0/273, 16.0/273, 4.0/273,
+    7.0/273, 26.0/273, 41.0/273, 26.0/273, 7.0/273,
+    4.0/273, 16.0/273, 26.0/273, 16.0/273, 4.0/273,
+    1.0/273, 4.0/273,  7.0/273,  4.0/273, 1.0/273};
+
+const double kernel_7x7[7 * 7] = {
+    0.00000067, 0.00002292, 0.00019117, 0.00038771, 0.00019117, 0.00002292, 0.00000067,
+    0.00002292, 0.00078633, 0.00655965, 0.01330373, 0.00655965, 0.00078633, 0.00002292,
+    0.00019117, 0.00655965, 0.05472157, 0.11098164, 0.05472157, 0.00655965, 0.00019117,
+    0.00038771, 0.01330373, 0.11098164, 0.22508352, 0.11098164, 0.01330373, 0.00038771,
+    0.00019117, 0.00655965, 0.05472157, 0.11098164, 0.05472157, 0.00655965, 0.00019117,
+    0.00002292, 0.00078633, 0.00655965, 0.01330373, 0.00655965, 0.00078633, 0.00002292,
+    0.00000067, 0.00002292, 0.00019117, 0.00038771, 0.00019117, 0.00002292, 0.00000067};
+
+// Tích chập dấu phẩy động với kiểu T cho cả trọng số và tổng (bỏ viền r pixel).
+// Bán kính là tham số template để vòng lặp kernel có cận hằng như blur_3x3/5x5/7x7
+template <typename T, int radius>
+static void convolve_float(const unsigned char *img, unsigned char *output_img, int width, int height,
+                           int channels, const T *kernel) {
+    const int size = 2 * radius + 1;
+    #pragma omp parallel for schedule(static) collapse(2)
+    for (int y = radius; y < height - radius; ++y) {
+        for (int x = radius; x < width - radius; ++x) {
+            for (int c = 0; c < channels; ++c) {
+                T sum = 0;
+                for (int ky = -radius; ky <= radius; ++ky) {
+                    for (int kx = -radius; kx <= radius; ++kx) {
+                        unsigned char pixel_val = img[((y + ky) * width + (x + kx)) * channels + c];
+                        sum += pixel_val * kernel[(ky + radius) * size + kx + radius];
+                    }
+                }
+                output_img[(y * width + x) * channels + c] = (unsigned char)sum;
+            }
+        }
+    }
+}
+
+// Tích chập fixed-point: tổng các pixel * trọng số Q16 rồi dịch phải (bỏ viền r pixel).
+// Tổng trọng số bằng đúng 2^16 nên tổng tối đa là 255 << 16, không tràn int32 và
+// không vượt 255 sau khi dịch
+template <int radius>
+static void convolve_fixed(const unsigned char *img, unsigned char *output_img, int width, int height,
+                           int channels, const int *kernel) {
+    const int size = 2 * radius + 1;
+    #pragma omp parallel for schedule(static) collapse(2)
+    for (int y = radius; y < height - radius; ++y) {
+        for (int x = radius; x < width - radius; ++x) {
+            for (int c = 0; c < channels; ++c) {
+                int sum = 0;
+                for (int ky = -radius; ky <= radius; ++ky) {
+                    for (int kx = -radius; kx <= radius; ++kx) {
+                        int pixel_val = img[((y + ky) * width + (x + kx)) * channels + c];
+                        sum += pixel_val * kernel[(ky + radius) * size + kx + radius];
+                    }
+                }
+                output_img[(y * width + x) * channels + c] = (unsigned char)(sum >> FIXED_SHIFT);
+            }
+        }
+    }
+}
+
+// Chọn bản template theo kiểu số học
+template <int radius>
+static void convolve(const std::string &precision, const unsigned char *img, unsigned char *output_img,
+                     int width, int height, int channels, const double *kernel_d, const float *kernel_f,
+                     const int *kernel_q) {
+    if (precision == "double") {
+        convolve_float<double, radius>(img, output_img, width, height, channels, kernel_d);
+    } else if (precision == "float") {
+        convolve_float<float, radius>(img, output_img, width, height, channels, kernel_f);
+    } else {
+        convolve_fixed<radius>(img, output_img, width, height, channels, kernel_q);
+    }
+}
+
+int main(int argc, char *argv[]) {
+    PhaseTimer timer;
+
+    if (argc < 5) {
+        printf("Usage: %s <image_file> <num_threads> <3|5|7> <double|float|fixed> [repeats]\n", argv[0]);
+        return 1;
+    }
+    char* input_filename = argv[1];
+    int num_threads = atoi(argv[2]);
+    int kernel_size = atoi(argv[3]);
+    std::string precision = argv[4];
+    // Số lần lặp kernel trong cùng một process (mặc định 1)
+    int repeats = 1;
+    if (argc > 5) {
+        repeats = atoi(argv[5]);
+    }
+    const double *kernel = kernel_size == 3 ? kernel_3x3 : kernel_size == 5 ? kernel_5x5
+                         : kernel_size == 7 ? kernel_7x7 : NULL;
+    if (kernel == NULL) {
+        fprintf(stderr, "Unknown kernel size: %d\n", kernel_size);
+        return 1;
+    }
+    if (precision != "double" && precision != "float" && precision != "fixed") {
+        fprintf(stderr, "Unknown precision: %s\n", precision.c_str());
+        return 1;
+    }
+    int radius = kernel_size / 2;
+    int taps = kernel_size * kernel_size;
+
+    // Trọng số theo từng kiểu số học; bản fixed-point dồn sai số làm tròn vào trọng
+    // số trung tâm để tổng trọng số đúng bằng 2^16
+    std::vector<float> kernel_f(kernel, kernel + taps);
+    std::vector<int> kernel_q(taps);
+    int total_q = 0;
+    for (int i = 0; i < taps; ++i) {
+        kernel_q[i] = (int)lround(kernel[i] * (1 << FIXED_SHIFT));
+        total_q += kernel_q[i];
+    }
+    kernel_q[taps / 2] += (1 << FIXED_SHIFT) - total_q;
+
+    int width, height, channels;
+    timer.start();
+    unsigned char *img = stbi_load(input_filename, &width, &height, &channels, 0);
+    timer.decode = timer.stop();
+    if (img == NULL) {
+        return 1;
+    }
+    size_t img_size = width * height * channels;
+    timer.start();
+    // calloc: viền không được tính vẫn có giá trị xác định trong file BLUR_DUMP
+    unsigned char *output_img = (unsigned char *)calloc(img_size, 1);
+    timer.alloc = timer.stop();
+    if (output_img == NULL) {
+        stbi_image_free(img);
+        return 1;
+    }
+
+    omp_set_num_threads(num_threads);
+
+    // Lặp kernel `repeats` lần trên dữ liệu đã đọc, in thời gian của từng lần
+    for (int r = 0; r < repeats; ++r) {
+        // Bắt đầu đo thời gian
+        double start_time = omp_get_wtime();
+
+        if (radius == 1) {
+            convolve<1>(precision, img, output_img, width, height, channels, kernel, kernel_f.data(), kernel_q.data());
+        } else if (radius == 2) {
+            convolve<2>(precision, img, output_img, width, height, channels, kernel, kernel_f.data(), kernel_q.data());
+        } else {
+            convolve<3>(precision, img, output_img, width, height, channels, kernel, kernel_f.data(), kernel_q.data());
+        }
+
+        // Kết thúc đo thời gian và in ra
+        double end_time = omp_get_wtime();
+        printf("%f\n", (end_time - start_time));
+        timer.compute.push_back(end_time - start_time);
+    }
+
+    // Ghi bộ đệm thô (nếu có BLUR_DUMP) để so sánh sai số và kiểm tra với bản tham chiếu
+    dump_buffers(img, output_img, img_size);
+
+    // Ghi ảnh kết quả
+    timer.start();
+    std::string output_name = "output_precision_" + std::to_string(kernel_size) + "_" + precision + ".jpg";
+    stbi_write_jpg(output_name.c_str(), width, height, channels, output_img, 100);
+    timer.encode = timer.stop();
+    timer.report(width, height, channels);
+
+    // Giải phóng bộ nhớ
+    stbi_image_free(img);
+    free(output_img);
+
+    return 0;
+}
@@ -0,0 +1,86 @@
+#include <iostream>
+#include <vector>
+#include <omp.h> // OpenMP cho xử lý song song
+
+// Thư viện xử lý ảnh
+#define STB_IMAGE_IMPLEMENTATION
+#include "stb_image.h"
+#define STB_IMAGE_WRITE_IMPLEMENTATION
+#include "stb_image_write.h"
+
+// Đo thời gian từng giai đoạn, in dòng JSON ở cuối stdout
+#include "../phase_timing.h"
+
+// Ghi bộ đệm ảnh dạng byte thô khi có BLUR_DUMP/BLUR_DUMP_INPUT
+#include "../raw_dump.h"
+
+// Trọng số và vòng lặp tích chập dùng chung với libblur.so
+#include "../blur_kernels.h"
+
+int main(int argc, char *argv[]) {
+    PhaseTimer timer;
+
+    if (argc < 3) {
+        printf("Usage: %s <image_file> <num_threads> [repeats]\n", argv[0]);
+        return 1;
+    }
+    char* input_filename = argv[1];
+    int num_threads = atoi(argv[2]);
+    // Số lần lặp kernel trong cùng một process (mặc định 1)
+    int repeats = 1;
+    if (argc > 3) {
+        repeats = atoi(argv[3]);
+    }
+
+    int width, height, channels;
+    timer.start();
+    unsigned char *img = stbi_load(input_filename, &width, &height, &channels, 0);
+    timer.decode = timer.stop();
+    if (img == NULL) {
+        return 1;
+    }
+    size_t img_size = width * height * channels;
+    timer.start();
+    unsigned char *output_img = (unsigned char *)malloc(img_size);
+    // Bộ đệm trung gian (float) chứa kết quả lượt ngang
+    float *temp_img = (float *)malloc(img_size * sizeof(float));
+    timer.alloc = timer.stop();
+    if (output_img == NULL || temp_img == NULL) {
+        stbi_image_free(img);
+        free(output_img);
+        free(temp_img);
+        return 1;
+    }
+
+    omp_set_num_threads(num_threads);
+
+    // Lặp kernel `repeats` lần trên dữ liệu đã đọc, in thời gian của từng lần
+    for (int r = 0; r < repeats; ++r) {
+        // Bắt đầu đo thời gian
+        double start_time = omp_get_wtime();
+
+        // Hai lượt: ngang rồi dọc qua bộ đệm trung gian, 14 phép tính/pixel thay vì 49
+        blur_separable_static<3>(img, output_img, temp_img, width, height, channels, blur_kernel_1d_7);
+
+        // Kết thúc đo thời gian và in ra
+        double end_time = omp_get_wtime();
+        printf("%f\n", (end_time - start_time));
+        timer.compute.push_back(end_time - start_time);
+    }
+
+    // Ghi bộ đệm thô (nếu có BLUR_DUMP) để kiểm tra với bản tham chiếu
+    dump_buffers(img, output_img, img_size);
+
+    // Ghi ảnh kết quả
+    timer.start();
+    stbi_write_jpg("output_7x7_separable.jpg", width, height, channels, output_img, 100);
+    timer.encode = timer.stop();
+    timer.report(width, height, channels);
+
+    // Giải phóng bộ nhớ
+    stbi_image_free(img);
+    free(output_img);
+    free(temp_img);
+
+    return 0;
+}
\ No newline at end of file
@@ -0,0 +1,91 @@
+#include <iostream>
+#include <vector>
+#include <omp.h> // OpenMP cho xử lý song song
+
+// Đo hai "mái" của mô hình roofline trên máy hiện tại với num_threads luồng:
+//   - Băng thông bộ nhớ: vòng lặp triad kiểu STREAM a[i] = b[i] + s * c[i] trên
+//     các mảng lớn hơn cache (24 byte mỗi iteration, không tính write-allocate)
+//   - Hiệu năng tính toán đỉnh: các chuỗi nhân-cộng (x = x * m + a) độc lập trên
+//     double, đủ nhiều để che độ trễ và được trình biên dịch vector hóa
+// Mỗi phép đo lặp nhiều lần và lấy lần nhanh nhất. Kết quả là dòng JSON cuối stdout:
+// {"threads": ..., "bandwidth_gbs": ..., "gflops": ...}
+
+static const int CHAINS = 32;  // Số chuỗi nhân-cộng độc lập mỗi luồng
+
+int main(int argc, char *argv[]) {
+    if (argc < 2) {
+        printf("Usage: %s <num_threads> [array_mb] [repeats]\n", argv[0]);
+        return 1;
+    }
+    int num_threads = atoi(argv[1]);
+    // Kích thước mỗi mảng của triad (MB), mặc định 128 MB, lớn hơn cache cuối
+    long array_mb = argc > 2 ? atol(argv[2]) : 128;
+    int repeats = argc > 3 ? atoi(argv[3]) : 5;
+    omp_set_num_threads(num_threads);
+
+    // --- Băng thông bộ nhớ (triad) ---
+    long n = array_mb * 1024 * 1024 / sizeof(double);
+    double *a = (double *)malloc(n * sizeof(double));
+    double *b = (double *)malloc(n * sizeof(double));
+    double *c = (double *)malloc(n * sizeof(double));
+    if (a == NULL || b == NULL || c == NULL) {
+        return 1;
+    }
+    // Khởi tạo song song để các trang bộ nhớ nằm gần luồng sẽ dùng chúng (first touch)
+    #pragma omp parallel for schedule(static)
+    for (long i = 0; i < n; ++i) {
+        a[i] = 0.0;
+        b[i] = 1.0;
+        c[i] = 2.0;
+    }
+    double best_triad = 1e30;
+    const double scalar = 3.0;
+    for (int r = 0; r < repeats; ++r) {
+        double start_time = omp_get_wtime();
+        #pragma omp parallel for schedule(static)
+        for (long i = 0; i < n; ++i) {
+            a[i] = b[i] + scalar * c[i];
+        }
+        double elapsed = omp_get_wtime() - start_time;
+        if (elapsed < best_triad) best_triad = elapsed;
+    }
+    double bandwidth = 3.0 * sizeof(double) * n / best_triad / 1e9;
+
+    // --- Hiệu năng tính toán đỉnh (nhân-cộng double) ---
+    const long iterations = 2000000;
+    double best_flops = 1e30;
+    double checksum = 0.0;
+    for (int r = 0; r < repeats; ++r) {
+        double start_time = omp_get_wtime();
+        #pragma omp parallel reduction(+:checksum)
+        {
+            double x[CHAINS];
+            for (int j = 0; j < CHAINS; ++j) x[j] = 1.0 + j * 1e-3 + omp_get_thread_num();
+            for (long i = 0; i < iterations; ++i) {
+                for (int j = 0; j < CHAINS; ++j) {
+                    x[j] = x[j] * 0.999999 + 0.000001;
+                }
+            }
+            for (int j = 0; j < CHAINS; ++j) checksum += x[j];
+        }
+        double elapsed = omp_get_wtime() - start_time;
+        if (elapsed < best_flops) best_flops = elapsed;
+    }
+    int team_size = 1;
+    #pragma omp parallel
+    {
+        #pragma omp master
+        team_size = omp_get_num_threads();
+    }
+    double gflops = 2.0 * CHAINS * iterations * team_size / best_flops / 1e9;
+
+    // Tránh việc trình biên dịch loại bỏ các vòng lặp
+    fprintf(stderr, "checksum: %f %f\n", checksum, a[n / 2]);
+    printf("{\"threads\": %d, \"bandwidth_gbs\": %f, \"gflops\": %f, \"array_mb\": %ld}\n",
+           team_size, bandwidth, gflops, array_mb);
+
+    free(a);
+    free(b);
+    free(c);
+    return 0;
+}
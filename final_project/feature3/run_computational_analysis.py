@@ -1,55 +1,105 @@
 import subprocess
 import numpy as np
-import matplotlib.pyplot as plt
 import os
+import json
+import argparse
 import glob
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from bench import (
+    DEFAULT_TABLE_PATH, BuildError, TuningTable, add_benchmark_arguments, benchmark_options,
+    build_targets, coordinate_search, host_id,
+    add_plot_arguments, add_results_arguments, add_thread_arguments, describe_options,
+    describe_topology, detect_topology, end_to_end_series, format_stats, plan_threads, pyplot,
+    read_results, render_charts, report_store, results_meta, run_benchmark, run_once, shade_topology,
+    thread_ladder, write_results,
+)
 
 # --- Cấu hình thực nghiệm ---
-NUM_RUNS = 5  # Số lần chạy mỗi cấu hình để lấy trung bình
-THREAD_COUNTS = [1, 2, 4, 8, 12, 16]  # Các số luồng cần kiểm tra
+NUM_RUNS = 5  # Số mẫu được tính vào thống kê cho mỗi cấu hình
+WARMUP_RUNS = 1  # Số lần chạy khởi động bị loại bỏ
+BENCH_OPTIONS = {'runs': NUM_RUNS, 'warmup': WARMUP_RUNS}  # Tham số cho run_benchmark, ghi đè từ dòng lệnh
+TOPOLOGY = detect_topology()  # CPU dùng được và số lõi vật lý của máy
+THREAD_COUNTS = thread_ladder(TOPOLOGY)  # Các số luồng cần kiểm tra (theo topology), ghi đè bằng --threads
 BASELINE_EXE = "./blur_baseline"
 KERNEL_3X3_EXE = "./blur_3x3"
 KERNEL_5X5_EXE = "./blur_5x5"
 KERNEL_7X7_EXE = "./blur_7x7"
+SEPARABLE_5X5_EXE = "./blur_5x5_sep"  # 5x5 tách được: lượt ngang rồi lượt dọc (xấp xỉ hạng 1 của kernel 1/273)
+SEPARABLE_7X7_EXE = "./blur_7x7_sep"  # 7x7 tách được (Gaussian sigma = 1, chính xác)
+PROBE_EXE = "./roofline_probe"  # Đo băng thông bộ nhớ và GFLOP/s đỉnh của máy (mái của roofline)
+PROBE_ARRAY_MB = 128  # Kích thước mỗi mảng của phép đo băng thông (MB), cần lớn hơn cache cuối
+RESULTS_FILE = "results.jsonl"  # Mẫu thô và kết quả dẫn xuất, dùng cho --replot/--report-only
+CHART_DPI = 100  # Độ phân giải biểu đồ, ghi đè bằng --dpi
+PLOT_JOBS = None  # Số process vẽ biểu đồ (None = số CPU), ghi đè bằng --plot-jobs
 
-# Thông tin về kernel để phân tích
+# Thông tin về kernel để phân tích: số phép nhân-cộng mỗi pixel/kênh, số byte bộ nhớ
+# bắt buộc mỗi pixel/kênh (đọc ảnh vào 1 + ghi ảnh ra 1; bản tách được thêm ghi và đọc
+# bộ đệm float 4 + 4), bản tuần tự cùng lượng công việc ('baseline'), màu và kiểu đường
+# trên biểu đồ; bản tách được (separable) ghi kernel 2D tương ứng trong 'direct'
 KERNEL_INFO = {
-    "3x3": {"name": "3x3 Kernel", "operations": 9, "executable": KERNEL_3X3_EXE},
-    "5x5": {"name": "5x5 Kernel", "operations": 25, "executable": KERNEL_5X5_EXE},
-    "7x7": {"name": "7x7 Kernel", "operations": 49, "executable": KERNEL_7X7_EXE}
+    "3x3": {"name": "3x3 Kernel", "operations": 9, "bytes": 2, "executable": KERNEL_3X3_EXE,
+            "baseline": BASELINE_EXE, "color": "blue", "style": "o-"},
+    "5x5": {"name": "5x5 Kernel", "operations": 25, "bytes": 2, "executable": KERNEL_5X5_EXE,
+            "baseline": "./blur_5x5_seq", "color": "green", "style": "o-"},
+    "7x7": {"name": "7x7 Kernel", "operations": 49, "bytes": 2, "executable": KERNEL_7X7_EXE,
+            "baseline": "./blur_7x7_seq", "color": "red", "style": "o-"},
+    "5x5-sep": {"name": "5x5 Separable", "operations": 10, "bytes": 10, "executable": SEPARABLE_5X5_EXE,
+                "baseline": "./blur_5x5_sep_seq", "color": "green", "style": "D:", "direct": "5x5"},
+    "7x7-sep": {"name": "7x7 Separable", "operations": 14, "bytes": 10, "executable": SEPARABLE_7X7_EXE,
+                "baseline": "./blur_7x7_sep_seq", "color": "red", "style": "D:", "direct": "7x7"},
 }
 
+# --- Cấu hình autotune kích thước tile (--autotune) ---
+TILED_EXE = "./blur_tiled"  # Kernel 7x7 chia tile, kích thước tile từ BLUR_TILE_W/BLUR_TILE_H
+TILE_WIDTHS = [16, 32, 64, 128, 256, 512, 0]  # Pixel, 0 = cả chiều rộng ảnh
+TILE_HEIGHTS = [1, 2, 4, 8, 16, 32, 64]  # Hàng, 0 = cả chiều cao ảnh
+AUTOTUNE_RESULTS_FILE = "autotune_results.jsonl"
+TUNING_TABLE = DEFAULT_TABLE_PATH  # Bảng tra cứu tile tốt nhất theo máy/kích thước ảnh/số luồng
+
+# --- Cấu hình quét bán kính (--radius-sweep) ---
+ENGINE_EXE = "./blur_engine"  # Bán kính và sigma chọn lúc chạy, thuật toán direct/separable/boxsum
+SWEEP_METHODS = ['direct', 'separable', 'boxsum']
+SWEEP_RADII = [1, 2, 3, 4, 5, 6, 8, 10, 12, 15, 20, 25, 30]
+SWEEP_SIGMA = 0.0  # 0 = radius / 3 (kernel phủ ±3 sigma)
+SWEEP_THREADS = None  # Số luồng khi quét bán kính (None = số lõi vật lý)
+SWEEP_CUTOFF = 20.0  # Ngừng đo một thuật toán ở các bán kính lớn hơn khi nó chậm hơn thuật toán nhanh nhất quá số lần này
+RADIUS_SWEEP_RESULTS_FILE = "radius_sweep_results.jsonl"
+METHOD_COLORS = {'direct': 'red', 'separable': 'green', 'boxsum': 'blue'}
+
+# --- Cấu hình so sánh kiểu số học (--precision) ---
+PRECISION_EXE = "./blur_precision"  # Kernel 3x3/5x5/7x7 với số học double, float hoặc fixed-point Q16
+PRECISION_KERNELS = [3, 5, 7]
+PRECISIONS = ['double', 'float', 'fixed']  # 'double' là bản chuẩn để đo sai số
+PRECISION_THREADS = None  # Số luồng khi so sánh (None = số lõi vật lý)
+QUALITY_MAX_ABS = 1  # Ngưỡng chất lượng: sai khác tối đa (mức xám) so với bản double
+QUALITY_MIN_PSNR = 50.0  # Ngưỡng chất lượng: PSNR tối thiểu (dB) so với bản double
+PRECISION_RESULTS_FILE = "precision_results.jsonl"
+PRECISION_COLORS = {'double': 'red', 'float': 'orange', 'fixed': 'blue'}
+
+# --- Cấu hình so sánh bố cục ảnh (--planar) ---
+PLANAR_EXE = "./blur_planar"  # Kernel 3x3/5x5/7x7 trên bố cục planar (mỗi kênh một mặt phẳng)
+PLANAR_KERNELS = [3, 5, 7]  # So với blur_3x3/5x5/7x7 (bố cục xen kẽ RGBRGB...)
+PLANAR_THREADS = None  # Số luồng khi so sánh (None = số lõi vật lý)
+PLANAR_RESULTS_FILE = "planar_results.jsonl"
+
 def compile_code():
-    """Biên dịch code C++ bằng Makefile."""
+    """Biên dịch code C++ từ Makefile, chỉ build lại các target đã thay đổi."""
     print("--- Compiling C++ code ---")
     try:
-        subprocess.run(["make", "clean"], check=True, capture_output=True, text=True)
-        subprocess.run(["make"], check=True, capture_output=True, text=True)
-        print("Compilation successful.")
-        return True
-    except (FileNotFoundError, subprocess.CalledProcessError) as e:
+        result = build_targets()
+    except BuildError as e:
         print(f"Error during compilation: {e}")
-        if hasattr(e, 'stderr'): print(e.stderr)
         return False
+    print(f"Compilation successful ({len(result['built'])} built, {len(result['cached'])} up to date).")
+    return True
 
-def run_benchmark(executable, args=[]):
-    """Chạy một file thực thi nhiều lần và trả về thời gian trung bình."""
-    timings = []
-    for _ in range(NUM_RUNS):
-        try:
-            result = subprocess.run(
-                [executable] + args, check=True, capture_output=True, text=True
-            )
-            timings.append(float(result.stdout.strip().split('\n')[-1]))
-        except (subprocess.CalledProcessError, ValueError, IndexError) as e:
-            print(f"Error running {executable} with args {args}: {e}")
-            if hasattr(e, 'stderr'): print(e.stderr)
-            return None
-    return np.mean(timings) if timings else None
-
-def generate_report(baseline_time, results):
+def generate_report(baseline_stats, results, roofs):
     """Tạo file báo cáo Markdown từ kết quả thu thập được."""
     print("\n--- Generating REPORT.md ---")
+    baseline_time = baseline_stats['median']
     
     report_content = "# Báo cáo Phân tích Ảnh hưởng của Cường độ Tính toán (Computational Intensity)\n\n"
     report_content += "Phân tích hiệu năng song song khi thay đổi kích thước kernel từ 3x3, 5x5 đến 7x7.\n\n"
@@ -59,11 +109,28 @@ def generate_report(baseline_time, results):
     report_content += "- **Kernel 3x3**: 9 phép nhân + 9 phép cộng = 18 operations/pixel\n"
     report_content += "- **Kernel 5x5**: 25 phép nhân + 25 phép cộng = 50 operations/pixel\n"
     report_content += "- **Kernel 7x7**: 49 phép nhân + 49 phép cộng = 98 operations/pixel\n\n"
+    report_content += (
+        "Kernel Gaussian là **tách được (separable)**: tích chập 2D k×k bằng một lượt ngang rồi một lượt "
+        "dọc với kernel 1D k phần tử (qua bộ đệm trung gian), chỉ còn 2k thay vì k² phép nhân-cộng mỗi pixel: "
+        "10 thay vì 25 (5x5) và 14 thay vì 49 (7x7). Kernel 7x7 (sigma = 1) tách được chính xác; ma trận 5x5 "
+        "(1/273) thì không, nên bản 5x5 tách được dùng xấp xỉ hạng 1 `[17, 66, 107, 66, 17]/273`.\n\n"
+    )
+    report_content += (
+        "Speedup và efficiency của mỗi kernel được tính so với **bản tuần tự của chính kernel đó** "
+        "(cùng source, biên dịch không có OpenMP), nên các kernel được so sánh trên cùng lượng công việc.\n\n"
+    )
     report_content += "**Giả thuyết**: Kernel lớn hơn (nhiều tính toán hơn) sẽ có Speedup và Efficiency tốt hơn vì overhead của song song hóa trở nên nhỏ bé hơn so với thời gian tính toán.\n\n"
 
     # Thông tin baseline
     report_content += f"## 2. Kết quả Thực nghiệm\n\n"
-    report_content += f"**Thời gian chạy tuần tự (baseline - 3x3):** {baseline_time:.4f} giây\n\n"
+    report_content += "**Thời gian chạy tuần tự (baseline của từng kernel):**\n\n"
+    report_content += "| Kernel | Sequential Program | Sequential Time (s) |\n"
+    report_content += "|--------|--------------------|---------------------|\n"
+    for kernel_name, data in results.items():
+        program = KERNEL_INFO[kernel_name]['baseline'] if data['baseline'] is not baseline_stats else BASELINE_EXE
+        report_content += f"| {kernel_name:<6} | `{program.lstrip('./')}` | {data['baseline']['median']:<19.4f} |\n"
+    report_content += "\n"
+    report_content += f"**Số luồng được test:** {THREAD_COUNTS} (topology CPU: {describe_topology(TOPOLOGY)})\n\n"
     
     # Bảng so sánh chi tiết
     report_content += "### So sánh chi tiết theo kernel size\n\n"
@@ -72,10 +139,10 @@ def generate_report(baseline_time, results):
     
     for i, p in enumerate(results["3x3"]["threads"]):
         if i < len(results["5x5"]["threads"]) and i < len(results["7x7"]["threads"]):
-            speedup_3x3 = baseline_time / results["3x3"]["times"][i]
-            speedup_5x5 = baseline_time / results["5x5"]["times"][i] 
-            speedup_7x7 = baseline_time / results["7x7"]["times"][i]
-            
+            speedup_3x3 = results["3x3"]["speedups"][i]
+            speedup_5x5 = results["5x5"]["speedups"][i]
+            speedup_7x7 = results["7x7"]["speedups"][i]
+
             report_content += (
                 f"| {p:<7} | {results['3x3']['times'][i]:<12.4f} | {results['5x5']['times'][i]:<12.4f} | {results['7x7']['times'][i]:<12.4f} | "
                 f"{speedup_3x3:<11.2f}x | {speedup_5x5:<11.2f}x | {speedup_7x7:<11.2f}x |\n"
@@ -86,6 +153,70 @@ def generate_report(baseline_time, results):
     report_content += "![Speedup Comparison](computational_intensity_speedup.png)\n"
     report_content += "![Efficiency Comparison](computational_intensity_efficiency.png)\n\n"
 
+    # Thời gian đầu-cuối: đọc ảnh + cấp phát + tính toán + ghi ảnh
+    e2e_kernels = [k for k in results if results[k]['e2e'] is not None]
+    if e2e_kernels:
+        phases = baseline_stats['phases']
+        report_content += "### Đầu-cuối (decode + alloc + compute + encode)\n\n"
+        report_content += (
+            f"Baseline 3x3: decode {phases['decode']:.4f}s, alloc {phases['alloc']:.4f}s, "
+            f"compute {baseline_time:.4f}s, encode {phases['encode']:.4f}s → "
+            f"**{baseline_stats['end_to_end']:.4f}s** ({baseline_stats['throughput']:.1f} MP/s)\n\n"
+        )
+        report_content += "| Kernel | Threads | Kernel Speedup | E2E Time (s) | E2E Speedup | Throughput (MP/s) | Compute / E2E |\n"
+        report_content += "|--------|---------|----------------|--------------|-------------|-------------------|---------------|\n"
+        for kernel_name in e2e_kernels:
+            data = results[kernel_name]
+            for i, p in enumerate(data['threads']):
+                stats = data['stats'][i]
+                report_content += (
+                    f"| {kernel_name:<6} | {p:<7} | {data['speedups'][i]:<14.2f}x | {data['e2e']['times'][i]:<12.4f} | "
+                    f"{data['e2e']['speedups'][i]:<11.2f}x | {data['e2e']['throughputs'][i]:<17.1f} | "
+                    f"{stats['median'] / stats['end_to_end']:<13.1%} |\n"
+                )
+        report_content += "\n![End-to-End Speedup](computational_intensity_end_to_end.png)\n\n"
+
+    # Tích chập trực tiếp so với tách được
+    pairs = separable_pairs(results)
+    if pairs:
+        report_content += "### Trực tiếp (2D) so với tách được (separable)\n\n"
+        report_content += "| Kernel | Threads | Direct Time (s) | Separable Time (s) | Separable Speedup | Ops/pixel |\n"
+        report_content += "|--------|---------|-----------------|--------------------|-------------------|-----------|\n"
+        for direct, separable in pairs:
+            for p, direct_time, separable_time in separable_comparison(results, direct, separable):
+                report_content += (
+                    f"| {direct:<6} | {p:<7} | {direct_time:<15.4f} | {separable_time:<18.4f} | "
+                    f"{direct_time / separable_time:<17.2f}x | "
+                    f"{results[direct]['operations']} → {results[separable]['operations']} |\n"
+                )
+        report_content += "\n![Direct vs Separable](computational_intensity_separable.png)\n\n"
+
+    # Roofline: kernel bị giới hạn bởi băng thông bộ nhớ hay khả năng tính toán
+    roofline = analyze_roofline(results, roofs)
+    if roofline:
+        report_content += "### Roofline\n\n"
+        report_content += (
+            "Mái của máy được đo bằng `roofline_probe` ở từng số luồng: băng thông bộ nhớ (triad kiểu STREAM) "
+            "và GFLOP/s đỉnh (chuỗi nhân-cộng double, cùng cờ biên dịch với các kernel). Mỗi kernel có "
+            "cường độ số học = FLOP / byte bộ nhớ bắt buộc mỗi pixel/kênh; mái đạt được = "
+            "min(GFLOP/s đỉnh, cường độ × băng thông).\n\n"
+        )
+        report_content += "| Threads | Bandwidth (GB/s) | Peak (GFLOP/s) | Ridge (FLOP/B) |\n"
+        report_content += "|---------|------------------|----------------|----------------|\n"
+        for p, roof in sorted(roofs.items()):
+            report_content += (
+                f"| {p:<7} | {roof['bandwidth_gbs']:<16.2f} | {roof['gflops']:<14.2f} | "
+                f"{roof['gflops'] / roof['bandwidth_gbs']:<14.2f} |\n"
+            )
+        report_content += "\n| Kernel | Threads | FLOP/B | GFLOP/s | GB/s | Roof (GFLOP/s) | Bound | % of Roof |\n"
+        report_content += "|--------|---------|--------|---------|------|----------------|-------|-----------|\n"
+        for row in roofline:
+            report_content += (
+                f"| {row['kernel']:<6} | {row['threads']:<7} | {row['intensity']:<6.1f} | {row['gflops']:<7.2f} | "
+                f"{row['bandwidth']:<4.2f} | {row['roof']:<14.2f} | {row['bound']:<7} | {row['fraction']:<9.1%} |\n"
+            )
+        report_content += "\n![Roofline](computational_intensity_roofline.png)\n\n"
+
     # Phân tích chi tiết
     report_content += "## 3. Phân tích Kết quả\n\n"
     
@@ -109,7 +240,41 @@ def generate_report(baseline_time, results):
     report_content += "**3. Cache Performance:**\n"
     report_content += "- Kernel lớn hơn có thể tận dụng tốt hơn dữ liệu đã load vào cache\n"
     report_content += "- Mỗi pixel được tính toán nhiều hơn, giảm memory bandwidth pressure\n\n"
+
+    if roofline:
+        report_content += "**Roofline (đo được):**\n"
+        for kernel_name in results:
+            rows = [row for row in roofline if row['kernel'] == kernel_name]
+            if not rows:
+                continue
+            row = rows[-1]
+            limit = "băng thông bộ nhớ" if row['bound'] == 'memory' else "khả năng tính toán"
+            report_content += (
+                f"- {kernel_name}: {row['intensity']:.1f} FLOP/byte → bị giới hạn bởi **{limit}** "
+                f"({row['bound']}-bound), đạt {row['gflops']:.2f} GFLOP/s = {row['fraction']:.0%} mái "
+                f"ở {row['threads']} luồng\n"
+            )
+        report_content += (
+            "- Byte tính theo lưu lượng bắt buộc (mỗi pixel đọc/ghi một lần), nên cường độ số học là giới hạn "
+            "trên; khoảng cách còn lại đến mái là các lệnh ngoài nhân-cộng mà mô hình không tính "
+            "(chuyển uchar → double, tính chỉ số mảng) và truy cập các hàng lân cận\n\n"
+        )
     
+    if pairs:
+        report_content += "**4. Thuật toán trước, song song sau:**\n"
+        for direct, separable in pairs:
+            comparison = separable_comparison(results, direct, separable)
+            ratios = [d / s for _, d, s in comparison]
+            report_content += (
+                f"- {direct}: bản tách được nhanh hơn {min(ratios):.2f}x–{max(ratios):.2f}x so với tích chập "
+                f"trực tiếp ở mọi số luồng ({results[direct]['operations']} → "
+                f"{results[separable]['operations']} phép nhân-cộng mỗi pixel)\n"
+            )
+        report_content += (
+            "- Giảm số phép tính làm giảm computational intensity, nên speedup theo số luồng của bản tách "
+            "được có thể thấp hơn, dù thời gian tuyệt đối nhỏ hơn nhiều\n\n"
+        )
+
     report_content += "### 3.3. Ý nghĩa thực tiễn\n\n"
     report_content += "**Nguyên tắc thiết kế:**\n"
     report_content += "- Với bài toán có **computational intensity thấp**: Song song hóa có thể không hiệu quả\n"
@@ -125,11 +290,342 @@ def generate_report(baseline_time, results):
         f.write(report_content)
     print("Generated REPORT.md successfully.")
 
-def main():
-    """Hàm chính điều phối toàn bộ quá trình."""
-    if not compile_code():
+def analyze_kernel(baseline_stats, kernel_name, kernel_stats, threads):
+    """
+    Tính speedup, efficiency và số liệu đầu-cuối của một kernel từ thống kê đo được.
+
+    baseline_stats là bản tuần tự của chính kernel đó, nên speedup so sánh cùng
+    một lượng công việc.
+    """
+    threads_np = np.array(threads)
+    times = np.array([stats['median'] for stats in kernel_stats])
+    speedups = baseline_stats['median'] / times
+    return {
+        'threads': threads_np,
+        'times': times,
+        'stats': kernel_stats,
+        'baseline': baseline_stats,
+        'operations': KERNEL_INFO[kernel_name]['operations'],
+        'speedups': speedups,
+        'efficiencies': speedups / threads_np,
+        'e2e': end_to_end_series(baseline_stats, kernel_stats),
+    }
+
+def separable_pairs(results):
+    """Các cặp (kernel trực tiếp, kernel tách được) đều có trong kết quả."""
+    return [(info['direct'], name) for name, info in KERNEL_INFO.items()
+            if 'direct' in info and name in results and info['direct'] in results]
+
+def separable_comparison(results, direct, separable):
+    """Danh sách (số luồng, thời gian trực tiếp, thời gian tách được) ở các số luồng chung."""
+    separable_times = dict(zip(results[separable]['threads'].tolist(), results[separable]['times']))
+    return [(int(p), t, separable_times[int(p)]) for p, t in zip(results[direct]['threads'], results[direct]['times'])
+            if int(p) in separable_times]
+
+def results_to_records(baseline_stats, results, roofs):
+    """
+    Chuyển kết quả thành các bản ghi để lưu ra file: baseline 3x3, baseline tuần tự
+    của từng kernel ('baseline_of'), từng kernel/số luồng và phép đo roofline ('probe').
+    """
+    records = [{'kernel': 'baseline', 'threads': None, 'stats': baseline_stats}]
+    for kernel_name, data in results.items():
+        if data['baseline'] is not baseline_stats:
+            records.append({'kernel': 'baseline', 'baseline_of': kernel_name, 'threads': None,
+                            'stats': data['baseline']})
+        for i, p in enumerate(data['threads']):
+            records.append({
+                'kernel': kernel_name, 'threads': int(p), 'operations': data['operations'],
+                'speedup': data['speedups'][i], 'efficiency': data['efficiencies'][i],
+                'stats': data['stats'][i],
+            })
+    records += [{'kernel': 'probe', 'threads': p, 'probe': roof} for p, roof in roofs.items()]
+    return records
+
+def records_to_results(records):
+    """
+    Dựng lại (baseline_stats, results, roofs) từ các bản ghi đã lưu.
+
+    File cũ chỉ có một baseline (3x3 tuần tự) và không có phép đo roofline: mọi
+    kernel dùng chung baseline đó như trước, roofs rỗng.
+    """
+    baseline_stats = next(r['stats'] for r in records if r['kernel'] == 'baseline' and not r.get('baseline_of'))
+    kernel_baselines = {r['baseline_of']: r['stats'] for r in records
+                        if r['kernel'] == 'baseline' and r.get('baseline_of')}
+    roofs = {r['threads']: r['probe'] for r in records if r['kernel'] == 'probe'}
+    results = {}
+    for kernel_name in dict.fromkeys(r['kernel'] for r in records if r['kernel'] not in ('baseline', 'probe')):
+        kernel_records = [r for r in records if r['kernel'] == kernel_name]
+        results[kernel_name] = analyze_kernel(
+            kernel_baselines.get(kernel_name, baseline_stats), kernel_name,
+            [r['stats'] for r in kernel_records], [r['threads'] for r in kernel_records],
+        )
+    return baseline_stats, results, roofs
+
+def measure_roofs(thread_counts):
+    """
+    Chạy roofline_probe với từng số luồng.
+
+    Returns:
+        dict: {số luồng: {'threads', 'bandwidth_gbs', 'gflops', 'array_mb'}}, bỏ qua
+        các số luồng đo lỗi
+    """
+    roofs = {}
+    for p in thread_counts:
+        try:
+            result = subprocess.run([PROBE_EXE, str(p), str(PROBE_ARRAY_MB)],
+                                    check=True, capture_output=True, text=True)
+            roofs[p] = json.loads(result.stdout.strip().splitlines()[-1])
+        except (OSError, subprocess.CalledProcessError, ValueError, IndexError) as e:
+            print(f"  Probe failed with {p} threads: {e}")
+            continue
+        print(f"  {p} threads: {roofs[p]['bandwidth_gbs']:.1f} GB/s, {roofs[p]['gflops']:.1f} GFLOP/s")
+    return roofs
+
+def analyze_roofline(results, roofs):
+    """
+    Đặt từng kernel/số luồng lên mô hình roofline của máy.
+
+    FLOP mỗi pixel/kênh = 2 x số phép nhân-cộng; byte mỗi pixel/kênh là lưu lượng bộ
+    nhớ bắt buộc ('bytes' trong KERNEL_INFO, coi các pixel lân cận đã nằm trong cache).
+    Mái đạt được = min(GFLOP/s đỉnh, cường độ số học x băng thông) đo ở cùng số luồng.
+
+    Returns:
+        list: Mỗi kernel/số luồng có phép đo roofline một dict: kernel, threads,
+        intensity (FLOP/byte), gflops và bandwidth (GB/s) đạt được, roof (GFLOP/s),
+        ridge (FLOP/byte tại đó hai mái gặp nhau), bound ('memory' hoặc 'compute')
+        và fraction (gflops / roof)
+    """
+    rows = []
+    for kernel_name, data in results.items():
+        info = KERNEL_INFO[kernel_name]
+        flops = 2 * info['operations']
+        intensity = flops / info['bytes']
+        for p, stats in zip(data['threads'], data['stats']):
+            roof = roofs.get(int(p))
+            if roof is None or not stats.get('phase_samples'):
+                continue
+            last = stats['phase_samples'][-1]
+            elements = last['width'] * last['height'] * last['channels']
+            gflops = flops * elements / stats['median'] / 1e9
+            memory_roof = intensity * roof['bandwidth_gbs']
+            attainable = min(roof['gflops'], memory_roof)
+            rows.append({
+                'kernel': kernel_name, 'threads': int(p), 'intensity': intensity, 'gflops': gflops,
+                'bandwidth': info['bytes'] * elements / stats['median'] / 1e9, 'roof': attainable,
+                'ridge': roof['gflops'] / roof['bandwidth_gbs'],
+                'bound': 'memory' if memory_roof < roof['gflops'] else 'compute',
+                'fraction': gflops / attainable,
+            })
+    return rows
+
+def comparison_threads(results, topology):
+    """
+    Số luồng cho các cột của bảng so sánh, chọn từ các số luồng đã đo: số lớn nhất
+    không vượt quá số lõi vật lý và số luồng lớn nhất (một cột nếu trùng nhau).
+    """
+    measured = sorted({int(p) for data in results.values() for p in data['threads']})
+    if not measured:
+        return []
+    within_cores = [p for p in measured if p <= topology['physical']]
+    return sorted({within_cores[-1] if within_cores else measured[0], measured[-1]})
+
+def print_comparison(results):
+    """In bảng so sánh speedup giữa các kernel ra màn hình."""
+    columns = comparison_threads(results, TOPOLOGY)
+    labels = [f"{p} threads Speedup" for p in columns]
+    print(f"\n--- Computational Intensity Comparison ---")
+    print(f"{'Kernel':<8} {'Ops/pixel':<12} " + " ".join(f"{label:<19}" for label in labels))
+    print("-" * (21 + 20 * len(columns)))
+
+    for kernel_name in results:
+        ops = results[kernel_name]['operations']
+        threads = results[kernel_name]['threads']
+        speedups = results[kernel_name]['speedups']
+
+        cells = []
+        for p in columns:
+            # N/A khi số luồng này của kernel bị lỗi và bỏ qua
+            idx = np.where(threads == p)[0]
+            cells.append(f"{speedups[idx[0]]:.2f}x" if len(idx) else "N/A")
+        print(f"{kernel_name:<8} {ops:<12} " + " ".join(f"{cell:<19}" for cell in cells))
+
+    for direct, separable in separable_pairs(results):
+        print(f"\n{direct} direct vs separable:")
+        for p, direct_time, separable_time in separable_comparison(results, direct, separable):
+            print(f"  {p:>4} threads: {direct_time:.6f}s vs {separable_time:.6f}s ({direct_time / separable_time:.2f}x)")
+
+def chart_time(results, thread_counts, dpi=CHART_DPI):
+    """Biểu đồ thời gian chạy của các kernel."""
+    plt = pyplot()
+    plt.figure(figsize=(12, 6))
+    for kernel_name, data in results.items():
+        plt.plot(data['threads'], data['times'], KERNEL_INFO[kernel_name]['style'],
+                label=f"{KERNEL_INFO[kernel_name]['name']}", color=KERNEL_INFO[kernel_name]['color'])
+    
+    plt.title('Execution Time vs Thread Count for Different Kernel Sizes')
+    plt.xlabel('Number of Threads')
+    plt.ylabel('Execution Time (seconds)')
+    plt.grid(True)
+    plt.legend()
+    plt.xticks(thread_counts)
+    plt.savefig("computational_intensity_time.png", dpi=dpi)
+    print("Saved time comparison chart")
+    plt.close()
+
+def chart_speedup(results, thread_counts, topology=None, dpi=CHART_DPI):
+    """Biểu đồ speedup của các kernel."""
+    plt = pyplot()
+    plt.figure(figsize=(12, 6))
+    for kernel_name, data in results.items():
+        plt.plot(data['threads'], data['speedups'], KERNEL_INFO[kernel_name]['style'],
+                label=f"{KERNEL_INFO[kernel_name]['name']}", color=KERNEL_INFO[kernel_name]['color'])
+    
+    plt.plot(thread_counts, thread_counts, 'k--', alpha=0.5, label='Ideal Speedup')
+    plt.title('Speedup vs Thread Count for Different Computational Intensities')
+    plt.xlabel('Number of Threads')
+    plt.ylabel('Speedup')
+    shade_topology(plt.gca(), topology)
+    plt.grid(True)
+    plt.legend()
+    plt.xticks(thread_counts)
+    plt.savefig("computational_intensity_speedup.png", dpi=dpi)
+    print("Saved speedup comparison chart")
+    plt.close()
+
+def chart_efficiency(results, thread_counts, dpi=CHART_DPI):
+    """Biểu đồ efficiency của các kernel."""
+    plt = pyplot()
+    plt.figure(figsize=(12, 6))
+    for kernel_name, data in results.items():
+        plt.plot(data['threads'], data['efficiencies'], KERNEL_INFO[kernel_name]['style'],
+                label=f"{KERNEL_INFO[kernel_name]['name']}", color=KERNEL_INFO[kernel_name]['color'])
+    
+    plt.axhline(y=1.0, color='k', linestyle='--', alpha=0.5, label='Ideal Efficiency')
+    plt.title('Efficiency vs Thread Count for Different Computational Intensities')
+    plt.xlabel('Number of Threads')
+    plt.ylabel('Efficiency')
+    plt.grid(True)
+    plt.legend()
+    plt.xticks(thread_counts)
+    plt.ylim(0, 1.1)
+    plt.gca().yaxis.set_major_formatter(plt.FuncFormatter('{:.0%}'.format))
+    plt.savefig("computational_intensity_efficiency.png", dpi=dpi)
+    print("Saved efficiency comparison chart")
+    plt.close()
+
+def chart_end_to_end(results, thread_counts, dpi=CHART_DPI):
+    """Biểu đồ speedup chỉ tính kernel so với speedup đầu-cuối."""
+    plt = pyplot()
+    plt.figure(figsize=(12, 6))
+    for kernel_name, data in results.items():
+        if data['e2e'] is None:
+            continue
+        plt.plot(data['threads'], data['speedups'], KERNEL_INFO[kernel_name]['style'],
+                label=f"{KERNEL_INFO[kernel_name]['name']} (kernel)", color=KERNEL_INFO[kernel_name]['color'])
+        plt.plot(data['threads'], data['e2e']['speedups'], 's--',
+                label=f"{KERNEL_INFO[kernel_name]['name']} (end-to-end)", color=KERNEL_INFO[kernel_name]['color'], alpha=0.6)
+
+    plt.axhline(y=1.0, color='k', linestyle='-', alpha=0.5)
+    plt.title('Kernel-only vs End-to-End Speedup (decode + compute + encode)')
+    plt.xlabel('Number of Threads')
+    plt.ylabel('Speedup')
+    plt.grid(True)
+    plt.legend()
+    plt.xticks(thread_counts)
+    plt.savefig("computational_intensity_end_to_end.png", dpi=dpi)
+    print("Saved end-to-end speedup chart")
+    plt.close()
+
+def chart_separable(results, thread_counts, dpi=CHART_DPI):
+    """Biểu đồ speedup của bản tách được so với tích chập trực tiếp theo số luồng."""
+    plt = pyplot()
+    plt.figure(figsize=(12, 6))
+    for direct, separable in separable_pairs(results):
+        comparison = separable_comparison(results, direct, separable)
+        plt.plot([p for p, _, _ in comparison], [d / s for _, d, s in comparison], KERNEL_INFO[separable]['style'],
+                 label=f"{KERNEL_INFO[separable]['name']} vs {KERNEL_INFO[direct]['name']} "
+                       f"({KERNEL_INFO[direct]['operations']} → {KERNEL_INFO[separable]['operations']} ops)",
+                 color=KERNEL_INFO[separable]['color'])
+        plt.axhline(y=KERNEL_INFO[direct]['operations'] / KERNEL_INFO[separable]['operations'],
+                    color=KERNEL_INFO[separable]['color'], linestyle='--', alpha=0.4,
+                    label=f"{KERNEL_INFO[direct]['name']} operation ratio")
+    plt.axhline(y=1.0, color='k', linestyle='-', alpha=0.5)
+    plt.title('Separable vs Direct 2D Convolution (time ratio direct / separable)')
+    plt.xlabel('Number of Threads')
+    plt.ylabel('Separable Speedup')
+    plt.grid(True)
+    plt.legend()
+    plt.xticks(thread_counts)
+    plt.savefig("computational_intensity_separable.png", dpi=dpi)
+    print("Saved separable comparison chart")
+    plt.close()
+
+def chart_roofline(roofline, roofs, dpi=CHART_DPI):
+    """Biểu đồ roofline (log-log): mái của máy theo số luồng và điểm đạt được của từng kernel."""
+    plt = pyplot()
+    plt.figure(figsize=(12, 7))
+    intensities = [row['intensity'] for row in roofline]
+    x = np.logspace(np.log10(min(intensities) / 4), np.log10(max(intensities) * 4), 200)
+    shades = np.linspace(0.7, 0.0, len(roofs)) if len(roofs) > 1 else [0.0]
+    for shade, (p, roof) in zip(shades, sorted(roofs.items())):
+        plt.plot(x, np.minimum(roof['gflops'], x * roof['bandwidth_gbs']), '-', color=str(shade), linewidth=2,
+                 label=f"Roof, {p} threads ({roof['bandwidth_gbs']:.1f} GB/s, {roof['gflops']:.1f} GFLOP/s)")
+    for kernel_name in dict.fromkeys(row['kernel'] for row in roofline):
+        rows = [row for row in roofline if row['kernel'] == kernel_name]
+        info = KERNEL_INFO[kernel_name]
+        plt.plot([row['intensity'] for row in rows], [row['gflops'] for row in rows], info['style'][0],
+                 color=info['color'], markersize=8, label=f"{info['name']} ({rows[-1]['fraction']:.0%} of roof)")
+        plt.annotate(f"{rows[-1]['threads']}T", (rows[-1]['intensity'], rows[-1]['gflops']),
+                     textcoords='offset points', xytext=(6, 4), fontsize=8, color=info['color'])
+    plt.xscale('log')
+    plt.yscale('log')
+    plt.title('Roofline: Achieved GFLOP/s vs Arithmetic Intensity')
+    plt.xlabel('Arithmetic Intensity (FLOP / byte of compulsory traffic)')
+    plt.ylabel('GFLOP/s')
+    plt.grid(True, which='both', alpha=0.3)
+    plt.legend(fontsize=8)
+    plt.savefig("computational_intensity_roofline.png", dpi=dpi)
+    print("Saved roofline chart")
+    plt.close()
+
+def plot_charts(results, roofs):
+    """Vẽ các biểu đồ so sánh các kích thước kernel (song song, mỗi biểu đồ một process)."""
+    charts = [chart_time, chart_efficiency]
+    if any(data['e2e'] is not None for data in results.values()):
+        charts.append(chart_end_to_end)
+    if separable_pairs(results):
+        charts.append(chart_separable)
+    jobs = [(chart_speedup, results, THREAD_COUNTS, TOPOLOGY)]
+    jobs += [(chart, results, THREAD_COUNTS) for chart in charts]
+    roofline = analyze_roofline(results, roofs)
+    if roofline:
+        jobs.append((chart_roofline, roofline, roofs))
+    render_charts(jobs, dpi=CHART_DPI, workers=PLOT_JOBS)
+
+def print_roofline(results, roofs):
+    """In vị trí của từng kernel trên roofline ở số luồng lớn nhất đã đo."""
+    roofline = analyze_roofline(results, roofs)
+    if not roofline:
         return
+    print(f"\n--- Roofline ---")
+    for kernel_name in results:
+        rows = [row for row in roofline if row['kernel'] == kernel_name]
+        if rows:
+            row = rows[-1]
+            print(f"{kernel_name:<8} {row['intensity']:>5.1f} FLOP/B  {row['gflops']:>7.2f} GFLOP/s  "
+                  f"{row['bound']}-bound, {row['fraction']:.0%} of roof at {row['threads']} threads")
 
+def render_results(baseline_stats, results, roofs, charts=True):
+    """In bảng so sánh, vẽ biểu đồ (nếu charts=True) và tạo REPORT.md từ kết quả."""
+    print_comparison(results)
+    print_roofline(results, roofs)
+    if charts:
+        print(f"\n--- Generating charts ---")
+        plot_charts(results, roofs)
+    generate_report(baseline_stats, results, roofs)
+
+def find_test_image():
+    """Tìm (hoặc tạo) ảnh dùng cho thực nghiệm; trả về đường dẫn hoặc None."""
     # Tìm file ảnh đầu vào
     input_images = glob.glob("../input*.jpg")
     if not input_images:
@@ -143,7 +639,7 @@ def main():
                 input_images = ["input_test.jpg"]
             except:
                 print("Cannot create test image. Please provide input image.")
-                return
+                return None
 
     # Sử dụng ảnh đầu tiên
     test_image = input_images[0]
@@ -152,138 +648,1068 @@ def main():
         new_name = test_image.replace("../", "")
         shutil.copy(test_image, new_name)
         test_image = new_name
-    
+    return test_image
+
+def main(charts=True):
+    """Hàm chính điều phối toàn bộ quá trình."""
+    if not compile_code():
+        return
+    print(f"CPU topology: {describe_topology(TOPOLOGY)}; thread counts: {THREAD_COUNTS}")
+
+    test_image = find_test_image()
+    if test_image is None:
+        return
     print(f"Using test image: {test_image}")
 
     # --- Chạy baseline (3x3 tuần tự) ---
-    print(f"\n--- Running Baseline (3x3 Sequential) - {NUM_RUNS} runs ---")
-    baseline_time = run_benchmark(BASELINE_EXE, [test_image])
-    if baseline_time is None:
+    print(f"\n--- Running Baseline (3x3 Sequential) - {describe_options(BENCH_OPTIONS)} ---")
+    baseline_stats = run_benchmark(BASELINE_EXE, [test_image], check={'kernel': '3x3'}, **BENCH_OPTIONS)
+    if baseline_stats is None:
         print("Failed to get baseline time. Exiting.")
         return
-    print(f"Average sequential time: {baseline_time:.6f}s")
+    print(f"Sequential time: {format_stats(baseline_stats)}")
 
     # --- Chạy các kernel khác nhau ---
     results = {}
     
     for kernel_name, kernel_info in KERNEL_INFO.items():
-        print(f"\n--- Running {kernel_info['name']} ({NUM_RUNS} runs each) ---")
-        times = []
+        print(f"\n--- Running {kernel_info['name']} ({describe_options(BENCH_OPTIONS)} each) ---")
+        # Baseline tuần tự cùng lượng công việc (bản 3x3 dùng lại blur_baseline)
+        kernel_baseline = baseline_stats
+        if kernel_info['baseline'] != BASELINE_EXE:
+            kernel_baseline = run_benchmark(kernel_info['baseline'], [test_image, '1'],
+                                            check={'kernel': kernel_name}, **BENCH_OPTIONS)
+            if kernel_baseline is None:
+                print(f"  Failed to get sequential time for {kernel_name}. Skipping.")
+                continue
+        print(f"  Sequential: {format_stats(kernel_baseline)}")
+        kernel_stats = []
         valid_threads = []
         
         for p in THREAD_COUNTS:
             print(f"  Testing with {p} threads...")
-            avg_time = run_benchmark(kernel_info['executable'], [test_image, str(p)])
-            if avg_time is not None:
-                times.append(avg_time)
+            stats = run_benchmark(kernel_info['executable'], [test_image, str(p)],
+                                  check={'kernel': kernel_name}, **BENCH_OPTIONS)
+            if stats is not None:
+                kernel_stats.append(stats)
                 valid_threads.append(p)
-                print(f"    Average time: {avg_time:.6f}s")
+                print(f"    {format_stats(stats)}")
         
-        if times:
-            results[kernel_name] = {
-                'threads': np.array(valid_threads),
-                'times': np.array(times),
-                'operations': kernel_info['operations']
-            }
+        if kernel_stats:
+            results[kernel_name] = analyze_kernel(kernel_baseline, kernel_name, kernel_stats, valid_threads)
 
     if not results:
         print("No successful runs. Exiting.")
         return
 
-    # --- Tính toán Speedup và Efficiency ---
-    for kernel_name in results:
-        results[kernel_name]['speedups'] = baseline_time / results[kernel_name]['times']
-        results[kernel_name]['efficiencies'] = results[kernel_name]['speedups'] / results[kernel_name]['threads']
+    # --- Đo mái của roofline (băng thông bộ nhớ, GFLOP/s đỉnh) ---
+    print(f"\n--- Measuring roofline ({PROBE_ARRAY_MB} MB arrays) ---")
+    roofs = measure_roofs(THREAD_COUNTS)
 
-    # --- In kết quả so sánh ---
-    print(f"\n--- Computational Intensity Comparison ---")
-    print(f"{'Kernel':<8} {'Ops/pixel':<12} {'8 threads Speedup':<18} {'16 threads Speedup':<19}")
-    print("-" * 65)
-    
-    for kernel_name in results:
-        ops = results[kernel_name]['operations']
-        # Tìm speedup cho 8 và 16 threads
-        threads = results[kernel_name]['threads']
-        speedups = results[kernel_name]['speedups']
-        
-        speedup_8 = "N/A"
-        speedup_16 = "N/A"
-        
-        if 8 in threads:
-            idx = np.where(threads == 8)[0][0]
-            speedup_8 = f"{speedups[idx]:.2f}x"
-        if 16 in threads:
-            idx = np.where(threads == 16)[0][0]
-            speedup_16 = f"{speedups[idx]:.2f}x"
-            
-        print(f"{kernel_name:<8} {ops:<12} {speedup_8:<18} {speedup_16:<19}")
-
-    # --- Vẽ biểu đồ ---
-    print(f"\n--- Generating charts ---")
-
-    # 1. So sánh thời gian chạy
-    plt.figure(figsize=(12, 6))
-    colors = ['blue', 'green', 'red']
-    for i, (kernel_name, data) in enumerate(results.items()):
-        plt.plot(data['threads'], data['times'], 'o-', 
-                label=f"{KERNEL_INFO[kernel_name]['name']}", color=colors[i])
-    
-    plt.title('Execution Time vs Thread Count for Different Kernel Sizes')
-    plt.xlabel('Number of Threads')
-    plt.ylabel('Execution Time (seconds)')
-    plt.grid(True)
-    plt.legend()
-    plt.xticks(THREAD_COUNTS)
-    plt.savefig("computational_intensity_time.png")
-    print("Saved time comparison chart")
+    write_results(RESULTS_FILE, results_to_records(baseline_stats, results, roofs),
+                  results_meta(BENCH_OPTIONS, thread_counts=THREAD_COUNTS, topology=TOPOLOGY,
+                               test_image=test_image),
+                  csv_path=os.path.splitext(RESULTS_FILE)[0] + '.csv')
+    print(f"\nSaved raw samples and derived results to {RESULTS_FILE}")
+    render_results(baseline_stats, results, roofs, charts=charts)
+
+
+# --- Autotune kích thước tile: kernel 7x7 chia khối, theo kích thước ảnh và số luồng ---
+
+def tile_label(tile_w, tile_h):
+    """Nhãn của một kích thước tile, ví dụ '64x16' hoặc 'fullx8' (0 = cả chiều)."""
+    return f"{tile_w or 'full'}x{tile_h or 'full'}"
+
+def tile_env(tile_w, tile_h):
+    """Biến môi trường chọn kích thước tile cho blur_tiled."""
+    return {'BLUR_TILE_W': str(tile_w), 'BLUR_TILE_H': str(tile_h)}
+
+def image_dimensions(stats):
+    """(width, height) của ảnh, lấy từ dòng JSON của chương trình."""
+    last = stats['phase_samples'][-1]
+    return last['width'], last['height']
+
+def analyze_tuning(runs):
+    """
+    Gom các phép đo autotune theo (ảnh, số luồng) và chọn tile nhanh nhất.
+
+    Args:
+        runs (list): Các phép đo {'image', 'threads', 'tile_w', 'tile_h', 'stats'};
+            tile_w = None là kernel 7x7 không chia tile (blur_7x7)
+
+    Returns:
+        list: Mỗi (ảnh, số luồng) một dict: image, width, height, threads, untiled
+        (thời gian blur_7x7 hoặc NaN), tiles (các tile đã đo: tile_w, tile_h, time),
+        best (tile_w, tile_h, time) và gain (untiled / best)
+    """
+    tuning = []
+    for image, threads in dict.fromkeys((r['image'], r['threads']) for r in runs):
+        group = [r for r in runs if (r['image'], r['threads']) == (image, threads)]
+        untiled = next((r['stats']['median'] for r in group if r['tile_w'] is None), np.nan)
+        tiles = [{'tile_w': r['tile_w'], 'tile_h': r['tile_h'], 'time': r['stats']['median']}
+                 for r in group if r['tile_w'] is not None]
+        if not tiles:
+            continue
+        best = min(tiles, key=lambda t: t['time'])
+        width, height = image_dimensions(group[0]['stats'])
+        tuning.append({
+            'image': image, 'width': width, 'height': height, 'threads': threads,
+            'untiled': untiled, 'tiles': tiles, 'best': best, 'gain': untiled / best['time'],
+        })
+    return tuning
+
+def tuning_to_records(runs):
+    """Chuyển các phép đo autotune thành bản ghi để lưu ra file."""
+    return [{
+        'image': r['image'], 'threads': r['threads'], 'tile_w': r['tile_w'], 'tile_h': r['tile_h'],
+        'tile': 'untiled' if r['tile_w'] is None else tile_label(r['tile_w'], r['tile_h']),
+        'stats': r['stats'],
+    } for r in runs]
+
+def records_to_runs(records):
+    """Dựng lại danh sách phép đo autotune từ các bản ghi đã lưu."""
+    return [{k: r[k] for k in ('image', 'threads', 'tile_w', 'tile_h', 'stats')} for r in records]
+
+def chart_autotune(tuning, tile_widths, tile_heights, dpi=CHART_DPI):
+    """Thời gian tile tốt nhất so với không chia tile, và lưới các tile đã đo cho cấu hình lớn nhất."""
+    plt = pyplot()
+    fig, (ax_time, ax_grid) = plt.subplots(1, 2, figsize=(16, 6))
+    images = list(dict.fromkeys(t['image'] for t in tuning))
+    colors = plt.cm.tab10(np.linspace(0, 1, 10))
+    for i, image in enumerate(images):
+        entries = [t for t in tuning if t['image'] == image]
+        threads = [t['threads'] for t in entries]
+        label = f"{os.path.basename(image)} ({entries[0]['width']}x{entries[0]['height']})"
+        ax_time.plot(threads, [t['untiled'] for t in entries], 's--', color=colors[i % 10], alpha=0.6,
+                     label=f"{label}, untiled")
+        ax_time.plot(threads, [t['best']['time'] for t in entries], 'o-', color=colors[i % 10],
+                     label=f"{label}, best tile")
+    thread_ticks = sorted({t['threads'] for t in tuning})
+    ax_time.set_title('7x7 Kernel: Untiled vs Autotuned Tile Size')
+    ax_time.set_xlabel('Number of Threads')
+    ax_time.set_ylabel('Execution Time (seconds)')
+    ax_time.set_xticks(thread_ticks)
+    ax_time.grid(True)
+    ax_time.legend(fontsize=8)
+
+    # Lưới tile đã đo của ảnh lớn nhất ở số luồng lớn nhất (ô trống = không được đo)
+    focus = max(tuning, key=lambda t: (t['width'] * t['height'], t['threads']))
+    grid = np.full((len(tile_heights), len(tile_widths)), np.nan)
+    for tile in focus['tiles']:
+        if tile['tile_w'] in tile_widths and tile['tile_h'] in tile_heights:
+            grid[tile_heights.index(tile['tile_h']), tile_widths.index(tile['tile_w'])] = tile['time'] / focus['best']['time']
+    image = ax_grid.imshow(grid, cmap='viridis_r', aspect='auto')
+    for h in range(len(tile_heights)):
+        for w in range(len(tile_widths)):
+            if not np.isnan(grid[h, w]):
+                ax_grid.text(w, h, f"{grid[h, w]:.2f}", ha='center', va='center', fontsize=8,
+                             color='red' if grid[h, w] == 1.0 else 'white')
+    ax_grid.set_xticks(range(len(tile_widths)))
+    ax_grid.set_xticklabels(['full' if w == 0 else w for w in tile_widths])
+    ax_grid.set_yticks(range(len(tile_heights)))
+    ax_grid.set_yticklabels(['full' if h == 0 else h for h in tile_heights])
+    ax_grid.set_xlabel('Tile Width (pixels)')
+    ax_grid.set_ylabel('Tile Height (rows)')
+    ax_grid.set_title(f"Measured Tiles, {os.path.basename(focus['image'])} @ {focus['threads']} threads "
+                      f"(time / best)")
+    fig.colorbar(image, ax=ax_grid, label='Time relative to best tile')
+    plt.tight_layout()
+    plt.savefig("autotune_tiles.png", dpi=dpi)
+    print("Saved tile autotuning chart to autotune_tiles.png")
     plt.close()
 
-    # 2. So sánh Speedup
+def generate_autotune_report(tuning, tile_widths, tile_heights, host):
+    """Tạo file báo cáo AUTOTUNE.md."""
+    print("\n--- Generating AUTOTUNE.md ---")
+    report_content = "# Autotune kích thước tile cho kernel 7x7\n\n"
+    report_content += (
+        "`blur_tiled` chia ảnh thành các tile `BLUR_TILE_W x BLUR_TILE_H` pixel; `collapse(2)` được áp dụng "
+        "trên lưới tile thay vì trên từng pixel, nên mỗi luồng xử lý trọn một vùng có dữ liệu đầu vào "
+        "(tile mở rộng thêm 3 pixel mỗi phía) nằm gọn trong cache. Kết quả trùng khớp từng byte với `blur_7x7`.\n\n"
+    )
+    report_content += (
+        "Kích thước tile được chọn bằng tìm kiếm theo tọa độ: quét chiều rộng khi giữ chiều cao cố định, "
+        "rồi quét chiều cao với chiều rộng tốt nhất, lặp đến khi không còn cải thiện. Tile thắng cuộc "
+        f"được ghi vào bảng tra cứu `{os.path.basename(TUNING_TABLE)}` theo máy, kích thước ảnh và số luồng. "
+        "Nếu tile tốt nhất không nhanh hơn `blur_7x7` (gain ≤ 1), bảng ghi kernel không chia tile làm cấu hình "
+        "thắng cuộc (`tile_w` = `tile_h` = `null`, cột \"Ghi vào bảng\" là `untiled`), nên tra cứu không đề xuất "
+        "chia tile ở nơi nó làm chậm.\n\n"
+    )
+    report_content += f"**Cấu hình thực nghiệm:**\n"
+    report_content += f"- Máy: {host} (topology CPU: {describe_topology(TOPOLOGY)})\n"
+    report_content += f"- Cách lấy mẫu: {describe_options(BENCH_OPTIONS)} (các lần chạy khởi động bị loại bỏ)\n"
+    report_content += f"- Chiều rộng tile: {', '.join('cả ảnh' if w == 0 else str(w) for w in tile_widths)}\n"
+    report_content += f"- Chiều cao tile: {', '.join('cả ảnh' if h == 0 else str(h) for h in tile_heights)}\n"
+    report_content += f"- Toàn bộ lưới: {len(tile_widths) * len(tile_heights)} cấu hình mỗi (ảnh, số luồng)\n\n"
+
+    report_content += "## Tile tốt nhất\n\n"
+    report_content += "| Ảnh | Kích thước | Threads | Tile tốt nhất | Tiled (s) | Untiled 7x7 (s) | Gain | Số tile đã đo | Ghi vào bảng |\n"
+    report_content += "|-----|------------|---------|---------------|-----------|-----------------|------|---------------|--------------|\n"
+    for t in tuning:
+        untiled = "n/a" if np.isnan(t['untiled']) else f"{t['untiled']:.4f}"
+        gain = "n/a" if np.isnan(t['gain']) else f"{t['gain']:.2f}x"
+        best_tile = tile_label(t['best']['tile_w'], t['best']['tile_h'])
+        recorded = "untiled" if t['gain'] <= 1 else best_tile
+        report_content += (
+            f"| `{os.path.basename(t['image'])}` | {t['width']}x{t['height']} | {t['threads']} | "
+            f"`{best_tile}` | {t['best']['time']:.4f} | {untiled} | {gain} | {len(t['tiles'])} | `{recorded}` |\n"
+        )
+    report_content += "\n![Tile Autotuning](autotune_tiles.png)\n\n"
+    report_content += "## Dùng kết quả\n\n"
+    report_content += (
+        "Chạy trực tiếp với tile đã tune, ví dụ "
+        f"`BLUR_TILE_W={tuning[-1]['best']['tile_w']} BLUR_TILE_H={tuning[-1]['best']['tile_h']} "
+        f"./blur_tiled {os.path.basename(tuning[-1]['image'])} {tuning[-1]['threads']}`, hoặc tra cứu bảng "
+        "từ Python: `TuningTable().lookup('7x7', width, height, threads)` (kích thước ảnh chưa tune dùng "
+        "mục có số pixel gần nhất).\n"
+    )
+
+    with open("AUTOTUNE.md", "w", encoding="utf-8") as f:
+        f.write(report_content)
+    print("Generated AUTOTUNE.md successfully.")
+
+def render_autotune_results(tuning, tile_widths, tile_heights, host, charts=True):
+    """In tile tốt nhất, vẽ biểu đồ (nếu charts=True) và tạo AUTOTUNE.md."""
+    print("\n--- Best tile per image and thread count ---")
+    for t in tuning:
+        print(f"{os.path.basename(t['image']):<20} {t['width']}x{t['height']:<6} {t['threads']:>4} threads: "
+              f"tile {tile_label(t['best']['tile_w'], t['best']['tile_h']):<12} {t['best']['time']:.6f}s "
+              f"({t['gain']:.2f}x vs untiled)")
+    if charts:
+        render_charts([(chart_autotune, tuning, tile_widths, tile_heights)], dpi=CHART_DPI, workers=PLOT_JOBS)
+    generate_autotune_report(tuning, tile_widths, tile_heights, host)
+
+def run_autotune(images, charts=True):
+    """Tune kích thước tile của kernel 7x7 cho từng ảnh và số luồng, ghi tile tốt nhất vào bảng tra cứu."""
+    if not compile_code():
+        return
+    print(f"CPU topology: {describe_topology(TOPOLOGY)}; thread counts: {THREAD_COUNTS}")
+    if not images:
+        test_image = find_test_image()
+        if test_image is None:
+            return
+        images = [test_image]
+
+    table = TuningTable(TUNING_TABLE)
+    host = host_id()
+    runs = []
+    for image in images:
+        for p in THREAD_COUNTS:
+            print(f"\n--- Autotuning tiles: {image}, {p} threads ({describe_options(BENCH_OPTIONS)} each) ---")
+            untiled = run_benchmark(KERNEL_7X7_EXE, [image, str(p)], check={'kernel': '7x7'}, **BENCH_OPTIONS)
+            if untiled is not None:
+                print(f"  untiled 7x7: {format_stats(untiled)}")
+                runs.append({'image': image, 'threads': p, 'tile_w': None, 'tile_h': None, 'stats': untiled})
+
+            def measure(config):
+                stats = run_benchmark(TILED_EXE, [image, str(p)], env=tile_env(config['tile_w'], config['tile_h']),
+                                      check={'kernel': '7x7'}, **BENCH_OPTIONS)
+                if stats is None:
+                    return None
+                print(f"  tile {tile_label(config['tile_w'], config['tile_h']):<12} {format_stats(stats)}")
+                runs.append({'image': image, 'threads': p, 'stats': stats, **config})
+                return stats['median']
+
+            search = coordinate_search(measure, {'tile_w': TILE_WIDTHS, 'tile_h': TILE_HEIGHTS})
+            if search is None:
+                continue
+            best = search['best']
+            width, height = image_dimensions(runs[-1]['stats'])
+            print(f"  best tile {tile_label(best['tile_w'], best['tile_h'])} after {len(search['measured'])} "
+                  f"configurations ({search['rounds']} rounds)")
+            if untiled is not None and search['time'] >= untiled['median']:
+                # Chia tile không nhanh hơn: ghi kernel không chia tile (tile_w = tile_h = None)
+                # làm cấu hình thắng cuộc để bảng tra cứu không đề xuất tile ở nơi nó làm chậm
+                print(f"  untiled 7x7 is faster ({untiled['median'] / search['time']:.2f}x): recording untiled")
+                table.record('7x7', width, height, p, {'tile_w': None, 'tile_h': None}, untiled['median'],
+                             host=host, untiled_time=untiled['median'], best_tile=best,
+                             tiled_time=search['time'], measured=len(search['measured']))
+            else:
+                table.record('7x7', width, height, p, best, search['time'], host=host,
+                             untiled_time=untiled['median'] if untiled is not None else None,
+                             measured=len(search['measured']))
+
+    if not runs:
+        print("No successful runs. Exiting.")
+        return
+
+    table.save()
+    print(f"\nSaved best tiles to {TUNING_TABLE}")
+    write_results(AUTOTUNE_RESULTS_FILE, tuning_to_records(runs),
+                  results_meta(BENCH_OPTIONS, thread_counts=THREAD_COUNTS, topology=TOPOLOGY, host=host,
+                               tile_widths=TILE_WIDTHS, tile_heights=TILE_HEIGHTS, images=images),
+                  csv_path=os.path.splitext(AUTOTUNE_RESULTS_FILE)[0] + '.csv')
+    print(f"Saved raw samples and derived results to {AUTOTUNE_RESULTS_FILE}")
+    render_autotune_results(analyze_tuning(runs), TILE_WIDTHS, TILE_HEIGHTS, host, charts=charts)
+
+
+# --- Quét bán kính: direct vs separable vs boxsum (tổng chạy) ---
+
+def method_operations(method, radius):
+    """Số phép tính mỗi pixel/kênh của một thuật toán ở bán kính cho trước."""
+    if method == 'direct':
+        return (2 * radius + 1) ** 2
+    if method == 'separable':
+        return 2 * (2 * radius + 1)
+    return 12  # boxsum: 3 box x 2 chiều x (cộng + trừ), không phụ thuộc bán kính
+
+def engine_check(method, radius, sigma):
+    """Mô tả kiểm tra kết quả của blur_engine với bản tham chiếu NumPy (--verify)."""
+    if method == 'boxsum':
+        return {'kernel': 'boxsum', 'radius': radius, 'sigma': sigma}
+    return {'kernel': 'gaussian', 'method': method, 'radius': radius, 'sigma': sigma}
+
+def analyze_sweep(runs, methods, radii):
+    """
+    Sắp xếp các phép đo của blur_engine thành bảng [method][radius] và tìm điểm giao nhau.
+
+    Args:
+        runs (list): Các phép đo {'method', 'radius', 'stats'}
+        methods, radii (list): Các giá trị của từng chiều
+
+    Returns:
+        dict: 'times' (mảng [method][radius], NaN nếu không đo), 'best' (thuật toán
+        nhanh nhất ở mỗi bán kính), 'ranges' (các khoảng bán kính liên tiếp có cùng
+        thuật toán nhanh nhất) và 'crossovers' (bán kính nội suy tại đó thứ tự
+        nhanh/chậm của một cặp thuật toán đảo chiều)
+    """
+    times = np.full((len(methods), len(radii)), np.nan)
+    for run in runs:
+        times[methods.index(run['method']), radii.index(run['radius'])] = run['stats']['median']
+    best = [None if np.all(np.isnan(times[:, r])) else methods[int(np.nanargmin(times[:, r]))]
+            for r in range(len(radii))]
+
+    ranges = []
+    for radius, method in zip(radii, best):
+        if method is None:
+            continue
+        if ranges and ranges[-1]['method'] == method:
+            ranges[-1]['to'] = radius
+        else:
+            ranges.append({'method': method, 'from': radius, 'to': radius})
+
+    crossovers = []
+    for a in range(len(methods)):
+        for b in range(a + 1, len(methods)):
+            diff = times[a] - times[b]
+            for r in range(len(radii) - 1):
+                d0, d1 = diff[r], diff[r + 1]
+                if np.isnan(d0) or np.isnan(d1) or (d0 < 0) == (d1 < 0) or d0 == d1:
+                    continue
+                # Nội suy tuyến tính hiệu thời gian giữa hai bán kính đo được
+                radius = radii[r] + (radii[r + 1] - radii[r]) * d0 / (d0 - d1)
+                slower, faster = (methods[a], methods[b]) if d1 > 0 else (methods[b], methods[a])
+                crossovers.append({'faster': faster, 'slower': slower, 'radius': radius})
+    crossovers.sort(key=lambda c: c['radius'])
+    return {'methods': methods, 'radii': radii, 'runs': runs, 'times': times, 'best': best,
+            'ranges': ranges, 'crossovers': crossovers}
+
+def sweep_to_records(sweep):
+    """Chuyển kết quả quét bán kính thành các bản ghi để lưu ra file."""
+    return [{
+        'method': run['method'], 'radius': run['radius'], 'sigma': run['sigma'], 'threads': run['threads'],
+        'operations': method_operations(run['method'], run['radius']), 'stats': run['stats'],
+    } for run in sweep['runs']]
+
+def records_to_sweep(records, methods, radii):
+    """Dựng lại kết quả quét bán kính từ các bản ghi đã lưu."""
+    runs = [{k: r[k] for k in ('method', 'radius', 'sigma', 'threads', 'stats')} for r in records]
+    return analyze_sweep(runs, methods, radii)
+
+def chart_radius_sweep(sweep, threads, dpi=CHART_DPI):
+    """Thời gian theo bán kính của từng thuật toán, tô nền theo thuật toán nhanh nhất."""
+    plt = pyplot()
     plt.figure(figsize=(12, 6))
-    for i, (kernel_name, data) in enumerate(results.items()):
-        plt.plot(data['threads'], data['speedups'], 'o-', 
-                label=f"{KERNEL_INFO[kernel_name]['name']}", color=colors[i])
-    
-    plt.plot(THREAD_COUNTS, THREAD_COUNTS, 'k--', alpha=0.5, label='Ideal Speedup')
-    plt.title('Speedup vs Thread Count for Different Computational Intensities')
-    plt.xlabel('Number of Threads')
-    plt.ylabel('Speedup')
-    plt.grid(True)
+    radii = np.array(sweep['radii'])
+    for m, method in enumerate(sweep['methods']):
+        measured = ~np.isnan(sweep['times'][m])
+        plt.plot(radii[measured], sweep['times'][m][measured], 'o-', label=method,
+                 color=METHOD_COLORS.get(method))
+    # Ranh giới giữa hai bán kính đo liên tiếp là điểm giữa của chúng
+    edges = np.concatenate([[radii[0] - 0.5], (radii[1:] + radii[:-1]) / 2, [radii[-1] + 0.5]])
+    for r in sweep['ranges']:
+        plt.axvspan(edges[sweep['radii'].index(r['from'])], edges[sweep['radii'].index(r['to']) + 1],
+                    color=METHOD_COLORS.get(r['method']), alpha=0.07)
+    for i, c in enumerate(sweep['crossovers']):
+        plt.axvline(x=c['radius'], color='grey', linestyle=':', linewidth=1)
+        plt.annotate(f"{c['faster']} < {c['slower']}\nr ≈ {c['radius']:.1f}", (c['radius'], plt.ylim()[1]),
+                     xytext=(3, -5 - 24 * i), textcoords='offset points', va='top', fontsize=8, color='dimgrey')
+    plt.yscale('log')
+    plt.title(f'Blur Time vs Kernel Radius ({threads} threads; background: fastest method)')
+    plt.xlabel('Kernel Radius (pixels)')
+    plt.ylabel('Execution Time (seconds, log scale)')
+    plt.grid(True, which='both', alpha=0.4)
     plt.legend()
-    plt.xticks(THREAD_COUNTS)
-    plt.savefig("computational_intensity_speedup.png")
-    print("Saved speedup comparison chart")
+    plt.savefig("radius_sweep.png", dpi=dpi)
+    print("Saved radius sweep chart to radius_sweep.png")
     plt.close()
 
-    # 3. So sánh Efficiency
-    plt.figure(figsize=(12, 6))
-    for i, (kernel_name, data) in enumerate(results.items()):
-        plt.plot(data['threads'], data['efficiencies'], 'o-', 
-                label=f"{KERNEL_INFO[kernel_name]['name']}", color=colors[i])
-    
-    plt.axhline(y=1.0, color='k', linestyle='--', alpha=0.5, label='Ideal Efficiency')
-    plt.title('Efficiency vs Thread Count for Different Computational Intensities')
-    plt.xlabel('Number of Threads')
-    plt.ylabel('Efficiency')
-    plt.grid(True)
-    plt.legend()
-    plt.xticks(THREAD_COUNTS)
-    plt.ylim(0, 1.1)
-    plt.gca().yaxis.set_major_formatter(plt.FuncFormatter('{:.0%}'.format))
-    plt.savefig("computational_intensity_efficiency.png")
-    print("Saved efficiency comparison chart")
+def generate_radius_report(sweep, threads, sigma, test_image):
+    """Tạo file báo cáo RADIUS_SWEEP.md."""
+    print("\n--- Generating RADIUS_SWEEP.md ---")
+    methods, radii = sweep['methods'], sweep['radii']
+    report_content = "# Quét bán kính: direct, separable và boxsum\n\n"
+    report_content += (
+        "`blur_engine` nhận bán kính r và sigma lúc chạy (sigma mặc định r/3). Ba thuật toán:\n\n"
+        "- **direct**: tích chập 2D, (2r+1)² phép nhân-cộng mỗi pixel\n"
+        "- **separable**: lượt ngang rồi lượt dọc với kernel 1D, 2(2r+1) phép nhân-cộng\n"
+        "- **boxsum**: 3 box blur liên tiếp (bán kính chọn theo sigma, Wells 1986) tính bằng tổng chạy; "
+        "mỗi pixel tốn 12 phép cộng/trừ bất kể r. Đây là xấp xỉ của Gaussian, không trùng khớp từng byte.\n\n"
+    )
+    report_content += f"**Cấu hình thực nghiệm:**\n"
+    report_content += f"- Ảnh: `{test_image}`\n"
+    report_content += f"- Cách lấy mẫu: {describe_options(BENCH_OPTIONS)} (các lần chạy khởi động bị loại bỏ)\n"
+    report_content += f"- Số luồng: {threads} (topology CPU: {describe_topology(TOPOLOGY)})\n"
+    report_content += f"- Sigma: {'r/3' if not sigma else sigma}\n"
+    report_content += (
+        f"- Một thuật toán không được đo ở các bán kính lớn hơn khi đã chậm hơn thuật toán nhanh nhất "
+        f"quá {SWEEP_CUTOFF:g} lần (ô n/a)\n\n"
+    )
+
+    report_content += "## Thuật toán nhanh nhất theo bán kính\n\n"
+    for r in sweep['ranges']:
+        span = f"r = {r['from']}" if r['from'] == r['to'] else f"r = {r['from']}–{r['to']}"
+        report_content += f"- {span}: **{r['method']}**\n"
+    if sweep['crossovers']:
+        report_content += "\n**Điểm giao nhau (nội suy):**\n\n"
+        for c in sweep['crossovers']:
+            report_content += f"- `{c['faster']}` nhanh hơn `{c['slower']}` từ r ≈ {c['radius']:.1f}\n"
+    report_content += "\n![Radius Sweep](radius_sweep.png)\n\n"
+
+    report_content += "## Thời gian chi tiết (giây)\n\n"
+    report_content += "| Radius | " + " | ".join(methods) + " | Nhanh nhất | " + " | ".join(f"{m} ops" for m in methods) + " |\n"
+    report_content += "|--------|" + "|".join("------" for _ in methods) + "|------------|" + "|".join("------" for _ in methods) + "|\n"
+    for r, radius in enumerate(radii):
+        cells = ["n/a" if np.isnan(t) else f"{t:.4f}" for t in sweep['times'][:, r]]
+        ops = [str(method_operations(m, radius)) for m in methods]
+        report_content += (f"| {radius} | " + " | ".join(cells) + f" | {sweep['best'][r] or 'n/a'} | "
+                           + " | ".join(ops) + " |\n")
+
+    with open("RADIUS_SWEEP.md", "w", encoding="utf-8") as f:
+        f.write(report_content)
+    print("Generated RADIUS_SWEEP.md successfully.")
+
+def render_radius_results(sweep, threads, sigma, test_image, charts=True):
+    """In thuật toán nhanh nhất theo bán kính, vẽ biểu đồ (nếu charts=True) và tạo RADIUS_SWEEP.md."""
+    print("\n--- Fastest method per radius ---")
+    for r in sweep['ranges']:
+        print(f"  radius {r['from']:>3}-{r['to']:<3}: {r['method']}")
+    for c in sweep['crossovers']:
+        print(f"  crossover: {c['faster']} beats {c['slower']} from radius ~{c['radius']:.1f}")
+    if charts:
+        render_charts([(chart_radius_sweep, sweep, threads)], dpi=CHART_DPI, workers=PLOT_JOBS)
+    generate_radius_report(sweep, threads, sigma, test_image)
+
+def run_radius_sweep(charts=True):
+    """Đo blur_engine với từng thuật toán và bán kính ở một số luồng cố định."""
+    if not compile_code():
+        return
+    threads = SWEEP_THREADS or TOPOLOGY['physical']
+    print(f"CPU topology: {describe_topology(TOPOLOGY)}; sweep threads: {threads}")
+    test_image = find_test_image()
+    if test_image is None:
+        return
+    print(f"Using test image: {test_image}")
+
+    runs = []
+    dropped = set()
+    for radius in SWEEP_RADII:
+        print(f"\n--- Radius {radius} ({describe_options(BENCH_OPTIONS)} each) ---")
+        measured = {}
+        for method in SWEEP_METHODS:
+            if method in dropped:
+                continue
+            stats = run_benchmark(ENGINE_EXE, [test_image, str(threads), method, str(radius), str(SWEEP_SIGMA)],
+                                  check=engine_check(method, radius, SWEEP_SIGMA), **BENCH_OPTIONS)
+            if stats is not None:
+                print(f"  {method:<10} {format_stats(stats)}")
+                measured[method] = stats['median']
+                runs.append({'method': method, 'radius': radius, 'sigma': SWEEP_SIGMA, 'threads': threads,
+                             'stats': stats})
+        # Thời gian chỉ tăng theo bán kính: bỏ thuật toán đã quá chậm ở các bán kính tiếp theo
+        if measured:
+            fastest = min(measured.values())
+            dropped.update(m for m, t in measured.items() if t > SWEEP_CUTOFF * fastest)
+
+    if not runs:
+        print("No successful runs. Exiting.")
+        return
+
+    sweep = analyze_sweep(runs, SWEEP_METHODS, SWEEP_RADII)
+    write_results(RADIUS_SWEEP_RESULTS_FILE, sweep_to_records(sweep),
+                  results_meta(BENCH_OPTIONS, topology=TOPOLOGY, threads=threads, sigma=SWEEP_SIGMA,
+                               methods=SWEEP_METHODS, radii=SWEEP_RADII, test_image=test_image),
+                  csv_path=os.path.splitext(RADIUS_SWEEP_RESULTS_FILE)[0] + '.csv')
+    print(f"\nSaved raw samples and derived results to {RADIUS_SWEEP_RESULTS_FILE}")
+    render_radius_results(sweep, threads, SWEEP_SIGMA, test_image, charts=charts)
+
+
+# --- Kiểu số học: double, float và fixed-point, thời gian và sai số so với double ---
+
+def dump_output(image, threads, kernel_size, precision, directory):
+    """
+    Chạy blur_precision một lần với BLUR_DUMP và đọc ảnh kết quả dạng byte thô.
+
+    Returns:
+        numpy.ndarray: Mảng uint8 (height, width, channels)
+    """
+    path = os.path.join(directory, f"{kernel_size}_{precision}.raw")
+    _, phases = run_once(PRECISION_EXE, [image, str(threads), str(kernel_size), precision], env={'BLUR_DUMP': path})
+    return np.fromfile(path, dtype=np.uint8).reshape(phases['height'], phases['width'], phases['channels'])
+
+def output_difference(reference, output, radius):
+    """
+    Sai khác của output so với reference trên phần ảnh được tính (bỏ viền radius pixel).
+
+    Returns:
+        dict: max_abs (mức xám), mse, psnr (dB, inf nếu trùng khớp) và differing
+        (tỷ lệ giá trị pixel/kênh khác nhau)
+    """
+    inner = (slice(radius, -radius), slice(radius, -radius))
+    diff = np.abs(output[inner].astype(np.int16) - reference[inner].astype(np.int16))
+    mse = float(np.mean(diff.astype(np.float64) ** 2))
+    return {
+        'max_abs': int(diff.max()),
+        'mse': mse,
+        'psnr': float('inf') if mse == 0 else 10 * np.log10(255 ** 2 / mse),
+        'differing': float(np.mean(diff != 0)),
+    }
+
+def meets_quality(quality, max_abs, min_psnr):
+    """Sai số có nằm trong ngưỡng chất lượng không."""
+    return quality['max_abs'] <= max_abs and quality['psnr'] >= min_psnr
+
+def analyze_precision(runs, max_abs, min_psnr):
+    """
+    Gom các phép đo theo kích thước kernel và chọn kiểu số học nhanh nhất đạt ngưỡng.
+
+    Args:
+        runs (list): Các phép đo {'kernel', 'precision', 'threads', 'stats', 'quality'}
+        max_abs (int): Sai khác tối đa cho phép so với double
+        min_psnr (float): PSNR tối thiểu (dB) so với double
+
+    Returns:
+        list: Mỗi kernel một dict: kernel, rows (precision, time, speedup so với
+        double, quality, ok) và choice (kiểu số học được chọn, None nếu không có)
+    """
+    analysis = []
+    for kernel_size in dict.fromkeys(r['kernel'] for r in runs):
+        group = [r for r in runs if r['kernel'] == kernel_size]
+        double_time = next((r['stats']['median'] for r in group if r['precision'] == 'double'), np.nan)
+        rows = [{
+            'precision': r['precision'], 'time': r['stats']['median'],
+            'speedup': double_time / r['stats']['median'], 'quality': r['quality'],
+            'ok': meets_quality(r['quality'], max_abs, min_psnr),
+        } for r in group]
+        passing = [row for row in rows if row['ok']]
+        analysis.append({
+            'kernel': kernel_size, 'rows': rows,
+            'choice': min(passing, key=lambda row: row['time'])['precision'] if passing else None,
+        })
+    return analysis
+
+def precision_to_records(runs):
+    """Chuyển các phép đo kiểu số học thành bản ghi (sai số ở trường vô hướng để có trong CSV)."""
+    return [dict({k: r[k] for k in ('kernel', 'precision', 'threads', 'stats')}, **r['quality']) for r in runs]
+
+def records_to_precision_runs(records):
+    """Dựng lại danh sách phép đo kiểu số học từ các bản ghi đã lưu."""
+    return [{
+        'kernel': r['kernel'], 'precision': r['precision'], 'threads': r['threads'], 'stats': r['stats'],
+        'quality': {k: r[k] for k in ('max_abs', 'mse', 'psnr', 'differing')},
+    } for r in records]
+
+def chart_precision(analysis, threads, max_abs, min_psnr, dpi=CHART_DPI):
+    """Thời gian và PSNR của từng kiểu số học theo kích thước kernel."""
+    plt = pyplot()
+    fig, (ax_time, ax_psnr) = plt.subplots(1, 2, figsize=(16, 6))
+    precisions = list(dict.fromkeys(row['precision'] for entry in analysis for row in entry['rows']))
+    x = np.arange(len(analysis))
+    width = 0.8 / len(precisions)
+    # PSNR vô hạn (trùng khớp từng byte) được vẽ ở mức trần của biểu đồ
+    finite = [row['quality']['psnr'] for entry in analysis for row in entry['rows']
+              if np.isfinite(row['quality']['psnr'])]
+    ceiling = max(finite + [min_psnr]) + 10
+    compared = [precision for precision in precisions if precision != 'double']
+    for i, precision in enumerate(precisions):
+        rows = [next((row for row in entry['rows'] if row['precision'] == precision), None) for entry in analysis]
+        offset = (i - (len(precisions) - 1) / 2) * width
+        color = PRECISION_COLORS.get(precision)
+        ax_time.bar(x + offset, [row['time'] if row else np.nan for row in rows], width, label=precision, color=color)
+        if precision == 'double':
+            continue
+        offset = (compared.index(precision) - (len(compared) - 1) / 2) * width
+        psnr = [min(row['quality']['psnr'], ceiling) if row else np.nan for row in rows]
+        bars = ax_psnr.bar(x + offset, psnr, width, label=precision, color=color)
+        for bar, row in zip(bars, rows):
+            if row:
+                text = 'exact' if np.isinf(row['quality']['psnr']) else f"max {row['quality']['max_abs']}"
+                ax_psnr.annotate(text, (bar.get_x() + bar.get_width() / 2, bar.get_height()),
+                                 xytext=(0, 3), textcoords='offset points', ha='center', fontsize=8)
+    labels = [f"{entry['kernel']}x{entry['kernel']}\n(choice: {entry['choice'] or 'none'})" for entry in analysis]
+    ax_time.set_xticks(x)
+    ax_time.set_xticklabels(labels)
+    ax_time.set_ylabel('Execution Time (seconds)')
+    ax_time.set_title(f'Execution Time by Precision ({threads} threads)')
+    ax_time.legend()
+    ax_time.grid(True, axis='y', alpha=0.4)
+    ax_psnr.axhline(y=min_psnr, color='k', linestyle='--', alpha=0.6, label=f'Quality bar ({min_psnr:g} dB)')
+    ax_psnr.set_xticks(x)
+    ax_psnr.set_xticklabels(labels)
+    ax_psnr.set_ylim(0, ceiling + 5)
+    ax_psnr.set_ylabel('PSNR vs double (dB)')
+    ax_psnr.set_title(f'Quality vs Double Precision (bar: PSNR >= {min_psnr:g} dB, max abs <= {max_abs})')
+    ax_psnr.legend()
+    ax_psnr.grid(True, axis='y', alpha=0.4)
+    plt.tight_layout()
+    plt.savefig("precision.png", dpi=dpi)
+    print("Saved precision chart to precision.png")
+    plt.close()
+
+def generate_precision_report(analysis, threads, max_abs, min_psnr, test_image):
+    """Tạo file báo cáo PRECISION.md."""
+    print("\n--- Generating PRECISION.md ---")
+    report_content = "# Kiểu số học: double, float và fixed-point\n\n"
+    report_content += (
+        "`blur_precision` tính kernel 3x3/5x5/7x7 (cùng trọng số với `blur_3x3/5x5/7x7`) với ba kiểu số học:\n\n"
+        "- **double**: như các chương trình khác, dùng làm bản chuẩn để đo sai số\n"
+        "- **float**: trọng số và tổng float 32 bit\n"
+        "- **fixed**: trọng số nguyên Q16 (round(w × 2¹⁶), dồn sai số làm tròn vào trọng số trung tâm để "
+        "tổng đúng bằng 2¹⁶), tổng int32, kết quả = tổng >> 16. Kernel 3x3 {1,2,1}/16 biểu diễn chính xác.\n\n"
+        "Sai số được đo trên ảnh kết quả dạng byte thô (`BLUR_DUMP`, không qua JPEG), bỏ viền không được tính.\n\n"
+    )
+    report_content += f"**Cấu hình thực nghiệm:**\n"
+    report_content += f"- Ảnh: `{test_image}`\n"
+    report_content += f"- Cách lấy mẫu: {describe_options(BENCH_OPTIONS)} (các lần chạy khởi động bị loại bỏ)\n"
+    report_content += f"- Số luồng: {threads} (topology CPU: {describe_topology(TOPOLOGY)})\n"
+    report_content += f"- Ngưỡng chất lượng: sai khác tối đa ≤ {max_abs} mức xám và PSNR ≥ {min_psnr:g} dB\n\n"
+
+    report_content += "## Kiểu số học được chọn\n\n"
+    for entry in analysis:
+        choice = next((row for row in entry['rows'] if row['precision'] == entry['choice']), None)
+        if choice is None:
+            report_content += f"- {entry['kernel']}x{entry['kernel']}: không có kiểu số học nào đạt ngưỡng\n"
+        else:
+            report_content += (
+                f"- {entry['kernel']}x{entry['kernel']}: **{choice['precision']}** "
+                f"({choice['time']:.4f}s, {choice['speedup']:.2f}x so với double)\n"
+            )
+    report_content += "\n![Precision](precision.png)\n\n"
+
+    report_content += "## Chi tiết\n\n"
+    report_content += "| Kernel | Precision | Time (s) | Speedup vs double | Max abs | PSNR (dB) | Differing | Meets bar |\n"
+    report_content += "|--------|-----------|----------|-------------------|---------|-----------|-----------|-----------|\n"
+    for entry in analysis:
+        for row in entry['rows']:
+            quality = row['quality']
+            psnr = "∞" if np.isinf(quality['psnr']) else f"{quality['psnr']:.2f}"
+            report_content += (
+                f"| {entry['kernel']}x{entry['kernel']} | {row['precision']:<9} | {row['time']:<8.4f} | "
+                f"{row['speedup']:<17.2f}x | {quality['max_abs']:<7} | {psnr:<9} | {quality['differing']:<9.2%} | "
+                f"{'yes' if row['ok'] else 'no':<9} |\n"
+            )
+
+    with open("PRECISION.md", "w", encoding="utf-8") as f:
+        f.write(report_content)
+    print("Generated PRECISION.md successfully.")
+
+def render_precision_results(analysis, threads, max_abs, min_psnr, test_image, charts=True):
+    """In kiểu số học được chọn, vẽ biểu đồ (nếu charts=True) và tạo PRECISION.md."""
+    print("\n--- Precision comparison ---")
+    for entry in analysis:
+        for row in entry['rows']:
+            quality = row['quality']
+            print(f"  {entry['kernel']}x{entry['kernel']} {row['precision']:<7} {row['time']:.6f}s "
+                  f"({row['speedup']:.2f}x)  max abs {quality['max_abs']}, PSNR {quality['psnr']:.2f} dB"
+                  f"{'' if row['ok'] else '  (below quality bar)'}")
+        print(f"  {entry['kernel']}x{entry['kernel']} choice: {entry['choice'] or 'none'}")
+    if charts:
+        render_charts([(chart_precision, analysis, threads, max_abs, min_psnr)], dpi=CHART_DPI, workers=PLOT_JOBS)
+    generate_precision_report(analysis, threads, max_abs, min_psnr, test_image)
+
+def run_precision(charts=True):
+    """Đo thời gian và sai số so với double của từng kernel và kiểu số học ở một số luồng cố định."""
+    if not compile_code():
+        return
+    threads = PRECISION_THREADS or TOPOLOGY['physical']
+    print(f"CPU topology: {describe_topology(TOPOLOGY)}; precision threads: {threads}")
+    test_image = find_test_image()
+    if test_image is None:
+        return
+    print(f"Using test image: {test_image}")
+
+    runs = []
+    with tempfile.TemporaryDirectory() as directory:
+        for kernel_size in PRECISION_KERNELS:
+            print(f"\n--- {kernel_size}x{kernel_size} kernel ({describe_options(BENCH_OPTIONS)} each) ---")
+            try:
+                reference = dump_output(test_image, threads, kernel_size, 'double', directory)
+            except (OSError, subprocess.CalledProcessError, ValueError) as e:
+                print(f"  Failed to get double-precision output: {e}")
+                continue
+            for precision in PRECISIONS:
+                stats = run_benchmark(PRECISION_EXE, [test_image, str(threads), str(kernel_size), precision],
+                                      check={'kernel': f"{kernel_size}x{kernel_size}"}, **BENCH_OPTIONS)
+                if stats is None:
+                    continue
+                try:
+                    output = reference if precision == 'double' else dump_output(
+                        test_image, threads, kernel_size, precision, directory)
+                except (OSError, subprocess.CalledProcessError, ValueError) as e:
+                    print(f"  {precision:<7} failed to dump output: {e}")
+                    continue
+                quality = output_difference(reference, output, kernel_size // 2)
+                print(f"  {precision:<7} {format_stats(stats)}; max abs {quality['max_abs']}, "
+                      f"PSNR {quality['psnr']:.2f} dB")
+                runs.append({'kernel': kernel_size, 'precision': precision, 'threads': threads,
+                             'stats': stats, 'quality': quality})
+
+    if not runs:
+        print("No successful runs. Exiting.")
+        return
+
+    write_results(PRECISION_RESULTS_FILE, precision_to_records(runs),
+                  results_meta(BENCH_OPTIONS, topology=TOPOLOGY, threads=threads, kernels=PRECISION_KERNELS,
+                               precisions=PRECISIONS, max_abs=QUALITY_MAX_ABS, min_psnr=QUALITY_MIN_PSNR,
+                               test_image=test_image),
+                  csv_path=os.path.splitext(PRECISION_RESULTS_FILE)[0] + '.csv')
+    print(f"\nSaved raw samples and derived results to {PRECISION_RESULTS_FILE}")
+    render_precision_results(analyze_precision(runs, QUALITY_MAX_ABS, QUALITY_MIN_PSNR), threads,
+                             QUALITY_MAX_ABS, QUALITY_MIN_PSNR, test_image, charts=charts)
+
+
+# --- Bố cục ảnh: xen kẽ (interleaved) so với planar, chi phí đổi bố cục theo kích thước ảnh ---
+
+def analyze_layout(runs):
+    """
+    Ghép phép đo xen kẽ và planar của cùng ảnh/kernel.
+
+    Args:
+        runs (list): Các phép đo {'image', 'kernel', 'layout' ('interleaved' hoặc
+            'planar'), 'threads', 'stats'}
+
+    Returns:
+        list: Mỗi (ảnh, kernel) một dict: image, width, height, kernel, threads,
+        interleaved và planar (thời gian kernel), deinterleave và interleave (thời
+        gian đổi bố cục), conversion (tổng), kernel_gain (interleaved / planar),
+        net_gain (interleaved / (planar + conversion)), break_even (số lần chạy
+        kernel để phần lợi bù chi phí đổi bố cục, inf nếu planar không nhanh hơn)
+        và e2e_gain (tỷ lệ thời gian đầu-cuối)
+    """
+    layout = []
+    for image, kernel_size in dict.fromkeys((r['image'], r['kernel']) for r in runs):
+        group = {r['layout']: r for r in runs if (r['image'], r['kernel']) == (image, kernel_size)}
+        if 'interleaved' not in group or 'planar' not in group:
+            continue
+        interleaved, planar = group['interleaved']['stats'], group['planar']['stats']
+        phases = planar['phases']
+        conversion = phases['deinterleave'] + phases['interleave']
+        saved = interleaved['median'] - planar['median']
+        width, height = image_dimensions(planar)
+        layout.append({
+            'image': image, 'width': width, 'height': height, 'kernel': kernel_size,
+            'threads': group['planar']['threads'], 'interleaved': interleaved['median'], 'planar': planar['median'],
+            'deinterleave': phases['deinterleave'], 'interleave': phases['interleave'], 'conversion': conversion,
+            'kernel_gain': interleaved['median'] / planar['median'],
+            'net_gain': interleaved['median'] / (planar['median'] + conversion),
+            'break_even': conversion / saved if saved > 0 else float('inf'),
+            'e2e_gain': interleaved['end_to_end'] / planar['end_to_end'],
+        })
+    return layout
+
+def records_to_layout_runs(records):
+    """Dựng lại danh sách phép đo bố cục ảnh từ các bản ghi đã lưu."""
+    return [{k: r[k] for k in ('image', 'kernel', 'layout', 'threads', 'stats')} for r in records]
+
+def chart_planar(layout, threads, dpi=CHART_DPI):
+    """Thời gian kernel xen kẽ so với planar (cộng chi phí đổi bố cục) và tỷ lệ lợi theo kích thước ảnh."""
+    plt = pyplot()
+    fig, (ax_time, ax_gain) = plt.subplots(1, 2, figsize=(16, 6))
+    kernels = list(dict.fromkeys(entry['kernel'] for entry in layout))
+    colors = {3: 'blue', 5: 'green', 7: 'red'}
+    labels = []
+    for i, entry in enumerate(layout):
+        position = 3 * i
+        color = colors.get(entry['kernel'])
+        ax_time.bar(position, entry['interleaved'], color=color, alpha=0.5)
+        ax_time.bar(position + 1, entry['planar'], color=color)
+        ax_time.bar(position + 1, entry['conversion'], bottom=entry['planar'], color='none', edgecolor=color,
+                    hatch='//')
+        labels.append((position + 0.5, f"{entry['kernel']}x{entry['kernel']}\n{entry['width']}x{entry['height']}"))
+    ax_time.set_xticks([p for p, _ in labels])
+    ax_time.set_xticklabels([label for _, label in labels], fontsize=8)
+    ax_time.bar(0, 0, color='grey', alpha=0.5, label='interleaved (RGBRGB...)')
+    ax_time.bar(0, 0, color='grey', label='planar kernel')
+    ax_time.bar(0, 0, color='none', edgecolor='grey', hatch='//', label='deinterleave + interleave')
+    ax_time.set_ylabel('Time (seconds)')
+    ax_time.set_title(f'Interleaved vs Planar Layout ({threads} threads)')
+    ax_time.legend()
+    ax_time.grid(True, axis='y', alpha=0.4)
+    for kernel_size in kernels:
+        entries = sorted((e for e in layout if e['kernel'] == kernel_size), key=lambda e: e['width'] * e['height'])
+        megapixels = [e['width'] * e['height'] / 1e6 for e in entries]
+        color = colors.get(kernel_size)
+        ax_gain.plot(megapixels, [e['kernel_gain'] for e in entries], 'o-', color=color,
+                     label=f"{kernel_size}x{kernel_size} kernel only")
+        ax_gain.plot(megapixels, [e['net_gain'] for e in entries], 's--', color=color, alpha=0.6,
+                     label=f"{kernel_size}x{kernel_size} incl. conversion")
+    ax_gain.axhline(y=1.0, color='k', linestyle='-', alpha=0.5)
+    ax_gain.set_xlabel('Image Size (megapixels)')
+    ax_gain.set_ylabel('Speedup of Planar over Interleaved')
+    ax_gain.set_title('Planar Gain vs Image Size')
+    ax_gain.legend(fontsize=8)
+    ax_gain.grid(True, alpha=0.4)
+    plt.tight_layout()
+    plt.savefig("planar_layout.png", dpi=dpi)
+    print("Saved planar layout chart to planar_layout.png")
     plt.close()
 
-    # --- Tạo báo cáo ---
-    generate_report(baseline_time, results)
+def generate_planar_report(layout, threads):
+    """Tạo file báo cáo PLANAR.md."""
+    print("\n--- Generating PLANAR.md ---")
+    report_content = "# Bố cục ảnh: xen kẽ (interleaved) so với planar\n\n"
+    report_content += (
+        "`blur_3x3/5x5/7x7` đọc ảnh xen kẽ RGBRGB... với vòng lặp kênh trong cùng, nên các pixel lân cận "
+        "của cùng kênh cách nhau `channels` byte và vòng lặp khó vector hóa. `blur_planar` tách ảnh thành "
+        "mỗi kênh một mặt phẳng ngay sau khi đọc (deinterleave), tích chập từng mặt phẳng với vòng lặp "
+        "trong cùng theo x bước 1, rồi ghép lại trước khi ghi (interleave). Kết quả trùng khớp từng byte "
+        "với bản xen kẽ.\n\n"
+    )
+    report_content += f"**Cấu hình thực nghiệm:**\n"
+    report_content += f"- Cách lấy mẫu: {describe_options(BENCH_OPTIONS)} (các lần chạy khởi động bị loại bỏ)\n"
+    report_content += f"- Số luồng: {threads} (topology CPU: {describe_topology(TOPOLOGY)})\n\n"
+
+    report_content += "## Tóm tắt\n\n"
+    for entry in layout:
+        verdict = "có lợi ngay từ lần chạy đầu" if entry['net_gain'] > 1 else (
+            "không có lợi" if np.isinf(entry['break_even'])
+            else f"có lợi khi kernel chạy từ {entry['break_even']:.1f} lần trên cùng ảnh đã tách kênh")
+        report_content += (
+            f"- {entry['kernel']}x{entry['kernel']}, {entry['width']}x{entry['height']}: kernel nhanh hơn "
+            f"{entry['kernel_gain']:.2f}x, tính cả đổi bố cục {entry['net_gain']:.2f}x → {verdict}\n"
+        )
+    report_content += "\n![Planar Layout](planar_layout.png)\n\n"
+
+    report_content += "## Chi tiết\n\n"
+    report_content += (
+        "| Image | Size | Kernel | Interleaved (s) | Planar Kernel (s) | Deinterleave (s) | Interleave (s) | "
+        "Kernel Gain | Net Gain | Break-even Passes | E2E Gain |\n"
+    )
+    report_content += (
+        "|-------|------|--------|-----------------|-------------------|------------------|----------------|"
+        "-------------|----------|-------------------|----------|\n"
+    )
+    for entry in layout:
+        break_even = "n/a" if np.isinf(entry['break_even']) else f"{entry['break_even']:.2f}"
+        report_content += (
+            f"| {os.path.basename(entry['image'])} | {entry['width']}x{entry['height']} | "
+            f"{entry['kernel']}x{entry['kernel']} | {entry['interleaved']:<15.4f} | {entry['planar']:<17.4f} | "
+            f"{entry['deinterleave']:<16.4f} | {entry['interleave']:<14.4f} | {entry['kernel_gain']:<11.2f}x | "
+            f"{entry['net_gain']:<8.2f}x | {break_even:<17} | {entry['e2e_gain']:<8.2f}x |\n"
+        )
+    report_content += (
+        "\nNet Gain = thời gian kernel xen kẽ / (kernel planar + tách + ghép kênh); Break-even Passes = số lần "
+        "chạy kernel trên cùng ảnh để phần thời gian tiết kiệm bù chi phí đổi bố cục.\n"
+    )
+
+    with open("PLANAR.md", "w", encoding="utf-8") as f:
+        f.write(report_content)
+    print("Generated PLANAR.md successfully.")
+
+def render_planar_results(layout, threads, charts=True):
+    """In lợi ích của bố cục planar, vẽ biểu đồ (nếu charts=True) và tạo PLANAR.md."""
+    print("\n--- Interleaved vs planar ---")
+    for entry in layout:
+        print(f"  {entry['kernel']}x{entry['kernel']} {entry['width']}x{entry['height']}: kernel "
+              f"{entry['interleaved']:.6f}s -> {entry['planar']:.6f}s ({entry['kernel_gain']:.2f}x), "
+              f"conversion {entry['conversion']:.6f}s, net {entry['net_gain']:.2f}x")
+    if charts:
+        render_charts([(chart_planar, layout, threads)], dpi=CHART_DPI, workers=PLOT_JOBS)
+    generate_planar_report(layout, threads)
+
+def run_planar(images, charts=True):
+    """Đo kernel xen kẽ và planar (kèm chi phí đổi bố cục) cho từng ảnh và kích thước kernel."""
+    if not compile_code():
+        return
+    threads = PLANAR_THREADS or TOPOLOGY['physical']
+    print(f"CPU topology: {describe_topology(TOPOLOGY)}; planar threads: {threads}")
+    if not images:
+        test_image = find_test_image()
+        if test_image is None:
+            return
+        images = [test_image]
+
+    runs = []
+    for image in images:
+        for kernel_size in PLANAR_KERNELS:
+            print(f"\n--- {os.path.basename(image)}, {kernel_size}x{kernel_size} ({describe_options(BENCH_OPTIONS)} each) ---")
+            layouts = [
+                ('interleaved', KERNEL_INFO[f"{kernel_size}x{kernel_size}"]['executable'], [image, str(threads)]),
+                ('planar', PLANAR_EXE, [image, str(threads), str(kernel_size)]),
+            ]
+            for layout_name, executable, args in layouts:
+                stats = run_benchmark(executable, args, check={'kernel': f"{kernel_size}x{kernel_size}"},
+                                      **BENCH_OPTIONS)
+                if stats is not None:
+                    print(f"  {layout_name:<12} {format_stats(stats)}")
+                    runs.append({'image': image, 'kernel': kernel_size, 'layout': layout_name, 'threads': threads,
+                                 'stats': stats})
+
+    layout = analyze_layout(runs)
+    if not layout:
+        print("No successful runs. Exiting.")
+        return
+
+    write_results(PLANAR_RESULTS_FILE, runs,
+                  results_meta(BENCH_OPTIONS, topology=TOPOLOGY, threads=threads, kernels=PLANAR_KERNELS,
+                               images=images),
+                  csv_path=os.path.splitext(PLANAR_RESULTS_FILE)[0] + '.csv')
+    print(f"\nSaved raw samples and derived results to {PLANAR_RESULTS_FILE}")
+    render_planar_results(layout, threads, charts=charts)
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Phân tích ảnh hưởng của cường độ tính toán (kích thước kernel)')
+    parser.add_argument('--autotune', action='store_true', help='Tìm kích thước tile tốt nhất cho kernel 7x7 chia khối theo từng ảnh và số luồng, ghi vào bảng tra cứu')
+    parser.add_argument('--images', nargs='+', default=None, help='Các ảnh cho --autotune và --planar (mặc định: ảnh thực nghiệm)')
+    parser.add_argument('--tile-widths', nargs='+', type=int, default=TILE_WIDTHS, help=f'Các chiều rộng tile (pixel) cho --autotune, 0 = cả ảnh (mặc định: {TILE_WIDTHS})')
+    parser.add_argument('--tile-heights', nargs='+', type=int, default=TILE_HEIGHTS, help=f'Các chiều cao tile (hàng) cho --autotune, 0 = cả ảnh (mặc định: {TILE_HEIGHTS})')
+    parser.add_argument('--radius-sweep', action='store_true', help='Quét bán kính kernel với blur_engine: direct, separable và boxsum (tổng chạy), tìm điểm giao nhau')
+    parser.add_argument('--radii', nargs='+', type=int, default=SWEEP_RADII, help=f'Các bán kính cho --radius-sweep (mặc định: {SWEEP_RADII})')
+    parser.add_argument('--methods', nargs='+', choices=['direct', 'separable', 'boxsum'], default=SWEEP_METHODS, help=f'Các thuật toán cho --radius-sweep (mặc định: {SWEEP_METHODS})')
+    parser.add_argument('--sigma', type=float, default=SWEEP_SIGMA, help='Sigma của Gaussian cho --radius-sweep, 0 = bán kính / 3 (mặc định: 0)')
+    parser.add_argument('--sweep-threads', type=int, default=SWEEP_THREADS, help='Số luồng cho --radius-sweep (mặc định: số lõi vật lý)')
+    parser.add_argument('--precision', action='store_true', help='So sánh kernel 3x3/5x5/7x7 với số học double, float và fixed-point: thời gian và sai số (max abs, PSNR) so với double')
+    parser.add_argument('--planar', action='store_true', help='So sánh bố cục ảnh xen kẽ (RGBRGB...) với planar (mỗi kênh một mặt phẳng): lợi ích kernel và chi phí đổi bố cục theo kích thước ảnh')
+    parser.add_argument('--planar-threads', type=int, default=PLANAR_THREADS, help='Số luồng cho --planar (mặc định: số lõi vật lý)')
+    parser.add_argument('--kernels', nargs='+', type=int, choices=[3, 5, 7], default=PRECISION_KERNELS, help=f'Các kích thước kernel cho --precision và --planar (mặc định: {PRECISION_KERNELS})')
+    parser.add_argument('--precisions', nargs='+', choices=['double', 'float', 'fixed'], default=PRECISIONS, help=f'Các kiểu số học cho --precision, luôn gồm double (mặc định: {PRECISIONS})')
+    parser.add_argument('--precision-threads', type=int, default=PRECISION_THREADS, help='Số luồng cho --precision (mặc định: số lõi vật lý)')
+    parser.add_argument('--max-abs', type=int, default=QUALITY_MAX_ABS, help=f'Ngưỡng chất lượng cho --precision: sai khác tối đa so với double (mặc định: {QUALITY_MAX_ABS})')
+    parser.add_argument('--min-psnr', type=float, default=QUALITY_MIN_PSNR, help=f'Ngưỡng chất lượng cho --precision: PSNR tối thiểu so với double, dB (mặc định: {QUALITY_MIN_PSNR:g})')
+    parser.add_argument('--table', default=TUNING_TABLE, help='File JSON bảng tra cứu tile tốt nhất (mặc định: final_project/autotune_table.json)')
+    add_thread_arguments(parser)
+    add_benchmark_arguments(parser, runs=NUM_RUNS, warmup=WARMUP_RUNS)
+    add_results_arguments(parser, RESULTS_FILE)
+    add_plot_arguments(parser, dpi=CHART_DPI)
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
     try:
-        import matplotlib
+        # matplotlib chỉ được import khi vẽ biểu đồ (bench.plotting.pyplot)
         import numpy
     except ImportError:
-        print("Error: 'matplotlib' and 'numpy' are required.")
-        print("Please install them using: pip install matplotlib numpy")
+        print("Error: 'numpy' is required.")
+        print("Please install it using: pip install numpy")
     else:
+        args = parse_arguments()
+        custom_results = args.results != RESULTS_FILE
+        RESULTS_FILE = os.path.abspath(args.results)
+        CHART_DPI = args.dpi
+        PLOT_JOBS = args.plot_jobs
+        TOPOLOGY, THREAD_COUNTS = plan_threads(args)
+        if args.autotune:
+            TILE_WIDTHS = args.tile_widths
+            TILE_HEIGHTS = args.tile_heights
+            TUNING_TABLE = os.path.abspath(args.table)
+            # Kết quả autotune được lưu riêng (trừ khi chỉ định --results)
+            AUTOTUNE_RESULTS_FILE = RESULTS_FILE if custom_results else os.path.abspath(AUTOTUNE_RESULTS_FILE)
+            images = [os.path.abspath(image) for image in args.images] if args.images else None
+        if args.radius_sweep:
+            SWEEP_RADII = sorted(args.radii)
+            SWEEP_METHODS = args.methods
+            SWEEP_SIGMA = args.sigma
+            SWEEP_THREADS = args.sweep_threads
+            RADIUS_SWEEP_RESULTS_FILE = RESULTS_FILE if custom_results else os.path.abspath(RADIUS_SWEEP_RESULTS_FILE)
+        if args.precision:
+            PRECISION_KERNELS = args.kernels
+            PRECISIONS = ['double'] + [p for p in args.precisions if p != 'double']
+            PRECISION_THREADS = args.precision_threads
+            QUALITY_MAX_ABS = args.max_abs
+            QUALITY_MIN_PSNR = args.min_psnr
+            PRECISION_RESULTS_FILE = RESULTS_FILE if custom_results else os.path.abspath(PRECISION_RESULTS_FILE)
+        if args.planar:
+            PLANAR_KERNELS = args.kernels
+            PLANAR_THREADS = args.planar_threads
+            PLANAR_RESULTS_FILE = RESULTS_FILE if custom_results else os.path.abspath(PLANAR_RESULTS_FILE)
+            images = [os.path.abspath(image) for image in args.images] if args.images else None
+
         os.chdir(os.path.dirname(os.path.abspath(__file__)))
-        main()
\ No newline at end of file
+
+        if args.autotune and (args.replot or args.report_only):
+            try:
+                meta, records = read_results(AUTOTUNE_RESULTS_FILE)
+            except FileNotFoundError:
+                print(f"Error: {AUTOTUNE_RESULTS_FILE} not found. Run the autotuner first.")
+                sys.exit(1)
+            BENCH_OPTIONS = meta.get('options', BENCH_OPTIONS)
+            TOPOLOGY = meta.get('topology', TOPOLOGY)
+            render_autotune_results(analyze_tuning(records_to_runs(records)),
+                                    meta.get('tile_widths', TILE_WIDTHS), meta.get('tile_heights', TILE_HEIGHTS),
+                                    meta.get('host', 'unknown'), charts=args.replot and not args.no_plots)
+        elif args.autotune:
+            BENCH_OPTIONS = benchmark_options(args)
+            run_autotune(images, charts=not args.no_plots)
+            report_store(BENCH_OPTIONS)
+        elif args.radius_sweep and (args.replot or args.report_only):
+            try:
+                meta, records = read_results(RADIUS_SWEEP_RESULTS_FILE)
+            except FileNotFoundError:
+                print(f"Error: {RADIUS_SWEEP_RESULTS_FILE} not found. Run the radius sweep first.")
+                sys.exit(1)
+            BENCH_OPTIONS = meta.get('options', BENCH_OPTIONS)
+            TOPOLOGY = meta.get('topology', TOPOLOGY)
+            sweep = records_to_sweep(records, meta.get('methods', SWEEP_METHODS), meta.get('radii', SWEEP_RADII))
+            render_radius_results(sweep, meta.get('threads'), meta.get('sigma', SWEEP_SIGMA),
+                                  meta.get('test_image', 'unknown'), charts=args.replot and not args.no_plots)
+        elif args.radius_sweep:
+            BENCH_OPTIONS = benchmark_options(args)
+            run_radius_sweep(charts=not args.no_plots)
+            report_store(BENCH_OPTIONS)
+        elif args.precision and (args.replot or args.report_only):
+            try:
+                meta, records = read_results(PRECISION_RESULTS_FILE)
+            except FileNotFoundError:
+                print(f"Error: {PRECISION_RESULTS_FILE} not found. Run the precision comparison first.")
+                sys.exit(1)
+            BENCH_OPTIONS = meta.get('options', BENCH_OPTIONS)
+            TOPOLOGY = meta.get('topology', TOPOLOGY)
+            # Ngưỡng chất lượng từ dòng lệnh được áp dụng lại cho kết quả đã lưu
+            analysis = analyze_precision(records_to_precision_runs(records), QUALITY_MAX_ABS, QUALITY_MIN_PSNR)
+            render_precision_results(analysis, meta.get('threads'), QUALITY_MAX_ABS, QUALITY_MIN_PSNR,
+                                     meta.get('test_image', 'unknown'), charts=args.replot and not args.no_plots)
+        elif args.precision:
+            BENCH_OPTIONS = benchmark_options(args)
+            run_precision(charts=not args.no_plots)
+            report_store(BENCH_OPTIONS)
+        elif args.planar and (args.replot or args.report_only):
+            try:
+                meta, records = read_results(PLANAR_RESULTS_FILE)
+            except FileNotFoundError:
+                print(f"Error: {PLANAR_RESULTS_FILE} not found. Run the planar comparison first.")
+                sys.exit(1)
+            BENCH_OPTIONS = meta.get('options', BENCH_OPTIONS)
+            TOPOLOGY = meta.get('topology', TOPOLOGY)
+            render_planar_results(analyze_layout(records_to_layout_runs(records)), meta.get('threads'),
+                                  charts=args.replot and not args.no_plots)
+        elif args.planar:
+            BENCH_OPTIONS = benchmark_options(args)
+            run_planar(images, charts=not args.no_plots)
+            report_store(BENCH_OPTIONS)
+        elif args.replot or args.report_only:
+            # Dựng lại biểu đồ/báo cáo từ kết quả đã lưu, không chạy benchmark
+            try:
+                meta, records = read_results(RESULTS_FILE)
+            except FileNotFoundError:
+                print(f"Error: {RESULTS_FILE} not found. Run the analysis first.")
+                sys.exit(1)
+            BENCH_OPTIONS = meta.get('options', BENCH_OPTIONS)
+            THREAD_COUNTS = meta.get('thread_counts', THREAD_COUNTS)
+            TOPOLOGY = meta.get('topology', TOPOLOGY)
+            render_results(*records_to_results(records), charts=args.replot and not args.no_plots)
+        else:
+            BENCH_OPTIONS = benchmark_options(args)
+            main(charts=not args.no_plots)
+            report_store(BENCH_OPTIONS)
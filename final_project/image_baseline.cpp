@@ -8,6 +8,12 @@
 #define STB_IMAGE_WRITE_IMPLEMENTATION
 #include "stb_image_write.h"
 
+// Đo thời gian từng giai đoạn, in dòng JSON ở cuối stdout
+#include "phase_timing.h"
+
+// Ghi bộ đệm ảnh dạng byte thô khi có BLUR_DUMP/BLUR_DUMP_INPUT
+#include "raw_dump.h"
+
 // Định nghĩa kernel Gaussian Blur 3x3
 // Đây là một ma trận trọng số
 const double kernel[3][3] = {
@@ -15,12 +21,21 @@ const double kernel[3][3] = {
     {2.0 / 16, 4.0 / 16, 2.0 / 16},
     {1.0 / 16, 2.0 / 16, 1.0 / 16}};
 
-int main() {
+int main(int argc, char *argv[]) {
+    PhaseTimer timer;
+
     int width, height, channels;
+    // Số lần lặp kernel trong cùng một process (mặc định 1)
+    int repeats = 1;
+    if (argc > 1) {
+        repeats = atoi(argv[1]);
+    }
 
     // 1. Đọc ảnh đầu vào
     // stbi_load trả về con trỏ unsigned char* đến dữ liệu pixel
+    timer.start();
     unsigned char *img = stbi_load("input.jpg", &width, &height, &channels, 0);
+    timer.decode = timer.stop();
     if (img == NULL) {
         printf("Lỗi: Không thể đọc file ảnh.\n");
         return 1;
@@ -31,48 +46,60 @@ int main() {
     size_t img_size = width * height * channels;
     
     // 2. Tạo bộ đệm (buffer) cho ảnh đầu ra
+    timer.start();
     unsigned char *output_img = (unsigned char *)malloc(img_size);
+    timer.alloc = timer.stop();
     if (output_img == NULL) {
         printf("Lỗi: Không thể cấp phát bộ nhớ cho ảnh đầu ra.\n");
         stbi_image_free(img);
         return 1;
     }
     
-    // --- BẮT ĐẦU ĐO THỜI GIAN TUẦN TỰ ---
-    auto start_time = std::chrono::high_resolution_clock::now();
+    // Lặp kernel `repeats` lần trên dữ liệu đã đọc, in thời gian của từng lần
+    for (int r = 0; r < repeats; ++r) {
+        // --- BẮT ĐẦU ĐO THỜI GIAN TUẦN TỰ ---
+        auto start_time = std::chrono::high_resolution_clock::now();
 
-    // 3. Áp dụng bộ lọc (Phần tính toán chính)
-    // Chúng ta duyệt qua từng pixel (trừ các đường viền)
-    for (int y = 1; y < height - 1; ++y) {
-        for (int x = 1; x < width - 1; ++x) {
+        // 3. Áp dụng bộ lọc (Phần tính toán chính)
+        // Chúng ta duyệt qua từng pixel (trừ các đường viền)
+        for (int y = 1; y < height - 1; ++y) {
+            for (int x = 1; x < width - 1; ++x) {
             
-            // Áp dụng kernel cho từng kênh màu (R, G, B)
-            for (int c = 0; c < channels; ++c) {
-                double sum = 0.0;
+                // Áp dụng kernel cho từng kênh màu (R, G, B)
+                for (int c = 0; c < channels; ++c) {
+                    double sum = 0.0;
                 
-                // Vòng lặp 3x3 của kernel
-                for (int ky = -1; ky <= 1; ++ky) {
-                    for (int kx = -1; kx <= 1; ++kx) {
-                        // Lấy pixel gốc
-                        unsigned char pixel_val = img[((y + ky) * width + (x + kx)) * channels + c];
-                        // Nhân với trọng số kernel
-                        sum += pixel_val * kernel[ky + 1][kx + 1];
+                    // Vòng lặp 3x3 của kernel
+                    for (int ky = -1; ky <= 1; ++ky) {
+                        for (int kx = -1; kx <= 1; ++kx) {
+                            // Lấy pixel gốc
+                            unsigned char pixel_val = img[((y + ky) * width + (x + kx)) * channels + c];
+                            // Nhân với trọng số kernel
+                            sum += pixel_val * kernel[ky + 1][kx + 1];
+                        }
                     }
-                }
                 
-                // Gán giá trị pixel mới cho ảnh đầu ra
-                output_img[(y * width + x) * channels + c] = (unsigned char)sum;
+                    // Gán giá trị pixel mới cho ảnh đầu ra
+                    output_img[(y * width + x) * channels + c] = (unsigned char)sum;
+                }
             }
         }
+
+        // --- KẾT THÚC ĐO THỜI GIAN ---
+        auto end_time = std::chrono::high_resolution_clock::now();
+        std::chrono::duration<double> diff = end_time - start_time;
+        printf("%f\n", diff.count());
+        timer.compute.push_back(diff.count());
     }
 
-    // --- KẾT THÚC ĐO THỜI GIAN ---
-    auto end_time = std::chrono::high_resolution_clock::now();
-    std::chrono::duration<double> diff = end_time - start_time;
-    printf("%f\n", diff.count());
+    // Ghi bộ đệm thô (nếu có BLUR_DUMP) để kiểm tra với bản tham chiếu
+    dump_buffers(img, output_img, img_size);
 
     // 4. Ghi ảnh ra file
+    timer.start();
     stbi_write_jpg("output_sequential.jpg", width, height, channels, output_img, 100);
+    timer.encode = timer.stop();
+    timer.report(width, height, channels);
 
     // 5. Giải phóng bộ nhớ
     stbi_image_free(img);
@@ -8,23 +8,32 @@
 #define STB_IMAGE_WRITE_IMPLEMENTATION
 #include "stb_image_write.h"
 
-// Bộ lọc Gaussian 3x3 để làm mờ ảnh
-const double kernel[3][3] = {
-    {1.0 / 16, 2.0 / 16, 1.0 / 16},
-    {2.0 / 16, 4.0 / 16, 2.0 / 16},
-    {1.0 / 16, 2.0 / 16, 1.0 / 16}};
+// Đo thời gian từng giai đoạn, in dòng JSON ở cuối stdout
+#include "phase_timing.h"
+
+// Ghi bộ đệm ảnh dạng byte thô khi có BLUR_DUMP/BLUR_DUMP_INPUT
+#include "raw_dump.h"
+
+// Trọng số và vòng lặp tích chập dùng chung với libblur.so
+#include "blur_kernels.h"
 
 int main(int argc, char *argv[]) {
+    PhaseTimer timer;
+
     // Đọc ảnh đầu vào
     int width, height, channels;
+    timer.start();
     unsigned char *img = stbi_load("input.jpg", &width, &height, &channels, 0);
+    timer.decode = timer.stop();
     if (img == NULL) {
         printf("Lỗi: Không thể mở file input.jpg\n");
         return 1;
     }
     // Cấp phát bộ nhớ cho ảnh đầu ra
     size_t img_size = width * height * channels;
+    timer.start();
     unsigned char *output_img = (unsigned char *)malloc(img_size);
+    timer.alloc = timer.stop();
     if (output_img == NULL) {
         printf("Lỗi: Không thể cấp phát bộ nhớ cho ảnh output.\n");
         stbi_image_free(img);
@@ -36,37 +45,36 @@ int main(int argc, char *argv[]) {
     if (argc > 1) {
         num_threads = atoi(argv[1]);
     }
+    // Số lần lặp kernel trong cùng một process (mặc định 1)
+    int repeats = 1;
+    if (argc > 2) {
+        repeats = atoi(argv[2]);
+    }
     omp_set_num_threads(num_threads);
     printf("Chạy song song với %d luồng...\n", num_threads);
 
-    // Bắt đầu đo thời gian
-    double start_time = omp_get_wtime();
+    // Lặp kernel `repeats` lần trên dữ liệu đã đọc, in thời gian của từng lần
+    for (int r = 0; r < repeats; ++r) {
+        // Bắt đầu đo thời gian
+        double start_time = omp_get_wtime();
+
+        // Áp dụng bộ lọc song song (static schedule, collapse 2 vòng lặp)
+        blur_direct_static<1>(img, output_img, width, height, channels, blur_kernel_3x3);
 
-    // Áp dụng bộ lọc song song (static schedule, collapse 2 vòng lặp)
-    #pragma omp parallel for schedule(static) collapse(2)
-    for (int y = 1; y < height - 1; ++y) {
-        for (int x = 1; x < width - 1; ++x) {
-            // Xử lý từng kênh màu (R, G, B)
-            for (int c = 0; c < channels; ++c) {
-                double sum = 0.0;
-                // Tính convolution với 9 pixel lân cận
-                for (int ky = -1; ky <= 1; ++ky) {
-                    for (int kx = -1; kx <= 1; ++kx) {
-                        unsigned char pixel_val = img[((y + ky) * width + (x + kx)) * channels + c];
-                        sum += pixel_val * kernel[ky + 1][kx + 1];
-                    }
-                }
-                output_img[(y * width + x) * channels + c] = (unsigned char)sum;
-            }
-        }
+        // Kết thúc đo thời gian và in ra
+        double end_time = omp_get_wtime();
+        printf("%f\n", (end_time - start_time));
+        timer.compute.push_back(end_time - start_time);
     }
 
-    // Kết thúc đo thời gian và in ra
-    double end_time = omp_get_wtime();
-    printf("%f\n", (end_time - start_time));
+    // Ghi bộ đệm thô (nếu có BLUR_DUMP) để kiểm tra với bản tham chiếu
+    dump_buffers(img, output_img, img_size);
 
     // Ghi ảnh kết quả
+    timer.start();
     stbi_write_jpg("output_parallel.jpg", width, height, channels, output_img, 100);
+    timer.encode = timer.stop();
+    timer.report(width, height, channels);
 
     // Giải phóng bộ nhớ
     stbi_image_free(img);
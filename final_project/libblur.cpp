@@ -0,0 +1,100 @@
+// Thư viện dùng chung (libblur.so) chứa các kernel làm mờ của feature1/2/3 với C ABI,
+// để gọi trực tiếp trong process (ctypes, xem bench/native.py) thay vì chạy một
+// chương trình cho mỗi mẫu: không có chi phí khởi động process, giải mã và mã hóa JPEG.
+//
+// Bộ đệm do bên gọi sở hữu: ảnh đầu vào và ảnh kết quả xen kẽ (height x width x
+// channels byte), bộ đệm trung gian float cho kernel separable (kích thước từ
+// blur_workspace_size). Trọng số và vòng lặp lấy từ blur_kernels.h, cùng header với
+// các chương trình, nên thư viện và chương trình biên dịch cùng một kernel:
+//   "3x3"                 - image_parallel.cpp (feature1) và feature2
+//   "5x5", "7x7"          - image_parallel_5x5/7x7.cpp (feature3)
+//   "5x5-sep", "7x7-sep"  - image_separable_5x5/7x7.cpp (feature3)
+// Schedule chọn vòng lặp như các chương trình: "static" với chunk 0 là vòng lặp
+// schedule(static) của blur_parallel/blur_static, "dynamic" với chunk 0 là
+// schedule(dynamic) của blur_dynamic; các cấu hình khác đặt bằng omp_set_schedule rồi
+// chạy vòng lặp schedule(runtime), như OMP_SCHEDULE của blur_runtime.
+// Như các chương trình, viền r pixel của ảnh kết quả không được ghi.
+//
+// blur_load_image/blur_free_image giải mã ảnh bằng stb_image như các chương trình, để
+// backend Python (bench/pyblur.py, bench/native.py) làm mờ đúng ảnh đầu vào mà các
+// chương trình nhận được (các bộ giải mã JPEG khác nhau cho ra pixel khác nhau).
+#include <cstring>
+#include <omp.h>
+
+#include "blur_kernels.h"
+
+#define STB_IMAGE_IMPLEMENTATION
+#include "stb_image.h"
+
+// Kiểu schedule theo tên; false nếu không biết
+static bool parse_schedule(const char *name, omp_sched_t *kind) {
+    if (strcmp(name, "static") == 0) *kind = omp_sched_static;
+    else if (strcmp(name, "dynamic") == 0) *kind = omp_sched_dynamic;
+    else if (strcmp(name, "guided") == 0) *kind = omp_sched_guided;
+    else if (strcmp(name, "auto") == 0) *kind = omp_sched_auto;
+    else return false;
+    return true;
+}
+
+static bool is_separable(const char *kernel) {
+    return strcmp(kernel, "5x5-sep") == 0 || strcmp(kernel, "7x7-sep") == 0;
+}
+
+static bool is_direct(const char *kernel) {
+    return strcmp(kernel, "3x3") == 0 || strcmp(kernel, "5x5") == 0 || strcmp(kernel, "7x7") == 0;
+}
+
+extern "C" {
+
+// Giải mã ảnh (số kênh gốc của file); NULL nếu lỗi. Giải phóng bằng blur_free_image
+unsigned char *blur_load_image(const char *path, int *width, int *height, int *channels) {
+    return stbi_load(path, width, height, channels, 0);
+}
+
+void blur_free_image(unsigned char *data) {
+    stbi_image_free(data);
+}
+
+// Số byte của bộ đệm trung gian cần cho kernel (0 với kernel trực tiếp), -1 nếu không biết kernel
+long blur_workspace_size(const char *kernel, int width, int height, int channels) {
+    if (is_separable(kernel)) return (long)width * height * channels * (long)sizeof(float);
+    return is_direct(kernel) ? 0 : -1;
+}
+
+// Chạy kernel một lần trên bộ đệm của bên gọi.
+// Trả về 0 nếu thành công, -1 nếu không biết kernel, -2 nếu không biết schedule,
+// -3 nếu kernel separable thiếu bộ đệm trung gian, -4 nếu kích thước/số luồng không hợp lệ
+int blur_run(const char *kernel, const unsigned char *input, unsigned char *output, float *workspace,
+             int width, int height, int channels, int threads, const char *schedule, int chunk) {
+    omp_sched_t kind;
+    if (!is_direct(kernel) && !is_separable(kernel)) return -1;
+    if (!parse_schedule(schedule, &kind)) return -2;
+    if (is_separable(kernel) && workspace == NULL) return -3;
+    if (width <= 0 || height <= 0 || channels <= 0 || threads <= 0) return -4;
+    omp_set_num_threads(threads);
+
+    if (chunk == 0 && kind == omp_sched_static) {
+        if (strcmp(kernel, "3x3") == 0) blur_direct_static<1>(input, output, width, height, channels, blur_kernel_3x3);
+        else if (strcmp(kernel, "5x5") == 0) blur_direct_static<2>(input, output, width, height, channels, blur_kernel_5x5);
+        else if (strcmp(kernel, "7x7") == 0) blur_direct_static<3>(input, output, width, height, channels, blur_kernel_7x7);
+        else if (strcmp(kernel, "5x5-sep") == 0) blur_separable_static<2>(input, output, workspace, width, height, channels, blur_kernel_1d_5);
+        else blur_separable_static<3>(input, output, workspace, width, height, channels, blur_kernel_1d_7);
+        return 0;
+    }
+    if (chunk == 0 && kind == omp_sched_dynamic && is_direct(kernel)) {
+        if (strcmp(kernel, "3x3") == 0) blur_direct_dynamic<1>(input, output, width, height, channels, blur_kernel_3x3);
+        else if (strcmp(kernel, "5x5") == 0) blur_direct_dynamic<2>(input, output, width, height, channels, blur_kernel_5x5);
+        else blur_direct_dynamic<3>(input, output, width, height, channels, blur_kernel_7x7);
+        return 0;
+    }
+
+    omp_set_schedule(kind, chunk);
+    if (strcmp(kernel, "3x3") == 0) blur_direct_runtime<1>(input, output, width, height, channels, blur_kernel_3x3);
+    else if (strcmp(kernel, "5x5") == 0) blur_direct_runtime<2>(input, output, width, height, channels, blur_kernel_5x5);
+    else if (strcmp(kernel, "7x7") == 0) blur_direct_runtime<3>(input, output, width, height, channels, blur_kernel_7x7);
+    else if (strcmp(kernel, "5x5-sep") == 0) blur_separable_runtime<2>(input, output, workspace, width, height, channels, blur_kernel_1d_5);
+    else blur_separable_runtime<3>(input, output, workspace, width, height, channels, blur_kernel_1d_7);
+    return 0;
+}
+
+}
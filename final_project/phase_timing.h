@@ -0,0 +1,101 @@
+// Đo thời gian từng giai đoạn của chương trình làm mờ ảnh:
+// đọc ảnh (decode), cấp phát (alloc), tính toán (compute, mỗi lần lặp một giá trị),
+// ghi ảnh (encode) và tổng thời gian từ đầu chương trình (total).
+// Kết quả được in thành một dòng JSON ở cuối stdout để script đo hiệu năng đọc.
+//
+// Khi biến môi trường BLUR_THREAD_STATS=1, các chương trình có ghi nhận theo luồng
+// (record_thread) in thêm trường "threads": mỗi lần lặp một danh sách, mỗi luồng
+// một phần tử {start, busy, wait, iterations} (giây tính từ đầu lần lặp).
+//
+// Chương trình có giai đoạn riêng ngoài kernel (ví dụ đổi bố cục ảnh) ghi lại bằng
+// record_phase; chúng được in trong trường "extra_phases" và tính vào thời gian đầu-cuối.
+#pragma once
+
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <string>
+#include <utility>
+#include <vector>
+
+// Số liệu của một luồng trong một lần lặp kernel
+struct ThreadSample {
+    double start = 0.0;     // Từ đầu lần lặp đến khi luồng bắt đầu nhận việc (chi phí fork)
+    double busy = 0.0;      // Thời gian xử lý các iteration được chia
+    double wait = 0.0;      // Thời gian chờ ở barrier cuối vùng song song
+    long iterations = 0;    // Số iteration luồng đã xử lý
+};
+
+struct PhaseTimer {
+    typedef std::chrono::steady_clock Clock;
+
+    Clock::time_point program_start = Clock::now();
+    Clock::time_point phase_start;
+    double decode = 0.0;
+    double alloc = 0.0;
+    double encode = 0.0;
+    std::vector<double> compute;
+    bool thread_stats = getenv("BLUR_THREAD_STATS") != NULL && atoi(getenv("BLUR_THREAD_STATS")) != 0;
+    std::vector<std::vector<ThreadSample> > threads;
+    std::vector<std::pair<std::string, double> > extra_phases;
+
+    // Bắt đầu đo một giai đoạn
+    void start() { phase_start = Clock::now(); }
+
+    // Thời gian (giây) từ lần gọi start() gần nhất
+    double stop() const {
+        return std::chrono::duration<double>(Clock::now() - phase_start).count();
+    }
+
+    // Ghi thời gian (giây) của một giai đoạn riêng của chương trình
+    void record_phase(const char *name, double seconds) {
+        extra_phases.push_back(std::make_pair(std::string(name), seconds));
+    }
+
+    // Bắt đầu một lần lặp có ghi nhận theo luồng (team tối đa num_threads luồng)
+    void begin_iteration(int num_threads) {
+        if (thread_stats) threads.push_back(std::vector<ThreadSample>(num_threads));
+    }
+
+    // Ghi số liệu của luồng tid trong lần lặp hiện tại (gọi từ trong vùng song song)
+    void record_thread(int tid, const ThreadSample &sample) {
+        if (thread_stats && tid < (int)threads.back().size()) threads.back()[tid] = sample;
+    }
+
+    // Thu gọn lần lặp hiện tại về kích thước team thực tế
+    void end_iteration(int team_size) {
+        if (thread_stats && team_size < (int)threads.back().size()) threads.back().resize(team_size);
+    }
+
+    // In dòng JSON: {"decode": ..., "alloc": ..., "compute": [...], "encode": ..., "total": ..., ...}
+    void report(int width, int height, int channels) const {
+        double total = std::chrono::duration<double>(Clock::now() - program_start).count();
+        printf("{\"width\": %d, \"height\": %d, \"channels\": %d, ", width, height, channels);
+        printf("\"decode\": %f, \"alloc\": %f, \"compute\": [", decode, alloc);
+        for (size_t i = 0; i < compute.size(); ++i) {
+            printf(i == 0 ? "%f" : ", %f", compute[i]);
+        }
+        printf("], \"encode\": %f, \"total\": %f", encode, total);
+        if (!extra_phases.empty()) {
+            printf(", \"extra_phases\": {");
+            for (size_t i = 0; i < extra_phases.size(); ++i) {
+                printf("%s\"%s\": %f", i == 0 ? "" : ", ", extra_phases[i].first.c_str(), extra_phases[i].second);
+            }
+            printf("}");
+        }
+        if (thread_stats && !threads.empty()) {
+            printf(", \"threads\": [");
+            for (size_t i = 0; i < threads.size(); ++i) {
+                printf(i == 0 ? "[" : ", [");
+                for (size_t t = 0; t < threads[i].size(); ++t) {
+                    const ThreadSample &s = threads[i][t];
+                    printf("%s{\"start\": %f, \"busy\": %f, \"wait\": %f, \"iterations\": %ld}",
+                           t == 0 ? "" : ", ", s.start, s.busy, s.wait, s.iterations);
+                }
+                printf("]");
+            }
+            printf("]");
+        }
+        printf("}\n");
+    }
+};
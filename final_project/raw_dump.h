@@ -0,0 +1,28 @@
+// Ghi bộ đệm ảnh dạng byte thô (không nén) để kiểm tra kết quả với bản tham chiếu
+// NumPy (bench/reference.py):
+//   BLUR_DUMP=<file>        ảnh kết quả (output_img)
+//   BLUR_DUMP_INPUT=<file>  ảnh đầu vào đã giải mã bởi stb_image
+// Ảnh JPEG kết quả không dùng được để so sánh vì nén JPEG làm thay đổi giá trị pixel;
+// ảnh đầu vào được ghi lại để bản tham chiếu không phải giải mã JPEG lần nữa (các bộ
+// giải mã khác nhau cho ra pixel khác nhau).
+#pragma once
+
+#include <cstdio>
+#include <cstdlib>
+
+// Ghi size byte của data vào file trong biến môi trường env_name (nếu có)
+static inline void dump_raw(const char *env_name, const unsigned char *data, size_t size) {
+    const char *path = getenv(env_name);
+    if (path == NULL || path[0] == '\0') return;
+    FILE *dump = fopen(path, "wb");
+    if (dump == NULL || fwrite(data, 1, size, dump) != size) {
+        fprintf(stderr, "Cannot write %s\n", path);
+    }
+    if (dump != NULL) fclose(dump);
+}
+
+// Ghi ảnh đầu vào và ảnh kết quả theo BLUR_DUMP_INPUT/BLUR_DUMP
+static inline void dump_buffers(const unsigned char *img, const unsigned char *output_img, size_t img_size) {
+    dump_raw("BLUR_DUMP_INPUT", img, img_size);
+    dump_raw("BLUR_DUMP", output_img, img_size);
+}
@@ -1,33 +1,40 @@
 import subprocess
 import numpy as np
-import matplotlib.pyplot as plt
 import os
+import argparse
+
+from bench import (
+    BuildError, add_benchmark_arguments, add_plot_arguments, add_thread_arguments,
+    benchmark_options, build_targets, describe_options, describe_topology, detect_topology,
+    end_to_end_series, format_stats, plan_threads, pyplot, render_charts, report_store,
+    run_benchmark, shade_topology, thread_ladder,
+)
 
 # --- Cấu hình thực nghiệm ---
-NUM_RUNS = 5  # Số lần chạy mỗi cấu hình để lấy trung bình
-THREAD_COUNTS = [1, 2, 4, 8, 10, 12]  # Các số luồng cần kiểm tra
+NUM_RUNS = 5  # Số mẫu được tính vào thống kê cho mỗi cấu hình
+WARMUP_RUNS = 1  # Số lần chạy khởi động bị loại bỏ
+BENCH_OPTIONS = {'runs': NUM_RUNS, 'warmup': WARMUP_RUNS}  # Tham số cho run_benchmark, ghi đè từ dòng lệnh
+TOPOLOGY = detect_topology()  # CPU dùng được và số lõi vật lý của máy
+THREAD_COUNTS = thread_ladder(TOPOLOGY)  # Các số luồng cần kiểm tra (theo topology), ghi đè bằng --threads
 BASELINE_EXE = "./blur_baseline"
 PARALLEL_EXE = "./blur_parallel"
 RESULTS_FILE = "results.dat"
 SPEEDUP_CHART_FILE = "speedup_chart.png"
 EFFICIENCY_CHART_FILE = "efficiency_chart.png"
+CHART_DPI = 100  # Độ phân giải biểu đồ, ghi đè bằng --dpi
+PLOT_JOBS = None  # Số process vẽ biểu đồ (None = số CPU), ghi đè bằng --plot-jobs
+OUTPUT_CHECK = {'kernel': '3x3'}  # Kiểm tra ảnh kết quả với bản tham chiếu NumPy (--verify)
 
 def compile_code():
-    """Biên dịch code C++ bằng Makefile."""
+    """Biên dịch code C++ từ Makefile, chỉ build lại các target đã thay đổi."""
     print("--- Compiling C++ code ---")
     try:
-        # Chạy 'make clean' và 'make'
-        subprocess.run(["make", "clean"], check=True, capture_output=True, text=True)
-        result = subprocess.run(["make"], check=True, capture_output=True, text=True)
-        print("Compilation successful.")
-        return True
-    except FileNotFoundError:
-        print("Error: 'make' command not found. Please ensure make is installed.")
-        return False
-    except subprocess.CalledProcessError as e:
-        print("Error during compilation:")
-        print(e.stderr)
+        result = build_targets()
+    except BuildError as e:
+        print(f"Error during compilation: {e}")
         return False
+    print(f"Compilation successful ({len(result['built'])} built, {len(result['cached'])} up to date).")
+    return True
 
 def check_input_image():
     """Kiểm tra sự tồn tại của input.jpg, nếu không có thì tạo ảnh giả."""
@@ -48,57 +55,84 @@ def check_input_image():
             return False
     return True
 
-def run_benchmark(executable, args=[]):
-    """Chạy một file thực thi nhiều lần và trả về thời gian trung bình."""
-    timings = []
-    for _ in range(NUM_RUNS):
-        try:
-            result = subprocess.run(
-                [executable] + args, check=True, capture_output=True, text=True
-            )
-            # Lấy dòng output cuối cùng chứa thời gian
-            time_str = result.stdout.strip().split('\n')[-1]
-            timings.append(float(time_str))
-        except (subprocess.CalledProcessError, ValueError, IndexError) as e:
-            print(f"Error running {executable} with args {args}: {e}")
-            if hasattr(e, 'stderr'):
-                print(e.stderr)
-            return None
-    return np.mean(timings) if timings else None
-
-def main():
+def chart_speedup(thread_counts, speedup, efficiency, e2e, topology=None, dpi=CHART_DPI):
+    """Biểu đồ Tăng tốc (Speedup)."""
+    plt = pyplot()
+    plt.figure(figsize=(10, 6))
+    plt.plot(thread_counts, speedup, 'o-', label='Actual Speedup')
+    if e2e is not None:
+        plt.plot(thread_counts, e2e['speedups'], 's--', label='End-to-End Speedup (incl. decode/encode)')
+    plt.plot(thread_counts, thread_counts, 'r--', label='Ideal Speedup')
+    plt.title('Speedup vs. Number of Threads')
+    plt.xlabel('Number of Threads (p)')
+    plt.ylabel('Speedup (Sequential Time / Parallel Time)')
+    shade_topology(plt.gca(), topology)
+    plt.grid(True)
+    plt.legend()
+    plt.xticks(thread_counts)
+    plt.savefig(SPEEDUP_CHART_FILE, dpi=dpi)
+    print(f"Saved speedup chart to {SPEEDUP_CHART_FILE}")
+    plt.close()
+
+def chart_efficiency(thread_counts, speedup, efficiency, e2e, dpi=CHART_DPI):
+    """Biểu đồ Hiệu suất (Efficiency)."""
+    plt = pyplot()
+    plt.figure(figsize=(10, 6))
+    plt.plot(thread_counts, efficiency, 'o-', label='Actual Efficiency')
+    plt.axhline(y=1.0, color='r', linestyle='--', label='Ideal Efficiency (100%)')
+    plt.title('Efficiency vs. Number of Threads')
+    plt.xlabel('Number of Threads (p)')
+    plt.ylabel('Efficiency (Speedup / p)')
+    plt.grid(True)
+    plt.legend()
+    plt.xticks(thread_counts)
+    plt.ylim(0, 1.1) # Giới hạn trục Y từ 0 đến 110%
+    plt.gca().yaxis.set_major_formatter(plt.FuncFormatter('{:.0%}'.format)) # Format Y axis as percentage
+    plt.savefig(EFFICIENCY_CHART_FILE, dpi=dpi)
+    print(f"Saved efficiency chart to {EFFICIENCY_CHART_FILE}")
+    plt.close()
+
+def main(charts=True):
     """Hàm chính điều phối toàn bộ quá trình."""
     if not compile_code():
         return
     if not check_input_image():
         return
+    print(f"CPU topology: {describe_topology(TOPOLOGY)}; thread counts: {THREAD_COUNTS}")
 
     # --- Chạy bản tuần tự (baseline) ---
-    print(f"\n--- Running Baseline ({NUM_RUNS} runs) ---")
-    baseline_time = run_benchmark(BASELINE_EXE)
-    if baseline_time is None:
+    print(f"\n--- Running Baseline ({describe_options(BENCH_OPTIONS)}) ---")
+    baseline_stats = run_benchmark(BASELINE_EXE, check=OUTPUT_CHECK, **BENCH_OPTIONS)
+    if baseline_stats is None:
         print("Failed to get baseline time. Exiting.")
         return
-    print(f"Average sequential time: {baseline_time:.6f}s")
+    baseline_time = baseline_stats['median']
+    print(f"Sequential time: {format_stats(baseline_stats)}")
 
     parallel_times = []
-    print(f"\n--- Running Parallel ({NUM_RUNS} runs for each thread count) ---")
+    parallel_stats = []
+    valid_threads = []
+    print(f"\n--- Running Parallel ({describe_options(BENCH_OPTIONS)} for each thread count) ---")
     for p in THREAD_COUNTS:
         print(f"Testing with {p} threads...")
-        avg_time = run_benchmark(PARALLEL_EXE, [str(p)])
-        if avg_time is None:
+        stats = run_benchmark(PARALLEL_EXE, [str(p)], check=OUTPUT_CHECK, **BENCH_OPTIONS)
+        if stats is None:
             print(f"Failed for {p} threads. Skipping.")
             continue
-        parallel_times.append(avg_time)
-        print(f"  Average time: {avg_time:.6f}s")
+        parallel_times.append(stats['median'])
+        parallel_stats.append(stats)
+        valid_threads.append(p)
+        print(f"  {format_stats(stats)}")
 
     # --- Xử lý dữ liệu và tính toán ---
     # Chuyển đổi sang numpy array để tính toán dễ dàng
-    thread_counts_np = np.array(THREAD_COUNTS[:len(parallel_times)])
+    thread_counts_np = np.array(valid_threads)
     parallel_times_np = np.array(parallel_times)
 
     speedup = baseline_time / parallel_times_np
     efficiency = speedup / thread_counts_np
+    # Đầu-cuối: decode + alloc + compute + encode (None nếu binary không báo giai đoạn)
+    e2e = end_to_end_series(baseline_stats, parallel_stats)
 
     # --- In kết quả ra màn hình ---
     print("\n--- Benchmark Results ---")
@@ -108,45 +142,46 @@ def main():
     for i, p in enumerate(thread_counts_np):
         print(f"{p:<10} {parallel_times_np[i]:<15.6f} {speedup[i]:<15.2f}x {efficiency[i]:<15.2%}")
 
+    if e2e is not None:
+        print("\n--- End-to-End (decode + alloc + compute + encode) ---")
+        print(f"{'Threads':<10} {'E2E (s)':<15} {'E2E Speedup':<15} {'Throughput':<15}")
+        print("-" * 55)
+        print(f"{'1 (Seq)':<10} {baseline_stats['end_to_end']:<15.6f} {'1.00x':<15} "
+              f"{baseline_stats['throughput']:.1f} MP/s")
+        for i, p in enumerate(thread_counts_np):
+            print(f"{p:<10} {e2e['times'][i]:<15.6f} {e2e['speedups'][i]:<15.2f}x "
+                  f"{e2e['throughputs'][i]:.1f} MP/s")
+
     # --- Vẽ biểu đồ ---
-    print(f"\n--- Generating charts ---")
+    if charts:
+        print(f"\n--- Generating charts ---")
+        series = (thread_counts_np, speedup, efficiency, e2e)
+        render_charts([(chart_speedup, *series, TOPOLOGY), (chart_efficiency, *series)],
+                      dpi=CHART_DPI, workers=PLOT_JOBS)
 
-    # 1. Biểu đồ Tăng tốc (Speedup)
-    plt.figure(figsize=(10, 6))
-    plt.plot(thread_counts_np, speedup, 'o-', label='Actual Speedup')
-    plt.plot(thread_counts_np, thread_counts_np, 'r--', label='Ideal Speedup')
-    plt.title('Speedup vs. Number of Threads')
-    plt.xlabel('Number of Threads (p)')
-    plt.ylabel('Speedup (Sequential Time / Parallel Time)')
-    plt.grid(True)
-    plt.legend()
-    plt.xticks(thread_counts_np)
-    plt.savefig(SPEEDUP_CHART_FILE)
-    print(f"Saved speedup chart to {SPEEDUP_CHART_FILE}")
 
-    # 2. Biểu đồ Hiệu suất (Efficiency)
-    plt.figure(figsize=(10, 6))
-    plt.plot(thread_counts_np, efficiency, 'o-', label='Actual Efficiency')
-    plt.axhline(y=1.0, color='r', linestyle='--', label='Ideal Efficiency (100%)')
-    plt.title('Efficiency vs. Number of Threads')
-    plt.xlabel('Number of Threads (p)')
-    plt.ylabel('Efficiency (Speedup / p)')
-    plt.grid(True)
-    plt.legend()
-    plt.xticks(thread_counts_np)
-    plt.ylim(0, 1.1) # Giới hạn trục Y từ 0 đến 110%
-    plt.gca().yaxis.set_major_formatter(plt.FuncFormatter('{:.0%}'.format)) # Format Y axis as percentage
-    plt.savefig(EFFICIENCY_CHART_FILE)
-    print(f"Saved efficiency chart to {EFFICIENCY_CHART_FILE}")
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Đo speedup và efficiency của thuật toán làm mờ ảnh song song')
+    add_thread_arguments(parser)
+    add_benchmark_arguments(parser, runs=NUM_RUNS, warmup=WARMUP_RUNS)
+    add_plot_arguments(parser, dpi=CHART_DPI)
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
     # Kiểm tra thư viện cần thiết
     try:
-        import matplotlib
+        # matplotlib chỉ được import khi vẽ biểu đồ (bench.plotting.pyplot)
         import numpy
     except ImportError:
-        print("Error: 'matplotlib' and 'numpy' are required.")
-        print("Please install them using: pip install matplotlib numpy")
+        print("Error: 'numpy' is required.")
+        print("Please install it using: pip install numpy")
     else:
-        main()
+        args = parse_arguments()
+        BENCH_OPTIONS = benchmark_options(args)
+        CHART_DPI = args.dpi
+        PLOT_JOBS = args.plot_jobs
+        TOPOLOGY, THREAD_COUNTS = plan_threads(args)
+        main(charts=not args.no_plots)
+        report_store(BENCH_OPTIONS)